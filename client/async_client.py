@@ -0,0 +1,189 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from server.core.binary_protocol import MAGIC, RESPONSE_HEADER, decode_response
+from server.core.command_parser import CommandParser
+from server.core.framing import MAX_LINE_LENGTH
+from client.client import (PROTOCOLS, Request, decode_text_response, encode_binary_requests, encode_text_commands,
+                           parse_requests, text_commands)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncClient:
+    def __init__(self, host: str = 'localhost', port: int = 8000, protocol: str = 'text') -> None:
+        """Initializes an asyncio client, which speaks the same protocols as Client over asyncio streams, so
+        one event loop can keep many requests in flight without a thread per connection.
+
+        Args:
+            host (str): The server's host address. Default is 'localhost'.
+            port (int): The server's port. Default is 8000.
+            protocol (str): 'text' or 'binary', as for Client. Default is 'text'.
+
+        Attributes:
+            reader (Optional[asyncio.StreamReader]): Reads the responses, once connected.
+            writer (Optional[asyncio.StreamWriter]): Writes the commands, once connected.
+            lock (asyncio.Lock): Keeps the commands and responses of concurrent coroutines from interleaving;
+                each call writes all of its commands, then reads all of its responses, while holding it.
+
+        Raises:
+            ValueError: If the protocol is unknown.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}; expected one of {', '.join(PROTOCOLS)}")
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.lock = asyncio.Lock()
+        self.command_parser = CommandParser()
+
+    async def connect(self) -> None:
+        """Connects to the server and negotiates the binary protocol if it was requested.
+
+        Raises:
+            ConnectionError: If the server does not accept the binary protocol.
+            OSError: If the server cannot be reached.
+        """
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, limit=MAX_LINE_LENGTH)
+        if self.protocol == 'binary':
+            self.writer.write(MAGIC)
+            await self.writer.drain()
+            if await self._read_exactly(len(MAGIC)) != MAGIC:
+                raise ConnectionError("Server does not support the binary protocol")
+        logger.debug("Connected to %s:%s", self.host, self.port)
+
+    async def send_command(self, command_str: str) -> Dict[str, Any]:
+        """Sends a command to the server and receives a response.
+
+        Args:
+            command_str (str): The command string to send.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return (await self.send_many([command_str]))[0]
+
+    async def send_many(self, commands: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Pipelines several commands: writes them all at once, then reads their responses in order.
+
+        Args:
+            commands (List[str]): The command strings to send.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The response to each command, in the order the commands were given.
+        """
+        if self.protocol == 'text':
+            async with self.lock:
+                self.writer.write(encode_text_commands(commands))
+                await self.writer.drain()
+                return [await self._merge_pages(self._read_text_response) for _ in commands]
+
+        requests, responses = parse_requests(self.command_parser, commands)
+        results = iter(await self.send_requests(requests))
+        return [response if response is not None else next(results) for response in responses]
+
+    async def request(self, action: str, key: Any = None, value: Any = None,
+                      transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Sends one command given as its parts, as Client.request.
+
+        Args:
+            action (str): The command, e.g. 'PUT'.
+            key (Any): The key, or the list of keys for MGET, MPUT and MDEL, if the command takes any.
+            value (Any): The value, or the list of values for MPUT, if the command takes any.
+            transaction_id (Optional[int]): The transaction the command runs in, if any.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return (await self.send_requests([(action, key, value, transaction_id)]))[0]
+
+    async def send_requests(self, requests: List[Request]) -> List[Optional[Dict[str, Any]]]:
+        """Pipelines several commands given as (action, key, value, transaction ID) tuples, as Client.send_requests.
+
+        Args:
+            requests (List[Request]): The commands to send.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The response to each command, in order.
+        """
+        if self.protocol == 'text':
+            return await self.send_many(text_commands(requests))
+
+        opcodes, payload = encode_binary_requests(requests)
+        async with self.lock:
+            self.writer.write(payload)
+            await self.writer.drain()
+            return [await self._merge_pages(lambda: self._read_binary_response(opcode)) for opcode in opcodes]
+
+    @staticmethod
+    async def _merge_pages(read: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Reads a response, merging the pages of a streamed response into one.
+
+        Args:
+            read (Callable[[], Awaitable[Optional[Dict[str, Any]]]]): Reads and decodes the next response frame.
+
+        Returns:
+            Optional[Dict[str, Any]]: The response, with the 'data' of all its pages.
+        """
+        response = await read()
+        while response is not None and response.pop('more', False):
+            page = await read()
+            if page is None:
+                return None
+            response['data'].update(page['data'])
+            response['more'] = page.get('more', False)
+        return response
+
+    async def _read_text_response(self) -> Optional[Dict[str, Any]]:
+        """Reads and decodes the next text response frame.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded response, or None if it could not be decoded.
+        """
+        line = await self.reader.readline()
+        if not line.endswith(b'\n'):
+            raise ConnectionError("Server closed the connection")
+        return decode_text_response(line)
+
+    async def _read_binary_response(self, opcode: int) -> Dict[str, Any]:
+        """Reads and decodes the next binary response frame.
+
+        Args:
+            opcode (int): The command the response answers.
+
+        Returns:
+            Dict[str, Any]: The decoded response.
+        """
+        status, length = RESPONSE_HEADER.unpack(await self._read_exactly(RESPONSE_HEADER.size))
+        return decode_response(opcode, status, await self._read_exactly(length))
+
+    async def _read_exactly(self, size: int) -> bytes:
+        """Reads exactly size bytes.
+
+        Args:
+            size (int): The number of bytes to read.
+
+        Returns:
+            bytes: The bytes read.
+
+        Raises:
+            ConnectionError: If the server closed the connection first.
+        """
+        try:
+            return await self.reader.readexactly(size)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("Server closed the connection") from None
+
+    async def disconnect(self) -> None:
+        """Disconnects from the server. Does nothing if the client is not connected."""
+        if self.writer is None:
+            return
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except OSError:
+            pass
+        self.reader = self.writer = None
+        logger.debug("Disconnected from %s:%s", self.host, self.port)
@@ -1,18 +1,91 @@
-import socket
 import json
-from typing import Any, Dict
+import logging
+import select
+import socket
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from server.core.binary_protocol import (MAGIC, RESPONSE_HEADER, BinaryFrameBuffer, Opcode, decode_response,
+                                         encode_request, pack_items)
+from server.core.command_parser import CommandParser
+from server.core.framing import FrameReader, LineReader, recv_exactly
+
+PROTOCOLS = ('text', 'binary')
+
+# An (action, key, value, transaction ID) request, as taken by Client.send_requests
+Request = Tuple[str, Any, Any, Optional[int]]
+
+logger = logging.getLogger(__name__)
+
 
 class Client:
-    def __init__(self, host: str = 'localhost', port: int = 8000) -> None:
-        """Initializes the client with the server's host and port."""
+    def __init__(self, host: str = 'localhost', port: int = 8000, protocol: str = 'text') -> None:
+        """Initializes the client with the server's host and port.
+
+        Args:
+            host (str): The server's host address. Default is 'localhost'.
+            port (int): The server's port. Default is 8000.
+            protocol (str): 'text' for newline-delimited commands and JSON responses, or 'binary' for the
+                compact length-prefixed protocol, which carries values as raw bytes. Default is 'text'.
+
+        Attributes:
+            client_socket (Optional[socket.socket]): The connection's socket, opened by connect.
+            reader (Optional[FrameReader]): Splits the bytes received on the socket into response frames.
+
+        Raises:
+            ValueError: If the protocol is unknown.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}; expected one of {', '.join(PROTOCOLS)}")
         self.host = host
         self.port = port
-        self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.protocol = protocol
+        self.client_socket: Optional[socket.socket] = None
+        self.reader: Optional[FrameReader] = None
+        self.command_parser = CommandParser()
 
     def connect(self) -> None:
-        """Connects to the server."""
-        self.client_socket.connect((self.host, self.port))
-        print(f"Connected to {self.host}:{self.port}")
+        """Opens a new connection to the server and negotiates the binary protocol if it was requested.
+
+        Raises:
+            ConnectionError: If the server does not accept the binary protocol.
+            OSError: If the server cannot be reached.
+        """
+        self.client_socket = socket.create_connection((self.host, self.port))
+        if self.protocol == 'binary':
+            self.reader = FrameReader(self.client_socket, BinaryFrameBuffer(RESPONSE_HEADER, 1))
+            self.client_socket.sendall(MAGIC)
+            if recv_exactly(self.client_socket, len(MAGIC)) != MAGIC:
+                raise ConnectionError("Server does not support the binary protocol")
+        else:
+            self.reader = LineReader(self.client_socket)
+        logger.debug("Connected to %s:%s", self.host, self.port)
+
+    def reconnect(self) -> None:
+        """Closes the connection, if any, and opens a new one. Transactions begun on the old connection
+        are rolled back by the server once it notices the connection closed.
+
+        Raises:
+            OSError: If the server cannot be reached.
+        """
+        self.disconnect()
+        self.connect()
+
+    def is_alive(self) -> bool:
+        """Checks without a round trip that the connection is open and ready for a new command: the server
+        has not closed it, and no response is left unread from an earlier command.
+
+        Returns:
+            bool: True if the connection can be used.
+        """
+        if self.client_socket is None or self.client_socket.fileno() < 0:
+            return False
+        if self.reader.pending or self.reader.frames.buffer:
+            return False
+        try:
+            readable, _, _ = select.select([self.client_socket], [], [], 0)
+        except (OSError, ValueError):
+            return False
+        # An idle connection has nothing to read; a readable one was closed or holds a stray response
+        return not readable
 
     def send_command(self, command_str: str) -> Dict[str, Any]:
         """Sends a command to the server and receives a response.
@@ -23,17 +96,375 @@ class Client:
         Returns:
             Dict[str, Any]: The response from the server
         """
-        self.client_socket.send(command_str.encode('utf-8'))
-        response_str = self.client_socket.recv(1024).decode('utf-8').strip()
-        print("Raw response from Client:", response_str)
-        try:
-            return json.loads(response_str)
-        except json.JSONDecodeError:
-            print("Error decoding response:", response_str)
-            return None
-        # return json.loads(response_str)
+        return self.send_many([command_str])[0]
+
+    def send_many(self, commands: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Pipelines several commands: writes them all at once, then reads their responses in order.
+
+        With the binary protocol, the commands are parsed on the client and sent as binary requests.
+
+        Args:
+            commands (List[str]): The command strings to send.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The response to each command, in the order the commands were given.
+        """
+        if self.protocol == 'text':
+            self.client_socket.sendall(encode_text_commands(commands))
+            return [self._read_response() for _ in commands]
+
+        requests, responses = parse_requests(self.command_parser, commands)
+        results = iter(self.send_requests(requests))
+        return [response if response is not None else next(results) for response in responses]
+
+    def request(self, action: str, key: Any = None, value: Any = None,
+                transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Sends one command given as its parts. Unlike send_command, the value may contain spaces or
+        arbitrary bytes when the binary protocol is used.
+
+        Args:
+            action (str): The command, e.g. 'PUT'.
+            key (Any): The key, or the list of keys for MGET, MPUT and MDEL, if the command takes any.
+            value (Any): The value, or the list of values for MPUT, if the command takes any.
+            transaction_id (Optional[int]): The transaction the command runs in, if any.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return self.send_requests([(action, key, value, transaction_id)])[0]
+
+    def mget(self, keys: List[str], transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Fetches many keys in one request.
+
+        Args:
+            keys (List[str]): The keys to fetch.
+            transaction_id (Optional[int]): The transaction the command runs in.
+
+        Returns:
+            Dict[str, Any]: The response; its 'result' lists the value of each key, None for missing keys.
+        """
+        return self.request("MGET", keys, transaction_id=transaction_id)
+
+    def mput(self, pairs: Dict[str, Union[bytes, str]], transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Stores many key/value pairs in one request.
+
+        Args:
+            pairs (Dict[str, Union[bytes, str]]): The values to store by key.
+            transaction_id (Optional[int]): The transaction the command runs in.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return self.request("MPUT", list(pairs), list(pairs.values()), transaction_id)
+
+    def mdelete(self, keys: List[str], transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Deletes many keys in one request.
+
+        Args:
+            keys (List[str]): The keys to delete.
+            transaction_id (Optional[int]): The transaction the command runs in.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return self.request("MDEL", keys, transaction_id=transaction_id)
+
+    def incr(self, key: str, amount: int = 1, transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Adds to the integer value of a key on the server, in one request.
+
+        Args:
+            key (str): The key.
+            amount (int): The number to add; negative to subtract. Default is 1.
+            transaction_id (Optional[int]): The transaction the command runs in, or None to commit at once.
+
+        Returns:
+            Dict[str, Any]: The response; its 'result' is the new value.
+        """
+        if amount == 1:
+            return self.request("INCR", key, transaction_id=transaction_id)
+        if amount < 0:
+            return self.request("DECRBY", key, -amount, transaction_id)
+        return self.request("INCRBY", key, amount, transaction_id)
+
+    def append(self, key: str, value: Union[bytes, str], transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Appends to the value of a key on the server, in one request.
+
+        Args:
+            key (str): The key.
+            value (Union[bytes, str]): The bytes to append.
+            transaction_id (Optional[int]): The transaction the command runs in, or None to commit at once.
+
+        Returns:
+            Dict[str, Any]: The response; its 'result' is the length of the new value.
+        """
+        return self.request("APPEND", key, value, transaction_id)
+
+    def get_version(self, key: str) -> Dict[str, Any]:
+        """Fetches the latest committed value of a key together with its version, for a later cas.
+
+        Args:
+            key (str): The key to fetch.
+
+        Returns:
+            Dict[str, Any]: The response; its 'result' is [value, version], with version 0 for a missing key.
+        """
+        return self.request("GETV", key)
+
+    def cas(self, key: str, expected_version: int, value: Union[bytes, str]) -> Dict[str, Any]:
+        """Writes a key only if its version is still the expected one, committing at once.
+
+        Args:
+            key (str): The key to write.
+            expected_version (int): The version returned by get_version, or 0 for a key expected not to exist.
+            value (Union[bytes, str]): The new value.
+
+        Returns:
+            Dict[str, Any]: The response; its 'result' is the key's new version, or None if the key changed.
+        """
+        return self.request("CAS", key, [expected_version, value])
+
+    def watch(self, keys: List[str], transaction_id: int) -> Dict[str, Any]:
+        """Makes a transaction optimistic: it takes no locks, and its commit fails if a watched or written
+        key was changed by someone else after the transaction began.
+
+        Args:
+            keys (List[str]): The keys to watch.
+            transaction_id (int): The transaction.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        return self.request("WATCH", keys, transaction_id=transaction_id)
+
+    def send_requests(self, requests: List[Tuple[str, Any, Any, Optional[int]]]) -> List[Optional[Dict[str, Any]]]:
+        """Pipelines several commands given as (action, key, value, transaction ID) tuples. For MGET, MPUT
+        and MDEL the key is a list of keys, and for MPUT the value is the list of their values. For SCAN the
+        key is the prefix and the value is [cursor, count]; for RANGE, the start key and [end key, limit].
+        For WATCH the key is the list of keys to watch, and for CAS the value is [expected version, value].
+
+        Args:
+            requests (List[Tuple[str, Any, Any, Optional[int]]]): The commands to send.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The response to each command, in order. Over the binary
+            protocol, GET results are the stored bytes.
+        """
+        if self.protocol == 'text':
+            return self.send_many(text_commands(requests))
+
+        opcodes, payload = encode_binary_requests(requests)
+        self.client_socket.sendall(payload)
+        return [self._merge_pages(lambda: self._read_binary_response(opcode)) for opcode in opcodes]
+
+    def show_all_pages(self) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """Sends SHOWALL and yields the pages of the answer as they arrive, instead of collecting the whole
+        store first like send_command("SHOWALL") does. The rest of the answer must be read before the
+        connection is used for anything else.
+
+        Yields:
+            Dict[str, Dict[str, Any]]: The 'value' and 'transaction_id' of the keys of each page.
+
+        Raises:
+            ValueError: If the server answers with an error.
+        """
+        if self.protocol == 'text':
+            self.client_socket.sendall(b"SHOWALL\n")
+            read = self._read_frame_response
+        else:
+            self.client_socket.sendall(encode_request(Opcode.SHOWALL))
+            read = lambda: self._read_binary_response(Opcode.SHOWALL)
+        while True:
+            response = read()
+            if response is None or response['status'] != 'Ok':
+                raise ValueError(response['mesg'] if response else "Undecodable SHOWALL response")
+            yield response['data']
+            if not response.get('more'):
+                return
+
+    @staticmethod
+    def _merge_pages(read: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Reads a response, merging the pages of a streamed response into one.
+
+        Args:
+            read (Callable[[], Optional[Dict[str, Any]]]): Reads and decodes the next response frame.
+
+        Returns:
+            Optional[Dict[str, Any]]: The response, with the 'data' of all its pages.
+        """
+        response = read()
+        while response is not None and response.pop('more', False):
+            page = read()
+            if page is None:
+                return None
+            response['data'].update(page['data'])
+            response['more'] = page.get('more', False)
+        return response
+
+    def _read_binary_response(self, opcode: int) -> Dict[str, Any]:
+        """Reads and decodes the next binary response frame.
+
+        Args:
+            opcode (int): The command the response answers.
+
+        Returns:
+            Dict[str, Any]: The decoded response.
+        """
+        frame = self.reader.read_frame()
+        if frame is None:
+            raise ConnectionError("Server closed the connection")
+        return decode_response(opcode, *frame)
+
+    def _read_response(self) -> Optional[Dict[str, Any]]:
+        """Reads and decodes the next text response, merging the pages of a streamed response.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded response, or None if it could not be decoded.
+        """
+        return self._merge_pages(self._read_frame_response)
+
+    def _read_frame_response(self) -> Optional[Dict[str, Any]]:
+        """Reads and decodes the next text response frame.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded response, or None if it could not be decoded.
+        """
+        line = self.reader.read_frame()
+        if line is None:
+            raise ConnectionError("Server closed the connection")
+        return decode_text_response(line)
 
     def disconnect(self) -> None:
-        """Disconnects from the server."""
+        """Disconnects from the server. Does nothing if the client is not connected."""
+        if self.client_socket is None:
+            return
         self.client_socket.close()
-        print("Disconnected from server")
+        self.client_socket = None
+        logger.debug("Disconnected from %s:%s", self.host, self.port)
+
+
+def encode_text_commands(commands: List[str]) -> bytes:
+    """Encodes text commands as newline-delimited frames, replacing newlines inside a command by spaces.
+
+    Args:
+        commands (List[str]): The command strings.
+
+    Returns:
+        bytes: The frames, ready to be written at once.
+    """
+    return ''.join(command_str.replace('\n', ' ') + '\n' for command_str in commands).encode('utf-8')
+
+
+def decode_text_response(line: bytes) -> Optional[Dict[str, Any]]:
+    """Decodes a text response frame.
+
+    Args:
+        line (bytes): The frame, without its newline.
+
+    Returns:
+        Optional[Dict[str, Any]]: The decoded response, or None if it is not valid JSON.
+    """
+    response_str = line.decode('utf-8').strip()
+    logger.debug("Raw response: %s", response_str)
+    try:
+        return json.loads(response_str)
+    except json.JSONDecodeError:
+        logger.debug("Error decoding response: %s", response_str)
+        return None
+
+
+def parse_requests(command_parser: CommandParser,
+                   commands: List[str]) -> Tuple[List[Request], List[Optional[Dict[str, Any]]]]:
+    """Parses command strings on the client into (action, key, value, transaction ID) requests for the binary
+    protocol. A command that does not parse is answered locally instead of being sent.
+
+    Args:
+        command_parser (CommandParser): Parses the commands.
+        commands (List[str]): The command strings.
+
+    Returns:
+        Tuple[List[Request], List[Optional[Dict[str, Any]]]]: The requests to send,
+        and for each command its error response, or None where the server's response goes.
+    """
+    requests = []
+    responses: List[Optional[Dict[str, Any]]] = []
+    for command_str in commands:
+        try:
+            action, params, transaction_id = command_parser.parse_command(command_str)
+        except ValueError as e:
+            responses.append({'status': 'Error', 'mesg': str(e)})
+            continue
+        if 'pairs' in params:
+            keys, values = [key for key, _ in params['pairs']], [value for _, value in params['pairs']]
+            requests.append((action, keys, values, transaction_id))
+        elif action == "SCAN":
+            requests.append((action, params['prefix'], [params['cursor'], params['count']], transaction_id))
+        elif action == "RANGE":
+            requests.append((action, params['start'], [params['end'], params['limit']], transaction_id))
+        elif action == "CAS":
+            requests.append((action, params['key'], [params['version'], params['value']], transaction_id))
+        elif 'ttl' in params:
+            requests.append(("PUTEX", params['key'], [params['ttl'], params['value']], transaction_id))
+        elif 'amount' in params or 'seconds' in params:
+            requests.append((action, params['key'], params.get('amount', params.get('seconds')), transaction_id))
+        else:
+            requests.append((action, params.get('keys', params.get('key')), params.get('value'), transaction_id))
+        responses.append(None)
+    return requests, responses
+
+
+def text_commands(requests: List[Request]) -> List[str]:
+    """Formats (action, key, value, transaction ID) requests, as taken by Client.send_requests, as text commands.
+
+    Args:
+        requests (List[Request]): The requests.
+
+    Returns:
+        List[str]: The command strings.
+    """
+    commands = []
+    for action, key, value, transaction_id in requests:
+        if isinstance(key, list):
+            values = value if value is not None else [None] * len(key)
+            parts = [part for pair in zip(key, values) for part in pair]
+        elif action.upper() == "PUTEX":
+            parts, action = [key, value[1], "EX", value[0]], "PUT"
+        elif isinstance(value, list):
+            parts = [key, *value]
+        else:
+            parts = [key, value]
+        parts = [action] + [part.decode('utf-8') if isinstance(part, bytes) else part for part in parts]
+        commands.append(' '.join(str(part) for part in parts + [transaction_id] if part is not None))
+    return commands
+
+
+def encode_binary_requests(requests: List[Request]) -> Tuple[List[int], bytes]:
+    """Encodes (action, key, value, transaction ID) requests, as taken by Client.send_requests, as binary frames.
+
+    Args:
+        requests (List[Request]): The requests.
+
+    Returns:
+        Tuple[List[int], bytes]: The opcode of each request, to decode its response, and the frames.
+
+    Raises:
+        KeyError: If an action has no opcode.
+    """
+    opcodes = []
+    payload = []
+    for action, key, value, transaction_id in requests:
+        opcode = Opcode[action.upper()]
+        if isinstance(key, list):
+            key = pack_items([item.encode('utf-8') for item in key])
+            if value is not None:
+                value = pack_items([item.encode('utf-8') if isinstance(item, str) else item for item in value])
+        else:
+            key = (key or '').encode('utf-8')
+            if isinstance(value, list):
+                value = pack_items([item if isinstance(item, bytes) else str(item).encode('utf-8') for item in value])
+            elif isinstance(value, str):
+                value = value.encode('utf-8')
+            elif isinstance(value, int):
+                value = str(value).encode('ascii')
+        opcodes.append(opcode)
+        payload.append(encode_request(opcode, transaction_id, key, value or b''))
+    return opcodes, b''.join(payload)
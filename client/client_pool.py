@@ -0,0 +1,182 @@
+import contextlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from client.client import PROTOCOLS, Client
+
+logger = logging.getLogger(__name__)
+
+
+class ClientPool:
+    def __init__(self, host: str = 'localhost', port: int = 8000, protocol: str = 'text', size: int = 8,
+                 timeout: Optional[float] = None) -> None:
+        """Initializes a thread-safe pool of connected clients, so that threads share a few long-lived
+        connections instead of connecting for every request. Connections are opened on first use, checked
+        before being handed out, and reopened if the server closed them.
+
+        A transaction belongs to the connection it was begun on: the server rolls it back when that
+        connection closes. Commands of one transaction should therefore run on one client taken from
+        client(), rather than through the pool's send_command, which may pick a different client each time.
+
+        Args:
+            host (str): The server's host address. Default is 'localhost'.
+            port (int): The server's port. Default is 8000.
+            protocol (str): The protocol of every client, 'text' or 'binary'. Default is 'text'.
+            size (int): The maximum number of open connections. Default is 8.
+            timeout (Optional[float]): Seconds to wait for a free client when all of them are in use. None waits
+                indefinitely.
+
+        Attributes:
+            idle (List[Client]): Connected clients not in use, the most recently returned last.
+            created (int): The number of clients handed out or idle; never more than size.
+            condition (threading.Condition): Guards idle, created and closed, and signals returned clients.
+            closed (bool): Whether close was called; the pool hands out no more clients.
+
+        Raises:
+            ValueError: If the protocol is unknown or the size is not positive.
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown protocol {protocol!r}; expected one of {', '.join(PROTOCOLS)}")
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.host = host
+        self.port = port
+        self.protocol = protocol
+        self.size = size
+        self.timeout = timeout
+        self.idle: List[Client] = []
+        self.created = 0
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def acquire(self) -> Client:
+        """Takes a connected client out of the pool, opening a connection if none is idle and the pool is not
+        full, or else waiting for one to be returned. An idle client whose connection is no longer usable is
+        reconnected first.
+
+        Returns:
+            Client: The client, to be given back with release.
+
+        Raises:
+            TimeoutError: If no client became free within the timeout.
+            ConnectionError: If the pool is closed.
+            OSError: If a connection to the server could not be opened.
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self.condition:
+            while True:
+                if self.closed:
+                    raise ConnectionError("Client pool is closed")
+                if self.idle:
+                    client = self.idle.pop()
+                    break
+                if self.created < self.size:
+                    self.created += 1
+                    client = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No client became free within {self.timeout} seconds")
+                self.condition.wait(remaining)
+        try:
+            if client is None:
+                client = Client(self.host, self.port, self.protocol)
+                client.connect()
+            elif not client.is_alive():
+                logger.debug("Reconnecting a pooled client to %s:%s", self.host, self.port)
+                client.reconnect()
+        except BaseException:
+            if client is not None:
+                client.disconnect()
+            self._forget_one()
+            raise
+        return client
+
+    def release(self, client: Client, broken: bool = False) -> None:
+        """Returns a client to the pool.
+
+        Args:
+            client (Client): A client taken with acquire.
+            broken (bool): Whether the connection may be unusable, e.g. after an error in the middle of a
+                command; it is then closed instead of kept. Default is False.
+        """
+        with self.condition:
+            if not broken and not self.closed:
+                self.idle.append(client)
+                self.condition.notify()
+                return
+        client.disconnect()
+        self._forget_one()
+
+    def _forget_one(self) -> None:
+        """Gives up the slot of a client that was closed, so a waiting thread can open a new connection."""
+        with self.condition:
+            self.created -= 1
+            self.condition.notify()
+
+    @contextlib.contextmanager
+    def client(self) -> Iterator[Client]:
+        """Lends a client for a block of commands, such as a whole transaction. A client whose block raised
+        is closed rather than reused, since it may have been left in the middle of a response.
+
+        Yields:
+            Client: The client.
+        """
+        client = self.acquire()
+        try:
+            yield client
+        except BaseException:
+            self.release(client, broken=True)
+            raise
+        self.release(client)
+
+    def send_command(self, command_str: str) -> Dict[str, Any]:
+        """Sends a command on any free client and returns the response.
+
+        Args:
+            command_str (str): The command string to send.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        with self.client() as client:
+            return client.send_command(command_str)
+
+    def send_many(self, commands: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Pipelines several commands on one free client.
+
+        Args:
+            commands (List[str]): The command strings to send.
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: The response to each command, in order.
+        """
+        with self.client() as client:
+            return client.send_many(commands)
+
+    def request(self, action: str, key: Any = None, value: Any = None,
+                transaction_id: Optional[int] = None) -> Dict[str, Any]:
+        """Sends one command given as its parts on any free client, as Client.request.
+
+        Args:
+            action (str): The command, e.g. 'PUT'.
+            key (Any): The key, or the list of keys for MGET, MPUT and MDEL, if the command takes any.
+            value (Any): The value, or the list of values for MPUT, if the command takes any.
+            transaction_id (Optional[int]): The transaction the command runs in, if any.
+
+        Returns:
+            Dict[str, Any]: The response from the server
+        """
+        with self.client() as client:
+            return client.request(action, key, value, transaction_id)
+
+    def close(self) -> None:
+        """Closes the idle connections; clients still in use are closed when they are returned."""
+        with self.condition:
+            self.closed = True
+            idle, self.idle = self.idle, []
+            self.created -= len(idle)
+            self.condition.notify_all()
+        for client in idle:
+            client.disconnect()
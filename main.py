@@ -1,16 +1,20 @@
 from server.core.server import Server
+from server.core.async_server import AsyncServer
 from client.client import Client
 import threading
 
 
-def start_server():
+def start_server(use_asyncio: bool = False):
     """
     Starts the server in a new thread.
 
     Prints a message to indicate the server is starting and initiates the server.
+
+    Args:
+        use_asyncio (bool): Serve clients from one asyncio event loop instead of a thread per connection.
     """
     print("Starting server...")
-    server = Server()
+    server = AsyncServer() if use_asyncio else Server()
     threading.Thread(target=server.start).start()
 
 
@@ -42,15 +46,18 @@ def main():
     while True:
         print("\nMain Menu:")
         print("1. Start Server")
-        print("2. Connect Client")
-        print("3. Exit")
+        print("2. Start Server (asyncio)")
+        print("3. Connect Client")
+        print("4. Exit")
         choice = input("Select an option: ")
 
         if choice == '1':
             start_server()
         elif choice == '2':
-            connect_client()
+            start_server(use_asyncio=True)
         elif choice == '3':
+            connect_client()
+        elif choice == '4':
             print("Exiting...")
             break
         else:
@@ -1,51 +1,88 @@
+import abc
+import sys
 from collections import OrderedDict
-from typing import Any, Optional
+from threading import RLock
+from typing import Any, Dict, Optional
 
+# Default returned by get_from_cache lookups that need to tell a cached None apart from a miss
+CACHE_MISS = object()
 
-class LRUCache:
-    def __init__(self, capacity: int) -> None:
+
+class CachingStrategy(abc.ABC):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None) -> None:
         """
-        Initializes an LRU (Least Recently Used) cache with the given capacity.
+        Initializes the parts shared by every cache: the size limits, the counters and the lock.
+        Subclasses decide which entry to evict by implementing the _on_* hooks and _victim.
 
         Args:
             capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+
+        Attributes:
+            cache (Dict[str, Any]): The cached key-value pairs.
+            sizes (Dict[str, int]): The estimated size in bytes of each cached entry.
+            size_bytes (int): The estimated size in bytes of all cached entries.
+            hits (int): The number of lookups that found the key.
+            misses (int): The number of lookups that did not find the key.
+            evictions (int): The number of entries evicted to stay within the limits.
+            lock (RLock): Guards the cache; hold it to make a check and an update atomic.
         """
         self.capacity = capacity
-        self.cache = OrderedDict()
+        self.max_bytes = max_bytes
+        self.cache: Dict[str, Any] = {}
+        self.sizes: Dict[str, int] = {}
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = RLock()
 
-    def get_from_cache(self, key: str) -> Optional[Any]:
+    def get_from_cache(self, key: str, default: Any = None) -> Optional[Any]:
         """
         Retrieves the value associated with the given key from the cache.
 
         Args:
             key (str): The key to look up in the cache.
+            default (Any): The value returned when the key is not cached, so a cached None can be told apart from a miss.
 
         Returns:
-            Optional[Any]: The value associated with the key, or None if the key is not in the cache.
+            Optional[Any]: The value associated with the key, or default if the key is not in the cache.
         """
-        value = self.cache.pop(key, None)
-        if value is not None:
-            self.cache[key] = value  # Move the accessed item to the end to show it was recently used
-        return value
+        with self.lock:
+            if key not in self.cache:
+                self.misses += 1
+                self._on_miss(key)
+                return default
+            self.hits += 1
+            self._on_hit(key)
+            return self.cache[key]
 
     def add_to_cache(self, key: str, value: Any) -> None:
         """
-        Adds a key-value pair to the cache.
+        Adds a key-value pair to the cache, evicting entries chosen by the policy to stay within the limits.
 
         Args:
             key (str): The key to add.
             value (Any): The value to associate with the key.
         """
-        # Remove the key if it's already in the cache
-        if key in self.cache:
-            self.cache.pop(key)
+        size = sys.getsizeof(key) + sys.getsizeof(value)
+        with self.lock:
+            # Remove the key if it's already in the cache
+            self.remove_from_cache(key)
+            if self.capacity <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+                return
 
-        # Evict the least recently used item if the cache reaches its capacity
-        if len(self.cache) >= self.capacity:
-            self.cache.popitem(last=False)  # Removes the first item
+            # Evict until the new entry fits
+            while self.cache and (len(self.cache) >= self.capacity or (
+                    self.max_bytes is not None and self.size_bytes + size > self.max_bytes)):
+                self.remove_from_cache(self._victim())
+                self.evictions += 1
 
-        # Add the key-value pair to the cache
-        self.cache[key] = value
+            # Add the key-value pair to the cache
+            self.cache[key] = value
+            self.sizes[key] = size
+            self.size_bytes += size
+            self._on_insert(key)
 
     def remove_from_cache(self, key: str) -> None:
         """
@@ -54,10 +91,75 @@ class LRUCache:
         Args:
             key (str): The key to remove.
         """
-        self.cache.pop(key, None)
+        with self.lock:
+            if key in self.cache:
+                del self.cache[key]
+                self.size_bytes -= self.sizes.pop(key)
+                self._on_remove(key)
 
     def clear_cache(self) -> None:
         """
         Clears all key-value pairs from the cache.
         """
-        self.cache.clear()
+        with self.lock:
+            self.cache.clear()
+            self.sizes.clear()
+            self.size_bytes = 0
+            self._on_clear()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            Dict[str, int]: The number of entries, estimated bytes, hits, misses and evictions.
+        """
+        with self.lock:
+            return {'entries': len(self.cache), 'bytes': self.size_bytes, 'hits': self.hits,
+                    'misses': self.misses, 'evictions': self.evictions}
+
+    @abc.abstractmethod
+    def _victim(self) -> str:
+        """
+        Chooses the cached key to evict next. Called with the lock held and the cache non-empty.
+
+        Returns:
+            str: The key to evict.
+        """
+
+    def _on_hit(self, key: str) -> None:
+        """Records a lookup that found the key."""
+
+    def _on_miss(self, key: str) -> None:
+        """Records a lookup that did not find the key."""
+
+    def _on_insert(self, key: str) -> None:
+        """Records that the key was added to the cache."""
+
+    def _on_remove(self, key: str) -> None:
+        """Records that the key was removed from the cache."""
+
+    def _on_clear(self) -> None:
+        """Records that every key was removed from the cache."""
+
+
+class LRUCache(CachingStrategy):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes a thread-safe LRU (Least Recently Used) cache with the given limits.
+
+        Args:
+            capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+
+        Attributes:
+            cache (OrderedDict): The cached key-value pairs, least recently used first.
+        """
+        super().__init__(capacity, max_bytes)
+        self.cache = OrderedDict()
+
+    def _victim(self) -> str:
+        return next(iter(self.cache))
+
+    def _on_hit(self, key: str) -> None:
+        self.cache.move_to_end(key)  # Mark the accessed item as recently used
@@ -0,0 +1,64 @@
+from typing import Dict, List, Optional
+from server.caching.caching_strategy import CachingStrategy
+
+
+class ClockCache(CachingStrategy):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes a thread-safe CLOCK (second-chance) cache. A hit only sets a reference bit instead of
+        reordering entries; the clock hand clears bits as it sweeps and evicts the first unreferenced key.
+
+        Args:
+            capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+
+        Attributes:
+            slots (List[Optional[str]]): The ring of cached keys; None marks a free slot.
+            referenced (List[bool]): The reference bit of each slot.
+            positions (Dict[str, int]): The slot of each cached key.
+            free_slots (List[int]): Slots freed by removals, reused before the ring grows.
+            hand (int): The slot the clock hand points at.
+        """
+        super().__init__(capacity, max_bytes)
+        self.slots: List[Optional[str]] = []
+        self.referenced: List[bool] = []
+        self.positions: Dict[str, int] = {}
+        self.free_slots: List[int] = []
+        self.hand = 0
+
+    def _victim(self) -> str:
+        while True:
+            if self.hand >= len(self.slots):
+                self.hand = 0
+            key = self.slots[self.hand]
+            if key is not None:
+                if not self.referenced[self.hand]:
+                    return key
+                self.referenced[self.hand] = False  # Second chance
+            self.hand += 1
+
+    def _on_hit(self, key: str) -> None:
+        self.referenced[self.positions[key]] = True
+
+    def _on_insert(self, key: str) -> None:
+        if self.free_slots:
+            slot = self.free_slots.pop()
+            self.slots[slot] = key
+            self.referenced[slot] = False
+        else:
+            slot = len(self.slots)
+            self.slots.append(key)
+            self.referenced.append(False)
+        self.positions[key] = slot
+
+    def _on_remove(self, key: str) -> None:
+        slot = self.positions.pop(key)
+        self.slots[slot] = None
+        self.free_slots.append(slot)
+
+    def _on_clear(self) -> None:
+        self.slots.clear()
+        self.referenced.clear()
+        self.positions.clear()
+        self.free_slots.clear()
+        self.hand = 0
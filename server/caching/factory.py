@@ -0,0 +1,35 @@
+from typing import Dict, Type
+from server.caching.caching_strategy import CachingStrategy, LRUCache
+from server.caching.clock import ClockCache
+from server.caching.lfu import LFUCache
+from server.caching.tinylfu import WTinyLFUCache
+from server.caching.ttl import TTLCache
+
+CACHING_STRATEGIES: Dict[str, Type[CachingStrategy]] = {
+    'lru': LRUCache,
+    'lfu': LFUCache,
+    'clock': ClockCache,
+    'tinylfu': WTinyLFUCache,
+    'ttl': TTLCache,
+}
+
+
+def create_caching_strategy(policy: str, capacity: int = 10000, **kwargs) -> CachingStrategy:
+    """
+    Creates a cache using the named eviction policy.
+
+    Args:
+        policy (str): One of 'lru', 'lfu', 'clock', 'tinylfu' or 'ttl'.
+        capacity (int): The maximum number of key-value pairs the cache can hold. Default is 10000.
+        **kwargs: Extra options of the policy, such as max_bytes or default_ttl.
+
+    Returns:
+        CachingStrategy: The new cache.
+
+    Raises:
+        ValueError: If the policy is unknown.
+    """
+    strategy_class = CACHING_STRATEGIES.get(policy.lower())
+    if strategy_class is None:
+        raise ValueError(f"Unknown caching policy '{policy}'")
+    return strategy_class(capacity, **kwargs)
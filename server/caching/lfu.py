@@ -0,0 +1,64 @@
+from collections import OrderedDict
+from typing import Dict, Optional
+from server.caching.caching_strategy import CachingStrategy
+
+
+class LFUCache(CachingStrategy):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None) -> None:
+        """
+        Initializes a thread-safe LFU (Least Frequently Used) cache. Eviction is O(1): keys are kept in
+        buckets by hit count, and ties within a bucket are broken by recency.
+
+        Args:
+            capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+
+        Attributes:
+            frequencies (Dict[str, int]): The access count of each cached key.
+            buckets (Dict[int, OrderedDict]): The cached keys grouped by access count, least recently used first.
+            min_frequency (int): The lowest access count of any cached key.
+        """
+        super().__init__(capacity, max_bytes)
+        self.frequencies: Dict[str, int] = {}
+        self.buckets: Dict[int, OrderedDict] = {}
+        self.min_frequency = 0
+
+    def _victim(self) -> str:
+        return next(iter(self.buckets[self.min_frequency]))
+
+    def _on_hit(self, key: str) -> None:
+        frequency = self.frequencies[key]
+        self._unlink(key, frequency)
+        self.frequencies[key] = frequency + 1
+        self.buckets.setdefault(frequency + 1, OrderedDict())[key] = None
+        if self.min_frequency == frequency and frequency not in self.buckets:
+            self.min_frequency = frequency + 1
+
+    def _on_insert(self, key: str) -> None:
+        self.frequencies[key] = 1
+        self.buckets.setdefault(1, OrderedDict())[key] = None
+        self.min_frequency = 1
+
+    def _on_remove(self, key: str) -> None:
+        frequency = self.frequencies.pop(key)
+        self._unlink(key, frequency)
+        if self.min_frequency == frequency and frequency not in self.buckets:
+            self.min_frequency = min(self.buckets, default=0)
+
+    def _on_clear(self) -> None:
+        self.frequencies.clear()
+        self.buckets.clear()
+        self.min_frequency = 0
+
+    def _unlink(self, key: str, frequency: int) -> None:
+        """
+        Removes a key from its frequency bucket, dropping the bucket once it is empty.
+
+        Args:
+            key (str): The key to remove.
+            frequency (int): The key's current access count.
+        """
+        bucket = self.buckets[frequency]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[frequency]
@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from typing import List, Optional
+from server.caching.caching_strategy import CachingStrategy
+
+
+class FrequencySketch:
+    # Counters saturate like the 4-bit counters of the original TinyLFU sketch
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int, depth: int = 4) -> None:
+        """
+        Initializes a count-min sketch estimating how often keys were accessed recently. Each key maps to
+        one counter per row by double hashing. All counters are halved once the number of recorded
+        accesses reaches ten times the cache capacity, so old popularity fades.
+
+        Args:
+            capacity (int): The capacity of the cache the sketch admits entries for.
+            depth (int): The number of counter rows. Default is 4.
+
+        Attributes:
+            table (List[List[int]]): The counter rows; each row has a power-of-two width.
+            mask (int): The bit mask mapping a hash onto a row index.
+            additions (int): The number of accesses recorded since the last halving.
+            sample_size (int): The number of accesses after which the counters are halved.
+        """
+        width = 1
+        while width < max(capacity, 16):
+            width <<= 1
+        self.table: List[List[int]] = [[0] * width for _ in range(depth)]
+        self.mask = width - 1
+        self.additions = 0
+        self.sample_size = 10 * max(capacity, 1)
+
+    def increment(self, key: str) -> None:
+        """
+        Records one access to a key.
+
+        Args:
+            key (str): The accessed key.
+        """
+        h = hash(key)
+        step = (h >> 32) | 1
+        mask = self.mask
+        for row in self.table:
+            index = h & mask
+            if row[index] < self.MAX_COUNT:
+                row[index] += 1
+            h += step
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._reset()
+
+    def estimate(self, key: str) -> int:
+        """
+        Estimates how often a key was accessed recently.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            int: The smallest counter of the key across all rows.
+        """
+        h = hash(key)
+        step = (h >> 32) | 1
+        mask = self.mask
+        count = self.MAX_COUNT
+        for row in self.table:
+            count = min(count, row[h & mask])
+            h += step
+        return count
+
+    def _reset(self) -> None:
+        """Halves every counter to age out old accesses."""
+        self.table = [[count >> 1 for count in row] for row in self.table]
+        self.additions //= 2
+
+
+class WTinyLFUCache(CachingStrategy):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None, window_ratio: float = 0.01,
+                 protected_ratio: float = 0.8) -> None:
+        """
+        Initializes a thread-safe W-TinyLFU cache. New keys enter a small LRU window. When the window
+        overflows, its oldest key only enters the main segmented LRU if the frequency sketch says it is
+        accessed more often than the main cache's own eviction candidate, which keeps one-off scans from
+        flushing the hot set.
+
+        Args:
+            capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+            window_ratio (float): The share of the capacity given to the admission window. Default is 1%.
+            protected_ratio (float): The share of the main cache reserved for keys hit more than once. Default is 80%.
+
+        Attributes:
+            sketch (FrequencySketch): Estimates the recent access frequency of every key seen.
+            window (OrderedDict): Keys in the admission window, least recently used first.
+            probation (OrderedDict): Main-cache keys hit only once since admission, least recently used first.
+            protected (OrderedDict): Main-cache keys hit again while on probation, least recently used first.
+        """
+        super().__init__(capacity, max_bytes)
+        self.window_capacity = max(1, int(capacity * window_ratio))
+        self.protected_capacity = int((capacity - self.window_capacity) * protected_ratio)
+        self.sketch = FrequencySketch(capacity)
+        self.window = OrderedDict()
+        self.probation = OrderedDict()
+        self.protected = OrderedDict()
+
+    def _victim(self) -> str:
+        main_victim = self._main_victim()
+        if len(self.window) < self.window_capacity and main_victim is not None:
+            return main_victim
+        if not self.window:
+            return main_victim
+
+        candidate = next(iter(self.window))
+        if main_victim is None or self.sketch.estimate(candidate) <= self.sketch.estimate(main_victim):
+            return candidate
+        # The candidate is more popular: admit it to the main cache and evict the main cache's victim
+        del self.window[candidate]
+        self.probation[candidate] = None
+        return main_victim
+
+    def _main_victim(self) -> Optional[str]:
+        """
+        Returns the main cache's eviction candidate: the oldest key on probation, else the oldest protected key.
+
+        Returns:
+            Optional[str]: The candidate key, or None if the main cache is empty.
+        """
+        if self.probation:
+            return next(iter(self.probation))
+        if self.protected:
+            return next(iter(self.protected))
+        return None
+
+    def _on_hit(self, key: str) -> None:
+        self.sketch.increment(key)
+        if key in self.window:
+            self.window.move_to_end(key)
+        elif key in self.probation:
+            del self.probation[key]
+            self.protected[key] = None
+            if len(self.protected) > self.protected_capacity:
+                demoted, _ = self.protected.popitem(last=False)
+                self.probation[demoted] = None
+        else:
+            self.protected.move_to_end(key)
+
+    def _on_miss(self, key: str) -> None:
+        self.sketch.increment(key)
+
+    def _on_insert(self, key: str) -> None:
+        self.window[key] = None
+        # While the cache still has room, window overflow moves to the main cache without a contest
+        while len(self.window) > self.window_capacity:
+            overflow, _ = self.window.popitem(last=False)
+            self.probation[overflow] = None
+
+    def _on_remove(self, key: str) -> None:
+        for segment in (self.window, self.probation, self.protected):
+            if key in segment:
+                del segment[key]
+                return
+
+    def _on_clear(self) -> None:
+        self.window.clear()
+        self.probation.clear()
+        self.protected.clear()
@@ -0,0 +1,101 @@
+import heapq
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from server.caching.caching_strategy import LRUCache
+
+
+class TTLCache(LRUCache):
+    def __init__(self, capacity: int, max_bytes: Optional[int] = None, default_ttl: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        """
+        Initializes a thread-safe LRU cache whose entries expire after a per-entry time to live.
+        Expired entries count as misses and are dropped before a new entry is added, so no live entry is
+        evicted while an expired one remains; they are counted as expirations, not evictions.
+
+        Args:
+            capacity (int): The maximum number of key-value pairs the cache can hold.
+            max_bytes (Optional[int]): The maximum estimated size of the cached keys and values in bytes. None for no limit.
+            default_ttl (Optional[float]): Seconds an entry lives when add_to_cache is given no ttl. None never expires.
+            clock (Callable[[], float]): Returns the current time in seconds. Defaults to time.monotonic.
+
+        Attributes:
+            deadlines (Dict[str, float]): The expiry time of each cached key that has one.
+            expiry_heap (List[Tuple[float, str]]): (deadline, key) pairs ordered by deadline; stale pairs are skipped lazily.
+            expirations (int): The number of entries dropped because they expired.
+        """
+        super().__init__(capacity, max_bytes)
+        self.default_ttl = default_ttl
+        self.clock = clock
+        self.deadlines: Dict[str, float] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        self.expirations = 0
+
+    def get_from_cache(self, key: str, default: Any = None) -> Optional[Any]:
+        """
+        Retrieves the value associated with the given key from the cache, treating an expired entry as a miss.
+
+        Args:
+            key (str): The key to look up in the cache.
+            default (Any): The value returned when the key is not cached or has expired.
+
+        Returns:
+            Optional[Any]: The value associated with the key, or default.
+        """
+        with self.lock:
+            deadline = self.deadlines.get(key)
+            if deadline is not None and deadline <= self.clock():
+                self.remove_from_cache(key)
+                self.expirations += 1
+            return super().get_from_cache(key, default)
+
+    def add_to_cache(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        Adds a key-value pair to the cache with a time to live.
+
+        Args:
+            key (str): The key to add.
+            value (Any): The value to associate with the key.
+            ttl (Optional[float]): Seconds until the entry expires. Defaults to default_ttl.
+        """
+        if ttl is None:
+            ttl = self.default_ttl
+        with self.lock:
+            self._drop_expired()
+            super().add_to_cache(key, value)
+            if ttl is not None and key in self.cache:
+                deadline = self.clock() + ttl
+                self.deadlines[key] = deadline
+                heapq.heappush(self.expiry_heap, (deadline, key))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the cache counters, including the number of expired entries.
+
+        Returns:
+            Dict[str, int]: The number of entries, estimated bytes, hits, misses, evictions and expirations.
+        """
+        with self.lock:
+            stats = super().stats()
+            stats['expirations'] = self.expirations
+            return stats
+
+    def _drop_expired(self) -> None:
+        """Removes the entries that have expired. Called with the lock held."""
+        now = self.clock()
+        while self.expiry_heap and self.expiry_heap[0][0] <= now:
+            deadline, key = heapq.heappop(self.expiry_heap)
+            if self.deadlines.get(key) == deadline:
+                self.remove_from_cache(key)
+                self.expirations += 1
+
+    def _on_remove(self, key: str) -> None:
+        self.deadlines.pop(key, None)
+        if len(self.expiry_heap) > 2 * len(self.cache) + 16:
+            # Drop pairs left behind by removed or re-added keys
+            self.expiry_heap = [(deadline, heap_key) for deadline, heap_key in self.expiry_heap
+                                if self.deadlines.get(heap_key) == deadline]
+            heapq.heapify(self.expiry_heap)
+
+    def _on_clear(self) -> None:
+        self.deadlines.clear()
+        self.expiry_heap.clear()
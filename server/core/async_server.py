@@ -0,0 +1,180 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Iterator, List, Optional, Set
+from server.core.framing import FrameBuffer
+from server.core.binary_protocol import MAGIC, OPCODE_ACTIONS, REQUEST_HEADER, BinaryFrameBuffer
+from server.core.server import Server
+from server.data_store.workers.process_data_store import ProcessDataStore
+
+
+class AsyncServer(Server):
+    # Commands that never wait for a key lock, so they are cheaper to run on the event loop than on a worker
+    NON_BLOCKING_ACTIONS = frozenset({"BEGIN", "GET", "MGET", "TTL", "COMMIT", "ROLLBACK", "COMMITALL", "STATS",
+                                      "SCAN", "RANGE", "GETV", "WATCH"})
+    # Commands whose response is sent in several chunks
+    STREAMED_ACTIONS = frozenset({"SHOWALL"})
+    # Commands that wait for the commit log, when the data store has one
+    LOGGED_ACTIONS = frozenset({"COMMIT", "COMMITALL"})
+    # Commands a process-backed data store answers without a round trip to a worker process
+    LOCAL_ACTIONS = frozenset({"BEGIN"})
+
+    def __init__(self, host: str = 'localhost', port: int = 8000, backlog: int = 1024, max_workers: int = 32,
+                 data_store: Optional[Any] = None) -> None:
+        """
+        Initializes an asyncio server with the given host and port. Connections are served by one event loop
+        instead of a thread each, so thousands of mostly idle clients cost no threads. Command batches run on a
+        small worker pool, because a command may wait for a lock and must not stall the event loop.
+
+        Args:
+            host (str): The host address on which the server will run. Default is 'localhost'.
+            port (int): The port number on which the server will listen. Default is 8000.
+            backlog (int): The number of pending connections the listening socket queues. Default is 1024.
+            max_workers (int): The number of threads processing commands. Default is 32.
+            data_store (Optional[Any]): The store serving the commands. Defaults to a new DataStore.
+        """
+        super().__init__(host, port, backlog, data_store)
+        self.max_workers = max_workers
+        self.non_blocking_actions = self.NON_BLOCKING_ACTIONS
+        if isinstance(self.data_store, ProcessDataStore):
+            # Reads are pipe round trips and a cross-worker commit is a two-phase commit, so one slow worker
+            # would stall every connection
+            self.non_blocking_actions = self.NON_BLOCKING_ACTIONS & self.LOCAL_ACTIONS
+        elif getattr(self.data_store, 'commit_log', None) is not None:
+            self.non_blocking_actions = self.NON_BLOCKING_ACTIONS - self.LOGGED_ACTIONS
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stop_event: Optional[asyncio.Event] = None
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.connections: Set[asyncio.StreamWriter] = set()
+
+    def start(self) -> None:
+        """
+        Starts the server and runs its event loop until stop() is called.
+        """
+        asyncio.run(self.serve())
+        print("Server loop has ended")
+
+    async def serve(self) -> None:
+        """
+        Listens for client connections and serves them until stop() is called.
+        """
+        self.loop = asyncio.get_running_loop()
+        self.stop_event = asyncio.Event()
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='command')
+        server = await asyncio.start_server(self.handle_connection, self.host, self.port,
+                                            backlog=self.backlog, reuse_address=True)
+        self.running = True
+        self.started.set()
+        print(f"Server started on {self.host}:{self.port}")
+
+        try:
+            await self.stop_event.wait()
+        finally:
+            server.close()
+            for writer in list(self.connections):
+                writer.close()
+            await server.wait_closed()
+            self.executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Handles a single client connection, reading newline-delimited or binary commands and responding in order.
+        Transactions the client began and left open are rolled back when the connection closes.
+
+        Args:
+            reader (asyncio.StreamReader): Reads the client's commands.
+            writer (asyncio.StreamWriter): Writes the responses back to the client.
+        """
+        print(f"New connection from {writer.get_extra_info('peername')}")
+        self.connections.add(writer)
+        owned: Set[int] = set()
+        try:
+            data = await reader.read(1)
+            binary = data == MAGIC[:1]
+            if binary:
+                # Raises IncompleteReadError, an EOFError, if the client closes mid-handshake
+                if data + await reader.readexactly(len(MAGIC) - 1) != MAGIC:
+                    raise ValueError("Unsupported protocol version")
+                writer.write(MAGIC)
+                frames = BinaryFrameBuffer(REQUEST_HEADER, 2)
+                process = self.process_binary
+                data = await reader.read(65536)
+            else:
+                frames = FrameBuffer()
+                process = self.process_lines
+            while True:
+                batch = frames.feed(data) if data else frames.close()
+                if batch:
+                    actions = self._actions(batch, binary)
+                    if actions <= self.non_blocking_actions:
+                        writer.write(b''.join(process(batch, owned)))
+                    elif actions.isdisjoint(self.STREAMED_ACTIONS):
+                        writer.write(await self.loop.run_in_executor(self.executor, self._join, process(batch, owned)))
+                    else:
+                        # Every chunk is produced on a worker and written before the next one is built
+                        chunks = process(batch, owned)
+                        chunk = await self.loop.run_in_executor(self.executor, next, chunks, None)
+                        while chunk is not None:
+                            writer.write(chunk)
+                            await writer.drain()
+                            chunk = await self.loop.run_in_executor(self.executor, next, chunks, None)
+                    await writer.drain()
+                if not data:
+                    break
+                data = await reader.read(65536)
+        except (ValueError, OSError, EOFError) as e:
+            print(f"Closing connection: {e}")
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+            if not owned or "ROLLBACK" in self.non_blocking_actions:
+                # A rollback never waits for a lock, so it runs on the event loop like ROLLBACK does
+                self.release_transactions(owned)
+            else:
+                try:
+                    await self.loop.run_in_executor(self.executor, self.release_transactions, owned)
+                except RuntimeError:  # The executor was shut down with the server
+                    self.release_transactions(owned)
+
+    @staticmethod
+    def _actions(frames: List[Any], binary: bool) -> Set[Optional[str]]:
+        """
+        Lists the commands of a batch, to decide where it runs.
+
+        Args:
+            frames (List[Any]): The text lines or decoded binary requests of the batch.
+            binary (bool): Whether the frames are binary requests.
+
+        Returns:
+            Set[Optional[str]]: The commands of the batch; None stands for an unknown binary opcode.
+        """
+        actions = set()
+        for frame in frames:
+            if binary:
+                actions.add(OPCODE_ACTIONS.get(frame[0]))
+            else:
+                parts = frame.split(None, 1)
+                if parts:
+                    actions.add(parts[0].upper().decode('ascii', errors='replace'))
+        return actions
+
+    @staticmethod
+    def _join(chunks: Iterator[bytes]) -> bytes:
+        """
+        Runs a batch that is not streamed to completion.
+
+        Args:
+            chunks (Iterator[bytes]): The response chunks of the batch.
+
+        Returns:
+            bytes: The whole response.
+        """
+        return b''.join(chunks)
+
+    def stop(self) -> None:
+        """
+        Stops the server from any thread, closing the listening socket and every client connection.
+        """
+        self.running = False
+        if self.loop is not None and self.stop_event is not None:
+            self.loop.call_soon_threadsafe(self.stop_event.set)
+        print("Server stopped")
@@ -0,0 +1,272 @@
+import json
+import struct
+from enum import IntEnum
+from typing import Any, Dict, List, Optional, Tuple
+from server.core.framing import MAX_LINE_LENGTH
+
+# Sent by a client as the first bytes of a connection to switch it to the binary protocol, and echoed by the
+# server to accept. Text commands never start with a NUL byte, so the server can tell the protocols apart.
+MAGIC = b'\x00MSB\x01'
+
+# opcode, transaction ID (0 for none), key length, value length; followed by the key and value bytes
+REQUEST_HEADER = struct.Struct('>BIII')
+# status, payload length; followed by the payload bytes
+RESPONSE_HEADER = struct.Struct('>BI')
+TRANSACTION_ID = struct.Struct('>I')
+# Prefixes each item of a list body; -1 encodes None
+ITEM_LENGTH = struct.Struct('>i')
+
+
+class Opcode(IntEnum):
+    """
+    Enum to specify the command of a binary request. The key body of MGET, MPUT and MDEL holds a list of
+    keys, and the value body of MPUT the list of their values, each encoded with pack_items. The value body
+    of EXPIRE holds the seconds as ASCII digits, and EXPIRE and TTL answer with an integer in ASCII digits.
+    WATCH takes its keys like MGET. The value body of CAS lists the expected version in ASCII digits and the
+    new value; CAS answers with the new version, or NIL if the key changed. GETV answers with the list of the
+    value and its version. The value body of INCRBY and DECRBY holds the amount in ASCII digits; INCR,
+    INCRBY, DECRBY and APPEND answer with the new value or length in ASCII digits. PUTEX is PUT with an
+    expiry: its value body lists the seconds in ASCII digits and the value, like CAS.
+    """
+    BEGIN = 1
+    GET = 2
+    PUT = 3
+    DEL = 4
+    COMMIT = 5
+    ROLLBACK = 6
+    COMMITALL = 7
+    SHOWALL = 8
+    MGET = 9
+    MPUT = 10
+    MDEL = 11
+    SNAPSHOT = 12
+    EXPIRE = 13
+    TTL = 14
+    STATS = 15
+    SCAN = 16
+    RANGE = 17
+    CAS = 18
+    GETV = 19
+    WATCH = 20
+    INCR = 21
+    INCRBY = 22
+    DECRBY = 23
+    APPEND = 24
+    PUTEX = 25
+
+
+class Status(IntEnum):
+    """
+    Enum to specify the outcome of a binary response.
+
+    Attributes:
+        OK (int): The command succeeded; the payload holds its result, if any.
+        NIL (int): The command succeeded and its result is None, e.g. GET of a missing key.
+        ERROR (int): The command failed; the payload holds the UTF-8 error message.
+        PARTIAL (int): One page of a streamed result; more frames answering the same request follow.
+    """
+    OK = 0
+    NIL = 1
+    ERROR = 2
+    PARTIAL = 3
+
+
+OPCODE_ACTIONS: Dict[int, str] = {opcode.value: opcode.name for opcode in Opcode}
+
+
+class BinaryFrameBuffer:
+    def __init__(self, header: struct.Struct, lengths: int, max_frame_length: int = MAX_LINE_LENGTH) -> None:
+        """
+        Initializes a buffer that splits a byte stream into length-prefixed binary frames. Like FrameBuffer,
+        it does no I/O itself, so blocking and asyncio readers share it.
+
+        Args:
+            header (struct.Struct): The fixed-size frame header; its last fields are the lengths of the bodies that follow.
+            lengths (int): The number of body lengths at the end of the header.
+            max_frame_length (int): The maximum size of the bodies of a single frame in bytes.
+
+        Attributes:
+            buffer (bytearray): Received bytes that do not form a complete frame yet.
+        """
+        self.header = header
+        self.lengths = lengths
+        self.max_frame_length = max_frame_length
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Tuple]:
+        """
+        Appends received bytes and returns every frame they complete.
+
+        Args:
+            data (bytes): The bytes received.
+
+        Returns:
+            List[Tuple]: The completed frames, possibly empty. Each frame holds the header fields other than
+            the lengths, followed by one bytes object per body.
+
+        Raises:
+            ValueError: If a frame exceeds max_frame_length.
+        """
+        self.buffer += data
+        buffer = self.buffer
+        header_size = self.header.size
+        frames = []
+        offset = 0
+        while len(buffer) - offset >= header_size:
+            fields = self.header.unpack_from(buffer, offset)
+            sizes = fields[-self.lengths:]
+            total = sum(sizes)
+            if total > self.max_frame_length:
+                raise ValueError("Frame exceeds the maximum frame size")
+            if len(buffer) - offset < header_size + total:
+                break
+            start = offset + header_size
+            bodies = []
+            for size in sizes:
+                bodies.append(bytes(buffer[start:start + size]))
+                start += size
+            frames.append(fields[:-self.lengths] + tuple(bodies))
+            offset = start
+        if offset:
+            del buffer[:offset]
+        return frames
+
+    def close(self) -> List[Tuple]:
+        """
+        Drops a truncated frame left in the buffer once the stream has ended.
+
+        Returns:
+            List[Tuple]: Always empty; a frame without all of its bytes cannot be processed.
+        """
+        self.buffer.clear()
+        return []
+
+
+def pack_items(items: List[Optional[bytes]]) -> bytes:
+    """
+    Encodes a list of byte strings as one body, each item prefixed with its length.
+
+    Args:
+        items (List[Optional[bytes]]): The items; None is encoded as length -1.
+
+    Returns:
+        bytes: The encoded list.
+    """
+    pack = ITEM_LENGTH.pack
+    return b''.join(pack(-1) if item is None else pack(len(item)) + item for item in items)
+
+
+def unpack_items(data: bytes) -> List[Optional[bytes]]:
+    """
+    Decodes a list body encoded by pack_items.
+
+    Args:
+        data (bytes): The encoded list.
+
+    Returns:
+        List[Optional[bytes]]: The items.
+
+    Raises:
+        ValueError: If the body is truncated.
+    """
+    items: List[Optional[bytes]] = []
+    offset = 0
+    while offset < len(data):
+        if offset + ITEM_LENGTH.size > len(data):
+            raise ValueError("Truncated list item")
+        (size,) = ITEM_LENGTH.unpack_from(data, offset)
+        offset += ITEM_LENGTH.size
+        if size < 0:
+            items.append(None)
+            continue
+        if offset + size > len(data):
+            raise ValueError("Truncated list item")
+        items.append(data[offset:offset + size])
+        offset += size
+    return items
+
+
+def encode_request(opcode: int, transaction_id: Optional[int] = None, key: bytes = b'', value: bytes = b'') -> bytes:
+    """
+    Encodes a binary request frame.
+
+    Args:
+        opcode (int): The command to run.
+        transaction_id (Optional[int]): The transaction the command runs in, if any.
+        key (bytes): The UTF-8 encoded key, if the command takes one.
+        value (bytes): The raw value, if the command takes one.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    return REQUEST_HEADER.pack(opcode, transaction_id or 0, len(key), len(value)) + key + value
+
+
+def encode_response(response: Dict[str, Any]) -> bytes:
+    """
+    Encodes a response dictionary, as returned by Server.execute_command, into a binary response frame.
+
+    Args:
+        response (Dict[str, Any]): The response status and any additional data.
+
+    Returns:
+        bytes: The encoded frame.
+    """
+    if response['status'] != 'Ok':
+        payload = response['mesg'].encode('utf-8')
+        return RESPONSE_HEADER.pack(Status.ERROR, len(payload)) + payload
+    if 'result' in response:
+        result = response['result']
+        if result is None:
+            return RESPONSE_HEADER.pack(Status.NIL, 0)
+        if isinstance(result, list):
+            result = pack_items([item.encode('utf-8') if isinstance(item, str)
+                                 else str(item).encode('ascii') if isinstance(item, int) else item
+                                 for item in result])
+        elif isinstance(result, str):
+            result = result.encode('utf-8')
+        elif isinstance(result, int):
+            result = str(result).encode('ascii')
+        return RESPONSE_HEADER.pack(Status.OK, len(result)) + result
+    if 'transaction_id' in response:
+        payload = TRANSACTION_ID.pack(response['transaction_id'])
+    elif 'data' in response:
+        payload = json.dumps(response['data']).encode('utf-8')
+    else:
+        payload = b''
+    return RESPONSE_HEADER.pack(Status.PARTIAL if response.get('more') else Status.OK, len(payload)) + payload
+
+
+def decode_response(opcode: int, status: int, payload: bytes) -> Dict[str, Any]:
+    """
+    Decodes a binary response into the dictionary the text protocol would have returned.
+    Values are returned as the raw bytes that were stored.
+
+    Args:
+        opcode (int): The command the response answers.
+        status (int): The response status.
+        payload (bytes): The response payload.
+
+    Returns:
+        Dict[str, Any]: A dictionary containing the response status and any additional data.
+    """
+    if status == Status.ERROR:
+        return {'status': 'Error', 'mesg': payload.decode('utf-8', errors='replace')}
+    if opcode == Opcode.GET:
+        return {'status': 'Ok', 'result': None if status == Status.NIL else payload}
+    if opcode == Opcode.MGET:
+        return {'status': 'Ok', 'result': unpack_items(payload)}
+    if opcode in (Opcode.EXPIRE, Opcode.TTL, Opcode.INCR, Opcode.INCRBY, Opcode.DECRBY, Opcode.APPEND):
+        return {'status': 'Ok', 'result': int(payload)}
+    if opcode == Opcode.CAS:
+        return {'status': 'Ok', 'result': None if status == Status.NIL else int(payload)}
+    if opcode == Opcode.GETV:
+        value, version = unpack_items(payload)
+        return {'status': 'Ok', 'result': [value, int(version)]}
+    if opcode == Opcode.BEGIN:
+        return {'status': 'Ok', 'transaction_id': TRANSACTION_ID.unpack(payload)[0]}
+    if opcode == Opcode.SHOWALL:
+        return {'status': 'Ok', 'data': json.loads(payload), 'more': status == Status.PARTIAL}
+    if opcode in (Opcode.STATS, Opcode.SCAN, Opcode.RANGE):
+        return {'status': 'Ok', 'data': json.loads(payload)}
+    return {'status': 'Ok'}
@@ -34,19 +34,116 @@ class CommandParser:
             transaction_id = int(parts[-1])
             parts = parts[:-1]
 
-        # PUT command
+        # PUT command, optionally with an expiry: PUT key value EX seconds
         if action == "PUT":
+            # Without a transaction ID, a trailing number is the value
+            if len(parts) == 2 and transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            # Without a transaction ID, the trailing number is the expiry
+            if len(parts) == 4 and parts[3].upper() == "EX" and transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if len(parts) == 5 and parts[3].upper() == "EX":
+                if not parts[4].isdigit() or int(parts[4]) == 0:
+                    raise ValueError("PUT EX requires a positive number of seconds")
+                params['ttl'] = int(parts[4])
+                parts = parts[:3]
             if len(parts) != 3:
                 raise ValueError("PUT command requires two parameters: key and value")
             params['key'] = parts[1]
             params['value'] = parts[2]
 
-        # GET and DEL commands
-        elif action == "GET" or action == "DEL":
+        # EXPIRE command
+        elif action == "EXPIRE":
+            # Without a transaction ID, the trailing number is the expiry
+            if len(parts) == 2 and transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if len(parts) != 3 or not parts[2].isdigit():
+                raise ValueError("EXPIRE command requires two parameters: key and seconds")
+            params['key'] = parts[1]
+            params['seconds'] = int(parts[2])
+
+        # GET, DEL and TTL commands
+        elif action in ("GET", "DEL", "TTL"):
             if len(parts) != 2:
                 raise ValueError(f"{action} command requires one parameter: key")
             params['key'] = parts[1]
 
+        # INCR key, INCRBY key amount, DECRBY key amount and APPEND key value commands
+        elif action in ("INCR", "INCRBY", "DECRBY", "APPEND"):
+            # Without a transaction ID, a trailing number is the amount or the value
+            if action != "INCR" and len(parts) == 2 and transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if action == "INCR":
+                if len(parts) != 2:
+                    raise ValueError("INCR command requires one parameter: key")
+            elif action == "APPEND":
+                if len(parts) != 3:
+                    raise ValueError("APPEND command requires two parameters: key and value")
+                params['value'] = parts[2]
+            else:
+                if len(parts) != 3 or not parts[2].lstrip('-').isdigit():
+                    raise ValueError(f"{action} command requires two parameters: key and an integer amount")
+                params['amount'] = int(parts[2])
+            params['key'] = parts[1]
+
+        # CAS key version value and GETV key commands, which never run in a transaction
+        elif action in ("CAS", "GETV"):
+            # A trailing number is the value or the key, not a transaction ID
+            if transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if action == "GETV":
+                if len(parts) != 2:
+                    raise ValueError("GETV command requires one parameter: key")
+                params['key'] = parts[1]
+            else:
+                if len(parts) != 4 or not parts[2].isdigit():
+                    raise ValueError("CAS command requires three parameters: key, version and value")
+                params['key'] = parts[1]
+                params['version'] = int(parts[2])
+                params['value'] = parts[3]
+
+        # WATCH key [key ...] id command
+        elif action == "WATCH":
+            if len(parts) < 2 or transaction_id is None:
+                raise ValueError("WATCH command requires at least one key and a transaction ID")
+            params['keys'] = parts[1:]
+
+        # MGET and MDEL commands
+        elif action == "MGET" or action == "MDEL":
+            if len(parts) < 2:
+                raise ValueError(f"{action} command requires at least one key")
+            params['keys'] = parts[1:]
+
+        # MPUT command
+        elif action == "MPUT":
+            # A trailing number is a value, not a transaction ID, if it completes the last pair
+            if transaction_id is not None and len(parts) % 2 == 0:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if len(parts) < 3 or len(parts) % 2 == 0:
+                raise ValueError("MPUT command requires key and value pairs")
+            params['pairs'] = list(zip(parts[1::2], parts[2::2]))
+
+        # SCAN prefix cursor count and RANGE start end limit commands
+        elif action in ("SCAN", "RANGE"):
+            # The trailing number is the page size, not a transaction ID
+            if transaction_id is not None:
+                parts.append(str(transaction_id))
+                transaction_id = None
+            if len(parts) != 4 or not parts[3].isdigit() or int(parts[3]) == 0:
+                if action == "SCAN":
+                    raise ValueError("SCAN command requires a prefix, a cursor and a positive count")
+                raise ValueError("RANGE command requires a start key, an end key and a positive limit")
+            if action == "SCAN":
+                params = {'prefix': parts[1], 'cursor': parts[2], 'count': int(parts[3])}
+            else:
+                params = {'start': parts[1], 'end': parts[2], 'limit': int(parts[3])}
+
         # BEGIN command
         elif action == "BEGIN":
             if len(parts) != 1:
@@ -57,6 +154,16 @@ class CommandParser:
             if len(parts) != 1:
                 raise ValueError("SHOWALL command takes no parameters")
 
+        # SNAPSHOT command
+        elif action == "SNAPSHOT":
+            if len(parts) != 1:
+                raise ValueError("SNAPSHOT command takes no parameters")
+
+        # STATS command
+        elif action == "STATS":
+            if len(parts) != 1:
+                raise ValueError("STATS command takes no parameters")
+
         # COMMITALL command
         elif action == "COMMITALL":
             if len(parts) != 1:
@@ -0,0 +1,167 @@
+import socket
+from collections import deque
+from typing import Any, Deque, List, Optional
+
+# Lines longer than this are rejected instead of buffered without bound
+MAX_LINE_LENGTH = 64 * 1024 * 1024
+
+
+class FrameBuffer:
+    def __init__(self, max_line_length: int = MAX_LINE_LENGTH) -> None:
+        """
+        Initializes a buffer that splits a byte stream into newline-delimited frames, however the
+        transport happens to split or coalesce them. It does no I/O itself, so blocking and asyncio
+        readers share it.
+
+        Args:
+            max_line_length (int): The maximum size of a single frame in bytes.
+
+        Attributes:
+            buffer (bytearray): Received bytes that do not form a complete line yet.
+        """
+        self.max_line_length = max_line_length
+        self.buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """
+        Appends received bytes and returns every line they complete.
+
+        Args:
+            data (bytes): The bytes received.
+
+        Returns:
+            List[bytes]: The completed lines without their newline, possibly empty.
+
+        Raises:
+            ValueError: If a line exceeds max_line_length.
+        """
+        self.buffer += data
+        end = self.buffer.rfind(b'\n')
+        if end < 0:
+            if len(self.buffer) > self.max_line_length:
+                raise ValueError("Line exceeds the maximum frame size")
+            return []
+        lines = bytes(self.buffer[:end]).split(b'\n')
+        del self.buffer[:end + 1]
+        return lines
+
+    def close(self) -> List[bytes]:
+        """
+        Returns an unterminated last line left in the buffer once the stream has ended.
+
+        Returns:
+            List[bytes]: The last line, or an empty list if nothing was left over.
+        """
+        if not self.buffer:
+            return []
+        line = bytes(self.buffer)
+        self.buffer.clear()
+        return [line]
+
+
+class FrameReader:
+    def __init__(self, sock: socket.socket, frames: Any) -> None:
+        """
+        Initializes a streaming reader that splits the bytes received on a socket into frames.
+
+        Args:
+            sock (socket.socket): The connected socket to read from.
+            frames (Any): Splits the received bytes into frames; a FrameBuffer or a BinaryFrameBuffer.
+
+        Attributes:
+            pending (Deque[Any]): Complete frames received but not returned yet.
+        """
+        self.sock = sock
+        self.frames = frames
+        self.pending: Deque[Any] = deque()
+
+    def read_frames(self) -> Optional[List[Any]]:
+        """
+        Waits until at least one complete frame is available and returns every complete frame received so far,
+        so pipelined requests can be handled as one batch.
+
+        Returns:
+            Optional[List[Any]]: The frames, or None once the peer closed the connection.
+
+        Raises:
+            ValueError: If a frame exceeds the maximum frame size.
+        """
+        if self.pending:
+            frames = list(self.pending)
+            self.pending.clear()
+            return frames
+        while True:
+            data = self.sock.recv(65536)
+            if not data:
+                # The peer may have closed after an unterminated last frame
+                return self.frames.close() or None
+            frames = self.frames.feed(data)
+            if frames:
+                return frames
+
+    def read_frame(self) -> Optional[Any]:
+        """
+        Returns the next complete frame.
+
+        Returns:
+            Optional[Any]: The frame, or None once the peer closed the connection.
+
+        Raises:
+            ValueError: If a frame exceeds the maximum frame size.
+        """
+        if not self.pending:
+            frames = self.read_frames()
+            if frames is None:
+                return None
+            self.pending.extend(frames)
+        return self.pending.popleft()
+
+
+class LineReader(FrameReader):
+    def __init__(self, sock: socket.socket, max_line_length: int = MAX_LINE_LENGTH) -> None:
+        """
+        Initializes a streaming reader that splits the bytes received on a socket into newline-delimited frames.
+
+        Args:
+            sock (socket.socket): The connected socket to read from.
+            max_line_length (int): The maximum size of a single frame in bytes.
+        """
+        super().__init__(sock, FrameBuffer(max_line_length))
+
+    def read_lines(self) -> Optional[List[bytes]]:
+        """
+        Returns every complete line received so far, waiting for at least one.
+
+        Returns:
+            Optional[List[bytes]]: The lines without their newline, or None once the peer closed the connection.
+        """
+        return self.read_frames()
+
+    def read_line(self) -> Optional[bytes]:
+        """
+        Returns the next complete line.
+
+        Returns:
+            Optional[bytes]: The line without its newline, or None once the peer closed the connection.
+        """
+        return self.read_frame()
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """
+    Receives exactly size bytes from a blocking socket.
+
+    Args:
+        sock (socket.socket): The connected socket to read from.
+        size (int): The number of bytes to receive.
+
+    Returns:
+        bytes: The received bytes; shorter than size only if the peer closed the connection.
+    """
+    data = b''
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
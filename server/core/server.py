@@ -3,34 +3,54 @@ import threading
 import json
 from server.data_store.data_store import DataStore
 from server.core.command_parser import CommandParser
-from typing import Any, Dict
+from server.core.framing import FrameReader, LineReader, recv_exactly
+from server.core.binary_protocol import (MAGIC, OPCODE_ACTIONS, REQUEST_HEADER, BinaryFrameBuffer, encode_response,
+                                         unpack_items)
+from server.data_store.concurrency.locking import LockError
+from server.data_store.eviction.memory_limit import MemoryLimitError
+from server.data_store.transactions.transaction import TransactionAbortedError, WriteConflictError
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 
 class Server:
-    def __init__(self, host: str = 'localhost', port: int = 8000) -> None:
+    # The number of keys per response frame of a streamed SHOWALL
+    SHOWALL_PAGE_SIZE = 1000
+    # Commands that run as their own single-key transaction when they are given no transaction ID
+    AUTOCOMMIT_ACTIONS = frozenset({"GET", "PUT", "DEL", "EXPIRE", "TTL", "INCR", "INCRBY", "DECRBY", "APPEND"})
+
+    def __init__(self, host: str = 'localhost', port: int = 8000, backlog: int = 128,
+                 data_store: Optional[Any] = None) -> None:
         """
-        Initializes the server with the given host and port.
+        Initializes the server with the given host and port. Each client connection is handled by its own thread;
+        see AsyncServer for the asyncio mode.
 
         Args:
             host (str): The host address on which the server will run. Default is 'localhost'.
             port (int): The port number on which the server will listen. Default is 8000.
+            backlog (int): The number of pending connections the listening socket queues. Default is 128.
+            data_store (Optional[Any]): The store serving the commands, e.g. a ProcessDataStore. Defaults to a new DataStore.
         """
         self.host = host
         self.port = port
-        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.data_store = DataStore()
+        self.backlog = backlog
+        self.server_socket = None
+        self.data_store = data_store if data_store is not None else DataStore()
         self.command_parser = CommandParser()
         self.running = False
+        self.started = threading.Event()
 
     def start(self) -> None:
         """
         Starts the server, listens for client connections, and processes commands.
         The server will continue running until the `self.running` is set to False.
         """
+        self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
-        self.server_socket.listen(5)
+        self.server_socket.listen(self.backlog)
         self.server_socket.settimeout(1)  # Set a timeout of 1 second
         self.running = True
+        self.started.set()
         print(f"Server started on {self.host}:{self.port}")
 
         while self.running:
@@ -41,6 +61,10 @@ class Server:
                 client_thread.start()
             except socket.timeout:
                 pass  # Ignore timeout exceptions; just continue checking self.running
+            except OSError:
+                if self.running:
+                    raise
+                break  # The socket was closed by stop()
 
         print("Server loop has ended")  # Debug message to confirm the loop has ended
 
@@ -48,46 +72,266 @@ class Server:
         """
         Handles a single client connection, reading commands and responding.
 
+        Commands and responses are newline-delimited text, unless the client opens the connection with the
+        binary protocol's MAGIC bytes. A client may pipeline many commands in one write; they are processed
+        in order and their responses sent back together in one write, except that SHOWALL is streamed page by page.
+        Transactions the client began and left open are rolled back when the connection closes.
+
         Args:
             client_socket (socket.socket): The client socket to communicate with.
         """
         with client_socket:
-            while True:
-                command_str = client_socket.recv(1024).decode('utf-8').strip()
-                print(f"Received command: {command_str}")
-                if not command_str:
-                    break
+            try:
+                binary = self.negotiate(client_socket)
+            except (ValueError, OSError) as e:
+                print(f"Closing connection: {e}")
+                return
+            if binary:
+                reader = FrameReader(client_socket, BinaryFrameBuffer(REQUEST_HEADER, 2))
+                process = self.process_binary
+            else:
+                reader = LineReader(client_socket)
+                process = self.process_lines
+            owned: Set[int] = set()
+            try:
+                while True:
+                    try:
+                        frames = reader.read_frames()
+                    except (ValueError, OSError) as e:
+                        print(f"Closing connection: {e}")
+                        break
+                    if frames is None:
+                        break
+                    try:
+                        for chunk in process(frames, owned):
+                            client_socket.sendall(chunk)
+                    except OSError:
+                        break
+            finally:
+                self.release_transactions(owned)
+
+    def negotiate(self, client_socket: socket.socket) -> bool:
+        """
+        Detects the protocol a new connection speaks and accepts the binary protocol if the client asked for it.
+
+        Args:
+            client_socket (socket.socket): The newly accepted client socket.
+
+        Returns:
+            bool: True if the connection speaks the binary protocol, False for the text protocol.
+
+        Raises:
+            ValueError: If the client asked for an unsupported binary protocol version.
+        """
+        if client_socket.recv(1, socket.MSG_PEEK) != MAGIC[:1]:
+            return False
+        if recv_exactly(client_socket, len(MAGIC)) != MAGIC:
+            raise ValueError("Unsupported protocol version")
+        client_socket.sendall(MAGIC)
+        return True
+
+    def release_transactions(self, owned: Set[int]) -> None:
+        """
+        Rolls back the transactions a closed connection left open, so their locks are not held forever.
+
+        Args:
+            owned (Set[int]): The transactions begun on the connection.
+        """
+        for transaction_id in owned:
+            if self.data_store.has_transaction(transaction_id):
+                print(f"Rolling back transaction {transaction_id} of a closed connection")
+                self.data_store.rollback_transaction(transaction_id)
+        owned.clear()
+
+    def process_lines(self, lines: List[bytes], owned: Optional[Set[int]] = None) -> Iterator[bytes]:
+        """
+        Processes a batch of pipelined command frames in order.
+
+        Args:
+            lines (List[bytes]): The command frames, without their newline.
+            owned (Optional[Set[int]]): The transactions begun on the client's connection, kept up to date.
+
+        Yields:
+            bytes: The newline-delimited JSON responses, one per command; consecutive responses are joined into
+            one chunk, and a SHOWALL response is split into one response per page.
+        """
+        responses = []
+        for line in lines:
+            command_str = line.decode('utf-8', errors='replace').strip()
+            print(f"Received command: {command_str}")
+            if command_str.upper() == "SHOWALL":
+                if responses:
+                    yield ''.join(responses).encode('utf-8')
+                    responses = []
+                yield from self._stream_show_all(lambda response: (json.dumps(response) + '\n').encode('utf-8'))
+                continue
+            response = self.process_command(command_str, owned)
+            print("Server response:", response)
+            responses.append(json.dumps(response) + '\n')
+        if responses:
+            yield ''.join(responses).encode('utf-8')
+
+    def process_binary(self, frames: List[Tuple[int, int, bytes, bytes]],
+                       owned: Optional[Set[int]] = None) -> Iterator[bytes]:
+        """
+        Processes a batch of pipelined binary request frames in order. Values are stored and returned
+        as the raw bytes the client sent.
+
+        Args:
+            frames (List[Tuple[int, int, bytes, bytes]]): The (opcode, transaction ID, key, value) of each request.
+            owned (Optional[Set[int]]): The transactions begun on the client's connection, kept up to date.
+
+        Yields:
+            bytes: The binary responses, one per request; consecutive responses are joined into one chunk, and
+            a SHOWALL response is split into one PARTIAL frame per page followed by an OK frame.
+        """
+        responses = []
+        for opcode, transaction_id, key, value in frames:
+            action = OPCODE_ACTIONS.get(opcode)
+            if action == "SHOWALL":
+                if responses:
+                    yield b''.join(responses)
+                    responses = []
+                yield from self._stream_show_all(encode_response)
+                continue
+            if action is None:
+                response = {'status': 'Error', 'mesg': 'Invalid command'}
+            else:
+                try:
+                    if action in ("MGET", "MDEL", "WATCH"):
+                        params = {'keys': [item.decode('utf-8') for item in unpack_items(key)]}
+                    elif action == "MPUT":
+                        keys = [item.decode('utf-8') for item in unpack_items(key)]
+                        values = unpack_items(value)
+                        if len(keys) != len(values) or None in values:
+                            raise ValueError("MPUT requires one value per key")
+                        params = {'pairs': list(zip(keys, values))}
+                    elif action == "EXPIRE":
+                        params = {'key': key.decode('utf-8'), 'seconds': int(value)}
+                    elif action == "PUTEX":
+                        items = unpack_items(value)
+                        if len(items) != 2 or None in items:
+                            raise ValueError("PUTEX requires the seconds and a value")
+                        action, params = "PUT", {'key': key.decode('utf-8'), 'value': items[1], 'ttl': int(items[0])}
+                        if params['ttl'] <= 0:
+                            raise ValueError("PUT EX requires a positive number of seconds")
+                    elif action in ("INCRBY", "DECRBY"):
+                        params = {'key': key.decode('utf-8'), 'amount': int(value)}
+                    elif action == "CAS":
+                        items = unpack_items(value)
+                        if len(items) != 2 or None in items:
+                            raise ValueError("CAS requires an expected version and a value")
+                        params = {'key': key.decode('utf-8'), 'version': int(items[0]), 'value': items[1]}
+                    elif action in ("SCAN", "RANGE"):
+                        # The key carries the prefix or start key, the value the cursor or end key and the page size
+                        items = unpack_items(value)
+                        if len(items) != 2 or None in items:
+                            raise ValueError(f"{action} requires two parameters after the key")
+                        bound, size = items[0].decode('utf-8'), int(items[1])
+                        if action == "SCAN":
+                            params = {'prefix': key.decode('utf-8'), 'cursor': bound, 'count': size}
+                        else:
+                            params = {'start': key.decode('utf-8'), 'end': bound, 'limit': size}
+                    else:
+                        params = {'key': key.decode('utf-8'), 'value': value}
+                except UnicodeDecodeError:
+                    response = {'status': 'Error', 'mesg': 'Keys must be UTF-8'}
+                except ValueError as e:
+                    response = {'status': 'Error', 'mesg': str(e)}
+                else:
+                    response = self.execute_command(action, params, transaction_id or None, owned)
+            responses.append(encode_response(response))
+        if responses:
+            yield b''.join(responses)
 
-                response = self.process_command(command_str)
-                print("Server response:", response)
-                client_socket.send(json.dumps(response).encode('utf-8'))
+    def _stream_show_all(self, encode: Callable[[Dict[str, Any]], bytes]) -> Iterator[bytes]:
+        """
+        Runs SHOWALL one page at a time, so neither the server nor the data store holds more than one page of
+        the store in memory. Each page is sent as its own response with 'more' set on all but the last.
 
-    def process_command(self, command_str: str) -> Dict[str, Any]:
+        Args:
+            encode (Callable[[Dict[str, Any]], bytes]): Encodes a response for the connection's protocol.
+
+        Yields:
+            bytes: The encoded response of each page, starting with the first page, which is empty if the store is.
         """
-        Processes a command string and returns a response dictionary.
+        pages = self.data_store.show_all_pages(self.SHOWALL_PAGE_SIZE)
+        try:
+            page = next(pages, {})
+            while page is not None:
+                # Looking one page ahead tells whether this one is the last
+                following = next(pages, None)
+                for entry in page.values():
+                    if isinstance(entry['value'], bytes):
+                        entry['value'] = entry['value'].decode('utf-8', errors='replace')
+                yield encode({'status': 'Ok', 'data': page, 'more': following is not None})
+                page = following
+        finally:
+            pages.close()
+
+    def process_command(self, command_str: str, owned: Optional[Set[int]] = None) -> Dict[str, Any]:
+        """
+        Processes a text command string and returns a response dictionary. Values are stored as UTF-8 bytes.
 
         Args:
             command_str (str): The command string to process.
+            owned (Optional[Set[int]]): The transactions begun on the client's connection, kept up to date.
 
         Returns:
             Dict[str, Any]: A dictionary containing the response status and any additional data.
         """
         try:
             action, params, transaction_id = self.command_parser.parse_command(command_str)
+        except ValueError as e:
+            return {'status': 'Error', 'mesg': str(e)}
+        if 'value' in params:
+            params['value'] = params['value'].encode('utf-8')
+        if 'pairs' in params:
+            params['pairs'] = [(key, value.encode('utf-8')) for key, value in params['pairs']]
+        response = self.execute_command(action, params, transaction_id, owned)
+        result = response.get('result')
+        if isinstance(result, bytes):
+            response['result'] = result.decode('utf-8', errors='replace')
+        elif isinstance(result, list):
+            response['result'] = [value.decode('utf-8', errors='replace') if isinstance(value, bytes) else value
+                                  for value in result]
+        return response
 
+    def execute_command(self, action: str, params: Dict[str, Any], transaction_id: Optional[int],
+                        owned: Optional[Set[int]] = None) -> Dict[str, Any]:
+        """
+        Runs a parsed command against the data store. Shared by the text and binary protocols.
+
+        Args:
+            action (str): The command to run.
+            params (Dict[str, Any]): The command's key and, for PUT, its value in bytes.
+            transaction_id (Optional[int]): The transaction the command runs in, if any.
+            owned (Optional[Set[int]]): The transactions begun on the client's connection; BEGIN adds to it
+                and COMMIT and ROLLBACK remove from it. None if the command has no connection.
+
+        Returns:
+            Dict[str, Any]: A dictionary containing the response status and any additional data.
+        """
+        try:
             # Handle the BEGIN command to start a transaction
             if action == "BEGIN":
                 transaction_id = self.data_store.start_transaction()
+                if owned is not None:
+                    owned.add(transaction_id)
                 return {'status': 'Ok', 'transaction_id': transaction_id}
 
             # Validate transaction_id for commands that require it
-            if action in ["PUT", "GET", "DEL", "COMMIT", "ROLLBACK"]:
-                if transaction_id is None or transaction_id not in self.data_store.transaction_manager.transactions:
+            autocommit = transaction_id is None and action in self.AUTOCOMMIT_ACTIONS
+            if action in ["PUT", "GET", "DEL", "MPUT", "MGET", "MDEL", "EXPIRE", "TTL", "INCR", "INCRBY", "DECRBY",
+                          "APPEND", "WATCH", "COMMIT", "ROLLBACK"]:
+                if not autocommit and not self.data_store.has_transaction(transaction_id):
                     return {'status': 'Error', 'mesg': f'Invalid transaction ID {transaction_id}'}
+            if action in ("COMMIT", "ROLLBACK") and owned is not None:
+                owned.discard(transaction_id)
 
             # Handle other commands using the transaction_id
             if action == "PUT":
-                self.data_store.put(params['key'], params['value'], transaction_id)
+                self.data_store.put(params['key'], params['value'], transaction_id, params.get('ttl'))
                 return {'status': 'Ok'}
             elif action == "GET":
                 result = self.data_store.get(params['key'], transaction_id)
@@ -95,18 +339,64 @@ class Server:
             elif action == "DEL":
                 self.data_store.delete(params['key'], transaction_id)
                 return {'status': 'Ok'}
+            elif action == "EXPIRE":
+                result = self.data_store.expire(params['key'], params['seconds'], transaction_id)
+                return {'status': 'Ok', 'result': int(result)}
+            elif action == "TTL":
+                return {'status': 'Ok', 'result': self.data_store.ttl(params['key'], transaction_id)}
+            elif action == "MPUT":
+                self.data_store.mput(params['pairs'], transaction_id)
+                return {'status': 'Ok'}
+            elif action == "MGET":
+                result = self.data_store.mget(params['keys'], transaction_id)
+                return {'status': 'Ok', 'result': result}
+            elif action == "MDEL":
+                self.data_store.mdelete(params['keys'], transaction_id)
+                return {'status': 'Ok'}
+            elif action in ("INCR", "INCRBY", "DECRBY"):
+                amount = params.get('amount', 1)
+                result = self.data_store.incr(params['key'], -amount if action == "DECRBY" else amount, transaction_id)
+                return {'status': 'Ok', 'result': result}
+            elif action == "APPEND":
+                result = self.data_store.append(params['key'], params['value'], transaction_id)
+                return {'status': 'Ok', 'result': result}
+            elif action == "CAS":
+                result = self.data_store.cas(params['key'], params['version'], params['value'])
+                return {'status': 'Ok', 'result': result}
+            elif action == "GETV":
+                value, version = self.data_store.get_version(params['key'])
+                return {'status': 'Ok', 'result': [value, version]}
+            elif action == "WATCH":
+                self.data_store.watch(params['keys'], transaction_id)
+                return {'status': 'Ok'}
             elif action == "START":
                 self.data_store.start_transaction(transaction_id)
                 return {'status': 'Ok'}
             elif action == "SHOWALL":
                 all_data = self.data_store.show_all()
+                for entry in all_data.values():
+                    if isinstance(entry['value'], bytes):
+                        entry['value'] = entry['value'].decode('utf-8', errors='replace')
                 return {'status': 'Ok', 'data': all_data}
+            elif action == "SCAN":
+                cursor, pairs = self.data_store.scan(params['prefix'], params['cursor'], params['count'])
+                return {'status': 'Ok', 'data': {'cursor': cursor, 'items': self._decode_pairs(pairs)}}
+            elif action == "RANGE":
+                next_start, pairs = self.data_store.range_scan(params['start'], params['end'], params['limit'])
+                return {'status': 'Ok', 'data': {'next': next_start, 'items': self._decode_pairs(pairs)}}
             elif action == "COMMIT":
                 self.data_store.commit_transaction(transaction_id)
                 return {'status': 'Ok'}
             elif action == "COMMITALL":
                 self.data_store.commit_all_transactions()
                 return {'status': 'Ok'}
+            elif action == "SNAPSHOT":
+                self.data_store.snapshot()
+                return {'status': 'Ok'}
+            elif action == "STATS":
+                stats = self.data_store.memory_stats()
+                stats.update(self.data_store.transaction_stats())
+                return {'status': 'Ok', 'data': stats}
             elif action == "ROLLBACK":
                 self.data_store.rollback_transaction(transaction_id)
                 return {'status': 'Ok'}
@@ -115,12 +405,30 @@ class Server:
             
         except ValueError as e:
             return {'status': 'Error', 'mesg': str(e)}
+        except (LockError, WriteConflictError, TransactionAbortedError, MemoryLimitError) as e:
+            return {'status': 'Error', 'mesg': str(e)}
+
+    @staticmethod
+    def _decode_pairs(pairs: List[Tuple[str, Any]]) -> List[List[Any]]:
+        """
+        Converts scanned key/value pairs to JSON-friendly lists, decoding byte values like SHOWALL does.
+
+        Args:
+            pairs (List[Tuple[str, Any]]): The key/value pairs.
+
+        Returns:
+            List[List[Any]]: The [key, value] pairs.
+        """
+        return [[key, value.decode('utf-8', errors='replace') if isinstance(value, bytes) else value]
+                for key, value in pairs]
 
     def stop(self) -> None:
         """
         Stops the server. It performs the necessary clean-up to ensure all resources are released properly.
         """
         self.running = False
+        if self.server_socket is None:
+            return
         # Create a temporary socket to unblock the accept() call in the server's main loop
         temp_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         temp_socket.connect((self.host, self.port))
@@ -0,0 +1,90 @@
+from threading import Lock as Mutex
+from typing import Dict, Iterable, List, Optional, Set
+from server.data_store.concurrency.locking import DeadlockError
+
+
+class WaitForGraph:
+    def __init__(self) -> None:
+        """
+        Initializes an empty wait-for graph used to detect deadlocks between waiting transactions.
+
+        Attributes:
+            edges (Dict[int, Set[int]]): Maps each waiting transaction ID to the IDs of the transactions it waits for.
+            victims (Set[int]): Transaction IDs chosen to be aborted that have not noticed it yet.
+            mutex (Lock): Guards the graph.
+        """
+        self.edges: Dict[int, Set[int]] = {}
+        self.victims: Set[int] = set()
+        self.mutex = Mutex()
+
+    def wait_for(self, transaction_id: int, holders: Iterable[int]) -> None:
+        """
+        Records that a transaction is waiting for the given holders and checks for a deadlock.
+        When a cycle is found, the youngest transaction in it (highest ID) is chosen as the victim.
+
+        Args:
+            transaction_id (int): The ID of the waiting transaction.
+            holders (Iterable[int]): The IDs of the transactions holding the conflicting lock.
+
+        Raises:
+            DeadlockError: If the waiting transaction is, or already was, chosen as the victim.
+        """
+        with self.mutex:
+            if transaction_id in self.victims:
+                self._remove(transaction_id)
+                raise DeadlockError(f"Transaction {transaction_id} aborted: deadlock detected")
+
+            self.edges[transaction_id] = set(holders)
+            cycle = self._find_cycle(transaction_id)
+            if cycle is None:
+                return
+
+            victim = max(cycle)
+            if victim == transaction_id:
+                self._remove(transaction_id)
+                raise DeadlockError(f"Transaction {transaction_id} aborted: deadlock detected")
+            # The victim is blocked in another thread; it notices on its next wake-up
+            self.victims.add(victim)
+            self.edges.pop(victim, None)
+
+    def clear(self, transaction_id: int) -> None:
+        """
+        Removes a transaction from the graph once it stops waiting.
+
+        Args:
+            transaction_id (int): The ID of the transaction that is no longer waiting.
+        """
+        with self.mutex:
+            self._remove(transaction_id)
+
+    def _remove(self, transaction_id: int) -> None:
+        """
+        Removes a transaction's outgoing edges and pending victim mark. Must be called with the mutex held.
+
+        Args:
+            transaction_id (int): The ID of the transaction to remove.
+        """
+        self.edges.pop(transaction_id, None)
+        self.victims.discard(transaction_id)
+
+    def _find_cycle(self, start: int) -> Optional[List[int]]:
+        """
+        Searches for a cycle of waiting transactions that leads back to the given transaction.
+
+        Args:
+            start (int): The ID of the transaction that just started waiting.
+
+        Returns:
+            Optional[List[int]]: The transaction IDs on the cycle, or None if there is no deadlock.
+        """
+        stack = [(start, [start])]
+        visited = set()
+        while stack:
+            transaction_id, path = stack.pop()
+            for holder in self.edges.get(transaction_id, ()):
+                if holder == start:
+                    return path
+                if holder not in visited:
+                    visited.add(holder)
+                    stack.append((holder, path + [holder]))
+        return None
@@ -1,6 +1,7 @@
+import time
 from enum import Enum
-from threading import RLock
-from typing import Any, Dict
+from threading import Condition, RLock
+from typing import Any, Dict, List, Optional
 
 
 class LockType(Enum):
@@ -15,7 +16,22 @@ class LockType(Enum):
     WRITE = 2
 
 
+class LockError(Exception):
+    """Base class for errors raised while acquiring a lock."""
+
+
+class LockTimeoutError(LockError):
+    """Raised when a lock could not be acquired before the request timeout expired."""
+
+
+class DeadlockError(LockError):
+    """Raised in the transaction chosen as the victim to break a deadlock."""
+
+
 class Lock:
+    # Waiters wake at least this often to notice they were chosen as a deadlock victim
+    POLL_INTERVAL = 0.05
+
     def __init__(self):
         """
         Initializes a Lock object with an empty set of holders and a reentrant lock.
@@ -24,36 +40,246 @@ class Lock:
             type (LockType or None): Specifies the type of the lock (READ/WRITE). None if no lock is held.
             holders (set): A set of transaction IDs that currently hold this lock.
             lock (RLock): A reentrant lock for acquiring and releasing locks.
+            condition (Condition): Signalled whenever a holder releases the lock.
+            references (int): The number of threads about to wait on this lock; it must not be discarded while non-zero.
         """
         self.type = None
         self.holders = set()
         self.lock = RLock()
+        self.condition = Condition(self.lock)
+        self.references = 0
+
+    def _is_compatible(self, lock_type: LockType, transaction_id: int) -> bool:
+        """
+        Checks whether a lock of a given type can be granted to a transaction right now.
+
+        Args:
+            lock_type (LockType): The type of lock requested (READ/WRITE).
+            transaction_id (int): The transaction ID requesting the lock.
 
-    def acquire(self, lock_type: LockType, transaction_id: int):
+        Returns:
+            bool: True if no other transaction holds a conflicting lock.
         """
-        Acquires a lock of a given type for a given transaction ID.
+        if not self.holders or self.holders == {transaction_id}:
+            return True
+        return lock_type == LockType.READ and self.type == LockType.READ
+
+    def _grant(self, lock_type: LockType, transaction_id: int) -> None:
+        """
+        Records a transaction as a holder of the lock. A WRITE lock is never downgraded to READ.
+
+        Args:
+            lock_type (LockType): The type of lock granted (READ/WRITE).
+            transaction_id (int): The transaction ID receiving the lock.
+        """
+        if lock_type == LockType.WRITE or self.type is None:
+            self.type = lock_type
+        self.holders.add(transaction_id)
+
+    def try_acquire(self, lock_type: LockType, transaction_id: int) -> bool:
+        """
+        Acquires a lock of a given type for a given transaction ID if that is possible without waiting.
 
         Args:
             lock_type (LockType): The type of lock to be acquired (READ/WRITE).
             transaction_id (int): The transaction ID for which the lock is being acquired.
 
-        Raises:
-            Exception: If a lock upgrade from READ to WRITE is attempted by a different transaction.
+        Returns:
+            bool: True if the lock was acquired.
         """
         with self.lock:
-            if lock_type == LockType.WRITE and self.type == LockType.READ and transaction_id not in self.holders:
-                raise Exception("Cannot upgrade lock")
-            self.type = lock_type
-            self.holders.add(transaction_id)
+            if not self._is_compatible(lock_type, transaction_id):
+                return False
+            self._grant(lock_type, transaction_id)
+            return True
+
+    def acquire(self, lock_type: LockType, transaction_id: int, timeout: Optional[float] = None,
+                deadlock_detector=None) -> None:
+        """
+        Acquires a lock of a given type for a given transaction ID, waiting while other transactions
+        hold a conflicting lock. READ locks are shared; WRITE locks are exclusive.
+
+        Args:
+            lock_type (LockType): The type of lock to be acquired (READ/WRITE).
+            transaction_id (int): The transaction ID for which the lock is being acquired.
+            timeout (Optional[float]): The maximum number of seconds to wait. None waits indefinitely.
+            deadlock_detector (WaitForGraph, optional): Records who waits for whom and picks deadlock victims.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired within the timeout.
+            DeadlockError: If this transaction was chosen as the victim of a deadlock.
+        """
+        with self.condition:
+            if self._is_compatible(lock_type, transaction_id):
+                self._grant(lock_type, transaction_id)
+                return
+
+            deadline = None if timeout is None else time.monotonic() + timeout
+            try:
+                while not self._is_compatible(lock_type, transaction_id):
+                    if deadlock_detector is not None:
+                        deadlock_detector.wait_for(transaction_id, self.holders - {transaction_id})
+                    wait_time = self.POLL_INTERVAL
+                    if deadline is not None:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise LockTimeoutError(
+                                f"Transaction {transaction_id} timed out waiting for a {lock_type.name} lock")
+                        wait_time = min(wait_time, remaining)
+                    self.condition.wait(wait_time)
+                self._grant(lock_type, transaction_id)
+            finally:
+                if deadlock_detector is not None:
+                    deadlock_detector.clear(transaction_id)
 
     def release(self, transaction_id: int):
         """
-        Releases a lock for a given transaction ID.
+        Releases a lock for a given transaction ID and wakes up any waiting transactions.
 
         Args:
             transaction_id (int): The transaction ID for which the lock is being released.
         """
-        with self.lock:
+        with self.condition:
             self.holders.discard(transaction_id)
             if not self.holders:
                 self.type = None
+            self.condition.notify_all()
+
+
+class LockStripe:
+    def __init__(self):
+        """
+        Initializes one stripe of a striped lock table.
+
+        Attributes:
+            locks (Dict[str, Lock]): The per-key locks that hash to this stripe.
+            lock (RLock): A reentrant lock guarding this stripe's lock dictionary.
+            contention (int): The number of times a thread had to wait for this stripe's lock.
+        """
+        self.locks: Dict[str, Lock] = {}
+        self.lock = RLock()
+        self.contention = 0
+
+    def __enter__(self):
+        if not self.lock.acquire(blocking=False):
+            self.lock.acquire()
+            self.contention += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.lock.release()
+
+
+class StripedLockTable:
+    def __init__(self, num_stripes: int = 64):
+        """
+        Initializes a lock table partitioned into stripes so that unrelated keys never share a mutex.
+
+        Args:
+            num_stripes (int): The number of stripes. Default is 64.
+
+        Attributes:
+            stripes (List[LockStripe]): The stripes of the table; a key always maps to the same stripe.
+        """
+        self.stripes = [LockStripe() for _ in range(num_stripes)]
+
+    def _get_stripe(self, key: str) -> LockStripe:
+        """
+        Returns the stripe responsible for a given key.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            LockStripe: The stripe the key hashes to.
+        """
+        return self.stripes[hash(key) % len(self.stripes)]
+
+    def acquire(self, key: str, lock_type: LockType, transaction_id: int, timeout: Optional[float] = None,
+                deadlock_detector=None) -> Lock:
+        """
+        Acquires a lock of a given type on a key, creating the per-key lock if needed. The stripe is
+        only held for the lookup; waiting for a conflicting holder happens outside of it.
+
+        Args:
+            key (str): The key to lock.
+            lock_type (LockType): The type of lock to acquire (READ or WRITE).
+            transaction_id (int): The ID of the transaction acquiring the lock.
+            timeout (Optional[float]): The maximum number of seconds to wait. None waits indefinitely.
+            deadlock_detector (WaitForGraph, optional): Records who waits for whom and picks deadlock victims.
+
+        Returns:
+            Lock: The per-key lock that was acquired.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired within the timeout.
+            DeadlockError: If the transaction was chosen as the victim of a deadlock.
+        """
+        stripe = self._get_stripe(key)
+        with stripe:
+            lock = stripe.locks.get(key)
+            if lock is None:
+                lock = Lock()
+                stripe.locks[key] = lock
+            if lock.try_acquire(lock_type, transaction_id):
+                return lock
+            lock.references += 1
+
+        try:
+            lock.acquire(lock_type, transaction_id, timeout, deadlock_detector)
+        finally:
+            with stripe:
+                lock.references -= 1
+                self._discard_if_free(stripe, key, lock)
+        return lock
+
+    def release(self, key: str, lock: Lock, transaction_id: int) -> None:
+        """
+        Releases a transaction's hold on a key's lock and drops the lock once it has no holders.
+
+        Args:
+            key (str): The locked key.
+            lock (Lock): The lock returned by acquire for this key.
+            transaction_id (int): The ID of the transaction releasing the lock.
+        """
+        with self._get_stripe(key) as stripe:
+            lock.release(transaction_id)
+            self._discard_if_free(stripe, key, lock)
+
+    @staticmethod
+    def _discard_if_free(stripe: LockStripe, key: str, lock: Lock) -> None:
+        """
+        Removes a key's lock from its stripe once nobody holds or waits for it. Must be called with the stripe held.
+
+        Args:
+            stripe (LockStripe): The stripe the key hashes to.
+            key (str): The locked key.
+            lock (Lock): The key's lock.
+        """
+        if not lock.holders and not lock.references and stripe.locks.get(key) is lock:
+            del stripe.locks[key]
+
+    def get(self, key: str) -> Optional[Lock]:
+        """
+        Returns the lock currently held on a key, if any.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            Optional[Lock]: The lock for the key, or None if nobody holds it.
+        """
+        with self._get_stripe(key) as stripe:
+            return stripe.locks.get(key)
+
+    def contention_counts(self) -> List[int]:
+        """
+        Returns the contention counter of every stripe, to spot hot stripes.
+
+        Returns:
+            List[int]: The number of contended acquisitions per stripe, in stripe order.
+        """
+        return [stripe.contention for stripe in self.stripes]
+
+    def __len__(self) -> int:
+        return sum(len(stripe.locks) for stripe in self.stripes)
@@ -1,28 +1,246 @@
-from typing import Any, Optional, List
-from server.data_store.transactions.transaction import LockType
+import contextlib
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, List, Tuple, Union
+from server.caching.caching_strategy import CACHE_MISS, CachingStrategy
+from server.caching.factory import create_caching_strategy
+from server.caching.ttl import TTLCache
+from server.data_store.concurrency.locking import DeadlockError, LockTimeoutError
+from server.data_store.eviction.memory_limit import MemoryLimit, MemoryLimitError, estimate_size
+from server.data_store.persistence.append_only_log import AppendOnlyLog, read_records
+from server.data_store.persistence.snapshot import read_snapshot, write_snapshot
+from server.data_store.transactions.transaction import LockType, Transaction, WriteConflictError
 from server.data_store.transactions.transaction_manager import TransactionManager
 from server.data_store.sharding.sharding_manager import ShardingManager
+from server.data_store.sharding.expiry import ExpiringValue, is_expired, live_value
+from server.data_store.sharding.ordered_index import START_CURSOR, OrderedKeyIndex, decode_cursor, encode_cursor
 from server.data_store.sharding.shard import Shard
 
+# Expired keys removed per acquisition of the transaction manager's lock
+EXPIRY_BATCH = 20
+
 
 class DataStore:
-    def __init__(self, shards: List[Shard] = None, caching_strategy=None) -> None:
+    def __init__(self, shards: List[Shard] = None, caching_strategy: Union[CachingStrategy, str, None] = None,
+                 lock_timeout: Optional[float] = 5.0, log_path: Optional[str] = None, fsync: str = 'always',
+                 fsync_interval: float = 0.01, snapshot_path: Optional[str] = None,
+                 snapshot_interval: Optional[float] = None, expiry_interval: float = 0.1,
+                 expiry_time_slice: float = 0.001, maxmemory: Optional[int] = None,
+                 eviction_policy: str = 'noeviction', eviction_samples: int = 5, ordered_index: bool = False,
+                 idle_timeout: Optional[float] = None) -> None:
         """
-        Initializes the main storage, active transaction list, and sharding manager.
+        Initializes the main storage, active transaction list, and sharding manager. With a snapshot path,
+        the shards are loaded from the latest snapshot; with a log path, the log records the snapshot does
+        not cover are then replayed and every later commit is appended to the log.
 
         Args:
             shards (List[Shard], optional): List of Shard objects for sharding. Defaults to 10 shards.
-            caching_strategy: Optional caching strategy for caching key/value pairs.
+            caching_strategy (Union[CachingStrategy, str, None]): Optional read-through cache of committed key/value
+                pairs, or the name of an eviction policy ('lru', 'lfu', 'clock', 'tinylfu', 'ttl') to create one.
+                The 'ttl' cache drops the entry of a key stored with an expiry once the key expires, and evicts
+                other entries by LRU.
+            lock_timeout (Optional[float]): Seconds a request waits for a conflicting lock. Defaults to 5.
+            log_path (Optional[str]): Append-only log of committed transactions. Defaults to no persistence.
+            fsync (str): When the log is forced to disk: 'always', 'interval' or 'never'. Default is 'always'.
+            fsync_interval (float): Seconds between fsyncs with the 'interval' policy. Default is 0.01.
+            snapshot_path (Optional[str]): Snapshot file written by snapshot(). Defaults to no snapshots.
+            snapshot_interval (Optional[float]): Seconds between background snapshots. Defaults to snapshots
+                taken only on request.
+            expiry_interval (float): Seconds between passes of the background expiry over the shards. Default is 0.1.
+            expiry_time_slice (float): Seconds a pass may spend removing expired keys from one shard. Default is 0.001.
+            maxmemory (Optional[int]): Budget in bytes for the estimated size of the stored keys and values.
+                Defaults to no budget.
+            eviction_policy (str): What a write over the budget does: 'noeviction' rejects it, while 'allkeys-lru',
+                'allkeys-lfu' and 'volatile-ttl' first evict keys to make room. Default is 'noeviction'.
+            eviction_samples (int): Keys sampled per eviction by the LRU and LFU policies. Default is 5.
+            ordered_index (bool): Whether every shard keeps a sorted index of its keys, which scan() and
+                range_scan() need. Default is False.
+            idle_timeout (Optional[float]): Seconds after its latest operation an open transaction is rolled
+                back, releasing its locks. Should exceed lock_timeout. Defaults to never.
 
         Attributes:
             transaction_manager (TransactionManager): Manages the transactions within the data store.
             sharding_manager (ShardingManager): Manages the sharding logic.
-            caching_strategy: Caching strategy for managing cache.
+            caching_strategy (Optional[CachingStrategy]): Caching strategy for managing cache.
+            migration_thread (Optional[threading.Thread]): Moves keys after the last shard was added or removed.
+            commit_log (Optional[AppendOnlyLog]): Receives a record of every commit that changed data.
+            maintenance_lock (threading.Lock): Serializes snapshots and shard migrations, so a snapshot finds
+                every key in exactly one shard.
+            snapshot_thread (Optional[threading.Thread]): Takes the background snapshots.
+            stopping (threading.Event): Set by close() to stop the background snapshots and expiry.
+            expiry_thread (Optional[threading.Thread]): Removes expired keys; started once a key has an expiry.
+            memory_limit (MemoryLimit): The memory budget, its eviction policy and the eviction counters.
+            reaped_transactions (int): The number of idle transactions rolled back so far.
+            reaper_thread (Optional[threading.Thread]): Rolls back idle transactions, if there is an idle_timeout.
+            autocommit_ids (Iterator[int]): Negative IDs under which writes outside a transaction lock their key,
+                so they never collide with transaction IDs.
         """
-        self.transaction_manager = TransactionManager()
+        self.memory_limit = MemoryLimit(maxmemory, eviction_policy, eviction_samples)
         self.sharding_manager = ShardingManager(shards or [Shard() for _ in range(10)])
+        self.ordered_index = ordered_index
+        for shard in self.sharding_manager.shards:
+            self._prepare_shard(shard)
+        self.snapshot_path = snapshot_path
+        self.commit_log = None
+        commit_timestamp = 0
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            commit_timestamp = self._load_snapshot(snapshot_path)
+        if log_path is not None:
+            commit_timestamp = self._replay(log_path, commit_timestamp)
+            self.commit_log = AppendOnlyLog(log_path, fsync, fsync_interval)
+        self.transaction_manager = TransactionManager(lock_timeout=lock_timeout, commit_log=self.commit_log)
+        self.transaction_manager.commit_timestamp = commit_timestamp
+        if isinstance(caching_strategy, str):
+            caching_strategy = create_caching_strategy(caching_strategy)
         self.caching_strategy = caching_strategy
+        self.migration_thread: Optional[threading.Thread] = None
+        self.maintenance_lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.snapshot_thread: Optional[threading.Thread] = None
+        if snapshot_interval is not None:
+            self.snapshot_thread = threading.Thread(target=self._snapshot_periodically, args=(snapshot_interval,),
+                                                    daemon=True)
+            self.snapshot_thread.start()
+        self.expiry_interval = expiry_interval
+        self.expiry_time_slice = expiry_time_slice
+        self.expiry_thread: Optional[threading.Thread] = None
+        if any(shard.expiry_heap for shard in self.sharding_manager.shards):
+            self._start_expiry()
+        self.idle_timeout = idle_timeout
+        self.reaped_transactions = 0
+        self.autocommit_ids = itertools.count(-1, -1)
+        self.reaper_thread: Optional[threading.Thread] = None
+        if idle_timeout is not None:
+            self.reaper_thread = threading.Thread(target=self._reap_periodically, daemon=True)
+            self.reaper_thread.start()
+
+    def _prepare_shard(self, shard: Shard) -> None:
+        """
+        Sets a shard up for the data store's options: the access statistic its eviction policy needs and,
+        if range scans are enabled, a sorted index of its keys.
+
+        Args:
+            shard (Shard): A shard joining the data store.
+        """
+        shard.track_access = self.memory_limit.tracked_access
+        if self.ordered_index and shard.index is None:
+            shard.index = OrderedKeyIndex(shard.storage)
 
+    def _load_snapshot(self, snapshot_path: str) -> int:
+        """
+        Loads the shards from a snapshot file.
+
+        Args:
+            snapshot_path (str): The snapshot file.
+
+        Returns:
+            int: The commit timestamp the snapshot was taken at.
+        """
+        commit_timestamp, chunks = read_snapshot(snapshot_path)
+        for chunk in chunks:
+            values = dict(chunk)
+            for shard, keys in self.sharding_manager.group_by_shard(values).items():
+                # Versions are not part of the snapshot, so every restored key takes the snapshot's timestamp
+                shard.apply({key: values[key] for key in keys}, [], commit_timestamp)
+        return commit_timestamp
+
+    def _replay(self, log_path: str, snapshot_timestamp: int = 0) -> int:
+        """
+        Rebuilds the shards from the records of a commit log that a snapshot does not cover.
+
+        Args:
+            log_path (str): The log file.
+            snapshot_timestamp (int): The commit timestamp of the loaded snapshot, or 0 if there is none.
+
+        Returns:
+            int: The commit timestamp of the last replayed transaction, or snapshot_timestamp if there is none.
+        """
+        records, _ = read_records(log_path)
+        commit_timestamp = snapshot_timestamp
+        for record_timestamp, writes, deletes in records:
+            # Left over when the data store stopped between writing a snapshot and truncating the log
+            if record_timestamp <= snapshot_timestamp:
+                continue
+            commit_timestamp = record_timestamp
+            for shard, keys in self.sharding_manager.group_by_shard([*writes, *deletes]).items():
+                shard.apply({key: writes[key] for key in keys if key in writes},
+                            [key for key in keys if key not in writes], record_timestamp)
+        return commit_timestamp
+
+    def snapshot(self) -> int:
+        """
+        Writes every committed key/value pair to the snapshot file and drops the log records it covers.
+        The pairs are read from an MVCC snapshot, so writers keep committing while the file is written.
+
+        Returns:
+            int: The commit timestamp the snapshot was taken at.
+
+        Raises:
+            ValueError: If the data store has no snapshot path.
+        """
+        if self.snapshot_path is None:
+            raise ValueError("Snapshots are not configured")
+        with self.maintenance_lock:
+            view_id, commit_timestamp = self.transaction_manager.open_read_view()
+            try:
+                write_snapshot(self.snapshot_path, commit_timestamp, self._snapshot_items(commit_timestamp))
+            finally:
+                self.transaction_manager.close_read_view(view_id)
+                self.transaction_manager.collect_garbage(self.sharding_manager)
+            if self.commit_log is not None:
+                self.commit_log.truncate(commit_timestamp)
+        return commit_timestamp
+
+    def _snapshot_items(self, snapshot_timestamp: int) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields every key/value pair visible as of a snapshot, one shard at a time.
+
+        Args:
+            snapshot_timestamp (int): The commit timestamp to read as of; it must stay open while iterating.
+
+        Yields:
+            Tuple[str, Any]: The key/value pairs.
+        """
+        for shard in self.sharding_manager.shards:
+            # Keys deleted since the snapshot only remain in the version chains
+            keys = set(shard.storage)
+            keys.update(shard.history)
+            now = time.time()
+            for key in keys:
+                value = shard.read(key, snapshot_timestamp)
+                if value is not None and not is_expired(value, now):
+                    yield key, value
+
+    def _snapshot_periodically(self, interval: float) -> None:
+        """
+        Takes a snapshot every interval seconds until the data store is closed.
+
+        Args:
+            interval (float): Seconds between snapshots.
+        """
+        while not self.stopping.wait(interval):
+            try:
+                self.snapshot()
+            except OSError as e:
+                print(f"Snapshot failed: {e}")
+
+    def close(self) -> None:
+        """
+        Stops the background snapshots, expiry and transaction reaping, writes out and closes the commit log,
+        if any, and closes the shards.
+        """
+        self.stopping.set()
+        for thread in (self.snapshot_thread, self.expiry_thread, self.reaper_thread):
+            if thread is not None:
+                thread.join()
+        if self.commit_log is not None:
+            self.commit_log.close()
+        for shard in self.sharding_manager.shards:
+            shard.close()
 
     def get_shard(self, key: str) -> Shard:
         """
@@ -37,79 +255,1073 @@ class DataStore:
         return self.sharding_manager.get_shard(key)
 
 
-    def put(self, key: str, value: Any, transaction_id: int) -> None:
+    def _acquire_write_lock(self, key: str, transaction_id: int) -> Shard:
+        """
+        Acquires a WRITE lock for a transaction and checks that nobody committed the key after the
+        transaction's snapshot was taken. The transaction is rolled back if it has to be aborted.
+        An optimistic transaction takes no lock: its keys are checked when it commits.
+
+        Args:
+            key (str): The key to lock.
+            transaction_id (int): The ID of the transaction acquiring the lock.
+
+        Returns:
+            Shard: The shard owning the key, looked up once the lock is held in case the key moved meanwhile.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired in time.
+            DeadlockError: If the transaction was aborted to break a deadlock.
+            WriteConflictError: If the key was committed by another transaction after this one's snapshot.
+        """
+        transaction = self.transaction_manager.transactions.get(transaction_id)
+        if transaction is not None and transaction.optimistic:
+            return self.get_shard(key)
+        try:
+            self.transaction_manager.acquire_lock(key, LockType.WRITE, transaction_id)
+        except DeadlockError:
+            self.rollback_transaction(transaction_id)
+            raise
+        shard = self.get_shard(key)
+        snapshot_timestamp, read_time = self._read_view(transaction_id)
+        if (shard.last_commit_timestamp(key) > snapshot_timestamp
+                and not self._expired_in_snapshot(shard, key, snapshot_timestamp, read_time)):
+            self.rollback_transaction(transaction_id)
+            raise WriteConflictError(
+                f"Transaction {transaction_id} aborted: key '{key}' was modified after its snapshot")
+        return shard
+
+
+    def _read_view(self, transaction_id: int) -> Tuple[int, float]:
         """
-        Adds or updates a key/value pair in the datastore.
+        Returns the commit timestamp and the wall-clock time a transaction's reads are served as of.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+
+        Returns:
+            Tuple[int, float]: The snapshot's commit timestamp and the time expiries are judged at.
+
+        Raises:
+            TransactionAbortedError: If the transaction is not active.
+        """
+        transaction = self.transaction_manager.get_active(transaction_id)
+        return transaction.start_timestamp, transaction.start_time
+
+    @staticmethod
+    def _expired_in_snapshot(shard: Shard, key: str, snapshot_timestamp: int, read_time: float) -> bool:
+        """
+        Checks whether a key committed after a snapshot was merely removed after expiring, while the
+        snapshot already saw it as missing. Writing it is then no conflict.
+
+        Args:
+            shard (Shard): The shard owning the key.
+            key (str): The key.
+            snapshot_timestamp (int): The commit timestamp of the snapshot.
+            read_time (float): The wall-clock time the snapshot judges expiries at.
+
+        Returns:
+            bool: True if the key is gone and the snapshot saw it missing or expired.
+        """
+        return key not in shard.storage and live_value(shard.read(key, snapshot_timestamp), read_time) is None
+
+    def put(self, key: str, value: Any, transaction_id: Optional[int], ttl: Optional[float] = None) -> None:
+        """
+        Adds or updates a key/value pair in the datastore. A value put without a ttl clears any earlier expiry.
 
         Args:
             key (str): The key to add or update.
             value (Any): The value to associate with the key.
-            transaction_id (int): The ID of the transaction under which this operation falls.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to commit the write on its own straight away.
+            ttl (Optional[float]): Seconds after which the key expires. Defaults to no expiry.
+
+        Raises:
+            ValueError: If the ttl is not positive.
         """
-        shard = self.get_shard(key)
-        self.transaction_manager.acquire_lock(key, LockType.WRITE, transaction_id)
+        if ttl is not None:
+            if ttl <= 0:
+                raise ValueError("Expiry must be a positive number of seconds")
+            value = ExpiringValue(value, time.time() + ttl)
+            self._start_expiry()
+        if transaction_id is None:
+            reserved = self._reserve_memory([(key, value)])
+            try:
+                self._autocommit(key, {key: value}, [])
+            finally:
+                self._release_memory(reserved)
+            return
+        self._reserve_memory([(key, value)], self.transaction_manager.get_active(transaction_id))
+        shard = self._acquire_write_lock(key, transaction_id)
         current_value = shard.storage.get(key)
-        transaction = self.transaction_manager.transactions[transaction_id]
+        transaction = self.transaction_manager.get_active(transaction_id)
         transaction.put(key, value, current_value)
-        if self.caching_strategy:
-            self.caching_strategy.add_to_cache(key, value)
+        if not transaction.optimistic:
+            self.transaction_manager.record_write(transaction_id, key)
 
+    def _autocommit(self, key: str, writes: Dict[str, Any], deletes: List[str],
+                    expected_version: Optional[int] = None) -> Optional[int]:
+        """
+        Writes or deletes one key as an implicit single-key transaction. It waits for the key's WRITE lock like
+        a transaction, so it never overwrites uncommitted changes, but the lock is taken under a one-off ID
+        and the change is committed to the shard at once, without a Transaction object or snapshot.
 
-    def get(self, key: str, transaction_id: int) -> Optional[Any]:
+        Args:
+            key (str): The key.
+            writes (Dict[str, Any]): The key and its new value, to write it.
+            deletes (List[str]): The key, to delete it.
+            expected_version (Optional[int]): The version the key must have for the change to be made, as
+                returned by get_version. None makes the change whatever the version.
+
+        Returns:
+            Optional[int]: The key's new version, or None if nothing was changed.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired in time.
+        """
+        with self._autocommit_lock(key), self.transaction_manager.lock:
+            shard = self.get_shard(key)
+            if expected_version is not None and self._current_version(shard, key) != expected_version:
+                return None
+            if deletes and key not in shard.storage:
+                return None
+            sequence = self.transaction_manager.autocommit(shard, writes, deletes)
+            version = self.transaction_manager.commit_timestamp
+            self._invalidate_cache([key])
+        self._wait_for_log(sequence)
+        return version
+
+    @contextlib.contextmanager
+    def _autocommit_lock(self, key: str) -> Iterator[None]:
+        """
+        Holds a key's WRITE lock for a change made outside any transaction, under a one-off ID.
+
+        Args:
+            key (str): The key to lock.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired in time.
+        """
+        lock_table = self.transaction_manager.lock_table
+        lock_id = next(self.autocommit_ids)
+        lock = lock_table.acquire(key, LockType.WRITE, lock_id, self.transaction_manager.lock_timeout,
+                                  self.transaction_manager.deadlock_detector)
+        try:
+            yield
+        finally:
+            lock_table.release(key, lock, lock_id)
+
+    def cas(self, key: str, expected_version: int, value: Any) -> Optional[int]:
+        """
+        Compare-and-set: writes a key, committing at once, only if its version is still the expected one.
+        No lock is held between reading the version and the write, so a read-modify-write cycle over the
+        network does not block other clients.
+
+        Args:
+            key (str): The key to write.
+            expected_version (int): The version the key was read at, or 0 for a key expected not to exist.
+            value (Any): The new value.
+
+        Returns:
+            Optional[int]: The key's new version, or None if the key changed meanwhile and nothing was written.
+
+        Raises:
+            LockTimeoutError: If a transaction holds the key's lock for longer than the lock timeout.
+        """
+        reserved = self._reserve_memory([(key, value)])
+        try:
+            return self._autocommit(key, {key: value}, [], expected_version)
+        finally:
+            self._release_memory(reserved)
+
+    def get_version(self, key: str) -> Tuple[Optional[Any], int]:
         """
-        Retrieves a value by key from the datastore.
+        Reads the latest committed value of a key together with its version, for a later cas.
 
         Args:
             key (str): The key to look up.
-            transaction_id (int): The ID of the transaction under which this operation falls.
+
+        Returns:
+            Tuple[Optional[Any], int]: The value, or None if the key does not exist, and its version, 0 if it does not.
+        """
+        # Under the commit lock, so the value and version come from the same commit
+        with self.transaction_manager.lock:
+            shard = self.get_shard(key)
+            value = live_value(shard.storage.get(key), time.time())
+            version = self._current_version(shard, key)
+        if shard.track_access:
+            shard.touch(key)
+        return value, version
+
+    @staticmethod
+    def _current_version(shard: Shard, key: str) -> int:
+        """
+        Returns the version of a key's latest committed value; an expired key counts as missing, version 0.
+
+        Args:
+            shard (Shard): The shard owning the key.
+            key (str): The key.
+
+        Returns:
+            int: The key's version.
+        """
+        if live_value(shard.storage.get(key), time.time()) is None:
+            return 0
+        return shard.version(key)
+
+    def watch(self, keys: List[str], transaction_id: int) -> None:
+        """
+        Makes a transaction optimistic and watches keys for it. From now on its writes take no locks;
+        instead its commit aborts if a watched or written key was committed by someone else after its
+        snapshot was taken.
+
+        Args:
+            keys (List[str]): The keys the transaction's outcome depends on, typically the keys it read.
+            transaction_id (int): The ID of the transaction.
+
+        Raises:
+            TransactionAbortedError: If the transaction is not active.
+        """
+        transaction = self.transaction_manager.get_active(transaction_id)
+        transaction.watched.update(keys)
+        transaction.optimistic = True
+
+    def validate_transaction(self, transaction_id: int) -> None:
+        """
+        Validates an optimistic transaction before it commits. Its written keys are WRITE-locked and its
+        other watched keys READ-locked without waiting, so they cannot change until it commits or rolls
+        back, then every key is checked for a commit made after the transaction's snapshot. On a conflict
+        the transaction is rolled back. Does nothing for a transaction that is not optimistic or was
+        already validated.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+
+        Raises:
+            WriteConflictError: If a key is locked by another transaction or changed after the snapshot.
+            TransactionAbortedError: If the transaction is not active.
+        """
+        with self.transaction_manager.lock:
+            transaction = self.transaction_manager.get_active(transaction_id)
+            if not transaction.optimistic or transaction.validated:
+                return
+            written = set(transaction.changes) | transaction.deleted_keys
+            snapshot_timestamp, read_time = transaction.start_timestamp, transaction.start_time
+            for key in sorted(written | transaction.watched):
+                lock_type = LockType.WRITE if key in written else LockType.READ
+                try:
+                    lock = self.transaction_manager.lock_table.acquire(key, lock_type, transaction_id, 0)
+                except LockTimeoutError:
+                    self.rollback_transaction(transaction_id)
+                    raise WriteConflictError(
+                        f"Transaction {transaction_id} aborted: key '{key}' is locked by another transaction")
+                transaction.held_locks[key] = lock
+                shard = self.get_shard(key)
+                if (shard.last_commit_timestamp(key) > snapshot_timestamp
+                        and not self._expired_in_snapshot(shard, key, snapshot_timestamp, read_time)):
+                    self.rollback_transaction(transaction_id)
+                    raise WriteConflictError(
+                        f"Transaction {transaction_id} aborted: key '{key}' was modified after its snapshot")
+            transaction.validated = True
+
+    def get(self, key: str, transaction_id: Optional[int]) -> Optional[Any]:
+        """
+        Retrieves a value by key from the datastore. No lock is taken: the transaction sees its own
+        changes on top of the snapshot taken when it started.
+
+        Args:
+            key (str): The key to look up.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to read the latest committed value.
 
         Returns:
             Optional[Any]: The value associated with the key, or None if the key is not in the datastore.
         """
+        return live_value(*self._read_raw(key, transaction_id))
+
+    def _read_raw(self, key: str, transaction_id: Optional[int]) -> Tuple[Optional[Any], float]:
+        """
+        Reads a key as a transaction sees it, with its expiry still attached. A committed value found
+        expired is removed from its shard on the way.
+
+        Args:
+            key (str): The key to look up.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls.
+
+        Returns:
+            Tuple[Optional[Any], float]: The stored value, possibly an ExpiringValue, or None if the key is
+            missing, and the wall-clock time the reader judges expiries at.
+        """
         shard = self.get_shard(key)
-        self.transaction_manager.acquire_lock(key, LockType.READ, transaction_id)
         transaction = self.transaction_manager.transactions.get(transaction_id)
         if transaction:
-            return transaction.changes.get(key, shard.storage.get(key, None))
-        return shard.storage.get(key, None)
+            snapshot_timestamp, read_time = self._read_view(transaction_id)
+            if key in transaction.changes:
+                return transaction.changes[key], read_time
+            if key in transaction.deleted_keys:
+                return None, read_time
+        else:
+            snapshot_timestamp, read_time = self.transaction_manager.commit_timestamp, time.time()
+        value = self._read_committed(shard, key, snapshot_timestamp)
+        if shard.track_access:
+            shard.touch(key)
+        if isinstance(value, ExpiringValue) and is_expired(value, time.time()):
+            self._expire_keys(shard, [key])
+        return value, read_time
+
+    def expire(self, key: str, seconds: float, transaction_id: Optional[int]) -> bool:
+        """
+        Sets the expiry of an existing key; like any write, it takes effect when the transaction commits.
+        A non-positive number of seconds deletes the key.
+
+        Args:
+            key (str): The key.
+            seconds (float): Seconds from now after which the key expires.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to read the key and commit its new expiry on their own, under the key's lock.
 
+        Returns:
+            bool: True if the key exists, False if it does not and nothing was changed.
+        """
+        if transaction_id is None:
+            with self._autocommit_lock(key), self.transaction_manager.lock:
+                shard = self.get_shard(key)
+                now = time.time()
+                value = live_value(shard.storage.get(key), now)
+                if value is None:
+                    return False
+                if seconds <= 0:
+                    sequence = self.transaction_manager.autocommit(shard, {}, [key])
+                else:
+                    stored = ExpiringValue(value, now + seconds)
+                    self._release_memory(self._reserve_memory([(key, stored)]))
+                    sequence = self.transaction_manager.autocommit(shard, {key: stored}, [])
+                self._invalidate_cache([key])
+            self._wait_for_log(sequence)
+            if seconds > 0:
+                self._start_expiry()
+            return True
+        value, read_time = self._read_raw(key, transaction_id)
+        value = live_value(value, read_time)
+        if value is None:
+            return False
+        if seconds <= 0:
+            self.delete(key, transaction_id)
+        else:
+            self.put(key, value, transaction_id, seconds)
+        return True
+
+    def ttl(self, key: str, transaction_id: Optional[int]) -> int:
+        """
+        Returns the number of seconds until a key expires, rounded up.
+
+        Args:
+            key (str): The key.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls.
 
-    def delete(self, key: str, transaction_id: int) -> None:
+        Returns:
+            int: The remaining seconds, -1 if the key has no expiry, or -2 if it does not exist.
+        """
+        value, read_time = self._read_raw(key, transaction_id)
+        if live_value(value, read_time) is None:
+            return -2
+        if not isinstance(value, ExpiringValue):
+            return -1
+        return max(0, math.ceil(value.expires_at - time.time()))
+
+    def _expire_keys(self, shard: Shard, keys: List[str]) -> None:
+        """
+        Removes keys from a shard if their latest value has expired. The removal is not logged: replaying
+        the log restores the expired values, which expire again.
+
+        Args:
+            shard (Shard): The shard holding the keys.
+            keys (List[str]): The keys to check.
+        """
+        with self.transaction_manager.lock:
+            now = time.time()
+            keys = [key for key in keys if is_expired(shard.storage.get(key), now)]
+            if keys:
+                self._remove_committed(shard, keys)
+
+    def _remove_committed(self, shard: Shard, keys: List[str], logged: bool = False) -> None:
+        """
+        Removes keys from a shard outside any transaction; the caller holds the transaction manager's lock.
+        Like a commit, the removal gets a commit timestamp, and the removed versions are kept while older
+        snapshots may still see them.
+
+        Args:
+            shard (Shard): The shard holding the keys.
+            keys (List[str]): The keys to remove.
+            logged (bool): Whether to append the removal to the commit log, if there is one. It is not waited
+                for: a later commit waiting for its own record also waits for this one.
+        """
+        commit_timestamp = self.transaction_manager.commit_timestamp + 1
+        if logged and self.commit_log is not None:
+            self.commit_log.append(commit_timestamp, {}, list(keys))
+        shard.apply({}, keys, commit_timestamp, bool(self.transaction_manager.active_snapshots))
+        self.transaction_manager.commit_timestamp = commit_timestamp
+        self._invalidate_cache(keys)
+
+    def used_memory(self) -> int:
+        """
+        Returns the estimated size of every stored key and value.
+
+        Returns:
+            int: The estimate in bytes, summed over the shards' incrementally kept estimates.
+        """
+        return sum(shard.memory_usage for shard in self.sharding_manager.shards)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Returns the memory estimate, the budget and the eviction counters.
+
+        Returns:
+            Dict[str, Any]: used_memory, maxmemory, policy, evicted_keys and rejected_writes.
+        """
+        return self.memory_limit.stats(self.used_memory())
+
+    def _reserve_memory(self, pairs: List[Tuple[str, Any]], transaction: Optional[Transaction] = None) -> int:
+        """
+        Makes room for writes before they are made, evicting keys if the policy allows, and holds it until
+        they are committed: reserved bytes count as used, so writes of concurrent transactions cannot
+        together exceed the budget. A transaction's reservation is released when it commits or rolls back;
+        other callers release the returned bytes with _release_memory once the writes are committed.
+        Writes that do not grow the data store always pass.
+
+        Args:
+            pairs (List[Tuple[str, Any]]): The key/value pairs about to be written.
+            transaction (Optional[Transaction]): The transaction making the writes, which keeps the reservation.
+
+        Returns:
+            int: The bytes reserved.
+
+        Raises:
+            MemoryLimitError: If the writes would exceed the budget and the policy finds nothing to evict.
+        """
+        limit = self.memory_limit
+        if limit.maxmemory is None:
+            return 0
+        growth = 0
+        for key, value in pairs:
+            growth += estimate_size(key, value)
+            if transaction is not None and key in transaction.changes:
+                # The transaction already holds room for its pending value of the key
+                current = transaction.changes[key]
+            else:
+                current = self.get_shard(key).storage.get(key)
+            if current is not None:
+                growth -= estimate_size(key, current)
+        if growth <= 0:
+            return 0
+        with self.transaction_manager.lock:
+            while self.used_memory() + limit.reserved + growth > limit.maxmemory:
+                if not self._evict():
+                    limit.rejected_writes += 1
+                    raise MemoryLimitError(f"Write rejected: the memory limit of {limit.maxmemory} bytes is "
+                                           f"exceeded and the '{limit.policy}' policy found nothing to evict")
+            limit.reserved += growth
+            if transaction is not None:
+                transaction.reserved_memory += growth
+        return growth
+
+    def _release_memory(self, size: int) -> None:
+        """
+        Gives back bytes reserved by _reserve_memory.
+
+        Args:
+            size (int): The bytes to release.
+        """
+        if size:
+            with self.transaction_manager.lock:
+                self.memory_limit.reserved -= size
+
+    def _evict(self) -> bool:
+        """
+        Evicts one key; the caller holds the transaction manager's lock. The sampling policies sample one
+        shard per eviction, in turns, so the work of finding victims is spread across the shards. Keys a
+        transaction is writing are never evicted, so rolling that transaction back cannot bring them back.
+        The eviction is logged like a deletion, so the key stays gone after a restart.
+
+        Returns:
+            bool: True if a key was evicted, False if the policy found nothing to evict.
+        """
+        lock_table = self.transaction_manager.lock_table
+        victim = self.memory_limit.pick_victim(self.sharding_manager.shards, lambda key: lock_table.get(key) is None)
+        if victim is None:
+            return False
+        shard, key = victim
+        self._remove_committed(shard, [key], logged=True)
+        self.memory_limit.evicted_keys += 1
+        return True
+
+    def _start_expiry(self) -> None:
+        """Starts the background expiry, unless it is running already."""
+        if self.expiry_thread is None:
+            with self.transaction_manager.lock:
+                if self.expiry_thread is None:
+                    self.expiry_thread = threading.Thread(target=self._expire_periodically, daemon=True)
+                    self.expiry_thread.start()
+
+    def _expire_periodically(self) -> None:
+        """
+        Removes expired keys every expiry_interval seconds until the data store is closed. Each shard gets a
+        bounded time slice per pass, and the lock is released between batches of EXPIRY_BATCH keys, so a
+        burst of expiries is spread over several passes instead of stalling commits.
+        """
+        while not self.stopping.wait(self.expiry_interval):
+            for shard in list(self.sharding_manager.shards):
+                deadline = time.perf_counter() + self.expiry_time_slice
+                while True:
+                    with self.transaction_manager.lock:
+                        keys = shard.due_keys(time.time(), EXPIRY_BATCH)
+                        self._expire_keys(shard, keys)
+                    if len(keys) < EXPIRY_BATCH or time.perf_counter() >= deadline:
+                        break
+
+
+    def _read_committed(self, shard: Shard, key: str, snapshot_timestamp: int) -> Optional[Any]:
+        """
+        Reads the committed value of a key as of a snapshot, going through the cache when one is configured.
+        Keys with older versions still visible to some snapshot bypass the cache, which only holds latest values.
+
+        Args:
+            shard (Shard): The shard owning the key.
+            key (str): The key to read.
+            snapshot_timestamp (int): The commit timestamp the read is served as of.
+
+        Returns:
+            Optional[Any]: The value visible to the snapshot, or None if the key did not exist.
+        """
+        cache = self.caching_strategy
+        if cache is None or key in shard.history:
+            return self._read_shard(shard, key, snapshot_timestamp)
+
+        value = cache.get_from_cache(key, CACHE_MISS)
+        if value is not CACHE_MISS:
+            return value
+
+        commit_timestamp = self.transaction_manager.commit_timestamp
+        value = self._read_shard(shard, key, snapshot_timestamp)
+        with cache.lock:
+            # A commit since the read may already have invalidated this key; caching the value then would be stale
+            if self.transaction_manager.commit_timestamp == commit_timestamp and key not in shard.history:
+                if isinstance(cache, TTLCache) and isinstance(value, ExpiringValue):
+                    # The entry leaves the cache when the key expires
+                    cache.add_to_cache(key, value, max(0.0, value.expires_at - time.time()))
+                else:
+                    cache.add_to_cache(key, value)
+        return value
+
+
+    def _read_shard(self, shard: Shard, key: str, snapshot_timestamp: int) -> Optional[Any]:
+        """
+        Reads a key from its shard. A miss is retried on the key's current owner, because a shard
+        being added or removed may have moved the key after the shard was looked up.
+
+        Args:
+            shard (Shard): The shard owning the key when the read started.
+            key (str): The key to read.
+            snapshot_timestamp (int): The commit timestamp the read is served as of.
+
+        Returns:
+            Optional[Any]: The value visible to the snapshot, or None if the key did not exist.
+        """
+        value = shard.read(key, snapshot_timestamp)
+        if value is None:
+            owner = self.get_shard(key)
+            if owner is not shard:
+                value = owner.read(key, snapshot_timestamp)
+        return value
+
+
+    def _invalidate_cache(self, keys: Iterable[str]) -> None:
+        """
+        Drops keys from the cache after their committed values changed.
+
+        Args:
+            keys (Iterable[str]): The keys to drop.
+        """
+        if self.caching_strategy:
+            for key in keys:
+                self.caching_strategy.remove_from_cache(key)
+
+
+    def delete(self, key: str, transaction_id: Optional[int]) -> None:
         """
         Deletes a value by key from the datastore.
 
         Args:
             key (str): The key to delete.
-            transaction_id (int): The ID of the transaction under which this operation falls.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to commit the deletion on its own straight away.
         """
-        shard = self.get_shard(key)
-        self.transaction_manager.acquire_lock(key, LockType.WRITE, transaction_id)
+        if transaction_id is None:
+            self._autocommit(key, {}, [key])
+            return
+        shard = self._acquire_write_lock(key, transaction_id)
         current_value = shard.storage.get(key)
-        transaction = self.transaction_manager.transactions[transaction_id]
+        transaction = self.transaction_manager.get_active(transaction_id)
         transaction.delete(key, current_value)
-        if self.caching_strategy:
-            self.caching_strategy.remove_from_cache(key)
+        if not transaction.optimistic:
+            self.transaction_manager.record_write(transaction_id, key)
+
+
+    def incr(self, key: str, amount: int, transaction_id: Optional[int]) -> int:
+        """
+        Adds to the integer value of a key in one step, treating a missing key as 0. A value stored as
+        bytes or str digits keeps its type, and a key with an expiry keeps it.
+
+        Args:
+            key (str): The key.
+            amount (int): The number to add; negative to subtract.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to commit the change on its own straight away.
+
+        Returns:
+            int: The new value.
+
+        Raises:
+            ValueError: If the key holds a value that is not an integer.
+        """
+        return int(self._update(key, transaction_id, lambda current: self._increment(current, amount)))
+
+    def append(self, key: str, suffix: Any, transaction_id: Optional[int]) -> int:
+        """
+        Appends to the value of a key in one step, treating a missing key as empty. A key with an expiry keeps it.
+
+        Args:
+            key (str): The key.
+            suffix (Any): The bytes or str to append.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None
+                to commit the change on its own straight away.
+
+        Returns:
+            int: The length of the new value.
+
+        Raises:
+            ValueError: If the key holds a value that is not bytes or str.
+        """
+        return len(self._update(key, transaction_id, lambda current: self._append(current, suffix)))
+
+    def _update(self, key: str, transaction_id: Optional[int], update: Callable[[Optional[Any]], Any]) -> Any:
+        """
+        Replaces the value of a key by one computed from it, so a read-modify-write needs a single request.
+        Without a transaction, the value is read and the new one committed under the key's WRITE lock and
+        the commit lock, like an autocommit PUT. In a transaction, the key is write-locked like a PUT first,
+        so no other writer can change it before the transaction ends.
+
+        Args:
+            key (str): The key.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None.
+            update (Callable[[Optional[Any]], Any]): Computes the new value from the current one, None if missing.
+
+        Returns:
+            Any: The new value, without its expiry.
+        """
+        if transaction_id is None:
+            with self._autocommit_lock(key), self.transaction_manager.lock:
+                shard = self.get_shard(key)
+                value, stored = self._updated(shard.storage.get(key), time.time(), update)
+                # Committed under the same lock hold, so the room needs no reservation past the check
+                self._release_memory(self._reserve_memory([(key, stored)]))
+                sequence = self.transaction_manager.autocommit(shard, {key: stored}, [])
+                self._invalidate_cache([key])
+            self._wait_for_log(sequence)
+            return value
+        shard = self._acquire_write_lock(key, transaction_id)
+        current, read_time = self._read_raw(key, transaction_id)
+        value, stored = self._updated(current, read_time, update)
+        transaction = self.transaction_manager.get_active(transaction_id)
+        self._reserve_memory([(key, stored)], transaction)
+        transaction.put(key, stored, shard.storage.get(key))
+        if not transaction.optimistic:
+            self.transaction_manager.record_write(transaction_id, key)
+        return value
+
+    @staticmethod
+    def _updated(current: Any, now: float, update: Callable[[Optional[Any]], Any]) -> Tuple[Any, Any]:
+        """
+        Applies an update to a stored value, keeping the expiry of a value that has not expired yet.
+
+        Args:
+            current (Any): The stored value, possibly an ExpiringValue, or None if the key is missing.
+            now (float): The wall-clock time expiries are judged at.
+            update (Callable[[Optional[Any]], Any]): Computes the new value from the current one.
+
+        Returns:
+            Tuple[Any, Any]: The new value, and the value to store, with the expiry if there is one.
+        """
+        value = update(live_value(current, now))
+        if isinstance(current, ExpiringValue) and not is_expired(current, now):
+            return value, ExpiringValue(value, current.expires_at)
+        return value, value
+
+    @staticmethod
+    def _increment(current: Optional[Any], amount: int) -> Any:
+        """
+        Adds to an integer value.
+
+        Args:
+            current (Optional[Any]): The value: an int, or its digits as bytes or str; None counts as 0 and
+                becomes bytes, like the values clients store.
+            amount (int): The number to add.
+
+        Returns:
+            Any: The new value, of the same type as the current one.
+
+        Raises:
+            ValueError: If the value is not an integer.
+        """
+        if current is None:
+            return str(amount).encode('ascii')
+        if isinstance(current, int) and not isinstance(current, bool):
+            return current + amount
+        if isinstance(current, (bytes, str)):
+            try:
+                number = int(current)
+            except ValueError:
+                pass
+            else:
+                result = str(number + amount)
+                return result.encode('ascii') if isinstance(current, bytes) else result
+        raise ValueError("Value is not an integer")
+
+    @staticmethod
+    def _append(current: Optional[Any], suffix: Any) -> Any:
+        """
+        Appends to a bytes or str value, converting the suffix to the value's type.
+
+        Args:
+            current (Optional[Any]): The value; None counts as empty.
+            suffix (Any): The bytes or str to append.
+
+        Returns:
+            Any: The new value.
+
+        Raises:
+            ValueError: If the value is not bytes or str.
+        """
+        if current is None:
+            return suffix
+        if isinstance(current, bytes):
+            return current + (suffix.encode('utf-8') if isinstance(suffix, str) else suffix)
+        if isinstance(current, str):
+            return current + (suffix.decode('utf-8') if isinstance(suffix, bytes) else suffix)
+        raise ValueError("Value is not a string")
+
+
+    def mget(self, keys: List[str], transaction_id: int) -> List[Optional[Any]]:
+        """
+        Retrieves the values of many keys at once, reading each shard's keys together from one snapshot.
+
+        Args:
+            keys (List[str]): The keys to look up.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+
+        Returns:
+            List[Optional[Any]]: The value of each key, or None for a missing key, in the order the keys were given.
+        """
+        transaction = self.transaction_manager.transactions.get(transaction_id)
+        if transaction:
+            snapshot_timestamp, read_time = self._read_view(transaction_id)
+        else:
+            snapshot_timestamp, read_time = self.transaction_manager.commit_timestamp, time.time()
+        values = {}
+        for shard, shard_keys in self.sharding_manager.group_by_shard(set(keys)).items():
+            expired = []
+            for key in shard_keys:
+                if transaction and key in transaction.changes:
+                    value = transaction.changes[key]
+                elif transaction and key in transaction.deleted_keys:
+                    value = None
+                else:
+                    value = self._read_committed(shard, key, snapshot_timestamp)
+                    if shard.track_access:
+                        shard.touch(key)
+                    if isinstance(value, ExpiringValue) and is_expired(value, time.time()):
+                        expired.append(key)
+                values[key] = live_value(value, read_time)
+            if expired:
+                self._expire_keys(shard, expired)
+        return [values[key] for key in keys]
+
+
+    def mput(self, pairs: List[Tuple[str, Any]], transaction_id: int) -> None:
+        """
+        Adds or updates many key/value pairs at once. Every WRITE lock is taken before any change is made.
+
+        Args:
+            pairs (List[Tuple[str, Any]]): The key/value pairs; a key given twice takes its last value.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+        """
+        self._reserve_memory(pairs, self.transaction_manager.get_active(transaction_id))
+        shards = self._acquire_write_locks([key for key, _ in pairs], transaction_id)
+        transaction = self.transaction_manager.get_active(transaction_id)
+        for key, value in pairs:
+            transaction.put(key, value, shards[key].storage.get(key))
+            if not transaction.optimistic:
+                self.transaction_manager.record_write(transaction_id, key)
+
+
+    def mdelete(self, keys: List[str], transaction_id: int) -> None:
+        """
+        Deletes many keys at once. Every WRITE lock is taken before any change is made.
+
+        Args:
+            keys (List[str]): The keys to delete.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+        """
+        shards = self._acquire_write_locks(keys, transaction_id)
+        transaction = self.transaction_manager.get_active(transaction_id)
+        for key in keys:
+            transaction.delete(key, shards[key].storage.get(key))
+            if not transaction.optimistic:
+                self.transaction_manager.record_write(transaction_id, key)
+
+
+    def _acquire_write_locks(self, keys: List[str], transaction_id: int) -> Dict[str, Shard]:
+        """
+        Acquires the WRITE locks of many keys, shard by shard and in key order within a shard. Every batch
+        locks in this same global order, so two batches over overlapping keys cannot deadlock each other.
 
+        Args:
+            keys (List[str]): The keys to lock.
+            transaction_id (int): The ID of the transaction acquiring the locks.
+
+        Returns:
+            Dict[str, Shard]: The shard owning each key.
+
+        Raises:
+            LockTimeoutError: If a lock could not be acquired in time.
+            DeadlockError: If the transaction was aborted to break a deadlock.
+            WriteConflictError: If a key was committed by another transaction after this one's snapshot.
+        """
+        groups = self.sharding_manager.group_by_shard(set(keys))
+        shards = {}
+        for shard in self.sharding_manager.shards:
+            for key in sorted(groups.get(shard, ())):
+                shards[key] = self._acquire_write_lock(key, transaction_id)
+        return shards
+
+
+    def scan(self, prefix: str, cursor: str = START_CURSOR, count: int = 10) -> Tuple[str, List[Tuple[str, Any]]]:
+        """
+        Returns one page of the committed keys starting with a prefix, in key order. Pass the returned cursor
+        back to get the next page; a scan starts and ends with START_CURSOR. Only one page is read at a time.
+
+        Args:
+            prefix (str): The prefix of the keys to list.
+            cursor (str): The cursor returned with the previous page. Defaults to the first page.
+            count (int): The maximum number of pairs in the page. Default is 10.
+
+        Returns:
+            Tuple[str, List[Tuple[str, Any]]]: The cursor of the next page, and the key/value pairs.
+
+        Raises:
+            ValueError: If the cursor is malformed or the shards keep no ordered index.
+        """
+        after = decode_cursor(cursor)
+        if after is None or after < prefix:
+            pairs = self._ordered_items(prefix, True, lambda key: key.startswith(prefix))
+        else:
+            pairs = self._ordered_items(after, False, lambda key: key.startswith(prefix))
+        page = list(itertools.islice(pairs, count + 1))
+        if len(page) > count:
+            return encode_cursor(page[count - 1][0]), page[:count]
+        return START_CURSOR, page
+
+    def range_scan(self, start: str, end: str, limit: int = 10) -> Tuple[Optional[str], List[Tuple[str, Any]]]:
+        """
+        Returns one page of the committed keys from start up to, but excluding, end, in key order.
+        The next page starts at the returned key.
+
+        Args:
+            start (str): The first key of the page.
+            end (str): The key the range stops before.
+            limit (int): The maximum number of pairs in the page. Default is 10.
+
+        Returns:
+            Tuple[Optional[str], List[Tuple[str, Any]]]: The first key of the next page, or None if the range
+            is exhausted, and the key/value pairs.
+
+        Raises:
+            ValueError: If the shards keep no ordered index.
+        """
+        page = list(itertools.islice(self._ordered_items(start, True, lambda key: key < end), limit + 1))
+        if len(page) > limit:
+            return page[limit][0], page[:limit]
+        return None, page
+
+    def _ordered_items(self, start: str, inclusive: bool, within: Callable[[str], bool]) -> Iterator[Tuple[str, Any]]:
+        """
+        Yields the committed key/value pairs from a key on, in key order, by a k-way merge of the shards'
+        ordered indexes. Each index is read block by block, so only what the caller consumes is materialized.
+
+        Args:
+            start (str): The key to start at.
+            inclusive (bool): Whether start itself is included.
+            within (Callable[[str], bool]): Tells whether a key is still in the scanned range; the first key
+                that is not ends the iteration.
+
+        Yields:
+            Tuple[str, Any]: The live key/value pairs, read as of the commit timestamp the scan started at.
+
+        Raises:
+            ValueError: If the shards keep no ordered index.
+        """
+        shards = list(self.sharding_manager.shards)
+        if any(shard.index is None for shard in shards):
+            raise ValueError("Range and prefix scans need an ordered index: DataStore(ordered_index=True)")
+        snapshot_timestamp = self.transaction_manager.commit_timestamp
+        now = time.time()
+        previous = None
+        for key in heapq.merge(*(shard.index.keys_from(start, inclusive) for shard in shards)):
+            if not within(key):
+                return
+            # A key being moved to another shard is briefly in the indexes of both
+            if key == previous:
+                continue
+            previous = key
+            value = live_value(self._read_shard(self.get_shard(key), key, snapshot_timestamp), now)
+            if value is not None:
+                yield key, value
 
     def show_all(self) -> dict:
         """
         Returns a dictionary containing all key-value pairs and their associated transaction IDs.
+        Use show_all_pages to go through a large data store without building the whole dictionary.
 
         Returns:
             dict: All key-value pairs in the datastore.
         """
         all_data = {}
-        for shard in self.sharding_manager.shards:
-            for key, value in shard.storage.items():
-                transaction_id = self.transaction_manager.get_transaction_id_for_key(key)
-                all_data[key] = {'value': value, 'transaction_id': transaction_id}
+        for page in self.show_all_pages():
+            all_data.update(page)
         return all_data
 
+    def show_all_pages(self, page_size: int = 1000) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """
+        Yields every key-value pair and its associated transaction ID, page_size keys at a time. Values are
+        read as each page is built, so only one page is held at a time; keys committed or moved between
+        shards while the pages are being consumed may or may not be included.
+
+        Args:
+            page_size (int): The number of keys per page. Default is 1000.
+
+        Yields:
+            Dict[str, Dict[str, Any]]: The 'value' and 'transaction_id' of each key of the page; no page is empty.
+        """
+        page = {}
+        for shard in list(self.sharding_manager.shards):
+            for key in self._shard_keys(shard):
+                value = live_value(shard.storage.get(key), time.time())
+                if value is None:
+                    continue
+                page[key] = {'value': value, 'transaction_id': self.transaction_manager.get_transaction_id_for_key(key)}
+                if len(page) == page_size:
+                    yield page
+                    page = {}
+        if page:
+            yield page
+
+    @staticmethod
+    def _shard_keys(shard: Shard) -> Iterable[str]:
+        """
+        Returns the keys of a shard for iteration while it keeps changing.
+
+        Args:
+            shard (Shard): The shard.
+
+        Returns:
+            Iterable[str]: The keys, read block by block from the ordered index if the shard keeps one, or
+            else a copy of the key set, which holds references to the keys but none of the values.
+        """
+        if shard.index is not None:
+            return shard.index.keys_from('')
+        return list(shard.storage)
+
 
     def commit_all_transactions(self) -> None:
         """Commits all active transactions."""
         with self.transaction_manager.lock:
-            self.transaction_manager.commit_all(self.sharding_manager.shards)
+            transactions = list(self.transaction_manager.transactions.values())
+            keys = [key for transaction in transactions for key in (*transaction.changes, *transaction.deleted_keys)]
+            sequence = self.transaction_manager.commit_all(self.sharding_manager)
+            self._release_memory(sum(transaction.reserved_memory for transaction in transactions))
+            self.transaction_manager.collect_garbage(self.sharding_manager)
+            self._invalidate_cache(keys)
+        self._wait_for_log(sequence)
+
+    def add_shard(self, shard: Optional[Shard] = None, batch_size: int = 1000) -> threading.Thread:
+        """
+        Adds a shard while the data store keeps serving requests. The keys it takes over move to it in the
+        background, batch_size keys at a time, each batch under the transaction manager's lock.
+
+        Args:
+            shard (Optional[Shard]): The shard to add. Defaults to a new empty shard.
+            batch_size (int): The number of keys checked per migration step. Default is 1000.
+
+        Returns:
+            threading.Thread: The migration thread; join it to wait until every key has moved.
+        """
+        self.wait_for_migration()
+        shard = shard or Shard()
+        self._prepare_shard(shard)
+        with self.transaction_manager.lock:
+            self.sharding_manager.add_shard(shard)
+        return self._start_migration(batch_size)
+
+    def remove_shard(self, shard: Shard, batch_size: int = 1000) -> threading.Thread:
+        """
+        Removes a shard while the data store keeps serving requests. Its keys move to their new owners in
+        the background, and the shard is dropped once it is empty.
+
+        Args:
+            shard (Shard): The shard to remove.
+            batch_size (int): The number of keys checked per migration step. Default is 1000.
+
+        Returns:
+            threading.Thread: The migration thread; join it to wait until every key has moved.
+        """
+        self.wait_for_migration()
+        with self.transaction_manager.lock:
+            self.sharding_manager.remove_shard(shard)
+        return self._start_migration(batch_size)
+
+    def wait_for_migration(self) -> None:
+        """Blocks until the keys of the last added or removed shard have finished moving."""
+        if self.migration_thread is not None:
+            self.migration_thread.join()
+
+    def _start_migration(self, batch_size: int) -> threading.Thread:
+        """
+        Starts moving keys to their new shards in a background thread.
+
+        Args:
+            batch_size (int): The number of keys checked per migration step.
+
+        Returns:
+            threading.Thread: The migration thread.
+        """
+        self.migration_thread = threading.Thread(target=self._migrate, args=(batch_size,), daemon=True)
+        self.migration_thread.start()
+        return self.migration_thread
+
+    def _migrate(self, batch_size: int) -> None:
+        """
+        Moves keys batch by batch until the migration is complete. Each batch is listed without the lock and
+        moved under it, releasing it between batches so commits are never held up for more than one batch.
+
+        Args:
+            batch_size (int): The number of keys checked per migration step.
+        """
+        with self.maintenance_lock:
+            while True:
+                batch = self.sharding_manager.next_migration_batch(batch_size)
+                with self.transaction_manager.lock:
+                    if self.sharding_manager.migrate(batch, batch_size):
+                        return
+                time.sleep(0)  # Let waiting commits take the lock between batches
 
     def start_transaction(self) -> int:
         """
@@ -121,17 +1333,86 @@ class DataStore:
         transaction_id = self.transaction_manager.begin()
         return transaction_id
 
+    def has_transaction(self, transaction_id: Optional[int]) -> bool:
+        """
+        Checks whether a transaction ID belongs to an active transaction of this data store.
+
+        Args:
+            transaction_id (Optional[int]): The ID to check.
+
+        Returns:
+            bool: True if the transaction has begun and not yet committed, rolled back or been reaped.
+        """
+        return transaction_id in self.transaction_manager.transactions
+
+    def transaction_stats(self) -> Dict[str, int]:
+        """
+        Returns the transaction counters for monitoring.
+
+        Returns:
+            Dict[str, int]: The number of active transactions and of idle transactions rolled back so far.
+        """
+        return {'active_transactions': self.transaction_manager.active_count(),
+                'reaped_transactions': self.reaped_transactions}
+
+    def reap_idle_transactions(self) -> List[int]:
+        """
+        Rolls back the transactions that have not been used for idle_timeout seconds, so a client that
+        went away mid-transaction does not hold its locks forever.
+
+        Returns:
+            List[int]: The IDs of the transactions rolled back.
+        """
+        reaped = []
+        for transaction_id in self.transaction_manager.idle_transactions(self.idle_timeout):
+            with self.transaction_manager.lock:
+                # It may have been used or finished since it was found idle
+                transaction = self.transaction_manager.transactions.get(transaction_id)
+                if transaction is not None and transaction.last_active < time.time() - self.idle_timeout:
+                    self.rollback_transaction(transaction_id)
+                    reaped.append(transaction_id)
+        self.reaped_transactions += len(reaped)
+        return reaped
+
+    def _reap_periodically(self) -> None:
+        """Rolls back idle transactions every half idle_timeout until the data store is closed."""
+        while not self.stopping.wait(self.idle_timeout / 2):
+            reaped = self.reap_idle_transactions()
+            if reaped:
+                print(f"Rolled back idle transactions {reaped}")
+
     def commit_transaction(self, transaction_id: int) -> None:
         """
-        Commits the current transaction.
+        Commits the current transaction. An optimistic transaction is validated first.
 
         Args:
             transaction_id (int): The ID of the transaction to commit.
+
+        Raises:
+            WriteConflictError: If an optimistic transaction conflicts and was rolled back instead.
         """
+        sequence = None
         with self.transaction_manager.lock:
             transaction = self.transaction_manager.transactions.get(transaction_id)
             if transaction:
-                self.transaction_manager.commit(transaction_id, self.sharding_manager.shards)
+                self.validate_transaction(transaction_id)
+                keys = list(transaction.changes) + list(transaction.deleted_keys)
+                sequence = self.transaction_manager.commit(transaction_id, self.sharding_manager)
+                self._release_memory(transaction.reserved_memory)
+                self.transaction_manager.collect_garbage(self.sharding_manager)
+                self._invalidate_cache(keys)
+        self._wait_for_log(sequence)
+
+    def _wait_for_log(self, sequence: Optional[int]) -> None:
+        """
+        Waits, outside the transaction manager's lock, until a commit's log record is as durable as the
+        fsync policy promises. Other transactions commit meanwhile and share the same fsync.
+
+        Args:
+            sequence (Optional[int]): The sequence number of the log record, or None if nothing was logged.
+        """
+        if sequence is not None:
+            self.commit_log.wait(sequence)
 
     def rollback_transaction(self, transaction_id: int) -> None:
         """
@@ -143,5 +1424,11 @@ class DataStore:
         with self.transaction_manager.lock:
             transaction = self.transaction_manager.transactions.get(transaction_id)
             if transaction:
-                transaction.undo(self.sharding_manager.shards)  # Pass the shards here
+                keys = list(transaction.pre_commit_state)
+                if not transaction.optimistic:
+                    # An optimistic transaction's previous values were read without locks and may be stale
+                    transaction.undo(self.sharding_manager)
                 self.transaction_manager.rollback(transaction_id)
+                self._release_memory(transaction.reserved_memory)
+                self.transaction_manager.collect_garbage(self.sharding_manager)
+                self._invalidate_cache(keys)
@@ -0,0 +1,195 @@
+import heapq
+import sys
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from server.data_store.sharding.expiry import ExpiringValue
+
+EVICTION_POLICIES = ('noeviction', 'allkeys-lru', 'allkeys-lfu', 'volatile-ttl')
+
+# Starting value of a key's LFU counter, so new keys are not the first to go
+LFU_INITIAL = 5
+LFU_MAX = 255
+# The higher, the more accesses each further counter increment takes
+LFU_LOG_FACTOR = 10
+# The best eviction candidates remembered between evictions by the sampling policies
+EVICTION_POOL_SIZE = 16
+
+
+class MemoryLimitError(Exception):
+    """Raised when a write would exceed the memory limit and nothing can be evicted to make room."""
+
+
+def estimate_size(key: str, value: Any) -> int:
+    """
+    Estimates the bytes a key/value pair occupies, the same way the caches do.
+
+    Args:
+        key (str): The key.
+        value (Any): The stored value, possibly an ExpiringValue.
+
+    Returns:
+        int: The estimated size in bytes.
+    """
+    size = sys.getsizeof(key) + sys.getsizeof(value)
+    if isinstance(value, ExpiringValue):
+        size += sys.getsizeof(value.value)
+    return size
+
+
+def lfu_increment(counter: int, chance: float) -> int:
+    """
+    Increments a logarithmic access counter: the higher it is, the less likely an access raises it,
+    so a small counter tells frequently from rarely accessed keys.
+
+    Args:
+        counter (int): The current counter.
+        chance (float): A random number in [0, 1).
+
+    Returns:
+        int: The new counter.
+    """
+    if counter < LFU_MAX and chance < 1.0 / ((counter - LFU_INITIAL) * LFU_LOG_FACTOR + 1):
+        return counter + 1
+    return counter
+
+
+class MemoryLimit:
+    def __init__(self, maxmemory: Optional[int] = None, policy: str = 'noeviction', samples: int = 5) -> None:
+        """
+        Initializes a memory budget for a data store and the policy that makes room when it is exceeded.
+
+        Args:
+            maxmemory (Optional[int]): The budget in bytes, compared with the sum of the shards' estimates.
+                Defaults to no budget.
+            policy (str): 'noeviction' rejects writes over the budget; 'allkeys-lru' and 'allkeys-lfu' evict the least
+                recently or least frequently used of a few sampled keys; 'volatile-ttl' evicts the keys with the
+                soonest expiry, and rejects writes once no key has one. Default is 'noeviction'.
+            samples (int): The number of keys sampled per eviction by the LRU and LFU policies. Default is 5.
+
+        Attributes:
+            evicted_keys (int): The number of keys evicted so far.
+            rejected_writes (int): The number of writes rejected for lack of memory.
+            reserved (int): Bytes set aside for writes checked against the budget but not yet committed; they
+                count as used, so concurrent transactions cannot together exceed the budget at commit.
+            next_shard (int): The shard sampled next; the sampling policies rotate over the shards.
+            pool (List[Tuple[float, str, Shard]]): The best candidates sampled so far, as (access statistic, key,
+                shard), best first, so a victim is chosen across shards while each eviction samples only one.
+
+        Raises:
+            ValueError: If the policy is unknown.
+        """
+        if policy not in EVICTION_POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}'")
+        self.maxmemory = maxmemory
+        self.policy = policy
+        self.samples = samples
+        self.evicted_keys = 0
+        self.rejected_writes = 0
+        self.reserved = 0
+        self.next_shard = 0
+        self.pool: List[Tuple[float, str, Any]] = []
+
+    @property
+    def tracked_access(self) -> Optional[str]:
+        """Optional[str]: The access statistic shards must keep for the policy: 'lru', 'lfu' or None."""
+        return {'allkeys-lru': 'lru', 'allkeys-lfu': 'lfu'}.get(self.policy)
+
+    def pick_victim(self, shards: Sequence[Any], evictable: Callable[[str], bool]) -> Optional[Tuple[Any, str]]:
+        """
+        Picks the key to evict next.
+
+        Args:
+            shards (Sequence[Shard]): The data store's shards.
+            evictable (Callable[[str], bool]): Tells whether a key may be evicted now, e.g. because no
+                transaction is writing it.
+
+        Returns:
+            Optional[Tuple[Shard, str]]: The shard and the key to evict, or None if the policy finds none.
+        """
+        if self.policy == 'noeviction':
+            return None
+        if self.policy == 'volatile-ttl':
+            return self._soonest_expiry(shards, evictable)
+        for _ in range(len(shards)):
+            shard = shards[self.next_shard % len(shards)]
+            self.next_shard = (self.next_shard + 1) % len(shards)
+            self._sample(shard)
+            while self.pool:
+                score, key, shard = self.pool.pop(0)
+                # Entries are stale once their key was accessed, removed or moved to another shard
+                if (any(candidate is shard for candidate in shards) and key in shard.storage
+                        and self._score(shard, key) == score and evictable(key)):
+                    return shard, key
+        return None
+
+    def _score(self, shard: Any, key: str) -> float:
+        """
+        Returns a key's access statistic; the lowest is evicted first.
+
+        Args:
+            shard (Shard): The shard holding the key.
+            key (str): The key.
+
+        Returns:
+            float: The time of the last access for LRU, the access counter for LFU.
+        """
+        # Keys not accessed since they were loaded rank as the least recently and least frequently used
+        return shard.access.get(key, 0 if self.policy == 'allkeys-lru' else LFU_INITIAL)
+
+    def _sample(self, shard: Any) -> None:
+        """
+        Samples keys of a shard into the pool, keeping only the EVICTION_POOL_SIZE best candidates.
+
+        Args:
+            shard (Shard): The shard to sample.
+        """
+        pooled = {(key, id(entry_shard)) for _, key, entry_shard in self.pool}
+        for key in shard.sample_keys(self.samples):
+            if (key, id(shard)) not in pooled:
+                pooled.add((key, id(shard)))
+                self.pool.append((self._score(shard, key), key, shard))
+        self.pool.sort(key=lambda entry: entry[0])
+        del self.pool[EVICTION_POOL_SIZE:]
+
+    @staticmethod
+    def _soonest_expiry(shards: Sequence[Any], evictable: Callable[[str], bool]) -> Optional[Tuple[Any, str]]:
+        """
+        Finds the evictable key with the soonest expiry, looking at the top of each shard's expiry heap.
+
+        Args:
+            shards (Sequence[Shard]): The data store's shards.
+            evictable (Callable[[str], bool]): Tells whether a key may be evicted now.
+
+        Returns:
+            Optional[Tuple[Shard, str]]: The shard and the key, or None if no key has an expiry.
+        """
+        best = None
+        for shard in shards:
+            skipped = []
+            while shard.expiry_heap:
+                expires_at, key = shard.expiry_heap[0]
+                value = shard.storage.get(key)
+                # Entries of keys rewritten or removed since they were pushed are stale
+                if not isinstance(value, ExpiringValue) or value.expires_at != expires_at:
+                    heapq.heappop(shard.expiry_heap)
+                elif not evictable(key):
+                    skipped.append(heapq.heappop(shard.expiry_heap))
+                else:
+                    if best is None or expires_at < best[0]:
+                        best = (expires_at, shard, key)
+                    break
+            for entry in skipped:
+                heapq.heappush(shard.expiry_heap, entry)
+        return None if best is None else best[1:]
+
+    def stats(self, used_memory: int) -> Dict[str, Any]:
+        """
+        Returns the memory statistics.
+
+        Args:
+            used_memory (int): The current estimate of the data store's memory use in bytes.
+
+        Returns:
+            Dict[str, Any]: The budget, policy, estimate and eviction counters.
+        """
+        return {'used_memory': used_memory, 'maxmemory': self.maxmemory, 'policy': self.policy,
+                'evicted_keys': self.evicted_keys, 'rejected_writes': self.rejected_writes}
@@ -0,0 +1,239 @@
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+FSYNC_POLICIES = ('always', 'interval', 'never')
+
+# Payload length and CRC-32 of the payload; a record whose header or payload is cut short or does not
+# match its checksum marks the end of the log, e.g. after a crash in the middle of a write
+RECORD_HEADER = struct.Struct('>II')
+
+LogRecord = Tuple[int, Dict[str, Any], List[str]]
+
+
+def read_records(path: str) -> Tuple[List[LogRecord], int]:
+    """
+    Reads every intact record of a log file.
+
+    Args:
+        path (str): The log file.
+
+    Returns:
+        Tuple[List[LogRecord], int]: The (commit timestamp, writes, deletes) of each committed transaction in
+        commit order, and the length in bytes of the intact part of the file.
+    """
+    if not os.path.exists(path):
+        return [], 0
+    with open(path, 'rb') as file:
+        data = file.read()
+    records = []
+    offset = 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        start = offset + RECORD_HEADER.size
+        payload = data[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        records.append(pickle.loads(payload))
+        offset = start + length
+    return records, offset
+
+
+def encode_record(commit_timestamp: int, writes: Dict[str, Any], deletes: List[str]) -> bytes:
+    """
+    Encodes the changes of one committed transaction as a log record.
+
+    Args:
+        commit_timestamp (int): The transaction's commit timestamp.
+        writes (Dict[str, Any]): The key/value pairs it wrote.
+        deletes (List[str]): The keys it deleted.
+
+    Returns:
+        bytes: The record.
+    """
+    payload = pickle.dumps((commit_timestamp, writes, deletes), protocol=pickle.HIGHEST_PROTOCOL)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def replace_file(temporary: str, path: str) -> None:
+    """
+    Atomically replaces a file with a fully written and fsynced temporary file, then fsyncs the directory
+    where the platform allows it, so the rename itself survives a crash.
+
+    Args:
+        temporary (str): The new contents.
+        path (str): The file to replace.
+    """
+    os.replace(temporary, path)
+    if hasattr(os, 'O_DIRECTORY'):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+class AppendOnlyLog:
+    def __init__(self, path: str, fsync: str = 'always', fsync_interval: float = 0.01) -> None:
+        """
+        Opens an append-only log of committed transactions, one record per transaction. Records are
+        queued by committers and written by a background thread, so no file I/O happens while the
+        transaction manager's lock is held. Whatever has queued up while the thread was busy is written
+        with one write and, depending on the policy, one fsync: concurrent committers share the cost
+        of a single fsync (group commit).
+
+        A torn record at the end of an existing file, left by a crash in the middle of a write, is cut off.
+
+        Args:
+            path (str): The log file. Created if it does not exist.
+            fsync (str): When records are forced to disk. 'always' makes every commit wait for the fsync
+                covering its record; 'interval' fsyncs every fsync_interval seconds, so a crash can lose
+                the commits of the last interval; 'never' leaves flushing to the operating system.
+                Default is 'always'.
+            fsync_interval (float): Seconds between fsyncs with the 'interval' policy. Default is 0.01.
+
+        Attributes:
+            pending (List[LogRecord]): Records queued and not written yet, in commit order.
+            appended (int): The sequence number of the last queued record.
+            written (int): The sequence number of the last record handed to the operating system.
+            durable (int): The sequence number of the last record known to be on disk.
+            syncs (int): The number of fsyncs performed.
+            error (Optional[OSError]): The error that stopped the writer thread, if any.
+            file_lock (threading.Lock): Held while the file is written, synced or replaced.
+
+        Raises:
+            ValueError: If the fsync policy is unknown.
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy {fsync!r}; expected one of {', '.join(FSYNC_POLICIES)}")
+        self.path = path
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        _, intact_length = read_records(path)
+        self.file = open(path, 'ab')
+        self.file.truncate(intact_length)
+        self.pending: List[LogRecord] = []
+        self.appended = 0
+        self.written = 0
+        self.durable = 0
+        self.syncs = 0
+        self.error: Optional[OSError] = None
+        self.closed = False
+        self.condition = threading.Condition()
+        self.file_lock = threading.Lock()
+        self.writer = threading.Thread(target=self._run, name='append-only-log', daemon=True)
+        self.writer.start()
+
+    def append(self, commit_timestamp: int, writes: Dict[str, Any], deletes: List[str]) -> int:
+        """
+        Queues the record of a committed transaction. Cheap enough to call with the transaction manager's
+        lock held, which keeps records in commit order.
+
+        Args:
+            commit_timestamp (int): The transaction's commit timestamp.
+            writes (Dict[str, Any]): The key/value pairs it wrote; must not be modified afterwards.
+            deletes (List[str]): The keys it deleted.
+
+        Returns:
+            int: The record's sequence number, to pass to wait().
+        """
+        with self.condition:
+            self.pending.append((commit_timestamp, writes, deletes))
+            self.appended += 1
+            self.condition.notify_all()
+            return self.appended
+
+    def wait(self, sequence: int) -> None:
+        """
+        Blocks until a record is as durable as the fsync policy promises: on disk with 'always',
+        handed to the operating system otherwise.
+
+        Args:
+            sequence (int): The sequence number returned by append().
+
+        Raises:
+            OSError: If the log could not be written.
+        """
+        with self.condition:
+            while (self.durable if self.fsync == 'always' else self.written) < sequence:
+                if self.error is not None:
+                    raise self.error
+                self.condition.wait()
+
+    def _run(self) -> None:
+        """Writes queued records in batches until the log is closed."""
+        last_sync = time.monotonic()
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    timeout = None
+                    if self.fsync == 'interval' and self.durable < self.written:
+                        timeout = last_sync + self.fsync_interval - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    self.condition.wait(timeout)
+                batch, self.pending = self.pending, []
+                sequence = self.appended
+                closed = self.closed
+
+            try:
+                with self.file_lock:
+                    if batch:
+                        self.file.write(b''.join(encode_record(*record) for record in batch))
+                        self.file.flush()
+                    now = time.monotonic()
+                    sync = self.written < sequence or closed if self.fsync == 'always' else (
+                        self.fsync == 'interval' and (closed or now - last_sync >= self.fsync_interval))
+                    if sync and self.durable < sequence:
+                        os.fsync(self.file.fileno())
+                        self.syncs += 1
+                        last_sync = now
+                    else:
+                        sync = False
+            except OSError as e:
+                with self.condition:
+                    self.error = e
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.written = sequence
+                if sync:
+                    self.durable = sequence
+                self.condition.notify_all()
+            if closed:
+                return
+
+    def truncate(self, commit_timestamp: int) -> None:
+        """
+        Drops the records a snapshot covers. The remaining tail is written to a new file that replaces
+        the log, so a crash leaves either the old or the truncated log. Records queued meanwhile are
+        written after the swap.
+
+        Args:
+            commit_timestamp (int): The commit timestamp of the snapshot; records up to it are dropped.
+        """
+        with self.file_lock:
+            records, _ = read_records(self.path)
+            temporary = self.path + '.tmp'
+            with open(temporary, 'wb') as file:
+                file.write(b''.join(encode_record(*record) for record in records if record[0] > commit_timestamp))
+                file.flush()
+                os.fsync(file.fileno())
+            self.file.close()
+            replace_file(temporary, self.path)
+            self.file = open(self.path, 'ab')
+
+    def close(self) -> None:
+        """Writes and, unless the policy is 'never', fsyncs every queued record, then closes the file."""
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.writer.join()
+        self.file.close()
@@ -0,0 +1,92 @@
+import os
+import pickle
+import struct
+import zlib
+from typing import Any, Iterable, Iterator, List, Tuple
+from server.data_store.persistence.append_only_log import RECORD_HEADER, replace_file
+
+# Identifies a snapshot file and its format version
+SNAPSHOT_MAGIC = b'MSSNAP\x01'
+# The commit timestamp the snapshot was taken at; every log record up to it is covered by the snapshot
+SNAPSHOT_HEADER = struct.Struct('>Q')
+# Key/value pairs per chunk; each chunk is framed like a log record, with its length and CRC-32
+CHUNK_SIZE = 1000
+
+
+def write_snapshot(path: str, commit_timestamp: int, items: Iterable[Tuple[str, Any]],
+                   chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Writes key/value pairs to a snapshot file. The file is written next to the old snapshot, fsynced,
+    and then renamed over it, so a crash leaves either the old or the new snapshot, never a partial one.
+
+    Args:
+        path (str): The snapshot file.
+        commit_timestamp (int): The commit timestamp the pairs were read as of.
+        items (Iterable[Tuple[str, Any]]): The key/value pairs, consumed chunk by chunk.
+        chunk_size (int): The number of pairs per chunk. Default is CHUNK_SIZE.
+
+    Returns:
+        int: The number of pairs written.
+    """
+    temporary = path + '.tmp'
+    count = 0
+    with open(temporary, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC + SNAPSHOT_HEADER.pack(commit_timestamp))
+        chunk: List[Tuple[str, Any]] = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) == chunk_size:
+                _write_chunk(file, chunk)
+                count += len(chunk)
+                chunk = []
+        if chunk:
+            _write_chunk(file, chunk)
+            count += len(chunk)
+        file.flush()
+        os.fsync(file.fileno())
+    replace_file(temporary, path)
+    return count
+
+
+def _write_chunk(file: Any, chunk: List[Tuple[str, Any]]) -> None:
+    """Writes one framed chunk of key/value pairs."""
+    payload = pickle.dumps(chunk, protocol=pickle.HIGHEST_PROTOCOL)
+    file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+
+
+def read_snapshot(path: str) -> Tuple[int, Iterator[List[Tuple[str, Any]]]]:
+    """
+    Opens a snapshot file.
+
+    Args:
+        path (str): The snapshot file.
+
+    Returns:
+        Tuple[int, Iterator[List[Tuple[str, Any]]]]: The commit timestamp the snapshot was taken at, and an
+        iterator over its chunks of key/value pairs, read one at a time so the file is never fully in memory.
+
+    Raises:
+        ValueError: If the file is not a snapshot or is corrupt.
+    """
+    file = open(path, 'rb')
+    header = file.read(len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size)
+    if not header.startswith(SNAPSHOT_MAGIC) or len(header) < len(SNAPSHOT_MAGIC) + SNAPSHOT_HEADER.size:
+        file.close()
+        raise ValueError(f"{path} is not a snapshot file")
+    commit_timestamp, = SNAPSHOT_HEADER.unpack_from(header, len(SNAPSHOT_MAGIC))
+
+    def chunks() -> Iterator[List[Tuple[str, Any]]]:
+        with file:
+            while True:
+                header = file.read(RECORD_HEADER.size)
+                if not header:
+                    return
+                if len(header) < RECORD_HEADER.size:
+                    raise ValueError(f"Snapshot {path} is truncated")
+                length, checksum = RECORD_HEADER.unpack(header)
+                payload = file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    raise ValueError(f"Snapshot {path} is corrupt")
+                yield pickle.loads(payload)
+
+    return commit_timestamp, chunks()
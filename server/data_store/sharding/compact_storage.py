@@ -0,0 +1,361 @@
+import mmap
+import os
+import pickle
+import struct
+import threading
+import zlib
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Iterator, List, Optional, Tuple
+
+# File magic, number of arena bytes in use and the owner's size estimate of the entries
+ARENA_HEADER = struct.Struct('<8sQQ')
+ARENA_MAGIC = b'MSARENA2'
+# Value encoding (with FLAG_DELETED once the entry is dead), key length, value length; followed by the bytes
+ENTRY_HEADER = struct.Struct('<BII')
+
+TAG_BYTES = 0
+TAG_STR = 1
+TAG_PICKLE = 2
+FLAG_DELETED = 0x80
+
+# Index slots that hold no entry
+EMPTY = -1
+DELETED = -2
+# Share of index slots, live or deleted, above which the index is rebuilt larger
+MAX_LOAD = 0.7
+
+_MISSING = object()
+
+
+class CompactStorage(MutableMapping):
+    def __init__(self, path: Optional[str] = None, initial_size: int = 1 << 16) -> None:
+        """
+        Initializes a compact key/value storage that can replace a shard's dict. Entries are packed one after
+        another into a single arena of bytes, and an open-addressing hash table maps each key to its entry's
+        offset, so a key costs its encoded bytes plus a few bytes of header and index instead of the headers
+        of a str, a value object and a dict entry. Values are stored as raw bytes when they are bytes, as UTF-8
+        when they are str, and pickled otherwise.
+
+        Overwritten and deleted entries stay in the arena as garbage until more than half of it is garbage,
+        then live entries are compacted in place. All access is serialized by one lock, as the structure,
+        unlike a dict, cannot be read while another thread changes it.
+
+        Args:
+            path (Optional[str]): File to map the arena to, so the operating system pages out cold entries.
+                An existing file is reopened after a scan of the entry headers, without decoding any value.
+                Defaults to an arena in memory. The file is not crash-safe; durability comes from the commit log.
+            initial_size (int): The initial arena size in bytes. Default is 64 KiB.
+
+        Attributes:
+            arena (Union[bytearray, mmap.mmap]): The packed entries, after an ARENA_HEADER.
+            used (int): The number of arena bytes in use.
+            garbage (int): The number of arena bytes held by dead entries.
+            offsets (array): The arena offset of each index slot's entry, or EMPTY or DELETED.
+            hashes (array): The CRC-32 of each index slot's key, compared before the key itself.
+            count (int): The number of live keys.
+            filled (int): The number of index slots that are not EMPTY.
+            layout (int): Counts index rebuilds, which move keys to other slots; see key_batches.
+            size_estimate (int): The estimated size of the entries as objects, kept up to date by the owner, e.g.
+                a shard's memory_usage, and saved in the header so a reopened file does not decode every value
+                to recompute it.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.size_estimate = 0
+        self.layout = 0
+        if path is None:
+            self.arena = bytearray(max(initial_size, ARENA_HEADER.size))
+            self.used = ARENA_HEADER.size
+        else:
+            exists = os.path.exists(path) and os.path.getsize(path) >= ARENA_HEADER.size
+            self.file = open(path, 'r+b' if exists else 'w+b')
+            if not exists:
+                self.file.truncate(max(initial_size, ARENA_HEADER.size))
+            self.arena = mmap.mmap(self.file.fileno(), 0)
+            if exists:
+                magic, self.used, self.size_estimate = ARENA_HEADER.unpack_from(self.arena, 0)
+                if magic != ARENA_MAGIC:
+                    self.close()
+                    raise ValueError(f"{path} is not a compact storage file")
+            else:
+                self.used = ARENA_HEADER.size
+        self._write_header()
+        self._rebuild_index()
+
+    def _write_header(self) -> None:
+        """Writes the magic, the number of bytes in use and the size estimate to the start of the arena."""
+        ARENA_HEADER.pack_into(self.arena, 0, ARENA_MAGIC, self.used, self.size_estimate)
+
+    def _entries(self) -> Iterator[Tuple[int, int, int, int]]:
+        """Yields the offset, tag, key length and value length of every arena entry, live or dead."""
+        offset = ARENA_HEADER.size
+        while offset < self.used:
+            tag, key_length, value_length = ENTRY_HEADER.unpack_from(self.arena, offset)
+            yield offset, tag, key_length, value_length
+            offset += ENTRY_HEADER.size + key_length + value_length
+
+    def _rebuild_index(self) -> None:
+        """Rebuilds the index from a scan of the arena's entry headers."""
+        live: List[Tuple[int, int]] = []
+        self.garbage = 0
+        for offset, tag, key_length, value_length in self._entries():
+            if tag & FLAG_DELETED:
+                self.garbage += ENTRY_HEADER.size + key_length + value_length
+            else:
+                start = offset + ENTRY_HEADER.size
+                live.append((zlib.crc32(self.arena[start:start + key_length]), offset))
+        self._build_index(live)
+
+    def _build_index(self, live: List[Tuple[int, int]]) -> None:
+        """
+        Builds an index with room for twice the live entries.
+
+        Args:
+            live (List[Tuple[int, int]]): The key hash and arena offset of every live entry.
+        """
+        capacity = 8
+        while capacity < 2 * len(live):
+            capacity *= 2
+        self.offsets = array('q', [EMPTY]) * capacity
+        self.hashes = array('I', [0]) * capacity
+        mask = capacity - 1
+        for key_hash, offset in live:
+            slot = key_hash & mask
+            while self.offsets[slot] != EMPTY:
+                slot = (slot + 1) & mask
+            self.offsets[slot] = offset
+            self.hashes[slot] = key_hash
+        self.count = self.filled = len(live)
+        self.layout += 1
+
+    def _probe(self, key: bytes, key_hash: int) -> Tuple[int, int]:
+        """
+        Looks a key up in the index by linear probing.
+
+        Args:
+            key (bytes): The encoded key.
+            key_hash (int): The key's CRC-32.
+
+        Returns:
+            Tuple[int, int]: The slot holding the key, or -1, and the slot a new entry for it would take.
+        """
+        offsets, hashes, arena = self.offsets, self.hashes, self.arena
+        mask = len(offsets) - 1
+        slot = key_hash & mask
+        free = -1
+        while True:
+            offset = offsets[slot]
+            if offset == EMPTY:
+                return -1, slot if free < 0 else free
+            if offset == DELETED:
+                if free < 0:
+                    free = slot
+            elif hashes[slot] == key_hash:
+                _, key_length, _ = ENTRY_HEADER.unpack_from(arena, offset)
+                start = offset + ENTRY_HEADER.size
+                if arena[start:start + key_length] == key:
+                    return slot, slot
+            slot = (slot + 1) & mask
+
+    def _value_at(self, offset: int) -> Any:
+        """Decodes the value of the entry at an arena offset."""
+        tag, key_length, value_length = ENTRY_HEADER.unpack_from(self.arena, offset)
+        start = offset + ENTRY_HEADER.size + key_length
+        data = bytes(self.arena[start:start + value_length])
+        if tag == TAG_BYTES:
+            return data
+        if tag == TAG_STR:
+            return data.decode('utf-8')
+        return pickle.loads(data)
+
+    def _kill(self, offset: int) -> None:
+        """Marks the entry at an arena offset dead."""
+        tag, key_length, value_length = ENTRY_HEADER.unpack_from(self.arena, offset)
+        ENTRY_HEADER.pack_into(self.arena, offset, tag | FLAG_DELETED, key_length, value_length)
+        self.garbage += ENTRY_HEADER.size + key_length + value_length
+
+    def _append(self, tag: int, key: bytes, value: bytes) -> int:
+        """
+        Appends an entry to the arena, growing it if needed.
+
+        Returns:
+            int: The entry's arena offset.
+        """
+        size = ENTRY_HEADER.size + len(key) + len(value)
+        if self.used + size > len(self.arena):
+            # A file is remapped on every resize, so it grows faster than an arena in memory
+            growth = len(self.arena) if self.file is not None else len(self.arena) // 4
+            self._resize_arena(max(len(self.arena) + growth, self.used + size))
+        offset = self.used
+        ENTRY_HEADER.pack_into(self.arena, offset, tag, len(key), len(value))
+        start = offset + ENTRY_HEADER.size
+        self.arena[start:start + len(key)] = key
+        self.arena[start + len(key):start + size - ENTRY_HEADER.size] = value
+        self.used += size
+        self._write_header()
+        return offset
+
+    def _resize_arena(self, size: int) -> None:
+        """Grows or shrinks the arena to a number of bytes, keeping the bytes in use."""
+        if self.file is None:
+            if size > len(self.arena):
+                self.arena.extend(bytes(size - len(self.arena)))
+            else:
+                del self.arena[size:]
+        else:
+            self.arena.flush()
+            self.arena.close()
+            self.file.truncate(size)
+            self.arena = mmap.mmap(self.file.fileno(), 0)
+
+    def _compact(self) -> None:
+        """Moves live entries over dead ones, towards the start of the arena, and rebuilds the index."""
+        write = ARENA_HEADER.size
+        for offset, tag, key_length, value_length in list(self._entries()):
+            size = ENTRY_HEADER.size + key_length + value_length
+            if not tag & FLAG_DELETED:
+                if offset != write:
+                    self.arena[write:write + size] = self.arena[offset:offset + size]
+                write += size
+        self.used = write
+        self._write_header()
+        if self.file is None and len(self.arena) > 4 * self.used:
+            self._resize_arena(2 * self.used)
+        self._rebuild_index()
+
+    @staticmethod
+    def _encode(value: Any) -> Tuple[int, bytes]:
+        """Encodes a value as its tag and bytes."""
+        if isinstance(value, bytes):
+            return TAG_BYTES, value
+        if isinstance(value, str):
+            return TAG_STR, value.encode('utf-8')
+        return TAG_PICKLE, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __getitem__(self, key: str) -> Any:
+        encoded = key.encode('utf-8')
+        with self.lock:
+            slot, _ = self._probe(encoded, zlib.crc32(encoded))
+            if slot < 0:
+                raise KeyError(key)
+            return self._value_at(self.offsets[slot])
+
+    def get(self, key: str, default: Any = None) -> Any:
+        encoded = key.encode('utf-8')
+        with self.lock:
+            slot, _ = self._probe(encoded, zlib.crc32(encoded))
+            return self._value_at(self.offsets[slot]) if slot >= 0 else default
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        encoded = key.encode('utf-8')
+        with self.lock:
+            return self._probe(encoded, zlib.crc32(encoded))[0] >= 0
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        encoded = key.encode('utf-8')
+        key_hash = zlib.crc32(encoded)
+        tag, data = self._encode(value)
+        with self.lock:
+            slot, free = self._probe(encoded, key_hash)
+            offset = self._append(tag, encoded, data)
+            if slot >= 0:
+                self._kill(self.offsets[slot])
+                self.offsets[slot] = offset
+            else:
+                if self.offsets[free] == EMPTY:
+                    self.filled += 1
+                self.offsets[free] = offset
+                self.hashes[free] = key_hash
+                self.count += 1
+            self._maintain()
+
+    def __delitem__(self, key: str) -> None:
+        if self.pop(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
+    def pop(self, key: str, *default: Any) -> Any:
+        encoded = key.encode('utf-8')
+        with self.lock:
+            slot, _ = self._probe(encoded, zlib.crc32(encoded))
+            if slot < 0:
+                if default:
+                    return default[0]
+                raise KeyError(key)
+            offset = self.offsets[slot]
+            value = self._value_at(offset)
+            self._kill(offset)
+            self.offsets[slot] = DELETED
+            self.count -= 1
+            self._maintain()
+            return value
+
+    def _maintain(self) -> None:
+        """Compacts the arena when mostly garbage, and rebuilds the index when too full. Called with the lock held."""
+        if self.garbage > (self.used - ARENA_HEADER.size) // 2 and self.used > 1 << 12:
+            self._compact()
+        elif self.filled > MAX_LOAD * len(self.offsets):
+            self._build_index([(self.hashes[slot], offset) for slot, offset in enumerate(self.offsets) if offset >= 0])
+
+    def __iter__(self) -> Iterator[str]:
+        # Iterates over a copy of the keys, like list(dict), so other threads may write meanwhile
+        with self.lock:
+            keys = []
+            for offset in self.offsets:
+                if offset >= 0:
+                    _, key_length, _ = ENTRY_HEADER.unpack_from(self.arena, offset)
+                    start = offset + ENTRY_HEADER.size
+                    keys.append(bytes(self.arena[start:start + key_length]).decode('utf-8'))
+        return iter(keys)
+
+    def key_batches(self, batch_size: int) -> Iterator[List[str]]:
+        """
+        Yields the keys a batch at a time, decoding each batch under the lock and releasing it in between, so
+        listing a large storage never holds up its readers and writers for long. A key kept in its index slot
+        throughout is yielded at least once: if the index is rebuilt meanwhile, the scan starts over. A key
+        inserted after the scan passed its slot may be missed.
+
+        Args:
+            batch_size (int): The maximum number of keys per batch.
+
+        Yields:
+            List[str]: The next keys.
+        """
+        slot, layout = 0, None
+        while True:
+            with self.lock:
+                if self.layout != layout:
+                    slot, layout = 0, self.layout
+                keys = []
+                while slot < len(self.offsets) and len(keys) < batch_size:
+                    offset = self.offsets[slot]
+                    slot += 1
+                    if offset >= 0:
+                        _, key_length, _ = ENTRY_HEADER.unpack_from(self.arena, offset)
+                        start = offset + ENTRY_HEADER.size
+                        keys.append(bytes(self.arena[start:start + key_length]).decode('utf-8'))
+                done = slot >= len(self.offsets)
+            if keys:
+                yield keys
+            if done:
+                return
+
+    def __len__(self) -> int:
+        return self.count
+
+    def memory_usage(self) -> int:
+        """Returns the bytes held by the arena and the index."""
+        return len(self.arena) + self.offsets.itemsize * len(self.offsets) + self.hashes.itemsize * len(self.hashes)
+
+    def close(self) -> None:
+        """Writes a file-backed arena out and unmaps it; the storage must not be used afterwards."""
+        if self.file is not None:
+            with self.lock:
+                self._write_header()
+                self.arena.flush()
+                self.arena.close()
+                self.file.close()
+                self.file = None
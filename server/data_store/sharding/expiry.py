@@ -0,0 +1,53 @@
+from typing import Any, Optional
+
+
+class ExpiringValue:
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value: Any, expires_at: float) -> None:
+        """
+        Wraps a value stored with an expiry. The expiry travels with the value through transactions, version
+        chains, the commit log and snapshots, so every reader sees a value and its expiry together.
+
+        Args:
+            value (Any): The stored value.
+            expires_at (float): The wall-clock time, as returned by time.time(), at which the key expires.
+        """
+        self.value = value
+        self.expires_at = expires_at
+
+    def __reduce__(self):
+        return ExpiringValue, (self.value, self.expires_at)
+
+    def __repr__(self) -> str:
+        return f"ExpiringValue({self.value!r}, expires_at={self.expires_at})"
+
+
+def live_value(value: Any, now: float) -> Optional[Any]:
+    """
+    Returns a stored value as a reader sees it at a point in time.
+
+    Args:
+        value (Any): The stored value, possibly an ExpiringValue.
+        now (float): The wall-clock time the read happens at.
+
+    Returns:
+        Optional[Any]: The unwrapped value, or None if it had expired by then.
+    """
+    if isinstance(value, ExpiringValue):
+        return value.value if value.expires_at > now else None
+    return value
+
+
+def is_expired(value: Any, now: float) -> bool:
+    """
+    Checks whether a stored value had expired at a point in time.
+
+    Args:
+        value (Any): The stored value, possibly an ExpiringValue.
+        now (float): The wall-clock time to check at.
+
+    Returns:
+        bool: True if the value has an expiry and it has passed.
+    """
+    return isinstance(value, ExpiringValue) and value.expires_at <= now
@@ -0,0 +1,95 @@
+import bisect
+from hashlib import blake2b
+from typing import Any, Dict, List
+
+
+def stable_hash(key: str) -> int:
+    """
+    Hashes a key to a 64-bit integer that is the same in every process, unlike the built-in hash(),
+    which is randomized per process for strings.
+
+    Args:
+        key (str): The key to hash.
+
+    Returns:
+        int: The hash of the key.
+    """
+    return int.from_bytes(blake2b(key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HashRing:
+    def __init__(self, virtual_nodes: int = 64) -> None:
+        """
+        Initializes an empty consistent-hash ring. Each node is placed on the ring at several points
+        (virtual nodes), and a key belongs to the node at the first point at or after the key's hash.
+        Adding or removing a node therefore only moves the keys of the ranges next to its points.
+
+        Args:
+            virtual_nodes (int): The number of points each node is placed at. Default is 64.
+
+        Attributes:
+            tokens (List[int]): The sorted positions of every virtual node.
+            owners (Dict[int, Any]): The node owning each position.
+            names (Dict[Any, str]): The name of each node, from which its positions are derived.
+        """
+        self.virtual_nodes = virtual_nodes
+        self.tokens: List[int] = []
+        self.owners: Dict[int, Any] = {}
+        self.names: Dict[Any, str] = {}
+
+    def add(self, node: Any, name: str) -> None:
+        """
+        Places a node on the ring.
+
+        Args:
+            node (Any): The node to add.
+            name (str): The node's stable name; the same name always maps to the same positions.
+        """
+        self.names[node] = name
+        for index in range(self.virtual_nodes):
+            token = stable_hash(f"{name}#{index}")
+            if token not in self.owners:
+                bisect.insort(self.tokens, token)
+                self.owners[token] = node
+
+    def remove(self, node: Any) -> None:
+        """
+        Takes a node off the ring.
+
+        Args:
+            node (Any): The node to remove.
+        """
+        self.names.pop(node)
+        self.tokens = [token for token in self.tokens if self.owners[token] is not node]
+        self.owners = {token: self.owners[token] for token in self.tokens}
+
+    def get(self, key: str) -> Any:
+        """
+        Returns the node owning a key.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            Any: The node owning the key.
+        """
+        index = bisect.bisect_left(self.tokens, stable_hash(key))
+        if index == len(self.tokens):
+            index = 0
+        return self.owners[self.tokens[index]]
+
+    def copy(self) -> 'HashRing':
+        """
+        Returns an independent copy of the ring.
+
+        Returns:
+            HashRing: The copy.
+        """
+        ring = HashRing(self.virtual_nodes)
+        ring.tokens = list(self.tokens)
+        ring.owners = dict(self.owners)
+        ring.names = dict(self.names)
+        return ring
+
+    def __len__(self) -> int:
+        return len(self.names)
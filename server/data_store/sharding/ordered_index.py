@@ -0,0 +1,167 @@
+from bisect import bisect_left, bisect_right
+from typing import Iterable, Iterator, List, Optional
+
+# Keys per block of the index; a block is split when it grows to twice this size
+BLOCK_SIZE = 512
+# The cursor of a scan that starts at the beginning or has reached the end
+START_CURSOR = '0'
+
+
+class OrderedKeyIndex:
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        """
+        Initializes a sorted index of a shard's keys for range and prefix scans. The keys are kept in a list
+        of sorted blocks, so adding or removing a key moves at most one block's worth of references instead
+        of shifting the whole key list.
+
+        Readers iterate without a lock while a writer updates the index under the transaction manager's lock.
+        Iteration re-locates its position by key for every block, so it never repeats or reorders keys; keys
+        added or removed while a scan runs may or may not be seen.
+
+        Args:
+            keys (Iterable[str]): The keys to start with.
+
+        Attributes:
+            blocks (List[List[str]]): The sorted blocks of keys; every key of a block sorts before the next block's.
+            maxes (List[str]): The last key of each block, to find the block holding a key by bisection.
+            size (int): The number of keys in the index.
+        """
+        keys = sorted(keys)
+        self.blocks: List[List[str]] = [keys[i:i + BLOCK_SIZE] for i in range(0, len(keys), BLOCK_SIZE)]
+        self.maxes: List[str] = [block[-1] for block in self.blocks]
+        self.size = len(keys)
+
+    def add(self, key: str) -> None:
+        """
+        Adds a key to the index, unless it is there already.
+
+        Args:
+            key (str): The key to add.
+        """
+        if not self.blocks:
+            self.blocks.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            return
+        index = min(bisect_left(self.maxes, key), len(self.blocks) - 1)
+        block = self.blocks[index]
+        position = bisect_left(block, key)
+        if position < len(block) and block[position] == key:
+            return
+        block.insert(position, key)
+        self.maxes[index] = block[-1]
+        self.size += 1
+        if len(block) >= 2 * BLOCK_SIZE:
+            # Readers may hold the old block; they re-locate their position in the new ones by key
+            self.blocks[index:index + 1] = [block[:BLOCK_SIZE], block[BLOCK_SIZE:]]
+            self.maxes[index:index + 1] = [block[BLOCK_SIZE - 1], block[-1]]
+
+    def discard(self, key: str) -> None:
+        """
+        Removes a key from the index, if it is there.
+
+        Args:
+            key (str): The key to remove.
+        """
+        index = bisect_left(self.maxes, key)
+        if index == len(self.blocks):
+            return
+        block = self.blocks[index]
+        position = bisect_left(block, key)
+        if position == len(block) or block[position] != key:
+            return
+        del block[position]
+        self.size -= 1
+        if block:
+            self.maxes[index] = block[-1]
+        else:
+            # Shortening maxes first keeps every bisection landing on or before the block it is after
+            del self.maxes[index]
+            del self.blocks[index]
+
+    def keys_from(self, start: str, inclusive: bool = True) -> Iterator[str]:
+        """
+        Iterates over the keys from a starting key on, in order, one block at a time.
+
+        Args:
+            start (str): The key to start at.
+            inclusive (bool): Whether start itself is included. Default is True.
+
+        Yields:
+            str: The keys, in ascending order.
+        """
+        while True:
+            chunk = self._chunk(start, inclusive)
+            if not chunk:
+                return
+            yield from chunk
+            start, inclusive = chunk[-1], False
+
+    def _chunk(self, start: str, inclusive: bool) -> List[str]:
+        """
+        Copies the keys following a key up to the end of their block.
+
+        Args:
+            start (str): The key to continue from.
+            inclusive (bool): Whether start itself is included.
+
+        Returns:
+            List[str]: The keys found, or an empty list if there are none after start.
+        """
+        bisect = bisect_left if inclusive else bisect_right
+        blocks = self.blocks
+        index = bisect(self.maxes, start)
+        # A block's max may lag behind a concurrent removal; the following block then holds the next keys
+        while index < len(blocks):
+            block = blocks[index]
+            position = bisect(block, start)
+            if position < len(block):
+                return block[position:]
+            index += 1
+        return []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key: str) -> bool:
+        index = bisect_left(self.maxes, key)
+        if index == len(self.blocks):
+            return False
+        block = self.blocks[index]
+        position = bisect_left(block, key)
+        return position < len(block) and block[position] == key
+
+
+def encode_cursor(key: Optional[str]) -> str:
+    """
+    Encodes the last key a scan page returned as the cursor of the next page.
+
+    Args:
+        key (Optional[str]): The last key returned, or None if the scan has reached the end.
+
+    Returns:
+        str: The cursor: the hex-encoded key, or START_CURSOR at the end. Hex is never odd-length, so a
+        cursor can never be mistaken for START_CURSOR.
+    """
+    return START_CURSOR if key is None else key.encode('utf-8').hex()
+
+
+def decode_cursor(cursor: str) -> Optional[str]:
+    """
+    Decodes a scan cursor.
+
+    Args:
+        cursor (str): A cursor returned by encode_cursor.
+
+    Returns:
+        Optional[str]: The key the scan continues after, or None to start at the beginning.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if cursor == START_CURSOR:
+        return None
+    try:
+        return bytes.fromhex(cursor).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor '{cursor}'")
@@ -1,6 +1,309 @@
-from typing import Dict, Any
+import heapq
+import random
+import time
+from typing import Dict, Any, Iterable, Iterator, List, MutableMapping, Optional, Tuple
+from server.data_store.eviction.memory_limit import LFU_INITIAL, estimate_size, lfu_increment
+from server.data_store.sharding.compact_storage import CompactStorage
+from server.data_store.sharding.expiry import ExpiringValue, is_expired
+from server.data_store.sharding.ordered_index import OrderedKeyIndex
+
+# Marks a version in which the key was deleted
+TOMBSTONE = object()
+
 
 class Shard:
-    def __init__(self) -> None:
-        """Initializes the storage for the shard."""
-        self.storage: Dict[str, Any] = {}
+    def __init__(self, name: Optional[str] = None, storage: Optional[MutableMapping[str, Any]] = None,
+                 ordered: bool = False) -> None:
+        """
+        Initializes the storage for the shard.
+
+        Args:
+            name (Optional[str]): The shard's stable name, which fixes its place on the hash ring.
+                Defaults to a name assigned by the ShardingManager from the shard's position.
+            storage (Optional[MutableMapping[str, Any]]): The backend holding the latest values, e.g. a
+                CompactStorage for large datasets. Defaults to a dict.
+            ordered (bool): Whether to keep a sorted index of the keys for range and prefix scans. Default is False.
+
+        Attributes:
+            storage (MutableMapping[str, Any]): The latest committed value of every key in the shard.
+            history (Dict[str, List[Tuple[int, Any]]]): Version chains of (commit timestamp, value), oldest first,
+                kept only for keys overwritten while an older snapshot was still active.
+            expiry_heap (List[Tuple[float, str]]): (expiry time, key) of every value stored with an expiry, soonest
+                first. Entries of keys overwritten or deleted since are skipped when they come up.
+            memory_usage (int): The estimated size in bytes of the latest values, kept up to date by every change.
+            track_access (Optional[str]): The access statistic kept for eviction: 'lru' for the time of the last
+                access, 'lfu' for a logarithmic access counter, or None to keep none.
+            access (Dict[str, float]): The access statistic of every key accessed since it was tracked.
+            sample_pool (List[str]): Shuffled keys handed out by sample_keys; refilled once used up.
+            index (Optional[OrderedKeyIndex]): The sorted index of the keys in storage, if the shard keeps one.
+            versions (Dict[str, int]): The commit timestamp of the latest value of every key written since the
+                shard was created or restored, used as the key's version by compare-and-set.
+            arrivals (Optional[set]): Keys added to storage or history while a migration lists the shard's keys,
+                which the listing may have missed; None when no migration is listing them.
+        """
+        self.name = name
+        self.storage: MutableMapping[str, Any] = storage if storage is not None else {}
+        self.history: Dict[str, List[Tuple[int, Any]]] = {}
+        self.expiry_heap: List[Tuple[float, str]] = []
+        if isinstance(self.storage, CompactStorage) and (self.storage.size_estimate or not self.storage):
+            # Saved by the shard that last closed the storage, so reopening a file decodes no values
+            self.memory_usage = self.storage.size_estimate
+        else:
+            self.memory_usage = sum(estimate_size(key, value) for key, value in self.storage.items())
+        self.track_access: Optional[str] = None
+        self.access: Dict[str, float] = {}
+        self.sample_pool: List[str] = []
+        self.index: Optional[OrderedKeyIndex] = OrderedKeyIndex(self.storage) if ordered else None
+        self.versions: Dict[str, int] = {}
+        self.arrivals: Optional[set] = None
+
+    def apply(self, writes: Dict[str, Any], deletes: Iterable[str], commit_timestamp: Optional[int] = None,
+              retain_versions: bool = False) -> None:
+        """
+        Applies a batch of writes and deletions to the shard's storage.
+
+        Args:
+            writes (Dict[str, Any]): Key-value pairs to store in this shard.
+            deletes (Iterable[str]): Keys to remove from this shard.
+            commit_timestamp (Optional[int]): The commit timestamp of the batch. None leaves version chains and
+                key versions untouched.
+            retain_versions (bool): Whether older snapshots are active and need the overwritten values kept.
+        """
+        if commit_timestamp is not None:
+            if retain_versions:
+                # Publish the new version chains before the values so lock-free readers never miss a version
+                for key, value in writes.items():
+                    self._add_version(key, commit_timestamp, value)
+                for key in deletes:
+                    self._add_version(key, commit_timestamp, TOMBSTONE)
+            else:
+                for key in writes:
+                    self.history.pop(key, None)
+                for key in deletes:
+                    self.history.pop(key, None)
+        for key, value in writes.items():
+            previous = self.storage.get(key, TOMBSTONE)
+            self.storage[key] = value
+            self.memory_usage += estimate_size(key, value)
+            if previous is not TOMBSTONE:
+                self.memory_usage -= estimate_size(key, previous)
+            else:
+                if self.index is not None:
+                    self.index.add(key)
+                if self.arrivals is not None:
+                    self.arrivals.add(key)
+            if isinstance(value, ExpiringValue):
+                heapq.heappush(self.expiry_heap, (value.expires_at, key))
+            if self.track_access:
+                self.touch(key)
+        for key in deletes:
+            previous = self.storage.pop(key, TOMBSTONE)
+            if previous is not TOMBSTONE:
+                self.memory_usage -= estimate_size(key, previous)
+                if self.index is not None:
+                    self.index.discard(key)
+            self.access.pop(key, None)
+        if commit_timestamp is not None:
+            for key in writes:
+                self.versions[key] = commit_timestamp
+            for key in deletes:
+                self.versions.pop(key, None)
+
+    def _add_version(self, key: str, commit_timestamp: int, value: Any) -> None:
+        """
+        Appends a version to a key's chain. Chains are replaced rather than mutated so readers can walk them without a lock.
+
+        Args:
+            key (str): The key being written.
+            commit_timestamp (int): The commit timestamp of the new version.
+            value (Any): The new value, or TOMBSTONE for a deletion.
+        """
+        chain = self.history.get(key)
+        if chain is None:
+            # The current value predates every active snapshot
+            chain = [(0, self.storage.get(key, TOMBSTONE))]
+            if self.arrivals is not None:
+                self.arrivals.add(key)
+        self.history[key] = chain + [(commit_timestamp, value)]
+
+    def key_batches(self, batch_size: int) -> Iterator[List[str]]:
+        """
+        Yields the keys of the latest values and then of the version chains, listed lazily a batch at a time.
+        A compact storage decodes one batch of keys at a time; a dict's keys are copied at once, which needs
+        no decoding. Keys added meanwhile may be missed, which arrivals makes up for.
+
+        Args:
+            batch_size (int): The maximum number of keys per batch.
+
+        Yields:
+            List[str]: The next keys.
+        """
+        if isinstance(self.storage, CompactStorage):
+            yield from self.storage.key_batches(batch_size)
+        else:
+            keys = list(self.storage)
+            for start in range(0, len(keys), batch_size):
+                yield keys[start:start + batch_size]
+        keys = list(self.history)
+        for start in range(0, len(keys), batch_size):
+            yield keys[start:start + batch_size]
+
+    def move_key(self, key: str, target: 'Shard') -> None:
+        """
+        Moves a key's latest value and version chain to another shard.
+
+        Args:
+            key (str): The key to move.
+            target (Shard): The shard taking over the key.
+        """
+        # Copy before removing, so a lock-free reader finds the key in at least one of the shards
+        if key in self.history:
+            target.history[key] = self.history[key]
+        if key in self.storage:
+            value = self.storage[key]
+            target.storage[key] = value
+            if target.index is not None:
+                target.index.add(key)
+            size = estimate_size(key, value)
+            target.memory_usage += size
+            self.memory_usage -= size
+            if isinstance(value, ExpiringValue):
+                heapq.heappush(target.expiry_heap, (value.expires_at, key))
+            if key in self.access:
+                target.access[key] = self.access[key]
+            if key in self.versions:
+                target.versions[key] = self.versions[key]
+        self.storage.pop(key, None)
+        if self.index is not None:
+            self.index.discard(key)
+        self.history.pop(key, None)
+        self.access.pop(key, None)
+        self.versions.pop(key, None)
+
+    def read(self, key: str, snapshot_timestamp: int) -> Optional[Any]:
+        """
+        Reads the value of a key as of a snapshot, without taking any lock.
+
+        Args:
+            key (str): The key to read.
+            snapshot_timestamp (int): The commit timestamp the reader's snapshot was taken at.
+
+        Returns:
+            Optional[Any]: The value visible to the snapshot, or None if the key did not exist.
+        """
+        value = self.storage.get(key)
+        chain = self.history.get(key)
+        if chain is None:
+            return value
+        for commit_timestamp, version in reversed(chain):
+            if commit_timestamp <= snapshot_timestamp:
+                return None if version is TOMBSTONE else version
+        return None
+
+    def last_commit_timestamp(self, key: str) -> int:
+        """
+        Returns the commit timestamp of the latest version of a key, or 0 if it predates every active snapshot.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            int: The commit timestamp of the key's latest version.
+        """
+        chain = self.history.get(key)
+        return chain[-1][0] if chain else 0
+
+    def version(self, key: str) -> int:
+        """
+        Returns the version of a key's latest value: the commit timestamp that wrote it, or 0 if the key does not
+        exist. A key deleted and written again gets a new, higher version.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            int: The key's version.
+        """
+        return self.versions.get(key, 0)
+
+    def prune_history(self, horizon: int) -> None:
+        """
+        Drops versions that no active snapshot can see any more.
+
+        Args:
+            horizon (int): The commit timestamp of the oldest active snapshot.
+        """
+        for key, chain in list(self.history.items()):
+            visible = 0
+            for index, (commit_timestamp, _) in enumerate(chain):
+                if commit_timestamp <= horizon:
+                    visible = index
+            if visible == len(chain) - 1:
+                del self.history[key]
+            elif visible:
+                self.history[key] = chain[visible:]
+
+    def due_keys(self, now: float, limit: int) -> List[str]:
+        """
+        Takes keys whose latest value has expired off the expiry heap.
+
+        Args:
+            now (float): The current wall-clock time.
+            limit (int): The maximum number of heap entries to look at.
+
+        Returns:
+            List[str]: The expired keys found.
+        """
+        keys = []
+        for _ in range(limit):
+            if not self.expiry_heap or self.expiry_heap[0][0] > now:
+                break
+            _, key = heapq.heappop(self.expiry_heap)
+            if is_expired(self.storage.get(key), now) and key not in keys:
+                keys.append(key)
+        return keys
+
+    def touch(self, key: str) -> None:
+        """
+        Records an access to a key for the eviction policy, if it needs one.
+
+        Args:
+            key (str): The key read or written.
+        """
+        if self.track_access == 'lru':
+            self.access[key] = time.monotonic()
+        elif self.track_access == 'lfu':
+            self.access[key] = lfu_increment(self.access.get(key, LFU_INITIAL), random.random())
+
+    def sample_keys(self, count: int) -> List[str]:
+        """
+        Returns keys picked at random, for eviction policies that approximate their order by sampling.
+        Keys are drawn from a shuffled copy of the key set that is refilled once used up, which costs
+        O(1) per key on average; keys added since the last refill are not drawn until the next one.
+
+        Args:
+            count (int): The number of keys wanted.
+
+        Returns:
+            List[str]: Up to count keys currently in the shard.
+        """
+        keys = []
+        while len(keys) < count:
+            if not self.sample_pool:
+                if not self.storage:
+                    break
+                self.sample_pool = list(self.storage)
+                random.shuffle(self.sample_pool)
+            key = self.sample_pool.pop()
+            if key in self.storage:
+                keys.append(key)
+        return keys
+
+    def close(self) -> None:
+        """
+        Releases the storage backend's resources, e.g. the mapped file of a CompactStorage, which keeps the
+        shard's memory estimate for when it is reopened.
+        """
+        if isinstance(self.storage, CompactStorage):
+            self.storage.size_estimate = self.memory_usage
+            self.storage.close()
@@ -1,18 +1,56 @@
-from typing import List, Dict, Any
+from collections import deque
+from typing import List, Dict, Any, Deque, Iterable, Iterator, Optional, Tuple
+from server.data_store.sharding.hash_ring import HashRing
 from server.data_store.sharding.shard import Shard
 
 class ShardingManager:
-    def __init__(self, shards: List[Shard]) -> None:
+    def __init__(self, shards: List[Shard], virtual_nodes: int = 64) -> None:
         """
-        Initializes the ShardingManager with a given list of shards.
+        Initializes the ShardingManager with a given list of shards, placed on a consistent-hash ring.
 
         Args:
             shards (List[Shard]): The list of Shard objects that will handle data storage.
+            virtual_nodes (int): The number of points each shard is placed at on the ring. Default is 64.
 
         Attributes:
-            shards (List[Shard]): A list of Shard objects used for sharding the data.
+            shards (List[Shard]): A list of Shard objects used for sharding the data, including shards
+                being removed until their keys have moved.
+            ring (HashRing): Maps each key to the shard owning it once any migration is done.
+            previous_ring (Optional[HashRing]): The ring before the last shard was added or removed,
+                while keys are still migrating; None otherwise.
+            leaving (List[Shard]): Shards being removed, dropped from shards once migration completes.
+            migration_sources (Deque[Shard]): Each shard that may hold keys owned elsewhere and whose keys
+                are still to be listed.
+            migration_keys (Optional[Iterator[List[str]]]): The batches of keys of the first migration source,
+                listed lazily as the migration goes.
         """
-        self.shards = shards
+        self.shards: List[Shard] = []
+        self.ring = HashRing(virtual_nodes)
+        self.previous_ring: Optional[HashRing] = None
+        self.leaving: List[Shard] = []
+        self.migration_sources: Deque[Shard] = deque()
+        self.migration_keys: Optional[Iterator[List[str]]] = None
+        self.next_shard_number = 0
+        for shard in shards:
+            self._name(shard)
+            self.ring.add(shard, shard.name)
+            self.shards.append(shard)
+
+    def _name(self, shard: Shard) -> None:
+        """
+        Names a shard after its position if it has no name yet.
+
+        Args:
+            shard (Shard): The shard to name.
+
+        Raises:
+            ValueError: If another shard already has the same name.
+        """
+        if shard.name is None:
+            shard.name = f"shard-{self.next_shard_number}"
+            self.next_shard_number += 1
+        if any(other.name == shard.name for other in self.shards):
+            raise ValueError(f"A shard named '{shard.name}' already exists")
 
     def get_shard(self, key: str) -> Shard:
         """
@@ -24,8 +62,172 @@ class ShardingManager:
         Returns:
             Shard: The shard object responsible for the given key.
         """
-        shard_id = hash(key) % len(self.shards)
-        return self.shards[shard_id]
+        shard = self.ring.get(key)
+        previous_ring = self.previous_ring
+        if previous_ring is not None:
+            # While keys migrate, a key stays with its previous owner until it has been moved
+            owner = previous_ring.get(key)
+            if owner is not shard and (key in owner.storage or key in owner.history):
+                return owner
+        return shard
+
+    def group_by_shard(self, keys: Iterable[str]) -> Dict[Shard, List[str]]:
+        """
+        Groups keys by the shard responsible for each of them.
+
+        Args:
+            keys (Iterable[str]): The keys to group.
+
+        Returns:
+            Dict[Shard, List[str]]: A mapping of each owning shard to the keys it is responsible for.
+        """
+        groups: Dict[Shard, List[str]] = {}
+        for key in keys:
+            groups.setdefault(self.get_shard(key), []).append(key)
+        return groups
+
+    @property
+    def migrating(self) -> bool:
+        """bool: Whether keys are still moving after a shard was added or removed."""
+        return self.previous_ring is not None
+
+    def add_shard(self, shard: Shard) -> None:
+        """
+        Adds a shard to the ring. It takes over the key ranges next to its points, which are then moved
+        to it by migrate(); until a key has moved, it is still served by its previous owner.
+
+        Args:
+            shard (Shard): The shard to add.
+
+        Raises:
+            RuntimeError: If the previous migration has not completed yet.
+        """
+        if self.migrating:
+            raise RuntimeError("Cannot add a shard while keys are still migrating")
+        self._name(shard)
+        ring = self.ring.copy()
+        ring.add(shard, shard.name)
+        self._swap_ring(ring)
+        self.shards.append(shard)
+        self._start_listing([source for source in self.shards if source is not shard])
+
+    def remove_shard(self, shard: Shard) -> None:
+        """
+        Removes a shard from the ring. Its keys are moved to their new owners by migrate(); the shard
+        keeps serving the keys it still holds until then.
+
+        Args:
+            shard (Shard): The shard to remove.
+
+        Raises:
+            RuntimeError: If the previous migration has not completed yet.
+            ValueError: If the shard is not on the ring or is the last one.
+        """
+        if self.migrating:
+            raise RuntimeError("Cannot remove a shard while keys are still migrating")
+        if shard not in self.ring.names:
+            raise ValueError(f"Shard '{shard.name}' is not on the ring")
+        if len(self.ring) == 1:
+            raise ValueError("Cannot remove the last shard")
+        ring = self.ring.copy()
+        ring.remove(shard)
+        self._swap_ring(ring)
+        self.leaving.append(shard)
+        self._start_listing([shard])
+
+    def _start_listing(self, sources: List[Shard]) -> None:
+        """
+        Queues the shards whose keys must be checked. Their keys are listed later, by next_migration_batch, so
+        changing the ring costs no pass over the keyspace; keys added to them from now on are noted as arrivals.
+
+        Args:
+            sources (List[Shard]): The shards that may hold keys owned elsewhere.
+        """
+        for source in sources:
+            source.arrivals = set()
+        self.migration_sources = deque(sources)
+        self.migration_keys = None
+
+    def _swap_ring(self, ring: HashRing) -> None:
+        """
+        Replaces the ring with a changed copy, keeping the current one as the previous ring. Rings are never
+        changed in place, so lock-free readers always see a consistent ring.
+
+        Args:
+            ring (HashRing): The new ring.
+        """
+        # Publish the previous ring first, so a reader seeing the new ring also sees where unmoved keys are
+        self.previous_ring = self.ring
+        self.ring = ring
+
+    def next_migration_batch(self, batch_size: int = 1000) -> Optional[Tuple[Shard, List[str]]]:
+        """
+        Lists the next batch of keys to check, from the first migration source that has any left. Called
+        by the migration thread without the transaction manager's lock, so listing the keyspace never holds
+        up commits; keys listed may be gone or moved by the time they are checked.
+
+        Args:
+            batch_size (int): The maximum number of keys in the batch.
+
+        Returns:
+            Optional[Tuple[Shard, List[str]]]: The source and the keys to check, or None once every source
+                has been listed.
+        """
+        while self.migration_sources:
+            if self.migration_keys is None:
+                self.migration_keys = self.migration_sources[0].key_batches(batch_size)
+            keys = next(self.migration_keys, None)
+            if keys is not None:
+                return self.migration_sources[0], keys
+            self.migration_sources.popleft()
+            self.migration_keys = None
+        return None
+
+    def migrate(self, batch: Optional[Tuple[Shard, List[str]]], batch_size: int = 1000) -> bool:
+        """
+        Moves a batch of keys listed by next_migration_batch to the shards that own them on the current ring.
+        Once every source has been listed, checks the keys that arrived at the sources meanwhile, batch_size
+        at a time, and completes the migration when none are left. Must be called with the transaction
+        manager's lock held, so no commit writes a key while it moves.
+
+        Args:
+            batch (Optional[Tuple[Shard, List[str]]]): The source and keys to check, or None once every
+                source has been listed.
+            batch_size (int): The maximum number of arrivals to check in this step.
+
+        Returns:
+            bool: True once every key has moved and the migration is complete.
+        """
+        if batch is not None:
+            self._move_keys(*batch)
+            return False
+        for source in self.shards:
+            if source.arrivals:
+                keys = [source.arrivals.pop() for _ in range(min(batch_size, len(source.arrivals)))]
+                self._move_keys(source, keys)
+                return False
+
+        for shard in self.shards:
+            shard.arrivals = None
+        self.previous_ring = None
+        for shard in self.leaving:
+            self.shards.remove(shard)
+        self.leaving.clear()
+        return True
+
+    def _move_keys(self, source: Shard, keys: List[str]) -> None:
+        """
+        Moves those of the keys still in a shard that another shard owns on the current ring.
+
+        Args:
+            source (Shard): The shard the keys were listed from.
+            keys (List[str]): The keys to check.
+        """
+        for key in keys:
+            if key in source.storage or key in source.history:
+                target = self.ring.get(key)
+                if target is not source:
+                    source.move_key(key, target)
 
     def get_all_storages(self) -> Dict[str, Any]:
         """
@@ -1,8 +1,20 @@
+import time
 from typing import Any, Dict, Optional, List
 from enum import Enum
 from threading import RLock
 from server.data_store.concurrency.locking import Lock, LockType
-from server.data_store.sharding.shard import Shard
+from server.data_store.sharding.sharding_manager import ShardingManager
+
+
+class WriteConflictError(Exception):
+    """Raised when a transaction writes a key that another transaction committed after its snapshot was taken."""
+
+
+class TransactionAbortedError(Exception):
+    """
+    Raised when a transaction is no longer active: it spanned several shard workers and could not be
+    committed, it was rolled back after sitting idle, or it already finished.
+    """
 
 
 class Transaction:
@@ -15,10 +27,30 @@ class Transaction:
             changes (Dict[str, Any]): A dictionary of key-value changes made in this transaction.
             deleted_keys (set): A set of keys that have been deleted in this transaction.
             pre_commit_state (Dict[str, Any]): A dictionary to keep track of the state before any changes.
+            held_locks (Dict[str, Lock]): The locks this transaction currently holds, keyed by the locked key.
+            start_timestamp (Optional[int]): The commit timestamp of the snapshot this transaction reads from,
+                or None once it was committed or rolled back.
+            start_time (Optional[float]): The wall-clock time the snapshot was taken at; expiries are judged
+                as of this time, so a key never expires in the middle of the transaction.
+            last_active (float): The wall-clock time of the transaction's latest operation, to find idle ones.
+            optimistic (bool): Whether the transaction writes without locks and is validated when it commits,
+                as it is from its first WATCH on.
+            watched (set): The keys the transaction watches; it aborts on commit if any of them changed since its snapshot.
+            validated (bool): Whether an optimistic transaction passed validation and holds the locks of its keys.
+            reserved_memory (int): The bytes of the memory budget reserved for its writes until it commits or
+                rolls back.
         """
         self.changes: Dict[str, Any] = {}
         self.deleted_keys: set = set()
         self.pre_commit_state: Dict[str, Any] = {}
+        self.held_locks: Dict[str, Lock] = {}
+        self.start_timestamp: Optional[int] = None
+        self.start_time: Optional[float] = None
+        self.last_active = time.time()
+        self.optimistic = False
+        self.watched: set = set()
+        self.validated = False
+        self.reserved_memory = 0
 
     def get(self, key: str, transaction_id: int) -> Optional[Any]:
         """
@@ -71,32 +103,40 @@ class Transaction:
         self.deleted_keys.clear()
         self.pre_commit_state.clear()
 
-    def commit(self, shards: List[Shard]) -> None:
+    def commit(self, sharding_manager: ShardingManager, commit_timestamp: int = 0,
+               retain_versions: bool = False) -> None:
         """
-        Commits all the changes and deletions made in this transaction to the given shards.
+        Commits all the changes and deletions made in this transaction, writing each key only
+        to the shard that owns it.
 
         Args:
-            shards (List[Shard]): The list of shards to which the changes should be committed.
+            sharding_manager (ShardingManager): Routes each key to its owning shard.
+            commit_timestamp (int): The commit timestamp given to the new versions.
+            retain_versions (bool): Whether the overwritten versions must be kept for other active snapshots.
         """
-        for shard in shards:
-            for key, value in self.changes.items():
-                shard.storage[key] = value
-            for key in self.deleted_keys:
-                shard.storage.pop(key, None)
+        keys = list(self.changes) + list(self.deleted_keys)
+        for shard, shard_keys in sharding_manager.group_by_shard(keys).items():
+            writes = {key: self.changes[key] for key in shard_keys if key in self.changes}
+            deletes = [key for key in shard_keys if key in self.deleted_keys]
+            shard.apply(writes, deletes, commit_timestamp, retain_versions)
         self.changes.clear()
         self.deleted_keys.clear()
         self.pre_commit_state.clear()
 
-    def undo(self, shards: List[Shard]) -> None:
+    def undo(self, sharding_manager: ShardingManager) -> None:
         """
         Undoes all the changes and deletions made in this transaction, reverting to the original state.
 
         Args:
-            shards (List[Shard]): The list of shards from which the changes should be undone.
+            sharding_manager (ShardingManager): Routes each key to its owning shard.
         """
-        for shard in shards:
-            for key, value in self.pre_commit_state.items():
+        for shard, shard_keys in sharding_manager.group_by_shard(self.pre_commit_state).items():
+            writes = {}
+            deletes = []
+            for key in shard_keys:
+                value = self.pre_commit_state[key]
                 if value is not None:
-                    shard.storage[key] = value
+                    writes[key] = value
                 else:
-                    shard.storage.pop(key, None)
+                    deletes.append(key)
+            shard.apply(writes, deletes)
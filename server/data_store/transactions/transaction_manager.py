@@ -1,24 +1,52 @@
-from typing import Any, Dict, Optional, List
+import itertools
+import time
+from typing import Any, Dict, Optional, List, Tuple
 from threading import RLock
-from server.data_store.concurrency.locking import Lock, LockType
+from server.data_store.concurrency.deadlock import WaitForGraph
+from server.data_store.concurrency.locking import LockType, StripedLockTable
+from server.data_store.persistence.append_only_log import AppendOnlyLog
 from server.data_store.sharding.shard import Shard
-from server.data_store.transactions.transaction import Transaction
+from server.data_store.sharding.sharding_manager import ShardingManager
+from server.data_store.transactions.transaction import Transaction, TransactionAbortedError
 
 
 class TransactionManager:
-    def __init__(self) -> None:
+    def __init__(self, num_lock_stripes: int = 64, lock_timeout: Optional[float] = 5.0,
+                 commit_log: Optional[AppendOnlyLog] = None) -> None:
         """
-        Initializes the TransactionManager with an empty list of transactions and locks.
+        Initializes the TransactionManager with an empty list of transactions and locks. A transaction is
+        removed once it commits or rolls back, so the list only ever holds active transactions.
+
+        Args:
+            num_lock_stripes (int): The number of stripes the lock table is partitioned into. Default is 64.
+            lock_timeout (Optional[float]): Default number of seconds to wait for a conflicting lock. None waits indefinitely.
+            commit_log (Optional[AppendOnlyLog]): Log that receives a record of every commit that changed data.
 
         Attributes:
             current_transaction_id (int): The current transaction ID, incremented each time a new transaction starts.
-            transactions (dict): A dictionary mapping transaction IDs to Transaction objects.
-            locks (dict): A dictionary mapping keys to Lock objects.
-            lock (RLock): A reentrant lock for synchronizing access to transactions and locks.
+            transactions (dict): A dictionary mapping the IDs of the active transactions to Transaction objects.
+            lock_table (StripedLockTable): The per-key locks, partitioned into independently locked stripes.
+            deadlock_detector (WaitForGraph): Tracks waiting transactions and picks deadlock victims.
+            commit_timestamp (int): The timestamp of the latest fully applied commit; new snapshots read as of it.
+            active_snapshots (Dict[int, int]): Maps transaction IDs with an open snapshot, and the negative IDs of
+                open read views, to their start timestamp.
+            read_view_ids (Iterator[int]): Negative IDs for read views, which never collide with transaction IDs.
+            gc_horizon (int): The horizon up to which old versions were last garbage-collected.
+            key_owners (Dict[str, int]): Maps every key with an uncommitted change to the transaction that made it.
+                Only the holder of a key's WRITE lock can change it, so a key has at most one owner.
+            lock (RLock): A reentrant lock for synchronizing commits and rollbacks of transactions.
         """
         self.current_transaction_id = 0
         self.transactions = {}
-        self.locks = {}
+        self.commit_timestamp = 0
+        self.active_snapshots: Dict[int, int] = {}
+        self.read_view_ids = itertools.count(-1, -1)
+        self.gc_horizon = 0
+        self.key_owners: Dict[str, int] = {}
+        self.lock_table = StripedLockTable(num_lock_stripes)
+        self.lock_timeout = lock_timeout
+        self.deadlock_detector = WaitForGraph()
+        self.commit_log = commit_log
         self.lock = RLock()
 
     def begin(self) -> int:
@@ -28,10 +56,135 @@ class TransactionManager:
         Returns:
             int: The ID of the new transaction.
         """
-        transaction_id = self._generate_transaction_id()
-        self.transactions[transaction_id] = Transaction()
+        with self.lock:
+            transaction_id = self._generate_transaction_id()
+            self.transactions[transaction_id] = Transaction()
+            self._start_snapshot(transaction_id)
         return transaction_id
 
+    def get_active(self, transaction_id: int) -> Transaction:
+        """
+        Returns an active transaction for an operation, marking it as used now.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+
+        Returns:
+            Transaction: The transaction.
+
+        Raises:
+            TransactionAbortedError: If the transaction already committed, rolled back or was reaped.
+        """
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None:
+            raise TransactionAbortedError(f"Transaction {transaction_id} is not active")
+        transaction.last_active = time.time()
+        return transaction
+
+    def snapshot_timestamp(self, transaction_id: int) -> int:
+        """
+        Returns the timestamp of the snapshot a transaction reads from.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+
+        Returns:
+            int: The commit timestamp the transaction's reads are served as of.
+
+        Raises:
+            TransactionAbortedError: If the transaction is not active.
+        """
+        return self.get_active(transaction_id).start_timestamp
+
+    def active_count(self) -> int:
+        """
+        Returns the number of active transactions, in O(1).
+
+        Returns:
+            int: The number of transactions that have begun and not yet committed or rolled back.
+        """
+        return len(self.transactions)
+
+    def idle_transactions(self, idle_timeout: float) -> List[int]:
+        """
+        Lists the transactions that have not been used for a while.
+
+        Args:
+            idle_timeout (float): Seconds since a transaction's latest operation after which it is idle.
+
+        Returns:
+            List[int]: The IDs of the idle transactions.
+        """
+        deadline = time.time() - idle_timeout
+        return [transaction_id for transaction_id, transaction in list(self.transactions.items())
+                if transaction.last_active < deadline]
+
+    def _start_snapshot(self, transaction_id: int) -> None:
+        """
+        Opens a snapshot for a transaction as of the latest commit. Must be called with the lock held.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+        """
+        self.transactions[transaction_id].start_time = time.time()
+        self.transactions[transaction_id].start_timestamp = self.commit_timestamp
+        self.active_snapshots[transaction_id] = self.commit_timestamp
+
+    def open_read_view(self) -> Tuple[int, int]:
+        """
+        Opens a snapshot as of the latest commit that is not a transaction: it keeps the versions it can see
+        from garbage collection, but is neither counted as an active transaction nor rolled back when idle.
+
+        Returns:
+            Tuple[int, int]: The read view's ID, to be passed to close_read_view, and the commit timestamp
+            it reads as of.
+        """
+        with self.lock:
+            view_id = next(self.read_view_ids)
+            self.active_snapshots[view_id] = self.commit_timestamp
+        return view_id, self.active_snapshots[view_id]
+
+    def close_read_view(self, view_id: int) -> None:
+        """
+        Closes a read view, so the versions only it could see become garbage.
+
+        Args:
+            view_id (int): The ID returned by open_read_view.
+        """
+        with self.lock:
+            self.active_snapshots.pop(view_id, None)
+
+    def _finish(self, transaction_id: int) -> None:
+        """
+        Forgets a committed or rolled back transaction: closes its snapshot so the versions only it could see
+        become garbage, and releases its locks. It is removed before its locks are released, so an
+        acquire_lock racing with the removal sees that the transaction is gone and gives up its new lock.
+
+        Args:
+            transaction_id (int): The ID of the transaction.
+        """
+        transaction = self.transactions.pop(transaction_id)
+        transaction.start_timestamp = None
+        transaction.start_time = None
+        self.active_snapshots.pop(transaction_id, None)
+        self._release_locks(transaction_id, transaction)
+
+    def collect_garbage(self, sharding_manager: ShardingManager) -> None:
+        """
+        Drops old versions that no active snapshot can see any more. Does nothing while the oldest snapshot is unchanged.
+
+        Args:
+            sharding_manager (ShardingManager): Provides the shards holding the version chains.
+        """
+        with self.lock:
+            horizon = min(self.active_snapshots.values(), default=self.commit_timestamp)
+            if horizon == self.gc_horizon:
+                return
+            self.gc_horizon = horizon
+            for shard in sharding_manager.shards:
+                if shard.history:
+                    shard.prune_history(horizon)
+
     def _generate_transaction_id(self) -> int:
         """
         Generates a new unique transaction ID and returns it.
@@ -42,23 +195,63 @@ class TransactionManager:
         self.current_transaction_id += 1
         return self.current_transaction_id
 
-    def commit(self, transaction_id: int, shards: List[Shard]) -> None:
+    def commit(self, transaction_id: int, sharding_manager: ShardingManager) -> Optional[int]:
         """
-        Commits a transaction.
+        Commits a transaction and removes it. With a commit log, the transaction's changes are only queued
+        for the log here; the caller waits for them to become durable after releasing the lock.
 
         Args:
             transaction_id (int): The ID of the transaction to commit.
-            shards (List[Shard]): The list of shards affected by the transaction.
+            sharding_manager (ShardingManager): Routes each changed key to its owning shard.
+
+        Returns:
+            Optional[int]: The sequence number of the transaction's log record, or None if nothing was logged.
         """
+        sequence = None
         with self.lock:
             transaction = self.transactions.get(transaction_id)
             if transaction:
-                transaction.commit(shards)
-                self._release_locks(transaction_id)
+                if transaction.changes or transaction.deleted_keys:
+                    commit_timestamp = self.commit_timestamp + 1
+                    if self.commit_log is not None:
+                        # Copied because committing clears the transaction's changes
+                        sequence = self.commit_log.append(commit_timestamp, dict(transaction.changes),
+                                                          list(transaction.deleted_keys))
+                    retain_versions = len(self.active_snapshots) > (transaction_id in self.active_snapshots)
+                    transaction.commit(sharding_manager, commit_timestamp, retain_versions)
+                    # Published only once every shard is written, so new snapshots never see a partial commit
+                    self.commit_timestamp = commit_timestamp
+                else:
+                    transaction.commit(sharding_manager)
+                self._finish(transaction_id)
+        return sequence
+
+    def autocommit(self, shard: Shard, writes: Dict[str, Any], deletes: List[str]) -> Optional[int]:
+        """
+        Commits writes to one shard outside any transaction. They get a commit timestamp and a log record like
+        a transaction's changes, but no Transaction, snapshot or lock bookkeeping. The caller holds the WRITE
+        lock of every written key, so no transaction has uncommitted changes to them.
+
+        Args:
+            shard (Shard): The shard owning the keys, looked up under the lock.
+            writes (Dict[str, Any]): Key-value pairs to store.
+            deletes (List[str]): Keys to remove.
+
+        Returns:
+            Optional[int]: The sequence number of the log record, or None if nothing was logged.
+        """
+        sequence = None
+        with self.lock:
+            commit_timestamp = self.commit_timestamp + 1
+            if self.commit_log is not None:
+                sequence = self.commit_log.append(commit_timestamp, writes, deletes)
+            shard.apply(writes, deletes, commit_timestamp, bool(self.active_snapshots))
+            self.commit_timestamp = commit_timestamp
+        return sequence
 
     def rollback(self, transaction_id: int) -> None:
         """
-        Rolls back a transaction, undoing all its changes.
+        Rolls back a transaction, undoing all its changes, and removes it.
 
         Args:
             transaction_id (int): The ID of the transaction to roll back.
@@ -67,21 +260,35 @@ class TransactionManager:
             transaction = self.transactions.get(transaction_id)
             if transaction:
                 transaction.rollback()
-                self._release_locks(transaction_id)
+                self._finish(transaction_id)
 
-    def _release_locks(self, transaction_id: int) -> None:
+    def _release_locks(self, transaction_id: int, transaction: Transaction) -> None:
         """
-        Releases all locks held by a transaction.
+        Releases all locks held by a transaction. Locks left without holders are removed from the lock table.
 
         Args:
             transaction_id (int): The ID of the transaction whose locks are to be released.
+            transaction (Transaction): The transaction.
         """
-        for lock in self.locks.values():
-            lock.release(transaction_id)
+        for key, lock in list(transaction.held_locks.items()):
+            if self.key_owners.get(key) == transaction_id:
+                del self.key_owners[key]
+            self.lock_table.release(key, lock, transaction_id)
+        transaction.held_locks.clear()
+
+    def record_write(self, transaction_id: int, key: str) -> None:
+        """
+        Records that a transaction changed a key; the record is dropped when the transaction releases its locks.
+
+        Args:
+            transaction_id (int): The ID of the transaction holding the key's WRITE lock.
+            key (str): The changed key.
+        """
+        self.key_owners[key] = transaction_id
 
     def get_transaction_id_for_key(self, key: str) -> Optional[int]:
         """
-        Returns the transaction ID associated with a given key, if any.
+        Returns the ID of the transaction with an uncommitted change to a key, if any, in O(1).
 
         Args:
             key (str): The key to look up.
@@ -89,34 +296,49 @@ class TransactionManager:
         Returns:
             Optional[int]: The ID of the transaction associated with the key, or None if there is no such transaction.
         """
-        for transaction_id, transaction in self.transactions.items():
-            if key in transaction.changes or key in transaction.deleted_keys:
-                return transaction_id
-        return None
+        return self.key_owners.get(key)
 
-    def commit_all(self, shards: List[Shard]) -> None:
+    def commit_all(self, sharding_manager: ShardingManager) -> Optional[int]:
         """
         Commits all active transactions.
 
         Args:
-            shards (List[Shard]): The list of shards affected by the transactions.
+            sharding_manager (ShardingManager): Routes each changed key to its owning shard.
+
+        Returns:
+            Optional[int]: The sequence number of the last log record written, or None if nothing was logged.
         """
+        last_sequence = None
         with self.lock:
             for transaction_id in list(self.transactions.keys()):
-                self.commit(transaction_id, shards)
+                sequence = self.commit(transaction_id, sharding_manager)
+                if sequence is not None:
+                    last_sequence = sequence
+        return last_sequence
 
-    def acquire_lock(self, key: str, lock_type: LockType, transaction_id: int) -> None:
+    def acquire_lock(self, key: str, lock_type: LockType, transaction_id: int, timeout: Optional[float] = None) -> None:
         """
-        Acquires a lock of a certain type on a key for a transaction.
+        Acquires a lock of a certain type on a key for a transaction, waiting while another transaction
+        holds a conflicting lock. Only the key's stripe of the lock table is locked, so threads working
+        on unrelated keys do not contend.
 
         Args:
             key (str): The key to lock.
             lock_type (LockType): The type of lock to acquire (READ or WRITE).
             transaction_id (int): The ID of the transaction for which to acquire the lock.
+            timeout (Optional[float]): Seconds to wait for this request. Defaults to the manager's lock_timeout.
+
+        Raises:
+            LockTimeoutError: If the lock could not be acquired within the timeout.
+            DeadlockError: If the transaction was chosen as the victim of a deadlock.
+            TransactionAbortedError: If the transaction is not active, or stopped being active while waiting.
         """
-        with self.lock:
-            lock = self.locks.get(key)
-            if lock is None:
-                lock = Lock()
-                self.locks[key] = lock
-            lock.acquire(lock_type, transaction_id)
+        if timeout is None:
+            timeout = self.lock_timeout
+        transaction = self.get_active(transaction_id)
+        lock = self.lock_table.acquire(key, lock_type, transaction_id, timeout, self.deadlock_detector)
+        transaction.held_locks[key] = lock
+        if transaction_id not in self.transactions:
+            # Rolled back while waiting, e.g. reaped; releasing twice is harmless if the rollback saw the lock
+            self.lock_table.release(key, lock, transaction_id)
+            raise TransactionAbortedError(f"Transaction {transaction_id} is not active")
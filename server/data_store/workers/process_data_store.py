@@ -0,0 +1,633 @@
+import heapq
+import itertools
+import multiprocessing
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from server.data_store.concurrency.locking import DeadlockError
+from server.data_store.sharding.ordered_index import START_CURSOR, encode_cursor
+from server.data_store.sharding.shard import Shard
+from server.data_store.sharding.sharding_manager import ShardingManager
+from server.data_store.transactions.transaction import TransactionAbortedError, WriteConflictError
+from server.data_store.workers.shard_worker import run_worker
+
+
+class WorkerClient:
+    def __init__(self, index: int, context: Any, num_shards: int, lock_timeout: Optional[float],
+                 ordered_index: bool = False) -> None:
+        """
+        Starts a shard worker process and connects to it over a pipe. Any number of threads may call the
+        worker at once: requests are tagged with an ID and a receiver thread hands each response to its caller.
+
+        Args:
+            index (int): The worker's position among the workers.
+            context (Any): The multiprocessing context starting the process.
+            num_shards (int): The number of shards the worker owns.
+            lock_timeout (Optional[float]): Seconds a worker request waits for a conflicting lock.
+            ordered_index (bool): Whether the worker's shards keep a sorted index of their keys. Default is False.
+
+        Attributes:
+            connection (Connection): The front end's end of the pipe.
+            process (multiprocessing.Process): The worker process.
+            pending (Dict[int, Future]): Requests sent and not answered yet, by request ID.
+        """
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(worker_connection, num_shards, lock_timeout, ordered_index),
+                                       name=f"shard-worker-{index}", daemon=True)
+        self.process.start()
+        worker_connection.close()
+        self.send_lock = threading.Lock()
+        self.pending: Dict[int, Future] = {}
+        self.request_ids = itertools.count(1)
+        self.receiver = threading.Thread(target=self._receive, name=f"shard-worker-{index}-receiver", daemon=True)
+        self.receiver.start()
+
+    def submit(self, method: str, *args: Any) -> Future:
+        """
+        Sends a request to the worker without waiting for the response.
+
+        Args:
+            method (str): The ShardWorker method to call.
+            *args (Any): The method's arguments.
+
+        Returns:
+            Future: Resolves to the method's result, or raises its exception.
+        """
+        future = Future()
+        with self.send_lock:
+            request_id = next(self.request_ids)
+            self.pending[request_id] = future
+            try:
+                self.connection.send((request_id, method, args))
+            except (OSError, ValueError) as e:
+                self.pending.pop(request_id, None)
+                future.set_exception(ConnectionError(f"Shard worker is unavailable: {e}"))
+        return future
+
+    def call(self, method: str, *args: Any) -> Any:
+        """
+        Calls a worker method and waits for its result.
+
+        Args:
+            method (str): The ShardWorker method to call.
+            *args (Any): The method's arguments.
+
+        Returns:
+            Any: The method's result.
+        """
+        return self.submit(method, *args).result()
+
+    def _receive(self) -> None:
+        """Hands each response to the caller waiting for it, until the worker exits."""
+        while True:
+            try:
+                request_id, succeeded, result = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            future = self.pending.pop(request_id)
+            if succeeded:
+                future.set_result(result)
+            else:
+                future.set_exception(result)
+        with self.send_lock:
+            for future in self.pending.values():
+                future.set_exception(ConnectionError("Shard worker exited"))
+            self.pending.clear()
+
+    def close(self) -> None:
+        """Asks the worker to exit once its running requests are done, and waits for it."""
+        with self.send_lock:
+            try:
+                self.connection.send(None)
+            except (OSError, ValueError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.receiver.join(timeout=5)
+        self.connection.close()
+
+
+class ProcessDataStore:
+    def __init__(self, num_workers: int = 4, shards_per_worker: int = 1, lock_timeout: Optional[float] = 5.0,
+                 ordered_index: bool = False) -> None:
+        """
+        Initializes a data store whose shards are owned by worker processes, so requests for different
+        workers run on different cores instead of sharing one interpreter lock. It offers the same
+        operations as DataStore and routes each key to its worker with a ShardingManager.
+
+        Each worker runs its own transactions, locks and snapshots. A transaction takes a local transaction
+        on every worker it touches. One that touched a single worker commits there directly; one that
+        touched several is committed by two-phase commit, with this front end as the coordinator.
+        Snapshots and deadlock detection are per worker: a cross-worker deadlock ends in a lock timeout.
+
+        Args:
+            num_workers (int): The number of worker processes. Default is 4.
+            shards_per_worker (int): The number of shards each worker owns. Default is 1.
+            lock_timeout (Optional[float]): Seconds a request waits for a conflicting lock. Defaults to 5.
+            ordered_index (bool): Whether the workers keep sorted key indexes, which scan() and range_scan()
+                need. Default is False.
+
+        Attributes:
+            workers (List[WorkerClient]): The worker processes.
+            sharding_manager (ShardingManager): Routes each key to the shard standing for its worker.
+            transactions (Dict[int, Dict[int, int]]): The local transaction ID on each worker a transaction
+                has touched, by worker index, for every active transaction ID.
+            global_ids (List[Dict[int, int]]): Maps each worker's local transaction IDs back to transaction IDs.
+            stream_ids (Iterator[int]): Numbers the show_all_pages streams opened on the workers.
+            optimistic (Set[int]): The active transactions made optimistic by watch; their local transactions
+                are optimistic on every worker, and are validated by the prepare phase.
+        """
+        context = multiprocessing.get_context('spawn')
+        self.workers = [WorkerClient(index, context, shards_per_worker, lock_timeout, ordered_index)
+                        for index in range(num_workers)]
+        # The shards only place workers on the ring; the keys live in the worker processes
+        self.sharding_manager = ShardingManager([Shard(f"worker-{index}") for index in range(num_workers)])
+        self.worker_index = {shard: index for index, shard in enumerate(self.sharding_manager.shards)}
+        self.transactions: Dict[int, Dict[int, int]] = {}
+        self.global_ids: List[Dict[int, int]] = [{} for _ in range(num_workers)]
+        self.current_transaction_id = 0
+        self.stream_ids = itertools.count(1)
+        self.optimistic: Set[int] = set()
+        self.lock = threading.Lock()
+
+    def _group_by_worker(self, keys: List[str]) -> Dict[int, List[str]]:
+        """
+        Groups keys by the worker owning each of them.
+
+        Args:
+            keys (List[str]): The keys to group.
+
+        Returns:
+            Dict[int, List[str]]: The keys of each worker, by worker index.
+        """
+        return {self.worker_index[shard]: shard_keys
+                for shard, shard_keys in self.sharding_manager.group_by_shard(keys).items()}
+
+    def _local_transaction(self, transaction_id: Optional[int], worker: int) -> Optional[int]:
+        """
+        Returns a transaction's local transaction on a worker, beginning it on first use.
+
+        Args:
+            transaction_id (Optional[int]): The transaction ID, or None for an autocommit.
+            worker (int): The worker index.
+
+        Returns:
+            Optional[int]: The local transaction ID, or None for an autocommit.
+
+        Raises:
+            TransactionAbortedError: If the transaction is not active, e.g. already committed or rolled back.
+        """
+        if transaction_id is None:
+            return None
+        participants = self.transactions.get(transaction_id)
+        if participants is None:
+            raise TransactionAbortedError(f"Transaction {transaction_id} is not active")
+        local_id = participants.get(worker)
+        if local_id is None:
+            local_id = self.workers[worker].call('begin')
+            with self.lock:
+                self.global_ids[worker][local_id] = transaction_id
+                existing = participants.setdefault(worker, local_id)
+            if existing != local_id:
+                # Another thread of the same transaction began one first
+                self.workers[worker].call('rollback', local_id)
+                local_id = existing
+            elif transaction_id in self.optimistic:
+                self.workers[worker].call('watch', [], local_id)
+        return local_id
+
+    def _call(self, transaction_id: int, worker: int, method: str, *args: Any) -> Any:
+        """
+        Calls a worker on behalf of a transaction. If the worker aborted its part of the transaction,
+        the transaction is rolled back on every other worker as well.
+
+        Args:
+            transaction_id (int): The transaction ID.
+            worker (int): The worker index.
+            method (str): The ShardWorker method to call.
+            *args (Any): The method's arguments.
+
+        Returns:
+            Any: The method's result.
+        """
+        try:
+            return self.workers[worker].call(method, *args)
+        except (DeadlockError, WriteConflictError):
+            self.rollback_transaction(transaction_id)
+            raise
+
+    def start_transaction(self) -> int:
+        """
+        Begins a new transaction. Local transactions are only begun on the workers it touches.
+
+        Returns:
+            int: The ID of the new transaction.
+        """
+        with self.lock:
+            self.current_transaction_id += 1
+            transaction_id = self.current_transaction_id
+            self.transactions[transaction_id] = {}
+        return transaction_id
+
+    def has_transaction(self, transaction_id: Optional[int]) -> bool:
+        """
+        Checks whether a transaction ID belongs to an active transaction of this data store.
+
+        Args:
+            transaction_id (Optional[int]): The ID to check.
+
+        Returns:
+            bool: True if the transaction has begun and not yet committed or rolled back.
+        """
+        return transaction_id in self.transactions
+
+    def transaction_stats(self) -> Dict[str, int]:
+        """
+        Returns the transaction counters for monitoring.
+
+        Returns:
+            Dict[str, int]: The number of active transactions.
+        """
+        return {'active_transactions': len(self.transactions)}
+
+    def _forget(self, transaction_id: int) -> None:
+        """
+        Drops a committed or rolled back transaction and the mapping of its local transactions.
+
+        Args:
+            transaction_id (int): The transaction ID.
+        """
+        with self.lock:
+            participants = self.transactions.pop(transaction_id, {})
+            self.optimistic.discard(transaction_id)
+            for worker, local_id in participants.items():
+                self.global_ids[worker].pop(local_id, None)
+
+    def put(self, key: str, value: Any, transaction_id: int, ttl: Optional[float] = None) -> None:
+        """
+        Adds or updates a key/value pair in the datastore.
+
+        Args:
+            key (str): The key to add or update.
+            value (Any): The value to associate with the key.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+            ttl (Optional[float]): Seconds after which the key expires. Defaults to no expiry.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        local_id = self._local_transaction(transaction_id, worker)
+        self._call(transaction_id, worker, 'put', key, value, local_id, ttl)
+
+    def get(self, key: str, transaction_id: Optional[int]) -> Optional[Any]:
+        """
+        Retrieves a value by key from the datastore.
+
+        Args:
+            key (str): The key to look up.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls.
+
+        Returns:
+            Optional[Any]: The value associated with the key, or None if the key is not in the datastore.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        return self.workers[worker].call('get', key, self._local_transaction(transaction_id, worker))
+
+    def delete(self, key: str, transaction_id: int) -> None:
+        """
+        Deletes a value by key from the datastore.
+
+        Args:
+            key (str): The key to delete.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        local_id = self._local_transaction(transaction_id, worker)
+        self._call(transaction_id, worker, 'delete', key, local_id)
+
+    def expire(self, key: str, seconds: float, transaction_id: Optional[int]) -> bool:
+        """
+        Sets the expiry of an existing key.
+
+        Args:
+            key (str): The key.
+            seconds (float): Seconds from now after which the key expires.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None.
+
+        Returns:
+            bool: True if the key exists, False if it does not.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        local_id = self._local_transaction(transaction_id, worker)
+        return self._call(transaction_id, worker, 'expire', key, seconds, local_id)
+
+    def ttl(self, key: str, transaction_id: Optional[int]) -> int:
+        """
+        Returns the number of seconds until a key expires.
+
+        Args:
+            key (str): The key.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls.
+
+        Returns:
+            int: The remaining seconds, -1 if the key has no expiry, or -2 if it does not exist.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        return self.workers[worker].call('ttl', key, self._local_transaction(transaction_id, worker))
+
+    def incr(self, key: str, amount: int, transaction_id: Optional[int]) -> int:
+        """
+        Adds to the integer value of a key in one step, inside the worker owning it.
+
+        Args:
+            key (str): The key.
+            amount (int): The number to add; negative to subtract.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None.
+
+        Returns:
+            int: The new value.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        local_id = self._local_transaction(transaction_id, worker)
+        return self._call(transaction_id, worker, 'incr', key, amount, local_id)
+
+    def append(self, key: str, suffix: Any, transaction_id: Optional[int]) -> int:
+        """
+        Appends to the value of a key in one step, inside the worker owning it.
+
+        Args:
+            key (str): The key.
+            suffix (Any): The bytes or str to append.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls, or None.
+
+        Returns:
+            int: The length of the new value.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        local_id = self._local_transaction(transaction_id, worker)
+        return self._call(transaction_id, worker, 'append', key, suffix, local_id)
+
+    def cas(self, key: str, expected_version: int, value: Any) -> Optional[int]:
+        """
+        Writes a key, committing at once, only if its version is still the expected one.
+
+        Args:
+            key (str): The key to write.
+            expected_version (int): The version the key was read at, or 0 for a key expected not to exist.
+            value (Any): The new value.
+
+        Returns:
+            Optional[int]: The key's new version, or None if the key changed meanwhile and nothing was written.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        return self.workers[worker].call('cas', key, expected_version, value)
+
+    def get_version(self, key: str) -> Tuple[Optional[Any], int]:
+        """
+        Reads the latest committed value of a key together with its version.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            Tuple[Optional[Any], int]: The value, or None if the key does not exist, and its version, 0 if it does not.
+        """
+        worker = self.worker_index[self.sharding_manager.get_shard(key)]
+        return self.workers[worker].call('get_version', key)
+
+    def watch(self, keys: List[str], transaction_id: int) -> None:
+        """
+        Makes a transaction optimistic and watches keys for it, on every worker it touched or watches.
+
+        Args:
+            keys (List[str]): The keys the transaction's outcome depends on.
+            transaction_id (int): The ID of the transaction.
+
+        Raises:
+            TransactionAbortedError: If the transaction is not active.
+        """
+        if transaction_id not in self.transactions:
+            raise TransactionAbortedError(f"Transaction {transaction_id} is not active")
+        self.optimistic.add(transaction_id)
+        groups = self._group_by_worker(list(set(keys)))
+        for worker in sorted(set(groups) | set(self.transactions.get(transaction_id, {}))):
+            local_id = self._local_transaction(transaction_id, worker)
+            self.workers[worker].call('watch', groups.get(worker, []), local_id)
+
+    def mget(self, keys: List[str], transaction_id: Optional[int]) -> List[Optional[Any]]:
+        """
+        Retrieves the values of many keys at once, asking every worker involved in parallel.
+
+        Args:
+            keys (List[str]): The keys to look up.
+            transaction_id (Optional[int]): The ID of the transaction under which this operation falls.
+
+        Returns:
+            List[Optional[Any]]: The value of each key, or None for a missing key, in the order the keys were given.
+        """
+        groups = self._group_by_worker(list(set(keys)))
+        futures = {worker: self.workers[worker].submit('mget', worker_keys,
+                                                       self._local_transaction(transaction_id, worker))
+                   for worker, worker_keys in groups.items()}
+        values = {}
+        for worker, future in futures.items():
+            values.update(zip(groups[worker], future.result()))
+        return [values[key] for key in keys]
+
+    def mput(self, pairs: List[Tuple[str, Any]], transaction_id: int) -> None:
+        """
+        Adds or updates many key/value pairs at once. Workers are called in index order, so batches
+        lock their keys in the same global order and cannot deadlock each other.
+
+        Args:
+            pairs (List[Tuple[str, Any]]): The key/value pairs; a key given twice takes its last value.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+        """
+        groups = self._group_by_worker([key for key, _ in pairs])
+        worker_of = {key: worker for worker, worker_keys in groups.items() for key in worker_keys}
+        worker_pairs: Dict[int, List[Tuple[str, Any]]] = {}
+        for key, value in pairs:
+            worker_pairs.setdefault(worker_of[key], []).append((key, value))
+        for worker in sorted(worker_pairs):
+            local_id = self._local_transaction(transaction_id, worker)
+            self._call(transaction_id, worker, 'mput', worker_pairs[worker], local_id)
+
+    def mdelete(self, keys: List[str], transaction_id: int) -> None:
+        """
+        Deletes many keys at once, calling workers in index order like mput.
+
+        Args:
+            keys (List[str]): The keys to delete.
+            transaction_id (int): The ID of the transaction under which this operation falls.
+        """
+        groups = self._group_by_worker(keys)
+        for worker in sorted(groups):
+            local_id = self._local_transaction(transaction_id, worker)
+            self._call(transaction_id, worker, 'mdelete', groups[worker], local_id)
+
+    def commit_transaction(self, transaction_id: int) -> None:
+        """
+        Commits a transaction. A transaction that touched one worker commits there; one that touched
+        several is committed by two-phase commit: every worker votes in a prepare phase, and the
+        transaction is committed everywhere only if all of them voted to commit.
+
+        Args:
+            transaction_id (int): The ID of the transaction to commit.
+
+        Raises:
+            TransactionAbortedError: If a worker voted to abort or failed, in which case the transaction
+                was rolled back on every worker.
+        """
+        participants = dict(self.transactions.get(transaction_id, {}))
+        if len(participants) <= 1:
+            try:
+                for worker, local_id in participants.items():
+                    self.workers[worker].call('commit', local_id)
+            finally:
+                self._forget(transaction_id)
+            return
+
+        votes = [self.workers[worker].submit('prepare', local_id) for worker, local_id in participants.items()]
+        try:
+            prepared = all([vote.result() for vote in votes])
+        except Exception:
+            prepared = False
+        if not prepared:
+            self.rollback_transaction(transaction_id)
+            raise TransactionAbortedError(f"Transaction {transaction_id} aborted: a shard worker could not commit")
+        try:
+            for future in [self.workers[worker].submit('commit', local_id)
+                           for worker, local_id in participants.items()]:
+                future.result()
+        finally:
+            self._forget(transaction_id)
+
+    def rollback_transaction(self, transaction_id: int) -> None:
+        """
+        Rolls back a transaction on every worker it touched. Workers that cannot be reached are skipped.
+
+        Args:
+            transaction_id (int): The ID of the transaction to roll back.
+        """
+        participants = dict(self.transactions.get(transaction_id, {}))
+        futures = [self.workers[worker].submit('rollback', local_id) for worker, local_id in participants.items()]
+        for future in futures:
+            try:
+                future.result()
+            except ConnectionError:
+                pass
+        self._forget(transaction_id)
+
+    def commit_all_transactions(self) -> None:
+        """Commits all active transactions, one after another."""
+        for transaction_id in list(self.transactions):
+            self.commit_transaction(transaction_id)
+
+    def show_all(self) -> dict:
+        """
+        Returns a dictionary containing all key-value pairs of every worker and their associated transaction IDs.
+
+        Returns:
+            dict: All key-value pairs in the datastore.
+        """
+        all_data = {}
+        for page in self.show_all_pages():
+            all_data.update(page)
+        return all_data
+
+    def show_all_pages(self, page_size: int = 1000) -> Iterator[Dict[str, Dict[str, Any]]]:
+        """
+        Yields the key-value pairs of every worker and their associated transaction IDs, one page of a
+        worker at a time, as DataStore.show_all_pages. Each worker keeps a cursor over its own keys, so
+        only one page crosses the pipe per request.
+
+        Args:
+            page_size (int): The number of keys per page. Default is 1000.
+
+        Yields:
+            Dict[str, Dict[str, Any]]: The 'value' and 'transaction_id' of each key of the page.
+        """
+        for worker, client in enumerate(self.workers):
+            stream, page = next(self.stream_ids), None
+            try:
+                while True:
+                    page = client.call('show_all_page', stream, page_size)
+                    if page is None:
+                        break
+                    for entry in page.values():
+                        entry['transaction_id'] = self.global_ids[worker].get(entry['transaction_id'])
+                    yield page
+            finally:
+                if page is not None:  # Abandoned midway: drop the worker's cursor
+                    client.call('show_all_page', stream, page_size, True)
+
+    def scan(self, prefix: str, cursor: str = START_CURSOR, count: int = 10) -> Tuple[str, List[Tuple[str, Any]]]:
+        """
+        Returns one page of the committed keys starting with a prefix, in key order, as DataStore.scan.
+        Every worker returns its own first page after the cursor, and the pages are merged: the first count
+        pairs of the merge are the first count pairs overall.
+
+        Args:
+            prefix (str): The prefix of the keys to list.
+            cursor (str): The cursor returned with the previous page. Defaults to the first page.
+            count (int): The maximum number of pairs in the page. Default is 10.
+
+        Returns:
+            Tuple[str, List[Tuple[str, Any]]]: The cursor of the next page, and the key/value pairs.
+        """
+        futures = [client.submit('scan', prefix, cursor, count) for client in self.workers]
+        pages = [future.result() for future in futures]
+        merged = list(heapq.merge(*(pairs for _, pairs in pages), key=lambda pair: pair[0]))
+        if len(merged) > count or any(next_cursor != START_CURSOR for next_cursor, _ in pages):
+            return encode_cursor(merged[:count][-1][0]), merged[:count]
+        return START_CURSOR, merged
+
+    def range_scan(self, start: str, end: str, limit: int = 10) -> Tuple[Optional[str], List[Tuple[str, Any]]]:
+        """
+        Returns one page of the committed keys from start up to, but excluding, end, as DataStore.range_scan.
+        The workers' pages are merged like scan's. The next page starts at the first key left out of the merge,
+        or at a truncated worker's own next start if that comes earlier, since the worker's keys after its
+        page are not in the merge at all.
+
+        Args:
+            start (str): The first key of the page.
+            end (str): The key the range stops before.
+            limit (int): The maximum number of pairs in the page. Default is 10.
+
+        Returns:
+            Tuple[Optional[str], List[Tuple[str, Any]]]: The first key of the next page, or None if the range
+            is exhausted, and the key/value pairs.
+        """
+        futures = [client.submit('range_scan', start, end, limit) for client in self.workers]
+        pages = [future.result() for future in futures]
+        merged = list(heapq.merge(*(pairs for _, pairs in pages), key=lambda pair: pair[0]))
+        next_starts = [next_start for next_start, _ in pages if next_start is not None]
+        if len(merged) > limit:
+            return min([merged[limit][0]] + next_starts), merged[:limit]
+        return min(next_starts, default=None), merged
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Returns the memory estimate and eviction counters summed over the workers. The workers run without
+        a memory budget.
+
+        Returns:
+            Dict[str, Any]: used_memory, maxmemory, policy, evicted_keys and rejected_writes.
+        """
+        stats = [client.call('memory_stats') for client in self.workers]
+        return {'used_memory': sum(entry['used_memory'] for entry in stats), 'maxmemory': None,
+                'policy': stats[0]['policy'], 'evicted_keys': sum(entry['evicted_keys'] for entry in stats),
+                'rejected_writes': sum(entry['rejected_writes'] for entry in stats)}
+
+    def snapshot(self) -> int:
+        """
+        Snapshots are not supported by the worker processes, which keep their shards in memory only.
+
+        Raises:
+            ValueError: Always.
+        """
+        raise ValueError("Snapshots are not supported with worker processes")
+
+    def close(self) -> None:
+        """Stops every worker process."""
+        for worker in self.workers:
+            worker.close()
@@ -0,0 +1,210 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.shard import Shard
+from server.data_store.transactions.transaction import TransactionAbortedError, WriteConflictError
+
+
+class ShardWorker:
+    # Methods a front end may call
+    METHODS = frozenset({'begin', 'get', 'put', 'delete', 'mget', 'mput', 'mdelete', 'expire', 'ttl', 'prepare',
+                         'commit', 'rollback', 'show_all', 'show_all_page', 'memory_stats', 'scan',
+                         'range_scan', 'cas', 'get_version', 'watch', 'incr', 'append'})
+    # Methods that never wait for a key lock, so the worker runs them inline instead of on a thread
+    NON_BLOCKING_METHODS = frozenset({'begin', 'get', 'mget', 'ttl', 'prepare', 'commit', 'rollback', 'show_all',
+                                      'show_all_page', 'memory_stats', 'scan', 'range_scan', 'get_version',
+                                      'watch'})
+
+    def __init__(self, num_shards: int = 1, lock_timeout: Optional[float] = 5.0, ordered_index: bool = False) -> None:
+        """
+        Initializes the part of the data store owned by one worker process: a DataStore over its own group
+        of shards, with its own transactions, locks and snapshots.
+
+        Args:
+            num_shards (int): The number of shards the worker owns. Default is 1.
+            lock_timeout (Optional[float]): Seconds a request waits for a conflicting lock. Defaults to 5.
+            ordered_index (bool): Whether the shards keep a sorted index of their keys for scans. Default is False.
+
+        Attributes:
+            data_store (DataStore): Stores the worker's keys.
+            prepared (Set[int]): Local transactions that voted to commit and await the coordinator's decision.
+            show_all_streams (Dict[int, Iterator[Dict[str, Dict[str, Any]]]]): Open show_all_page cursors, by ID.
+        """
+        self.data_store = DataStore([Shard() for _ in range(num_shards)], lock_timeout=lock_timeout,
+                                    ordered_index=ordered_index)
+        self.prepared: Set[int] = set()
+        self.show_all_streams: Dict[int, Iterator[Dict[str, Dict[str, Any]]]] = {}
+
+    def begin(self) -> int:
+        """Begins a local transaction and returns its ID."""
+        return self.data_store.start_transaction()
+
+    def get(self, key: str, transaction_id: Optional[int]) -> Optional[Any]:
+        """Retrieves a value by key, as DataStore.get."""
+        return self.data_store.get(key, transaction_id)
+
+    def put(self, key: str, value: Any, transaction_id: int, ttl: Optional[float] = None) -> None:
+        """Adds or updates a key/value pair, as DataStore.put."""
+        self.data_store.put(key, value, transaction_id, ttl)
+
+    def delete(self, key: str, transaction_id: int) -> None:
+        """Deletes a key, as DataStore.delete."""
+        self.data_store.delete(key, transaction_id)
+
+    def mget(self, keys: List[str], transaction_id: Optional[int]) -> List[Optional[Any]]:
+        """Retrieves many keys at once, as DataStore.mget."""
+        return self.data_store.mget(keys, transaction_id)
+
+    def mput(self, pairs: List[Tuple[str, Any]], transaction_id: int) -> None:
+        """Adds or updates many key/value pairs at once, as DataStore.mput."""
+        self.data_store.mput(pairs, transaction_id)
+
+    def mdelete(self, keys: List[str], transaction_id: int) -> None:
+        """Deletes many keys at once, as DataStore.mdelete."""
+        self.data_store.mdelete(keys, transaction_id)
+
+    def expire(self, key: str, seconds: float, transaction_id: Optional[int]) -> bool:
+        """Sets the expiry of a key, as DataStore.expire."""
+        return self.data_store.expire(key, seconds, transaction_id)
+
+    def ttl(self, key: str, transaction_id: Optional[int]) -> int:
+        """Returns the seconds until a key expires, as DataStore.ttl."""
+        return self.data_store.ttl(key, transaction_id)
+
+    def incr(self, key: str, amount: int, transaction_id: Optional[int]) -> int:
+        """Adds to the integer value of a key, as DataStore.incr."""
+        return self.data_store.incr(key, amount, transaction_id)
+
+    def append(self, key: str, suffix: Any, transaction_id: Optional[int]) -> int:
+        """Appends to the value of a key, as DataStore.append."""
+        return self.data_store.append(key, suffix, transaction_id)
+
+    def cas(self, key: str, expected_version: int, value: Any) -> Optional[int]:
+        """Writes a key if its version is the expected one, as DataStore.cas."""
+        return self.data_store.cas(key, expected_version, value)
+
+    def get_version(self, key: str) -> Tuple[Optional[Any], int]:
+        """Reads a key's latest value and version, as DataStore.get_version."""
+        return self.data_store.get_version(key)
+
+    def watch(self, keys: List[str], transaction_id: int) -> None:
+        """Makes a local transaction optimistic and watches keys for it, as DataStore.watch."""
+        self.data_store.watch(keys, transaction_id)
+
+    def prepare(self, transaction_id: int) -> bool:
+        """
+        Votes on committing a local transaction, the first phase of a two-phase commit. Under two-phase
+        locking the transaction already holds the lock of every key it wrote, and write conflicts were
+        rejected when each key was written, so a transaction that still exists is certain to commit.
+        An optimistic transaction is validated now, which locks its keys until the decision arrives.
+
+        Args:
+            transaction_id (int): The local transaction ID.
+
+        Returns:
+            bool: True to vote commit, False to vote abort.
+        """
+        if not self.data_store.has_transaction(transaction_id):
+            return False
+        try:
+            self.data_store.validate_transaction(transaction_id)
+        except (WriteConflictError, TransactionAbortedError):
+            return False
+        self.prepared.add(transaction_id)
+        return True
+
+    def commit(self, transaction_id: int) -> None:
+        """Commits a local transaction, on its own or as the second phase of a two-phase commit."""
+        self.prepared.discard(transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def rollback(self, transaction_id: int) -> None:
+        """Rolls back a local transaction."""
+        self.prepared.discard(transaction_id)
+        self.data_store.rollback_transaction(transaction_id)
+
+    def show_all(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the worker's key/value pairs, as DataStore.show_all."""
+        return self.data_store.show_all()
+
+    def show_all_page(self, cursor: int, page_size: int, close: bool = False) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Returns the next page of the worker's key/value pairs, as DataStore.show_all_pages. The front end
+        picks a new cursor ID to start a stream and calls again with it for every following page.
+
+        Args:
+            cursor (int): The ID of the stream.
+            page_size (int): The number of keys per page.
+            close (bool): Whether to drop the stream instead of reading from it. Default is False.
+
+        Returns:
+            Optional[Dict[str, Dict[str, Any]]]: The next page, or None once the stream is exhausted or closed.
+        """
+        if close:
+            self.show_all_streams.pop(cursor, None)
+            return None
+        stream = self.show_all_streams.setdefault(cursor, self.data_store.show_all_pages(page_size))
+        page = next(stream, None)
+        if page is None:
+            del self.show_all_streams[cursor]
+        return page
+
+    def scan(self, prefix: str, cursor: str, count: int) -> Tuple[str, List[Tuple[str, Any]]]:
+        """Returns one page of the worker's keys with a prefix, as DataStore.scan."""
+        return self.data_store.scan(prefix, cursor, count)
+
+    def range_scan(self, start: str, end: str, limit: int) -> Tuple[Optional[str], List[Tuple[str, Any]]]:
+        """Returns one page of the worker's keys in a range, as DataStore.range_scan."""
+        return self.data_store.range_scan(start, end, limit)
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """Returns the worker's memory estimate and eviction counters, as DataStore.memory_stats."""
+        return self.data_store.memory_stats()
+
+
+def run_worker(connection: Connection, num_shards: int, lock_timeout: Optional[float], ordered_index: bool = False,
+               max_threads: int = 32) -> None:
+    """
+    Serves requests from the front end until it sends None or closes the pipe. Each request is a
+    (request ID, method, arguments) tuple and is answered with (request ID, succeeded, result or exception).
+    Requests that may wait for a lock run on a thread pool, so one waiting request does not stall the others.
+
+    Args:
+        connection (Connection): The worker's end of the pipe to the front end.
+        num_shards (int): The number of shards the worker owns.
+        lock_timeout (Optional[float]): Seconds a request waits for a conflicting lock.
+        ordered_index (bool): Whether the shards keep a sorted index of their keys for scans. Default is False.
+        max_threads (int): The number of threads running requests that may block. Default is 32.
+    """
+    worker = ShardWorker(num_shards, lock_timeout, ordered_index)
+    send_lock = threading.Lock()
+    executor = ThreadPoolExecutor(max_workers=max_threads)
+
+    def handle(request_id: int, method: str, args: Tuple) -> None:
+        try:
+            if method not in ShardWorker.METHODS:
+                raise ValueError(f"Unknown worker method {method}")
+            response = (request_id, True, getattr(worker, method)(*args))
+        except Exception as e:
+            response = (request_id, False, e)
+        with send_lock:
+            connection.send(response)
+
+    try:
+        while True:
+            try:
+                message = connection.recv()
+            except EOFError:
+                break
+            if message is None:
+                break
+            request_id, method, args = message
+            if method in ShardWorker.NON_BLOCKING_METHODS:
+                handle(request_id, method, args)
+            else:
+                executor.submit(handle, request_id, method, args)
+    finally:
+        executor.shutdown(wait=True)
+        connection.close()
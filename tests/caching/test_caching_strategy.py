@@ -0,0 +1,72 @@
+import threading
+import unittest
+from server.caching.caching_strategy import CACHE_MISS, CachingStrategy, LRUCache
+
+
+class TestLRUCache(unittest.TestCase):
+
+    def test_strategy_without_a_policy_cannot_be_created(self):
+        with self.assertRaises(TypeError):
+            CachingStrategy(capacity=2)
+        print("Abstract caching strategy - Test passed")
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(capacity=2)
+        cache.add_to_cache("a", 1)
+        cache.add_to_cache("b", 2)
+        cache.get_from_cache("a")
+        cache.add_to_cache("c", 3)
+
+        self.assertIs(cache.get_from_cache("b", CACHE_MISS), CACHE_MISS)
+        self.assertEqual(cache.get_from_cache("a"), 1)
+        self.assertEqual(cache.get_from_cache("c"), 3)
+        self.assertEqual(cache.stats()['evictions'], 1)
+        print("LRU eviction - Test passed")
+
+    def test_cached_none_is_a_hit(self):
+        cache = LRUCache(capacity=2)
+        cache.add_to_cache("missing", None)
+
+        self.assertIsNone(cache.get_from_cache("missing", CACHE_MISS))
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 0)
+        print("Cached None - Test passed")
+
+    def test_byte_limit(self):
+        cache = LRUCache(capacity=100, max_bytes=1000)
+        for i in range(50):
+            cache.add_to_cache(f"key{i}", "x" * 100)
+
+        stats = cache.stats()
+        self.assertLessEqual(stats['bytes'], 1000)
+        self.assertGreater(stats['evictions'], 0)
+        self.assertEqual(stats['entries'], len(cache.cache))
+        cache.clear_cache()
+        self.assertEqual(cache.stats()['bytes'], 0)
+        print("Byte limit - Test passed")
+
+    def test_concurrent_access(self):
+        cache = LRUCache(capacity=64, max_bytes=10000)
+
+        def worker(offset):
+            for i in range(2000):
+                key = f"key{(i + offset) % 200}"
+                if cache.get_from_cache(key, CACHE_MISS) is CACHE_MISS:
+                    cache.add_to_cache(key, i)
+                if i % 7 == 0:
+                    cache.remove_from_cache(key)
+
+        threads = [threading.Thread(target=worker, args=(n * 13,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertLessEqual(len(cache.cache), 64)
+        self.assertEqual(set(cache.cache), set(cache.sizes))
+        self.assertEqual(cache.size_bytes, sum(cache.sizes.values()))
+        print("Concurrent access - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+from server.caching.caching_strategy import CACHE_MISS
+from server.caching.clock import ClockCache
+from server.caching.factory import CACHING_STRATEGIES, create_caching_strategy
+from server.caching.lfu import LFUCache
+from server.caching.ttl import TTLCache
+from server.caching.tinylfu import WTinyLFUCache
+from server.data_store.data_store import DataStore
+
+
+class TestPolicies(unittest.TestCase):
+
+    def test_every_policy_respects_limits(self):
+        for policy in CACHING_STRATEGIES:
+            with self.subTest(policy=policy):
+                cache = create_caching_strategy(policy, capacity=10, max_bytes=2000)
+                for i in range(100):
+                    if cache.get_from_cache(f"key{i % 30}", CACHE_MISS) is CACHE_MISS:
+                        cache.add_to_cache(f"key{i % 30}", i)
+                    if i % 11 == 0:
+                        cache.remove_from_cache(f"key{i % 30}")
+
+                self.assertLessEqual(len(cache.cache), 10)
+                self.assertLessEqual(cache.size_bytes, 2000)
+                self.assertEqual(set(cache.cache), set(cache.sizes))
+                cache.clear_cache()
+                self.assertEqual(cache.stats()['entries'], 0)
+        print("Every policy respects limits - Test passed")
+
+    def test_lfu_evicts_least_frequently_used(self):
+        cache = LFUCache(capacity=2)
+        cache.add_to_cache("a", 1)
+        cache.add_to_cache("b", 2)
+        cache.get_from_cache("a")
+        cache.get_from_cache("a")
+        cache.get_from_cache("b")
+        cache.add_to_cache("c", 3)
+
+        self.assertIn("a", cache.cache)
+        self.assertNotIn("b", cache.cache)
+        print("LFU eviction - Test passed")
+
+    def test_clock_gives_referenced_keys_a_second_chance(self):
+        cache = ClockCache(capacity=2)
+        cache.add_to_cache("a", 1)
+        cache.add_to_cache("b", 2)
+        cache.get_from_cache("a")
+        cache.add_to_cache("c", 3)
+
+        self.assertIn("a", cache.cache)
+        self.assertNotIn("b", cache.cache)
+        print("CLOCK second chance - Test passed")
+
+    def test_tinylfu_rejects_one_off_keys(self):
+        cache = WTinyLFUCache(capacity=100)
+        for _ in range(5):
+            for i in range(90):
+                if cache.get_from_cache(f"hot{i}", CACHE_MISS) is CACHE_MISS:
+                    cache.add_to_cache(f"hot{i}", i)
+        # A long one-off scan while the hot keys are still in use
+        for i in range(1000):
+            for key in (f"scan{i}", f"hot{i % 90}"):
+                if cache.get_from_cache(key, CACHE_MISS) is CACHE_MISS:
+                    cache.add_to_cache(key, i)
+
+        hot = sum(1 for i in range(90) if f"hot{i}" in cache.cache)
+        self.assertGreater(hot, 80)
+        print("W-TinyLFU scan resistance - Test passed")
+
+    def test_ttl_expires_entries(self):
+        now = [0.0]
+        cache = TTLCache(capacity=10, default_ttl=10, clock=lambda: now[0])
+        cache.add_to_cache("short", 1, ttl=1)
+        cache.add_to_cache("long", 2)
+
+        now[0] = 5
+        self.assertIs(cache.get_from_cache("short", CACHE_MISS), CACHE_MISS)
+        self.assertEqual(cache.get_from_cache("long"), 2)
+        self.assertEqual(cache.stats()['expirations'], 1)
+        print("TTL expiry - Test passed")
+
+    def test_ttl_counts_an_expired_entry_once(self):
+        now = [0.0]
+        cache = TTLCache(capacity=2, clock=lambda: now[0])
+        cache.add_to_cache("short", 1, ttl=1)
+        cache.add_to_cache("plain", 2)
+        now[0] = 5
+        cache.add_to_cache("new", 3)
+        self.assertEqual(sorted(cache.cache), ["new", "plain"])
+        self.assertEqual((cache.stats()['expirations'], cache.stats()['evictions']), (1, 0))
+
+        cache.add_to_cache("newer", 4)
+        self.assertEqual(sorted(cache.cache), ["new", "newer"])
+        self.assertEqual((cache.stats()['expirations'], cache.stats()['evictions']), (1, 1))
+        print("TTL expirations and evictions - Test passed")
+
+    def test_ttl_policy_follows_key_expiry(self):
+        data_store = DataStore(caching_strategy="ttl")
+        self.assertIsInstance(data_store.caching_strategy, TTLCache)
+        data_store.put("session", "abc", None, ttl=30)
+        data_store.put("plain", "value", None)
+        data_store.get("session", None)
+        data_store.get("plain", None)
+        cache = data_store.caching_strategy
+        self.assertAlmostEqual(cache.deadlines["session"] - cache.clock(), 30, delta=1)
+        self.assertNotIn("plain", cache.deadlines)
+        print("TTL cache policy in the data store - Test passed")
+
+    def test_policy_selected_by_name(self):
+        data_store = DataStore(caching_strategy="tinylfu")
+        self.assertIsInstance(data_store.caching_strategy, WTinyLFUCache)
+        with self.assertRaises(ValueError):
+            create_caching_strategy("random")
+        print("Policy selected by name - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
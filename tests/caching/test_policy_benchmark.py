@@ -0,0 +1,53 @@
+import itertools
+import random
+import time
+import unittest
+from server.caching.caching_strategy import CACHE_MISS
+from server.caching.factory import CACHING_STRATEGIES, create_caching_strategy
+
+
+class TestPolicyBenchmark(unittest.TestCase):
+    NUM_KEYS = 10000
+    TRACE_LENGTH = 40000
+    CAPACITY = 500
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(42)
+        weights = [1 / (rank ** 0.99) for rank in range(1, cls.NUM_KEYS + 1)]
+        cum_weights = list(itertools.accumulate(weights))
+        zipf = [f"key{i}" for i in rng.choices(range(cls.NUM_KEYS), cum_weights=cum_weights, k=cls.TRACE_LENGTH)]
+
+        # Interleave sequential scans over cold keys, which pollute a plain LRU cache
+        cls.traces = {'zipf': zipf, 'zipf+scan': []}
+        for start in range(0, cls.TRACE_LENGTH, 4000):
+            cls.traces['zipf+scan'].extend(zipf[start:start + 4000])
+            cls.traces['zipf+scan'].extend(f"scan{start + i}" for i in range(1000))
+
+    def _replay(self, policy, trace):
+        """Replays a trace as a read-through workload and returns the hit ratio and ns/op."""
+        cache = create_caching_strategy(policy, capacity=self.CAPACITY)
+        start = time.perf_counter_ns()
+        for key in trace:
+            if cache.get_from_cache(key, CACHE_MISS) is CACHE_MISS:
+                cache.add_to_cache(key, key)
+        elapsed = time.perf_counter_ns() - start
+        return cache.hits / len(trace), elapsed / len(trace)
+
+    def test_policies_on_zipfian_traces(self):
+        """Benchmark: hit ratio and ns/op of every policy on Zipfian traces."""
+        results = {}
+        for trace_name, trace in self.traces.items():
+            for policy in CACHING_STRATEGIES:
+                hit_ratio, ns_per_op = self._replay(policy, trace)
+                results[trace_name, policy] = hit_ratio
+                print(f"{trace_name:>10} {policy:>8}: hit ratio {hit_ratio:.3f}, {ns_per_op:,.0f} ns/op")
+
+        for hit_ratio in results.values():
+            self.assertGreater(hit_ratio, 0)
+        self.assertGreater(results['zipf+scan', 'tinylfu'], results['zipf+scan', 'lru'])
+        print("Policy trace replay - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
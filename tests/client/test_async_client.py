@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import unittest
+from client.async_client import AsyncClient
+from server.core.async_server import AsyncServer
+from server.core.server import Server
+
+
+class TestAsyncClient(unittest.IsolatedAsyncioTestCase):
+    server_class = Server
+    port = 9012
+    protocol = 'text'
+
+    def setUp(self):
+        self.server = self.server_class(port=self.port)
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+    async def asyncSetUp(self):
+        self.client = AsyncClient(port=self.port, protocol=self.protocol)
+        await self.client.connect()
+
+    async def test_commands(self):
+        transaction_id = (await self.client.send_command("BEGIN"))['transaction_id']
+        self.assertEqual((await self.client.send_command(f"PUT key1 value1 {transaction_id}"))['status'], 'Ok')
+        self.assertEqual((await self.client.request("COMMIT", transaction_id=transaction_id))['status'], 'Ok')
+        result = (await self.client.request("GET", "key1"))['result']
+        self.assertEqual(result, b'value1' if self.protocol == 'binary' else 'value1')
+        self.assertEqual((await self.client.send_command("PUT missing-value"))['status'], 'Error')
+        print("Async client commands - Test passed")
+
+    async def test_pipelining_and_concurrent_coroutines(self):
+        responses = await self.client.send_many([f"PUT key{i} value{i}" for i in range(100)] + ["SHOWALL"])
+        self.assertTrue(all(response['status'] == 'Ok' for response in responses[:100]))
+        self.assertEqual(len(responses[100]['data']), 100)
+
+        results = await asyncio.gather(*(self.client.send_command("INCR counter") for _ in range(50)))
+        self.assertEqual(sorted(response['result'] for response in results), list(range(1, 51)))
+        print("Async client pipelining - Test passed")
+
+    async def asyncTearDown(self):
+        await self.client.disconnect()
+
+    def tearDown(self):
+        self.server.stop()
+        self.server_thread.join()
+
+
+class TestAsyncClientBinary(TestAsyncClient):
+    server_class = AsyncServer
+    port = 9013
+    protocol = 'binary'
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import threading
+import unittest
+from client.client_pool import ClientPool
+from server.core.async_server import AsyncServer
+from server.core.server import Server
+
+
+class TestClientPool(unittest.TestCase):
+    port = 9010
+
+    def setUp(self):
+        self.start_server()
+        self.pool = ClientPool(port=self.port, size=2, timeout=0.5)
+
+    def start_server(self):
+        self.server = AsyncServer(port=self.port)
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+    def stop_server(self):
+        self.server.stop()
+        self.server_thread.join()
+
+    def test_connections_are_reused(self):
+        self.assertEqual(self.pool.send_command("PUT key1 value1")['status'], 'Ok')
+        self.assertEqual(self.pool.send_command("GET key1")['result'], 'value1')
+        self.assertEqual(self.pool.request("GET", "key1")['result'], 'value1')
+        self.assertEqual(self.pool.created, 1)
+        self.assertEqual(len(self.pool.idle), 1)
+        print("Pooled connections are reused - Test passed")
+
+    def test_transaction_on_one_client(self):
+        with self.pool.client() as client:
+            transaction_id = client.send_command("BEGIN")['transaction_id']
+            responses = client.send_many([f"PUT key{i} value{i} {transaction_id}" for i in range(50)]
+                                         + [f"COMMIT {transaction_id}"])
+        self.assertTrue(all(response['status'] == 'Ok' for response in responses))
+        self.assertEqual(self.pool.send_command("GET key49")['result'], 'value49')
+        print("Transaction on a pooled client - Test passed")
+
+    def test_size_limit_and_timeout(self):
+        first, second = self.pool.acquire(), self.pool.acquire()
+        with self.assertRaises(TimeoutError):
+            self.pool.acquire()
+
+        threading.Timer(0.1, self.pool.release, args=(first,)).start()
+        self.assertIs(self.pool.acquire(), first)
+        self.pool.release(first)
+        self.pool.release(second, broken=True)
+        self.assertEqual(self.pool.created, 1)
+        print("Pool size limit - Test passed")
+
+    def test_concurrent_threads_share_the_pool(self):
+        errors = []
+
+        def work():
+            try:
+                for i in range(50):
+                    response = self.pool.send_command("INCR counter")
+                    if response['status'] != 'Ok':
+                        errors.append(response)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.pool.send_command("GET counter")['result'], '300')
+        self.assertLessEqual(self.pool.created, 2)
+        print("Threads sharing a pool - Test passed")
+
+    def test_reconnect_after_server_restart(self):
+        self.assertEqual(self.pool.send_command("PUT key1 value1")['status'], 'Ok')
+        client = self.pool.idle[0]
+        self.stop_server()
+        self.start_server()
+
+        self.assertFalse(client.is_alive())
+        self.assertEqual(self.pool.send_command("GET key1")['status'], 'Ok')
+        self.assertTrue(client.is_alive())
+        print("Pool reconnects - Test passed")
+
+    def test_broken_client_is_not_reused(self):
+        with self.assertRaises(RuntimeError):
+            with self.pool.client():
+                raise RuntimeError("failed mid-request")
+        self.assertEqual((self.pool.created, self.pool.idle), (0, []))
+        print("Broken pooled client - Test passed")
+
+    def tearDown(self):
+        self.pool.close()
+        self.stop_server()
+
+
+class TestClientPoolWithThreadedServer(unittest.TestCase):
+
+    def test_binary_pool(self):
+        server = Server(port=9011)
+        server_thread = threading.Thread(target=server.start)
+        server_thread.start()
+        server.started.wait(timeout=5)
+        pool = ClientPool(port=9011, protocol='binary', size=1)
+        try:
+            self.assertEqual(pool.request("PUT", "key1", b"\x00value")['status'], 'Ok')
+            self.assertEqual(pool.request("GET", "key1")['result'], b"\x00value")
+        finally:
+            pool.close()
+            server.stop()
+            server_thread.join()
+        print("Binary client pool - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.persistence.append_only_log import AppendOnlyLog, read_records
+
+
+class TestAppendOnlyLog(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "store.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _commit(self, data_store, writes=(), deletes=()):
+        transaction_id = data_store.start_transaction()
+        for key, value in writes:
+            data_store.put(key, value, transaction_id)
+        for key in deletes:
+            data_store.delete(key, transaction_id)
+        data_store.commit_transaction(transaction_id)
+
+    def test_replay_rebuilds_the_shards(self):
+        for fsync in ('always', 'interval', 'never'):
+            with self.subTest(fsync=fsync):
+                if os.path.exists(self.path):
+                    os.remove(self.path)
+                data_store = DataStore(log_path=self.path, fsync=fsync)
+                self._commit(data_store, [("key1", "a"), ("key2", "b")])
+                self._commit(data_store, [("key1", "c")], ["key2"])
+                empty = data_store.start_transaction()
+                data_store.commit_transaction(empty)
+                data_store.close()
+
+                restarted = DataStore(log_path=self.path)
+                reader = restarted.start_transaction()
+                self.assertEqual(restarted.get("key1", reader), "c")
+                self.assertIsNone(restarted.get("key2", reader))
+                self.assertEqual(restarted.transaction_manager.commit_timestamp, 2)
+                restarted.close()
+        print("Log replay - Test passed")
+
+    def test_commits_after_restart_are_appended(self):
+        data_store = DataStore(log_path=self.path)
+        self._commit(data_store, [("key1", "a")])
+        data_store.close()
+
+        restarted = DataStore(log_path=self.path)
+        self._commit(restarted, [("key2", "b")])
+        restarted.close()
+
+        records, _ = read_records(self.path)
+        self.assertEqual([record[0] for record in records], [1, 2])
+        print("Append after restart - Test passed")
+
+    def test_commit_all_and_rollback(self):
+        data_store = DataStore(log_path=self.path)
+        first = data_store.start_transaction()
+        second = data_store.start_transaction()
+        rolled_back = data_store.start_transaction()
+        data_store.put("key1", "a", first)
+        data_store.put("key2", "b", second)
+        data_store.put("key3", "c", rolled_back)
+        data_store.rollback_transaction(rolled_back)
+        data_store.commit_all_transactions()
+        data_store.close()
+
+        records, _ = read_records(self.path)
+        self.assertEqual(sorted(key for _, writes, _ in records for key in writes), ["key1", "key2"])
+        print("COMMITALL logging - Test passed")
+
+    def test_torn_tail_is_ignored_and_cut_off(self):
+        data_store = DataStore(log_path=self.path)
+        self._commit(data_store, [("key1", "a")])
+        self._commit(data_store, [("key2", "b")])
+        data_store.close()
+        with open(self.path, 'r+b') as file:
+            file.truncate(os.path.getsize(self.path) - 3)
+
+        restarted = DataStore(log_path=self.path)
+        reader = restarted.start_transaction()
+        self.assertEqual(restarted.get("key1", reader), "a")
+        self.assertIsNone(restarted.get("key2", reader))
+        self._commit(restarted, [("key3", "c")])
+        restarted.close()
+
+        records, _ = read_records(self.path)
+        self.assertEqual([list(writes) for _, writes, _ in records], [["key1"], ["key3"]])
+        print("Torn log tail - Test passed")
+
+    def test_concurrent_commits_share_fsyncs(self):
+        data_store = DataStore(log_path=self.path, fsync='always')
+        num_threads, commits_per_thread = 8, 25
+
+        def committer(index):
+            for i in range(commits_per_thread):
+                self._commit(data_store, [(f"thread{index}-key{i}", i)])
+
+        threads = [threading.Thread(target=committer, args=(index,)) for index in range(num_threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log = data_store.commit_log
+        self.assertEqual(log.durable, num_threads * commits_per_thread)
+        self.assertLess(log.syncs, num_threads * commits_per_thread)
+        print(f"{num_threads * commits_per_thread} commits in {log.syncs} fsyncs")
+        data_store.close()
+
+        records, _ = read_records(self.path)
+        self.assertEqual([record[0] for record in records], list(range(1, num_threads * commits_per_thread + 1)))
+        print("Group commit - Test passed")
+
+    def test_unknown_fsync_policy(self):
+        with self.assertRaises(ValueError):
+            AppendOnlyLog(self.path, fsync='sometimes')
+        print("Unknown fsync policy - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from server.data_store.concurrency.locking import LockTimeoutError
+from server.data_store.data_store import DataStore
+from server.data_store.transactions.transaction import WriteConflictError
+
+
+class TestAutocommit(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.1)
+        self.transaction_manager = self.data_store.transaction_manager
+
+    def test_single_key_commands_without_a_transaction(self):
+        self.data_store.put("key1", "value1", None)
+        self.assertEqual(self.data_store.get("key1", None), "value1")
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        self.data_store.delete("key1", None)
+        self.data_store.delete("missing", None)
+        self.assertIsNone(self.data_store.get("key1", None))
+
+        self.assertEqual(self.transaction_manager.active_count(), 1)
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+        print("Autocommit PUT, GET and DEL - Test passed")
+
+    def test_autocommit_waits_for_uncommitted_changes(self):
+        holder = self.data_store.start_transaction()
+        self.data_store.put("key1", "pending", holder)
+        with self.assertRaises(LockTimeoutError):
+            self.data_store.put("key1", "value1", None)
+        self.data_store.rollback_transaction(holder)
+
+        self.data_store.put("key1", "value1", None)
+        self.assertEqual(self.data_store.get("key1", None), "value1")
+        print("Autocommit respects locks - Test passed")
+
+    def test_autocommit_keeps_snapshot_isolation(self):
+        self.data_store.put("key1", "value1", None)
+        reader = self.data_store.start_transaction()
+        self.data_store.put("key1", "value2", None)
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        with self.assertRaises(WriteConflictError):
+            self.data_store.put("key1", "value3", reader)
+        self.assertEqual(self.data_store.get("key1", None), "value2")
+        print("Autocommit and snapshots - Test passed")
+
+    def test_autocommit_with_expiry(self):
+        self.data_store.put("session", "abc", None, ttl=100)
+        self.assertEqual(self.data_store.ttl("session", None), 100)
+        self.assertEqual(self.data_store.used_memory(), self.data_store.get_shard("session").memory_usage)
+        print("Autocommit with expiry - Test passed")
+
+    def test_autocommit_is_cheaper_than_a_transaction(self):
+        count = 5000
+        start = time.perf_counter()
+        for i in range(count):
+            transaction_id = self.data_store.start_transaction()
+            self.data_store.put(f"key{i}", "value", transaction_id)
+            self.data_store.commit_transaction(transaction_id)
+        transaction_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(count):
+            self.data_store.put(f"key{i}", "value", None)
+        autocommit_seconds = time.perf_counter() - start
+
+        print(f"  transactions: {count / transaction_seconds:,.0f} puts/s, "
+              f"autocommit: {count / autocommit_seconds:,.0f} puts/s")
+        self.assertLess(autocommit_seconds, transaction_seconds)
+        print("Autocommit cost - Test passed")
+
+
+class TestAutocommitPersistence(unittest.TestCase):
+
+    def test_autocommit_writes_are_logged(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "store.log")
+        data_store = DataStore(log_path=path)
+        data_store.put("key1", "value1", None)
+        data_store.put("key2", "value2", None)
+        data_store.delete("key1", None)
+        data_store.close()
+
+        restarted = DataStore(log_path=path)
+        self.assertEqual({key: entry['value'] for key, entry in restarted.show_all().items()}, {"key2": "value2"})
+        restarted.close()
+        print("Autocommit persistence - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
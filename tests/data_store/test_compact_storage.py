@@ -0,0 +1,131 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.compact_storage import ARENA_HEADER, CompactStorage
+from server.data_store.sharding.shard import Shard
+
+
+class TestCompactStorage(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_mapping_operations(self):
+        storage = CompactStorage(initial_size=64)
+        storage["bytes"] = b"\x00raw\xff"
+        storage["text"] = "héllo"
+        storage["number"] = 42
+        storage["text"] = "overwritten"
+        self.assertEqual(storage["bytes"], b"\x00raw\xff")
+        self.assertEqual(storage.get("text"), "overwritten")
+        self.assertEqual(storage.get("number"), 42)
+        self.assertIsNone(storage.get("missing"))
+        self.assertIn("bytes", storage)
+        self.assertNotIn("missing", storage)
+        self.assertEqual(sorted(storage), ["bytes", "number", "text"])
+        self.assertEqual(len(storage), 3)
+
+        self.assertEqual(storage.pop("number"), 42)
+        self.assertIsNone(storage.pop("number", None))
+        with self.assertRaises(KeyError):
+            del storage["number"]
+        storage.update({"a": "1", "b": "2"})
+        self.assertEqual(dict(storage.items()), {"bytes": b"\x00raw\xff", "text": "overwritten", "a": "1", "b": "2"})
+        print("Compact storage mapping - Test passed")
+
+    def test_churn_compacts_the_arena(self):
+        storage = CompactStorage(initial_size=64)
+        expected = {}
+        for round_number in range(20):
+            for i in range(500):
+                key = f"key{i}"
+                if (i + round_number) % 3 == 0:
+                    storage.pop(key, None)
+                    expected.pop(key, None)
+                else:
+                    storage[key] = f"value{i}-{round_number}"
+                    expected[key] = f"value{i}-{round_number}"
+        self.assertEqual(dict(storage.items()), expected)
+        self.assertLessEqual(storage.garbage, (storage.used - ARENA_HEADER.size) // 2)
+        print("Compact storage churn - Test passed")
+
+    def test_key_batches_survive_an_index_rebuild(self):
+        storage = CompactStorage()
+        for i in range(100):
+            storage[f"key{i}"] = "value"
+        batches = storage.key_batches(10)
+        listed = set(next(batches))
+        self.assertEqual(len(listed), 10)
+        layout = storage.layout
+        for i in range(1000):
+            storage[f"more{i}"] = "value"  # Outgrows the index, which moves every key to another slot
+        self.assertGreater(storage.layout, layout)
+        for keys in batches:
+            self.assertLessEqual(len(keys), 10)
+            listed.update(keys)
+        self.assertTrue({f"key{i}" for i in range(100)} <= listed)
+        print("Key batches across an index rebuild - Test passed")
+
+    def test_mapped_file_reopens(self):
+        path = os.path.join(self.directory, "shard.arena")
+        storage = CompactStorage(path, initial_size=128)
+        for i in range(1000):
+            storage[f"key{i}"] = f"value{i}".encode()
+        for i in range(0, 1000, 2):
+            del storage[f"key{i}"]
+        storage["key1"] = b"changed"
+        storage.close()
+
+        reopened = CompactStorage(path)
+        self.assertEqual(len(reopened), 500)
+        self.assertEqual(reopened.get("key1"), b"changed")
+        self.assertEqual(reopened.get("key3"), b"value3")
+        self.assertIsNone(reopened.get("key2"))
+        reopened.close()
+
+        with open(path, 'r+b') as file:
+            file.write(b"garbage!")
+        with self.assertRaises(ValueError):
+            CompactStorage(path)
+        print("Mapped compact storage - Test passed")
+
+    def test_reopened_shard_keeps_its_memory_estimate(self):
+        path = os.path.join(self.directory, "shard.arena")
+        shard = Shard(storage=CompactStorage(path))
+        shard.apply({f"key{i}": f"value{i}" for i in range(200)}, [], 1)
+        shard.apply({"key1": {"nested": [1, 2, 3]}}, ["key2"], 2)
+        memory_usage = shard.memory_usage
+        shard.close()
+
+        with mock.patch.object(CompactStorage, '_value_at', side_effect=AssertionError("value decoded")):
+            reopened = Shard(storage=CompactStorage(path))
+        self.assertEqual(reopened.memory_usage, memory_usage)
+        self.assertEqual(reopened.memory_usage, Shard(storage=dict(reopened.storage.items())).memory_usage)
+        reopened.close()
+        print("Memory estimate of a reopened shard - Test passed")
+
+    def test_data_store_with_compact_shards(self):
+        shards = [Shard(storage=CompactStorage()) for _ in range(3)]
+        data_store = DataStore(shards)
+        reader = data_store.start_transaction()
+        writer = data_store.start_transaction()
+        data_store.mput([(f"key{i}", f"value{i}".encode()) for i in range(100)], writer)
+        data_store.commit_transaction(writer)
+        self.assertIsNone(data_store.get("key1", reader))
+
+        data_store.add_shard(Shard(storage=CompactStorage())).join()
+        fresh = data_store.start_transaction()
+        self.assertEqual(data_store.mget(["key1", "key99"], fresh), [b"value1", b"value99"])
+        self.assertEqual(len(data_store.show_all()), 100)
+        data_store.close()
+        print("DataStore on compact shards - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import threading
+import time
+import unittest
+from server.data_store.concurrency.locking import LockTimeoutError
+from server.data_store.data_store import DataStore
+
+
+class TestCounters(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.1)
+
+    def test_incr(self):
+        self.assertEqual(self.data_store.incr("hits", 1, None), 1)
+        self.assertEqual(self.data_store.incr("hits", 10, None), 11)
+        self.assertEqual(self.data_store.incr("hits", -12, None), -1)
+        self.assertEqual(self.data_store.get("hits", None), b"-1")
+
+        self.data_store.put("count", 5, None)
+        self.assertEqual(self.data_store.incr("count", 2, None), 7)
+        self.assertEqual(self.data_store.get("count", None), 7)
+
+        self.data_store.put("name", b"abc", None)
+        with self.assertRaises(ValueError):
+            self.data_store.incr("name", 1, None)
+        self.assertEqual(len(self.data_store.transaction_manager.lock_table), 0)
+        print("INCR - Test passed")
+
+    def test_append(self):
+        self.assertEqual(self.data_store.append("log", b"a", None), 1)
+        self.assertEqual(self.data_store.append("log", b"bc", None), 3)
+        self.assertEqual(self.data_store.get("log", None), b"abc")
+        self.data_store.put("count", 5, None)
+        with self.assertRaises(ValueError):
+            self.data_store.append("count", b"1", None)
+        print("APPEND - Test passed")
+
+    def test_expiry_is_kept(self):
+        self.data_store.put("window", b"1", None, ttl=100)
+        self.assertEqual(self.data_store.incr("window", 1, None), 2)
+        self.assertEqual(self.data_store.ttl("window", None), 100)
+
+        self.data_store.put("window", b"1", None, ttl=0.01)
+        time.sleep(0.02)
+        self.assertEqual(self.data_store.incr("window", 1, None), 1)
+        self.assertEqual(self.data_store.ttl("window", None), -1)
+        print("INCR keeps expiry - Test passed")
+
+    def test_in_a_transaction(self):
+        self.data_store.incr("hits", 1, None)
+        transaction_id = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.incr("hits", 1, transaction_id), 2)
+        self.assertEqual(self.data_store.incr("hits", 1, transaction_id), 3)
+        self.assertEqual(self.data_store.get("hits", None), b"1")
+        with self.assertRaises(LockTimeoutError):
+            self.data_store.incr("hits", 1, None)
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(self.data_store.get("hits", None), b"3")
+
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.append("log", b"a", transaction_id)
+        self.data_store.rollback_transaction(transaction_id)
+        self.assertIsNone(self.data_store.get("log", None))
+        print("INCR and APPEND in a transaction - Test passed")
+
+    def test_concurrent_increments_are_not_lost(self):
+        def increment():
+            for _ in range(250):
+                self.data_store.incr("hits", 1, None)
+
+        threads = [threading.Thread(target=increment) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.data_store.get("hits", None), b"1000")
+        print("Concurrent INCR - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -38,5 +38,20 @@ class TestDataStore(unittest.TestCase):
         self.assertIsNone(value)
         print("PUT and DEL - Test passed")
 
+    def test_show_all_pages(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(f"key{i}", f"value{i}") for i in range(25)], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        writer = self.data_store.start_transaction()
+        self.data_store.put("key3", "pending", writer)
+
+        pages = list(self.data_store.show_all_pages(page_size=10))
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        data = {key: entry for page in pages for key, entry in page.items()}
+        self.assertEqual(data, self.data_store.show_all())
+        self.assertEqual(data["key3"], {'value': "value3", 'transaction_id': writer})
+        self.assertEqual(data["key4"], {'value': "value4", 'transaction_id': None})
+        print("SHOWALL pages - Test passed")
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,147 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.expiry import ExpiringValue
+
+
+class TestExpiry(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(expiry_interval=0.01)
+        self.now = time.time()
+        # Controls the wall clock the data store judges expiries by
+        clock = mock.patch('time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+        self.addCleanup(self.data_store.close)
+
+    def _commit_put(self, key, value, ttl=None):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put(key, value, transaction_id, ttl)
+        self.data_store.commit_transaction(transaction_id)
+
+    def test_expired_keys_disappear_on_access(self):
+        self._commit_put("session", "abc", ttl=10)
+        self._commit_put("plain", "value")
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("session", reader), "abc")
+        self.assertEqual(self.data_store.ttl("session", reader), 10)
+        self.assertEqual(self.data_store.ttl("plain", reader), -1)
+        self.assertEqual(self.data_store.ttl("missing", reader), -2)
+        self.data_store.commit_transaction(reader)
+
+        self.now += 10
+        self.assertIsNone(self.data_store.get("session", reader))
+        self.assertEqual(self.data_store.ttl("session", reader), -2)
+        self.assertNotIn("session", self.data_store.get_shard("session").storage)
+        self.assertEqual(self.data_store.mget(["session", "plain"], reader), [None, "value"])
+        print("Lazy expiry - Test passed")
+
+    def test_put_without_ttl_clears_the_expiry(self):
+        self._commit_put("key", "a", ttl=5)
+        self._commit_put("key", "b")
+        self.now += 10
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key", reader), "b")
+        print("PUT clears expiry - Test passed")
+
+    def test_expire_takes_effect_at_commit(self):
+        self._commit_put("key", "value")
+        writer = self.data_store.start_transaction()
+        self.assertTrue(self.data_store.expire("key", 5, writer))
+        self.assertFalse(self.data_store.expire("missing", 5, writer))
+        self.assertEqual(self.data_store.ttl("key", writer), 5)
+
+        other = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.ttl("key", other), -1)
+        self.data_store.commit_transaction(writer)
+        self.data_store.commit_transaction(other)
+        other = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.ttl("key", other), 5)
+
+        writer = self.data_store.start_transaction()
+        self.assertTrue(self.data_store.expire("key", 0, writer))
+        self.data_store.commit_transaction(writer)
+        self.assertIsNone(self.data_store.get("key", self.data_store.start_transaction()))
+        print("EXPIRE inside a transaction - Test passed")
+
+    def test_expire_without_a_transaction(self):
+        self.data_store.put("key", "value", None)
+        self.assertTrue(self.data_store.expire("key", 5, None))
+        self.assertFalse(self.data_store.expire("missing", 5, None))
+        self.assertEqual(self.data_store.ttl("key", None), 5)
+        self.assertEqual(len(self.data_store.transaction_manager.lock_table), 0)
+
+        self.now += 5
+        self.assertFalse(self.data_store.expire("key", 5, None))
+        self.data_store.put("key", "value", None)
+        self.assertTrue(self.data_store.expire("key", 0, None))
+        self.assertEqual(self.data_store.ttl("key", None), -2)
+        print("EXPIRE without a transaction - Test passed")
+
+    def test_transaction_never_sees_a_key_expire_midway(self):
+        self._commit_put("key", "value", ttl=5)
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key", reader), "value")
+
+        self.now += 10
+        fresh = self.data_store.start_transaction()
+        self.assertIsNone(self.data_store.get("key", fresh))  # Removes the key from its shard
+        self.assertEqual(self.data_store.get("key", reader), "value")
+        self.assertEqual(self.data_store.mget(["key"], reader), ["value"])
+        print("Expiry in a repeatable snapshot - Test passed")
+
+    def test_writing_an_expired_key_is_no_conflict(self):
+        self._commit_put("key", "old", ttl=5)
+        self.now += 10
+        writer = self.data_store.start_transaction()
+        reader = self.data_store.start_transaction()
+        self.assertIsNone(self.data_store.get("key", reader))  # Removes the key after writer's snapshot
+        self.data_store.put("key", "new", writer)
+        self.data_store.commit_transaction(writer)
+        self.data_store.commit_transaction(reader)
+        self.assertEqual(self.data_store.get("key", reader), "new")
+        print("Expired key rewrite - Test passed")
+
+    def test_background_expiry_reclaims_keys(self):
+        for i in range(100):
+            self._commit_put(f"key{i}", "value", ttl=1 + i % 2)
+        self.now += 1.5
+        shards = self.data_store.sharding_manager.shards
+        deadline = time.monotonic() + 5
+        while sum(len(shard.storage) for shard in shards) > 50 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(sum(len(shard.storage) for shard in shards), 50)
+        self.assertEqual(len(self.data_store.show_all()), 50)
+        print("Active expiry - Test passed")
+
+
+class TestExpiryPersistence(unittest.TestCase):
+
+    def test_expiries_survive_a_restart(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "store.log")
+        data_store = DataStore(log_path=path)
+        transaction_id = data_store.start_transaction()
+        data_store.put("short", "a", transaction_id, ttl=0.05)
+        data_store.put("long", "b", transaction_id, ttl=100)
+        data_store.commit_transaction(transaction_id)
+        data_store.close()
+        time.sleep(0.1)
+
+        restarted = DataStore(log_path=path)
+        reader = restarted.start_transaction()
+        self.assertEqual(restarted.mget(["short", "long"], reader), [None, "b"])
+        self.assertIsInstance(restarted.get_shard("long").storage["long"], ExpiringValue)
+        self.assertGreater(restarted.ttl("long", reader), 90)
+        restarted.close()
+        print("Expiry persistence - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import os
+import subprocess
+import sys
+import threading
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.hash_ring import HashRing, stable_hash
+from server.data_store.sharding.shard import Shard
+from server.data_store.sharding.sharding_manager import ShardingManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestHashRing(unittest.TestCase):
+    KEYS = [f"key{i}" for i in range(20000)]
+
+    def test_placement_is_stable_across_processes(self):
+        script = ("from server.data_store.sharding.sharding_manager import ShardingManager\n"
+                  "from server.data_store.sharding.shard import Shard\n"
+                  "manager = ShardingManager([Shard() for _ in range(10)])\n"
+                  "print(','.join(manager.get_shard(f'key{i}').name for i in range(200)))")
+        placements = set()
+        for seed in ("1", "2"):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            output = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            placements.add(output)
+        self.assertEqual(len(placements), 1)
+        self.assertEqual(stable_hash("key"), stable_hash("key"))
+        print("Stable placement - Test passed")
+
+    def test_keys_are_balanced(self):
+        manager = ShardingManager([Shard() for _ in range(10)])
+        counts = {shard: 0 for shard in manager.shards}
+        for key in self.KEYS:
+            counts[manager.get_shard(key)] += 1
+        average = len(self.KEYS) / 10
+        self.assertTrue(all(0.5 * average < count < 1.5 * average for count in counts.values()))
+        print("Balanced ring - Test passed")
+
+    def test_adding_a_node_moves_only_its_ranges(self):
+        ring = HashRing()
+        for i in range(10):
+            ring.add(i, f"shard-{i}")
+        before = {key: ring.get(key) for key in self.KEYS}
+        ring.add(10, "shard-10")
+
+        moved = [key for key in self.KEYS if ring.get(key) != before[key]]
+        self.assertTrue(all(ring.get(key) == 10 for key in moved))
+        # About 1/11 of the keys move, against nearly all of them with hash(key) % len(shards)
+        self.assertLess(len(moved), 0.2 * len(self.KEYS))
+        print(f"{len(moved) / len(self.KEYS):.1%} of keys moved - Test passed")
+
+
+class TestOnlineResharding(unittest.TestCase):
+    NUM_KEYS = 5000
+
+    def setUp(self):
+        self.data_store = DataStore([Shard() for _ in range(4)])
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(f"key{i}", f"value{i}") for i in range(self.NUM_KEYS)], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def _assert_every_key_on_its_owner(self):
+        manager = self.data_store.sharding_manager
+        self.assertEqual(sum(len(shard.storage) for shard in manager.shards), self.NUM_KEYS)
+        for i in range(self.NUM_KEYS):
+            key = f"key{i}"
+            self.assertEqual(manager.ring.get(key).storage[key], f"value{i}")
+
+    def _reshard_under_traffic(self, reshard):
+        """Runs a resharding step while another thread keeps reading and writing every key."""
+        errors = []
+        done = threading.Event()
+
+        def traffic():
+            keys = [f"key{i}" for i in range(self.NUM_KEYS)]
+            while not done.is_set():
+                reader = self.data_store.start_transaction()
+                values = self.data_store.mget(keys, reader)
+                self.data_store.commit_transaction(reader)
+                if values != [f"value{i}" for i in range(self.NUM_KEYS)]:
+                    errors.append([(k, v) for k, v in zip(keys, values) if v != "value" + k[3:]][:5])
+                writer = self.data_store.start_transaction()
+                self.data_store.put("key7", "value7", writer)
+                self.data_store.commit_transaction(writer)
+
+        thread = threading.Thread(target=traffic)
+        thread.start()
+        migration = reshard()
+        migration.join()
+        done.set()
+        thread.join()
+        self.assertEqual(errors, [])
+
+    def test_add_shard_online(self):
+        new_shard = Shard()
+        self._reshard_under_traffic(lambda: self.data_store.add_shard(new_shard, batch_size=100))
+
+        self.assertFalse(self.data_store.sharding_manager.migrating)
+        self.assertIn(new_shard, self.data_store.sharding_manager.shards)
+        self.assertTrue(new_shard.storage)
+        self._assert_every_key_on_its_owner()
+        print("Add shard online - Test passed")
+
+    def test_remove_shard_online(self):
+        leaving = self.data_store.sharding_manager.shards[0]
+        self._reshard_under_traffic(lambda: self.data_store.remove_shard(leaving, batch_size=100))
+
+        self.assertNotIn(leaving, self.data_store.sharding_manager.shards)
+        self.assertEqual(leaving.storage, {})
+        self._assert_every_key_on_its_owner()
+        print("Remove shard online - Test passed")
+
+    def test_writes_during_migration_land_on_the_new_owner(self):
+        manager = self.data_store.sharding_manager
+        with self.data_store.transaction_manager.lock:
+            manager.add_shard(Shard())
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("fresh", "value", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        self.data_store._start_migration(100).join()
+
+        self.assertEqual(manager.ring.get("fresh").storage["fresh"], "value")
+        self.assertEqual(sum("fresh" in shard.storage for shard in manager.shards), 1)
+        print("Writes during migration - Test passed")
+
+    def test_keys_are_listed_lazily_and_arrivals_still_move(self):
+        source = Shard()
+        manager = ShardingManager([source])
+        source.apply({f"key{i}": f"value{i}" for i in range(1000)}, [])
+        new_shard = Shard()
+        manager.add_shard(new_shard)
+        self.assertIsNone(manager.migration_keys)  # Changing the ring lists no keys
+
+        batches = []
+        while (batch := manager.next_migration_batch(100)) is not None:
+            batches.append(batch)
+        self.assertTrue(all(len(keys) <= 100 for _, keys in batches))
+        # A key the listing missed, e.g. one rewritten after its retained versions kept it on the source
+        late = next(f"late{i}" for i in range(1000) if manager.ring.get(f"late{i}") is new_shard)
+        source.apply({late: "value"}, [])
+        for batch in batches:
+            self.assertFalse(manager.migrate(batch, 100))
+        while not manager.migrate(None, 100):
+            pass
+
+        self.assertFalse(manager.migrating)
+        self.assertIsNone(source.arrivals)
+        self.assertEqual(new_shard.storage[late], "value")
+        for i in range(1000):
+            self.assertEqual(manager.ring.get(f"key{i}").storage[f"key{i}"], f"value{i}")
+        self.assertEqual(len(source.storage) + len(new_shard.storage), 1001)
+        print("Lazy key listing - Test passed")
+
+    def test_cannot_remove_the_last_shard(self):
+        data_store = DataStore([Shard()])
+        with self.assertRaises(ValueError):
+            data_store.remove_shard(data_store.sharding_manager.shards[0])
+        print("Last shard - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import time
+import unittest
+from server.data_store.concurrency.locking import LockType, StripedLockTable
+from server.data_store.data_store import DataStore
+
+
+class TestLockStriping(unittest.TestCase):
+    OPS_PER_CLIENT = 500
+
+    def test_keys_spread_across_stripes(self):
+        lock_table = StripedLockTable(num_stripes=8)
+        for i in range(100):
+            lock_table.acquire(f"key{i}", LockType.READ, 1)
+
+        self.assertEqual(len(lock_table), 100)
+        self.assertGreater(sum(1 for stripe in lock_table.stripes if stripe.locks), 1)
+        self.assertEqual(len(lock_table.contention_counts()), 8)
+        print("Keys spread across stripes - Test passed")
+
+    def _acquire_while_stripe_is_held(self, lock_table: StripedLockTable, held_key: str, key: str) -> bool:
+        """Holds held_key's stripe mutex while another thread locks key; returns whether that thread finished first."""
+        acquired = threading.Event()
+        thread = threading.Thread(target=lambda: (lock_table.acquire(key, LockType.WRITE, 2), acquired.set()))
+        with lock_table._get_stripe(held_key):
+            thread.start()
+            finished = acquired.wait(timeout=0.2)
+        thread.join()
+        self.assertEqual(lock_table.get(key).holders, {2})
+        return finished
+
+    def test_busy_stripe_only_blocks_its_own_keys(self):
+        lock_table = StripedLockTable(num_stripes=8)
+        held_key = "key0"
+        other_key = next(f"key{i}" for i in range(1, 100)
+                         if lock_table._get_stripe(f"key{i}") is not lock_table._get_stripe(held_key))
+        self.assertTrue(self._acquire_while_stripe_is_held(lock_table, held_key, other_key))
+        self.assertEqual(sum(lock_table.contention_counts()), 0)
+
+        # With a single stripe, every key waits for the one mutex
+        single = StripedLockTable(num_stripes=1)
+        self.assertFalse(self._acquire_while_stripe_is_held(single, held_key, other_key))
+        self.assertEqual(single.contention_counts(), [1])
+        print("Busy stripe blocks only its own keys - Test passed")
+
+    def _run_clients(self, num_clients: int, num_stripes: int = 64) -> float:
+        """Runs num_clients threads doing single-key transactions on disjoint keys and returns ops/sec."""
+        data_store = DataStore()
+        data_store.transaction_manager.lock_table = StripedLockTable(num_stripes)
+        barrier = threading.Barrier(num_clients + 1)
+
+        def client(client_id: int) -> None:
+            barrier.wait()
+            for i in range(self.OPS_PER_CLIENT):
+                transaction_id = data_store.start_transaction()
+                data_store.put(f"client{client_id}-key{i}", i, transaction_id)
+                data_store.get(f"client{client_id}-key{i}", transaction_id)
+                data_store.commit_transaction(transaction_id)
+
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(num_clients)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        start = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        stored = sum(len(shard.storage) for shard in data_store.sharding_manager.shards)
+        self.assertEqual(stored, num_clients * self.OPS_PER_CLIENT)
+        self.assertEqual(len(data_store.transaction_manager.lock_table), 0)
+        return num_clients * self.OPS_PER_CLIENT / elapsed
+
+    def test_throughput_does_not_collapse_with_client_count(self):
+        """
+        Benchmark: aggregate throughput must not collapse as client threads are added. The GIL serializes the
+        threads, so throughput cannot grow with them; single-stripe runs are printed for comparison only.
+        """
+        throughput = {}
+        for num_clients in (1, 2, 4, 8):
+            throughput[num_clients] = self._run_clients(num_clients)
+            single_stripe = self._run_clients(num_clients, num_stripes=1)
+            print(f"{num_clients:>2} clients: {throughput[num_clients]:,.0f} txn/s, "
+                  f"{single_stripe:,.0f} txn/s with one stripe")
+
+        self.assertGreater(throughput[8], throughput[1] * 0.25)
+        print("Throughput with client count - Test passed")
+
+if __name__ == '__main__':
+    unittest.main()
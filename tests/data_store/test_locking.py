@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from server.data_store.concurrency.locking import DeadlockError, LockTimeoutError, LockType
+from server.data_store.data_store import DataStore
+
+
+class TestLocking(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=2.0)
+
+    def test_readers_share_a_lock(self):
+        first = self.data_store.start_transaction()
+        second = self.data_store.start_transaction()
+        self.data_store.transaction_manager.acquire_lock("key1", LockType.READ, first)
+        self.data_store.transaction_manager.acquire_lock("key1", LockType.READ, second)
+
+        self.assertEqual(self.data_store.transaction_manager.lock_table.get("key1").holders, {first, second})
+        print("Shared READ locks - Test passed")
+
+    def test_writer_waits_for_reader_to_commit(self):
+        reader = self.data_store.start_transaction()
+        writer = self.data_store.start_transaction()
+        self.data_store.transaction_manager.acquire_lock("key1", LockType.READ, reader)
+
+        acquired = threading.Event()
+
+        def write():
+            self.data_store.put("key1", "value1", writer)
+            acquired.set()
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        self.assertFalse(acquired.wait(0.2))
+
+        self.data_store.commit_transaction(reader)
+        self.assertTrue(acquired.wait(2.0))
+        thread.join()
+        self.data_store.commit_transaction(writer)
+        self.assertEqual(self.data_store.get_shard("key1").storage["key1"], "value1")
+        print("WRITE waits for READ - Test passed")
+
+    def test_lock_wait_times_out(self):
+        data_store = DataStore(lock_timeout=0.1)
+        holder = data_store.start_transaction()
+        waiter = data_store.start_transaction()
+        data_store.put("key1", "value1", holder)
+
+        start = time.monotonic()
+        with self.assertRaises(LockTimeoutError):
+            data_store.delete("key1", waiter)
+        self.assertLess(time.monotonic() - start, 1.0)
+
+        # The timed-out request leaves the lock table consistent
+        data_store.commit_transaction(holder)
+        data_store.rollback_transaction(waiter)
+        waiter = data_store.start_transaction()
+        data_store.put("key1", "value2", waiter)
+        data_store.commit_transaction(waiter)
+        self.assertEqual(len(data_store.transaction_manager.lock_table), 0)
+        print("Lock wait timeout - Test passed")
+
+    def test_deadlock_aborts_youngest_transaction(self):
+        older = self.data_store.start_transaction()
+        younger = self.data_store.start_transaction()
+        self.data_store.put("a", "older", older)
+        self.data_store.put("b", "younger", younger)
+
+        errors = []
+
+        def older_writes_b():
+            self.data_store.put("b", "older", older)
+
+        thread = threading.Thread(target=older_writes_b)
+        thread.start()
+        time.sleep(0.1)
+        try:
+            self.data_store.put("a", "younger", younger)
+        except DeadlockError as e:
+            errors.append(e)
+        thread.join(timeout=2.0)
+
+        self.assertEqual(len(errors), 1)
+        self.assertFalse(thread.is_alive())
+        self.data_store.commit_transaction(older)
+        self.assertEqual(self.data_store.get_shard("a").storage["a"], "older")
+        self.assertEqual(self.data_store.get_shard("b").storage["b"], "older")
+        print("Deadlock victim aborted - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
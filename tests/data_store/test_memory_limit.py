@@ -0,0 +1,163 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.eviction.memory_limit import MemoryLimitError, estimate_size
+from server.data_store.sharding.shard import Shard
+
+VALUE = "x" * 100
+
+
+class TestMemoryLimit(unittest.TestCase):
+
+    def _commit_put(self, data_store, key, value=VALUE, ttl=None):
+        transaction_id = data_store.start_transaction()
+        data_store.put(key, value, transaction_id, ttl)
+        data_store.commit_transaction(transaction_id)
+
+    def _budget(self, num_keys):
+        """Returns a budget that fits num_keys keys of the form key<i> holding VALUE."""
+        return num_keys * estimate_size("key00", VALUE) + 10
+
+    def test_estimate_follows_puts_and_deletes(self):
+        data_store = DataStore()
+        self.assertEqual(data_store.used_memory(), 0)
+        self._commit_put(data_store, "key", "small")
+        small = data_store.used_memory()
+        self.assertEqual(small, estimate_size("key", "small"))
+        self._commit_put(data_store, "key", VALUE)
+        self.assertEqual(data_store.used_memory(), estimate_size("key", VALUE))
+        transaction_id = data_store.start_transaction()
+        data_store.delete("key", transaction_id)
+        data_store.rollback_transaction(transaction_id)
+        self.assertEqual(data_store.used_memory(), estimate_size("key", VALUE))
+        transaction_id = data_store.start_transaction()
+        data_store.delete("key", transaction_id)
+        data_store.commit_transaction(transaction_id)
+        self.assertEqual(data_store.used_memory(), 0)
+        print("Memory estimate - Test passed")
+
+    def test_noeviction_rejects_writes(self):
+        data_store = DataStore(maxmemory=self._budget(10))
+        for i in range(10):
+            self._commit_put(data_store, f"key{i:02d}")
+        transaction_id = data_store.start_transaction()
+        with self.assertRaises(MemoryLimitError):
+            data_store.put("key10", VALUE, transaction_id)
+        data_store.put("key00", "smaller", transaction_id)  # Overwrites still fit
+        stats = data_store.memory_stats()
+        self.assertEqual((stats['rejected_writes'], stats['evicted_keys']), (1, 0))
+        self.assertLessEqual(stats['used_memory'], stats['maxmemory'])
+        print("No eviction - Test passed")
+
+    def test_concurrent_transactions_cannot_exceed_the_limit(self):
+        data_store = DataStore(maxmemory=self._budget(10))
+        for i in range(9):
+            self._commit_put(data_store, f"key{i:02d}")
+        first = data_store.start_transaction()
+        second = data_store.start_transaction()
+        data_store.put("key09", VALUE, first)  # Fits alone, and holds the last room until it ends
+        with self.assertRaises(MemoryLimitError):
+            data_store.put("key10", VALUE, second)
+        data_store.put("key09", "x" * 50, first)  # Rewriting its own key needs no more room
+        data_store.rollback_transaction(first)
+        self.assertEqual(data_store.memory_limit.reserved, 0)
+        data_store.put("key10", VALUE, second)
+        data_store.commit_transaction(second)
+        self.assertEqual(data_store.memory_limit.reserved, 0)
+        self.assertLessEqual(data_store.used_memory(), data_store.memory_limit.maxmemory)
+        print("Concurrent transactions within the limit - Test passed")
+
+    def _hot_keys_survive(self, policy):
+        data_store = DataStore(maxmemory=self._budget(20), eviction_policy=policy, eviction_samples=10)
+        hot = [f"key{i:02d}" for i in range(5)]
+        reader = data_store.start_transaction()
+        for i in range(20):
+            self._commit_put(data_store, f"key{i:02d}")
+        for _ in range(200):  # The LFU counter grows logarithmically with the number of accesses
+            data_store.mget(hot, reader)
+        for i in range(20, 60):
+            self._commit_put(data_store, f"key{i:02d}")
+            data_store.mget(hot, reader)
+        self.assertEqual(data_store.memory_stats()['evicted_keys'], 40)
+        self.assertLessEqual(data_store.used_memory(), data_store.memory_limit.maxmemory)
+        stored = set(data_store.show_all())
+        self.assertTrue(set(hot) <= stored, f"{policy} evicted a hot key: {sorted(set(hot) - stored)}")
+
+    def test_lru_keeps_recently_used_keys(self):
+        self._hot_keys_survive('allkeys-lru')
+        print("LRU eviction - Test passed")
+
+    def test_lfu_keeps_frequently_used_keys(self):
+        self._hot_keys_survive('allkeys-lfu')
+        print("LFU eviction - Test passed")
+
+    def test_volatile_ttl_only_evicts_expiring_keys(self):
+        data_store = DataStore(maxmemory=self._budget(10), eviction_policy='volatile-ttl')
+        for i in range(5):
+            self._commit_put(data_store, f"key{i:02d}")
+        for i in range(5, 10):
+            self._commit_put(data_store, f"key{i:02d}", ttl=100 + i)
+        self._commit_put(data_store, "key10")
+        stored = set(data_store.show_all())
+        self.assertNotIn("key05", stored)  # The soonest expiry goes first
+        self.assertTrue({f"key{i:02d}" for i in range(5)} <= stored)
+
+        for i in range(11, 15):
+            self._commit_put(data_store, f"key{i}")
+        transaction_id = data_store.start_transaction()
+        with self.assertRaises(MemoryLimitError):
+            data_store.put("key15", VALUE, transaction_id)
+        self.assertEqual(data_store.memory_stats()['evicted_keys'], 5)
+        print("Volatile TTL eviction - Test passed")
+
+    def test_evictions_are_spread_across_shards(self):
+        shards = [Shard() for _ in range(4)]
+        data_store = DataStore(shards, maxmemory=self._budget(40), eviction_policy='allkeys-lru')
+        for i in range(80):
+            self._commit_put(data_store, f"key{i:02d}")
+        sizes = [len(shard.storage) for shard in shards]
+        self.assertEqual(sum(sizes), 40)
+        self.assertTrue(all(size > 0 for size in sizes), sizes)
+        print("Evictions across shards - Test passed")
+
+    def test_keys_being_written_are_not_evicted(self):
+        data_store = DataStore(maxmemory=self._budget(2), eviction_policy='allkeys-lru')
+        self._commit_put(data_store, "key00")
+        self._commit_put(data_store, "key01")
+        writer = data_store.start_transaction()
+        data_store.put("key00", "pending", writer)
+        self._commit_put(data_store, "key02")
+        self.assertIn("key00", data_store.get_shard("key00").storage)
+        data_store.rollback_transaction(writer)
+        self.assertEqual(len(data_store.show_all()), 2)
+        print("Locked keys not evicted - Test passed")
+
+
+class TestMemoryLimitPersistence(unittest.TestCase):
+
+    def test_evictions_survive_a_restart(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "store.log")
+        data_store = DataStore(log_path=path, maxmemory=5 * estimate_size("key0", VALUE) + 10,
+                               eviction_policy='allkeys-lru')
+        for i in range(10):
+            transaction_id = data_store.start_transaction()
+            data_store.put(f"key{i}", VALUE, transaction_id)
+            data_store.commit_transaction(transaction_id)
+            time.sleep(0.001)  # Distinct access times
+        stored = set(data_store.show_all())
+        data_store.close()
+
+        restarted = DataStore(log_path=path)
+        self.assertEqual(set(restarted.show_all()), stored)
+        self.assertEqual(len(stored), 5)
+        restarted.close()
+        print("Eviction persistence - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.transactions.transaction import TransactionAbortedError, WriteConflictError
+
+
+class TestMVCC(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.5)
+
+    def _commit(self, key, value):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put(key, value, transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def _history_size(self):
+        return sum(len(shard.history) for shard in self.data_store.sharding_manager.shards)
+
+    def test_get_takes_no_lock(self):
+        self._commit("key1", "value1")
+        transaction_id = self.data_store.start_transaction()
+
+        self.assertEqual(self.data_store.get("key1", transaction_id), "value1")
+        self.assertEqual(len(self.data_store.transaction_manager.lock_table), 0)
+        print("GET without lock - Test passed")
+
+    def test_reader_is_not_blocked_by_writer(self):
+        self._commit("key1", "value1")
+        writer = self.data_store.start_transaction()
+        reader = self.data_store.start_transaction()
+        self.data_store.put("key1", "value2", writer)
+
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        self.assertEqual(self.data_store.get("key1", writer), "value2")
+        print("Reader not blocked by writer - Test passed")
+
+    def test_repeatable_read(self):
+        self._commit("key1", "value1")
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+
+        self._commit("key1", "value2")
+        self._commit("key2", "new")
+        writer = self.data_store.start_transaction()
+        self.data_store.delete("key1", writer)
+        self.data_store.commit_transaction(writer)
+
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        self.assertIsNone(self.data_store.get("key2", reader))
+
+        # A new snapshot is taken after the transaction ends
+        self.data_store.commit_transaction(reader)
+        self.assertIsNone(self.data_store.get("key1", reader))
+        self.assertEqual(self.data_store.get("key2", reader), "new")
+        print("Repeatable read - Test passed")
+
+    def test_old_versions_are_garbage_collected(self):
+        self._commit("key1", "value1")
+        self.assertEqual(self._history_size(), 0)
+
+        reader = self.data_store.start_transaction()
+        self._commit("key1", "value2")
+        self.assertEqual(self._history_size(), 1)
+
+        self.data_store.commit_transaction(reader)
+        self.assertEqual(self._history_size(), 0)
+        self.assertEqual(self.data_store.get_shard("key1").storage["key1"], "value2")
+        print("Version garbage collection - Test passed")
+
+    def test_write_after_concurrent_commit_conflicts(self):
+        self._commit("key1", "value1")
+        transaction_id = self.data_store.start_transaction()
+        self._commit("key1", "value2")
+
+        with self.assertRaises(WriteConflictError):
+            self.data_store.put("key1", "value3", transaction_id)
+
+        # The aborted transaction is gone; a retry begins a new one with a fresh snapshot
+        with self.assertRaises(TransactionAbortedError):
+            self.data_store.put("key1", "value3", transaction_id)
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("key1", "value3", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(self.data_store.get_shard("key1").storage["key1"], "value3")
+        print("Write conflict aborts transaction - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.transactions.transaction import WriteConflictError
+
+
+class TestKeyVersions(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.1)
+
+    def test_versions_follow_commits(self):
+        self.assertEqual(self.data_store.get_version("key1"), (None, 0))
+        self.data_store.put("key1", "value1", None)
+        value, first = self.data_store.get_version("key1")
+        self.assertEqual(value, "value1")
+        self.assertGreater(first, 0)
+
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("key1", "value2", transaction_id)
+        self.assertEqual(self.data_store.get_version("key1"), ("value1", first))
+        self.data_store.commit_transaction(transaction_id)
+        self.assertGreater(self.data_store.get_version("key1")[1], first)
+
+        self.data_store.delete("key1", None)
+        self.assertEqual(self.data_store.get_version("key1"), (None, 0))
+        print("Per-key versions - Test passed")
+
+    def test_versions_move_with_their_keys(self):
+        for i in range(50):
+            self.data_store.put(f"key{i}", "value", None)
+        versions = {f"key{i}": self.data_store.get_version(f"key{i}")[1] for i in range(50)}
+        self.data_store.add_shard()
+        self.data_store.wait_for_migration()
+        self.assertEqual({key: self.data_store.get_version(key)[1] for key in versions}, versions)
+        print("Versions survive migration - Test passed")
+
+    def test_versions_are_restored(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        path = os.path.join(directory, "store.log")
+        data_store = DataStore(log_path=path)
+        data_store.put("key1", "value1", None)
+        data_store.put("key2", "value2", None)
+        versions = [data_store.get_version("key1")[1], data_store.get_version("key2")[1]]
+        data_store.close()
+
+        restarted = DataStore(log_path=path)
+        self.assertEqual([restarted.get_version("key1")[1], restarted.get_version("key2")[1]], versions)
+        restarted.close()
+        print("Versions after restart - Test passed")
+
+
+class TestCompareAndSet(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.1)
+
+    def test_cas(self):
+        first = self.data_store.cas("counter", 0, 1)
+        self.assertIsNotNone(first)
+        self.assertIsNone(self.data_store.cas("counter", 0, 2))
+        second = self.data_store.cas("counter", first, 2)
+        self.assertGreater(second, first)
+        self.assertIsNone(self.data_store.cas("counter", first, 3))
+        self.assertEqual(self.data_store.get_version("counter"), (2, second))
+        print("Compare-and-set - Test passed")
+
+    def test_concurrent_increments_are_not_lost(self):
+        def increment(times):
+            for _ in range(times):
+                while True:
+                    value, version = self.data_store.get_version("counter")
+                    if self.data_store.cas("counter", version, (value or 0) + 1) is not None:
+                        break
+
+        threads = [threading.Thread(target=increment, args=(200,)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.data_store.get("counter", None), 800)
+        self.assertEqual(len(self.data_store.transaction_manager.lock_table), 0)
+        print("Concurrent compare-and-set - Test passed")
+
+
+class TestOptimisticTransactions(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore(lock_timeout=0.1)
+        self.transaction_manager = self.data_store.transaction_manager
+        self.data_store.put("balance", 100, None)
+
+    def test_no_locks_until_commit(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch(["balance"], transaction_id)
+        balance = self.data_store.get("balance", transaction_id)
+        self.data_store.put("balance", balance - 30, transaction_id)
+        self.data_store.mput([("audit", "withdrawal")], transaction_id)
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+        self.assertIsNone(self.transaction_manager.get_transaction_id_for_key("balance"))
+
+        # Another transaction is not blocked by the pending write
+        other = self.data_store.start_transaction()
+        self.data_store.put("other", "value", other)
+        self.data_store.commit_transaction(other)
+
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(self.data_store.get("balance", None), 70)
+        self.assertEqual(self.data_store.get("audit", None), "withdrawal")
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+        print("Optimistic commit - Test passed")
+
+    def test_changed_watched_key_aborts_the_commit(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch(["balance"], transaction_id)
+        self.data_store.put("audit", "read balance", transaction_id)
+        self.data_store.put("balance", 50, None)
+
+        with self.assertRaises(WriteConflictError):
+            self.data_store.commit_transaction(transaction_id)
+        self.assertFalse(self.data_store.has_transaction(transaction_id))
+        self.assertIsNone(self.data_store.get("audit", None))
+        self.assertEqual(self.data_store.get("balance", None), 50)
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+        print("Optimistic conflict on a watched key - Test passed")
+
+    def test_changed_written_key_aborts_the_commit(self):
+        first = self.data_store.start_transaction()
+        second = self.data_store.start_transaction()
+        for transaction_id in (first, second):
+            self.data_store.watch([], transaction_id)
+            self.data_store.put("balance", transaction_id, transaction_id)
+        self.data_store.commit_transaction(second)
+        with self.assertRaises(WriteConflictError):
+            self.data_store.commit_transaction(first)
+        self.assertEqual(self.data_store.get("balance", None), second)
+        print("Optimistic conflict on a written key - Test passed")
+
+    def test_locked_key_aborts_the_commit(self):
+        holder = self.data_store.start_transaction()
+        self.data_store.put("balance", 0, holder)
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch(["balance"], transaction_id)
+        self.data_store.put("audit", "read balance", transaction_id)
+
+        with self.assertRaises(WriteConflictError):
+            self.data_store.commit_transaction(transaction_id)
+        self.data_store.commit_transaction(holder)
+        self.assertEqual(self.data_store.get("balance", None), 0)
+        print("Optimistic conflict with a lock holder - Test passed")
+
+    def test_rollback_leaves_concurrent_commits_alone(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch(["balance"], transaction_id)
+        self.data_store.put("balance", 0, transaction_id)
+        self.data_store.put("balance", 500, None)
+        self.data_store.rollback_transaction(transaction_id)
+        self.assertEqual(self.data_store.get("balance", None), 500)
+        print("Optimistic rollback - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+import random
+import time
+import unittest
+from unittest import mock
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.ordered_index import START_CURSOR, OrderedKeyIndex, decode_cursor, encode_cursor
+from server.data_store.sharding.shard import Shard
+
+
+class TestOrderedKeyIndex(unittest.TestCase):
+
+    def test_matches_a_sorted_set(self):
+        generator = random.Random(7)
+        index = OrderedKeyIndex([f"key{i:05d}" for i in range(0, 3000, 3)])
+        expected = {f"key{i:05d}" for i in range(0, 3000, 3)}
+        for _ in range(20000):
+            key = f"key{generator.randrange(5000):05d}"
+            if generator.random() < 0.6:
+                index.add(key)
+                expected.add(key)
+            else:
+                index.discard(key)
+                expected.discard(key)
+        self.assertEqual(list(index.keys_from("")), sorted(expected))
+        self.assertEqual(len(index), len(expected))
+        self.assertGreater(len(index.blocks), 1)
+        probe = sorted(expected)[100]
+        self.assertIn(probe, index)
+        self.assertEqual(next(index.keys_from(probe)), probe)
+        self.assertEqual(next(index.keys_from(probe, inclusive=False)), sorted(expected)[101])
+        print("Ordered index operations - Test passed")
+
+    def test_iteration_survives_concurrent_changes(self):
+        index = OrderedKeyIndex(f"key{i:05d}" for i in range(3000))
+        seen = []
+        for key in index.keys_from("key00000"):
+            seen.append(key)
+            if len(seen) == 500:
+                for i in range(3000, 6000):
+                    index.add(f"key{i:05d}")
+                for i in range(0, 1500):
+                    index.discard(f"key{i:05d}")
+        self.assertEqual(seen, sorted(set(seen)))
+        self.assertEqual(seen[-1], "key05999")
+        print("Ordered index concurrent changes - Test passed")
+
+    def test_cursor_round_trip(self):
+        self.assertEqual(decode_cursor(encode_cursor("tenant:1/ü")), "tenant:1/ü")
+        self.assertIsNone(decode_cursor(START_CURSOR))
+        self.assertEqual(encode_cursor(None), START_CURSOR)
+        with self.assertRaises(ValueError):
+            decode_cursor("xyz")
+        print("Scan cursors - Test passed")
+
+
+class TestScans(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore([Shard() for _ in range(4)], ordered_index=True)
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(f"tenant:{tenant}:user:{user:03d}", f"{tenant}-{user}")
+                              for tenant in range(3) for user in range(25)], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def _scan_all(self, prefix, count):
+        cursor, pages = START_CURSOR, []
+        while True:
+            cursor, pairs = self.data_store.scan(prefix, cursor, count)
+            pages.append(pairs)
+            if cursor == START_CURSOR:
+                return pages
+
+    def test_prefix_scan_pages(self):
+        pages = self._scan_all("tenant:1:", 10)
+        self.assertEqual([len(page) for page in pages], [10, 10, 5])
+        keys = [key for page in pages for key, _ in page]
+        self.assertEqual(keys, [f"tenant:1:user:{user:03d}" for user in range(25)])
+        self.assertEqual(pages[0][0], ("tenant:1:user:000", "1-0"))
+        self.assertEqual(self.data_store.scan("tenant:9:"), (START_CURSOR, []))
+        print("Prefix scan - Test passed")
+
+    def test_scan_sees_committed_keys_only(self):
+        writer = self.data_store.start_transaction()
+        self.data_store.put("tenant:1:user:100", "pending", writer)
+        self.data_store.delete("tenant:1:user:000", writer)
+        keys = [key for page in self._scan_all("tenant:1:", 100) for key, _ in page]
+        self.assertIn("tenant:1:user:000", keys)
+        self.assertNotIn("tenant:1:user:100", keys)
+
+        self.data_store.commit_transaction(writer)
+        keys = [key for page in self._scan_all("tenant:1:", 100) for key, _ in page]
+        self.assertNotIn("tenant:1:user:000", keys)
+        self.assertEqual(keys[-1], "tenant:1:user:100")
+        print("Scan isolation - Test passed")
+
+    def test_scan_skips_expired_keys(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("tenant:2:user:001", "short", transaction_id, ttl=5)
+        self.data_store.commit_transaction(transaction_id)
+        with mock.patch('time.time', return_value=time.time() + 10):
+            keys = [key for page in self._scan_all("tenant:2:", 100) for key, _ in page]
+        self.assertEqual(len(keys), 24)
+        self.assertNotIn("tenant:2:user:001", keys)
+        print("Scan and expiry - Test passed")
+
+    def test_range_pages(self):
+        next_start, pairs = self.data_store.range_scan("tenant:0:user:020", "tenant:1:user:003", 6)
+        self.assertEqual([key for key, _ in pairs], [f"tenant:0:user:{user:03d}" for user in range(20, 25)]
+                         + ["tenant:1:user:000"])
+        self.assertEqual(next_start, "tenant:1:user:001")
+        next_start, pairs = self.data_store.range_scan(next_start, "tenant:1:user:003", 6)
+        self.assertEqual([key for key, _ in pairs], ["tenant:1:user:001", "tenant:1:user:002"])
+        self.assertIsNone(next_start)
+        print("Range pages - Test passed")
+
+    def test_scan_during_resharding_has_no_duplicates(self):
+        cursor, pairs = self.data_store.scan("tenant:", START_CURSOR, 20)
+        keys = [key for key, _ in pairs]
+        self.data_store.add_shard(batch_size=1)
+        while cursor != START_CURSOR:
+            cursor, pairs = self.data_store.scan("tenant:", cursor, 20)
+            keys.extend(key for key, _ in pairs)
+        self.data_store.wait_for_migration()
+        self.assertEqual(keys, sorted(f"tenant:{tenant}:user:{user:03d}" for tenant in range(3) for user in range(25)))
+        print("Scan during resharding - Test passed")
+
+    def test_scans_need_the_index(self):
+        with self.assertRaises(ValueError):
+            DataStore().scan("tenant:")
+        print("Scan without index - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
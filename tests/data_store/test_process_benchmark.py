@@ -0,0 +1,50 @@
+import os
+import threading
+import time
+import unittest
+from server.data_store.workers.process_data_store import ProcessDataStore
+
+
+class TestProcessBenchmark(unittest.TestCase):
+    """Measures how throughput grows with the number of shard worker processes."""
+    NUM_CLIENTS = 8
+    ROUNDS = 20
+    BATCH = 200
+
+    def _measure(self, num_workers: int) -> float:
+        """Runs NUM_CLIENTS threads of batch transactions and returns the keys processed per second."""
+        data_store = ProcessDataStore(num_workers=num_workers)
+        try:
+            def client(index):
+                keys = [f"client{index}-key{i}" for i in range(self.BATCH)]
+                for round_number in range(self.ROUNDS):
+                    transaction_id = data_store.start_transaction()
+                    data_store.mput([(key, round_number) for key in keys], transaction_id)
+                    data_store.commit_transaction(transaction_id)
+                    data_store.mget(keys, None)
+
+            threads = [threading.Thread(target=client, args=(index,)) for index in range(self.NUM_CLIENTS)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            data_store.close()
+        return 2 * self.NUM_CLIENTS * self.ROUNDS * self.BATCH / elapsed
+
+    def test_throughput_scales_with_workers(self):
+        rates = {}
+        for num_workers in (1, 2, 4):
+            rates[num_workers] = self._measure(num_workers)
+            print(f"{num_workers} workers: {rates[num_workers]:,.0f} keys/s")
+        if (os.cpu_count() or 1) >= 4:
+            self.assertGreater(rates[4], 2 * rates[1])
+            print("Worker scaling - Test passed")
+        else:
+            print(f"Worker scaling not asserted: only {os.cpu_count()} CPU(s) available")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import unittest
+from server.data_store.concurrency.locking import LockTimeoutError
+from server.data_store.sharding.ordered_index import START_CURSOR
+from server.data_store.transactions.transaction import TransactionAbortedError, WriteConflictError
+from server.data_store.workers.process_data_store import ProcessDataStore
+
+
+class TestProcessDataStore(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = ProcessDataStore(num_workers=2, lock_timeout=0.2)
+        # Two keys owned by different workers
+        keys = [f"key{i}" for i in range(100)]
+        groups = self.data_store._group_by_worker(keys)
+        self.first, self.second = groups[0][0], groups[1][0]
+
+    def tearDown(self):
+        self.data_store.close()
+
+    def test_single_worker_transaction(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put(self.first, "value", transaction_id)
+        self.assertEqual(self.data_store.get(self.first, transaction_id), "value")
+        self.assertEqual(len(self.data_store.transactions[transaction_id]), 1)
+        self.data_store.commit_transaction(transaction_id)
+
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get(self.first, reader), "value")
+        print("Single-worker commit - Test passed")
+
+    def test_cross_worker_two_phase_commit(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(self.first, "a"), (self.second, "b")], transaction_id)
+        self.assertEqual(len(self.data_store.transactions[transaction_id]), 2)
+        self.data_store.commit_transaction(transaction_id)
+
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.mget([self.second, self.first, "missing"], reader), ["b", "a", None])
+        data = self.data_store.show_all()
+        self.assertEqual({key: entry['value'] for key, entry in data.items()}, {self.first: "a", self.second: "b"})
+        print("Two-phase commit - Test passed")
+
+    def test_show_all_pages(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(f"key{i}", f"value{i}") for i in range(30)], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        writer = self.data_store.start_transaction()
+        self.data_store.put(self.second, "pending", writer)
+
+        pages = list(self.data_store.show_all_pages(page_size=4))
+        self.assertTrue(all(0 < len(page) <= 4 for page in pages))
+        data = {key: entry for page in pages for key, entry in page.items()}
+        self.assertEqual({key: entry['value'] for key, entry in data.items()},
+                         {f"key{i}": f"value{i}" for i in range(30)})
+        self.assertEqual(data[self.second]['transaction_id'], writer)
+
+        abandoned = self.data_store.show_all_pages(page_size=4)
+        next(abandoned)
+        abandoned.close()
+        self.assertEqual(len(pages), sum(1 for _ in self.data_store.show_all_pages(page_size=4)))
+        print("Paged SHOWALL across workers - Test passed")
+
+    def test_rollback_spans_workers(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(self.first, "a"), (self.second, "b")], transaction_id)
+        self.data_store.rollback_transaction(transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.mget([self.first, self.second], reader), [None, None])
+        print("Cross-worker rollback - Test passed")
+
+    def test_finished_transaction_is_rejected(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put(self.first, "a", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        for operation in (lambda: self.data_store.put(self.first, "stale", transaction_id),
+                          lambda: self.data_store.get(self.first, transaction_id),
+                          lambda: self.data_store.mget([self.first, self.second], transaction_id),
+                          lambda: self.data_store.incr(self.second, 1, transaction_id)):
+            with self.assertRaises(TransactionAbortedError):
+                operation()
+        self.assertEqual(self.data_store.mget([self.first, self.second], None), ["a", None])
+        print("Finished transaction ID - Test passed")
+
+    def test_lock_conflicts_are_reported(self):
+        holder = self.data_store.start_transaction()
+        waiter = self.data_store.start_transaction()
+        self.data_store.put(self.first, "held", holder)
+        with self.assertRaises(LockTimeoutError):
+            self.data_store.put(self.first, "waiting", waiter)
+        print("Worker lock timeout - Test passed")
+
+    def test_counters(self):
+        self.assertEqual(self.data_store.incr(self.first, 2, None), 2)
+        transaction_id = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.incr(self.first, 3, transaction_id), 5)
+        self.assertEqual(self.data_store.append(self.second, b"ab", transaction_id), 2)
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(self.data_store.mget([self.first, self.second], None), [b"5", b"ab"])
+        print("Counters on workers - Test passed")
+
+    def test_compare_and_set(self):
+        version = self.data_store.cas(self.first, 0, "a")
+        self.assertEqual(self.data_store.get_version(self.first), ("a", version))
+        self.assertIsNone(self.data_store.cas(self.first, 0, "b"))
+        self.assertIsNotNone(self.data_store.cas(self.first, version, "b"))
+        print("Compare-and-set on a worker - Test passed")
+
+    def test_optimistic_two_phase_commit(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch([self.first], transaction_id)
+        self.data_store.put(self.second, "b", transaction_id)
+        self.data_store.put(self.first, "changed", None)
+        with self.assertRaises(TransactionAbortedError):
+            self.data_store.commit_transaction(transaction_id)
+        self.assertIsNone(self.data_store.get(self.second, None))
+
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch([self.first], transaction_id)
+        self.data_store.mput([(self.first, "a"), (self.second, "b")], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(self.data_store.mget([self.first, self.second], None), ["a", "b"])
+
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.watch([self.first], transaction_id)
+        self.data_store.put(self.first, "c", None)
+        with self.assertRaises(WriteConflictError):
+            self.data_store.commit_transaction(transaction_id)
+        print("Optimistic transactions across workers - Test passed")
+
+    def test_failed_participant_aborts_the_transaction(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(self.first, "a"), (self.second, "b")], transaction_id)
+        self.data_store.workers[1].process.terminate()
+        self.data_store.workers[1].process.join()
+
+        with self.assertRaises(TransactionAbortedError):
+            self.data_store.commit_transaction(transaction_id)
+        reader = self.data_store.start_transaction()
+        self.assertIsNone(self.data_store.get(self.first, reader))
+        print("Aborted two-phase commit - Test passed")
+
+
+class TestProcessDataStoreScans(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = ProcessDataStore(num_workers=2, ordered_index=True)
+        self.keys = [f"k{i:03d}" for i in range(40)]
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.mput([(key, key) for key in self.keys], transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def tearDown(self):
+        self.data_store.close()
+
+    def test_range_pages_cover_every_key(self):
+        for limit in (1, 3, 7, 40):
+            keys, next_start = [], "k"
+            while next_start is not None:
+                next_start, pairs = self.data_store.range_scan(next_start, "kz", limit)
+                self.assertLessEqual(len(pairs), limit)
+                keys.extend(key for key, _ in pairs)
+            self.assertEqual(keys, self.keys)
+        print("Range pages across workers - Test passed")
+
+    def test_scan_pages_cover_every_key(self):
+        for count in (1, 3, 7, 40):
+            cursor, pairs = self.data_store.scan("k", START_CURSOR, count)
+            keys = [key for key, _ in pairs]
+            while cursor != START_CURSOR:
+                cursor, pairs = self.data_store.scan("k", cursor, count)
+                keys.extend(key for key, _ in pairs)
+            self.assertEqual(keys, self.keys)
+        print("Scan pages across workers - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
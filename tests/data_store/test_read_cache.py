@@ -0,0 +1,65 @@
+import unittest
+from server.caching.caching_strategy import LRUCache
+from server.data_store.data_store import DataStore
+
+
+class TestReadCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(capacity=100)
+        self.data_store = DataStore(caching_strategy=self.cache)
+
+    def _commit(self, key, value):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put(key, value, transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+    def test_get_reads_through_cache(self):
+        self._commit("key1", "value1")
+        transaction_id = self.data_store.start_transaction()
+
+        self.assertEqual(self.data_store.get("key1", transaction_id), "value1")
+        self.assertEqual(self.data_store.get("key1", transaction_id), "value1")
+        self.assertEqual(self.cache.stats()['misses'], 1)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        print("Read-through cache - Test passed")
+
+    def test_uncommitted_values_are_not_cached(self):
+        self._commit("key1", "value1")
+        writer = self.data_store.start_transaction()
+        self.data_store.put("key1", "uncommitted", writer)
+
+        reader = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        self.assertNotIn("uncommitted", self.cache.cache.values())
+        print("Uncommitted values not cached - Test passed")
+
+    def test_commit_invalidates_cache(self):
+        self._commit("key1", "value1")
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.get("key1", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+
+        self._commit("key1", "value2")
+        transaction_id = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key1", transaction_id), "value2")
+
+        self.data_store.delete("key1", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        transaction_id = self.data_store.start_transaction()
+        self.assertIsNone(self.data_store.get("key1", transaction_id))
+        print("Commit invalidates cache - Test passed")
+
+    def test_snapshot_reads_bypass_newer_cached_values(self):
+        self._commit("key1", "value1")
+        reader = self.data_store.start_transaction()
+        self._commit("key1", "value2")
+
+        other = self.data_store.start_transaction()
+        self.assertEqual(self.data_store.get("key1", other), "value2")
+        self.assertEqual(self.data_store.get("key1", reader), "value1")
+        print("Snapshot reads bypass cache - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
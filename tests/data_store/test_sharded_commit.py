@@ -0,0 +1,63 @@
+import time
+import unittest
+from server.data_store.data_store import DataStore
+from server.data_store.sharding.shard import Shard
+
+
+class TestShardedCommit(unittest.TestCase):
+    NUM_KEYS = 2000
+
+    def _commit_keys(self, num_shards: int):
+        """Commits NUM_KEYS keys in one transaction and returns the data store and the commit time."""
+        data_store = DataStore([Shard() for _ in range(num_shards)])
+        transaction_id = data_store.start_transaction()
+        for i in range(self.NUM_KEYS):
+            data_store.put(f"key{i}", f"value{i}", transaction_id)
+
+        start = time.perf_counter()
+        data_store.commit_transaction(transaction_id)
+        elapsed = time.perf_counter() - start
+        return data_store, elapsed
+
+    def test_commit_writes_each_key_to_owning_shard_only(self):
+        data_store, _ = self._commit_keys(10)
+
+        stored = sum(len(shard.storage) for shard in data_store.sharding_manager.shards)
+        self.assertEqual(stored, self.NUM_KEYS)
+        for i in range(self.NUM_KEYS):
+            key = f"key{i}"
+            self.assertEqual(data_store.get_shard(key).storage[key], f"value{i}")
+        self.assertEqual(len(data_store.show_all()), self.NUM_KEYS)
+        print("Commit to owning shard - Test passed")
+
+    def test_rollback_touches_owning_shard_only(self):
+        data_store, _ = self._commit_keys(10)
+
+        transaction_id = data_store.start_transaction()
+        data_store.put("key0", "changed", transaction_id)
+        data_store.put("new_key", "new_value", transaction_id)
+        data_store.rollback_transaction(transaction_id)
+
+        stored = sum(len(shard.storage) for shard in data_store.sharding_manager.shards)
+        self.assertEqual(stored, self.NUM_KEYS)
+        self.assertEqual(data_store.get_shard("key0").storage["key0"], "value0")
+        print("Rollback to owning shard - Test passed")
+
+    def test_commit_cost_and_memory_flat_across_shard_counts(self):
+        """Regression benchmark: commit time and stored entries must not scale with the shard count."""
+        results = {}
+        for num_shards in (1, 10, 100):
+            data_store, elapsed = self._commit_keys(num_shards)
+            stored = sum(len(shard.storage) for shard in data_store.sharding_manager.shards)
+            results[num_shards] = (elapsed, stored)
+            print(f"{num_shards:>4} shards: commit {elapsed * 1000:.2f} ms, {stored} stored entries")
+
+        for elapsed, stored in results.values():
+            self.assertEqual(stored, self.NUM_KEYS)
+        # Writing into every shard would make 100 shards ~100x slower than 1; allow generous noise.
+        self.assertLess(results[100][0], results[1][0] * 10 + 0.01)
+        print("Commit cost flat across shard counts - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
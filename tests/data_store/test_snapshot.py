@@ -0,0 +1,149 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from server.data_store.data_store import DataStore
+from server.data_store.persistence.append_only_log import read_records
+from server.data_store.persistence.snapshot import read_snapshot, write_snapshot
+from server.data_store.sharding.shard import Shard
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.directory, "store.log")
+        self.snapshot_path = os.path.join(self.directory, "store.snapshot")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _open(self, **kwargs):
+        return DataStore(log_path=self.log_path, snapshot_path=self.snapshot_path, **kwargs)
+
+    def _commit(self, data_store, writes=(), deletes=()):
+        transaction_id = data_store.start_transaction()
+        for key, value in writes:
+            data_store.put(key, value, transaction_id)
+        for key in deletes:
+            data_store.delete(key, transaction_id)
+        data_store.commit_transaction(transaction_id)
+
+    def test_snapshot_truncates_the_log(self):
+        data_store = self._open()
+        for i in range(50):
+            self._commit(data_store, [(f"key{i}", i)])
+        self._commit(data_store, deletes=["key0"])
+        self.assertEqual(data_store.snapshot(), 51)
+        self.assertEqual(read_records(self.log_path)[0], [])
+
+        self._commit(data_store, [("key1", "after")])
+        data_store.close()
+
+        timestamp, chunks = read_snapshot(self.snapshot_path)
+        self.assertEqual(timestamp, 51)
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 49)
+        self.assertEqual([record[0] for record in read_records(self.log_path)[0]], [52])
+
+        restarted = self._open()
+        reader = restarted.start_transaction()
+        self.assertIsNone(restarted.get("key0", reader))
+        self.assertEqual(restarted.get("key1", reader), "after")
+        self.assertEqual(restarted.get("key49", reader), 49)
+        self.assertEqual(restarted.transaction_manager.commit_timestamp, 52)
+        restarted.close()
+        print("Snapshot and log tail - Test passed")
+
+    def test_snapshot_is_consistent_while_writers_commit(self):
+        """Tests that a snapshot sees each transaction's changes completely or not at all."""
+        data_store = self._open(shards=[Shard() for _ in range(4)])
+        self._commit(data_store, [(f"key{i}", 0) for i in range(100)])
+        stop = threading.Event()
+
+        def writer():
+            round_number = 0
+            while not stop.is_set():
+                round_number += 1
+                self._commit(data_store, [(f"key{i}", round_number) for i in range(100)])
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            for _ in range(5):
+                data_store.snapshot()
+                _, chunks = read_snapshot(self.snapshot_path)
+                values = {value for chunk in chunks for _, value in chunk}
+                self.assertEqual(len(values), 1)
+        finally:
+            stop.set()
+            thread.join()
+        data_store.close()
+
+        restarted = self._open()
+        reader = restarted.start_transaction()
+        self.assertEqual(len(set(restarted.mget([f"key{i}" for i in range(100)], reader))), 1)
+        restarted.close()
+        print("Consistent online snapshot - Test passed")
+
+    def test_log_records_covered_by_the_snapshot_are_skipped(self):
+        """Tests restarting after a snapshot was written but before the log was truncated."""
+        data_store = DataStore(snapshot_path=self.snapshot_path, log_path=self.log_path)
+        self._commit(data_store, [("counter", 1)])
+        self._commit(data_store, [("counter", 2)])
+        data_store.commit_log.truncate = lambda commit_timestamp: None
+        data_store.snapshot()
+        self._commit(data_store, [("other", 3)])
+        data_store.close()
+
+        restarted = self._open()
+        reader = restarted.start_transaction()
+        self.assertEqual(restarted.mget(["counter", "other"], reader), [2, 3])
+        self.assertEqual(restarted.transaction_manager.commit_timestamp, 3)
+        restarted.close()
+        print("Untruncated log replay - Test passed")
+
+    def test_background_snapshots(self):
+        data_store = self._open(snapshot_interval=0.05)
+        self._commit(data_store, [("key", "value")])
+        for _ in range(100):
+            if os.path.exists(self.snapshot_path) and read_snapshot(self.snapshot_path)[0] == 1:
+                break
+            threading.Event().wait(0.05)
+        data_store.close()
+        timestamp, chunks = read_snapshot(self.snapshot_path)
+        self.assertEqual(timestamp, 1)
+        self.assertEqual(list(chunks), [[("key", "value")]])
+        self.assertEqual(read_records(self.log_path)[0], [])
+        print("Background snapshots - Test passed")
+
+    def test_slow_snapshot_is_not_an_idle_transaction(self):
+        data_store = self._open(idle_timeout=0.2)
+        self._commit(data_store, [("key", "old")])
+        during = {}
+
+        def slow_write(path, commit_timestamp, items):
+            # Versions the snapshot reads must survive commits and garbage collection while it is written
+            threading.Event().wait(0.6)
+            self._commit(data_store, [("key", "new")])
+            data_store.transaction_manager.collect_garbage(data_store.sharding_manager)
+            during.update(data_store.transaction_stats())
+            return write_snapshot(path, commit_timestamp, items)
+
+        with mock.patch('server.data_store.data_store.write_snapshot', slow_write):
+            self.assertEqual(data_store.snapshot(), 1)
+        self.assertEqual(during, {'active_transactions': 0, 'reaped_transactions': 0})
+        self.assertEqual(data_store.transaction_manager.active_snapshots, {})
+        self.assertEqual(list(read_snapshot(self.snapshot_path)[1]), [[("key", "old")]])
+        data_store.close()
+        print("Slow snapshot and idle reaping - Test passed")
+
+    def test_snapshot_requires_a_path(self):
+        with self.assertRaises(ValueError):
+            DataStore().snapshot()
+        print("Snapshot without a path - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
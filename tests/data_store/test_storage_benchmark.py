@@ -0,0 +1,32 @@
+import tracemalloc
+import unittest
+from server.data_store.sharding.compact_storage import CompactStorage
+
+
+class TestStorageBenchmark(unittest.TestCase):
+    """Measures the memory each shard storage backend needs per small key/value pair."""
+    NUM_KEYS = 50_000
+
+    def _bytes_per_key(self, storage) -> float:
+        """Fills a storage with small keys and values and returns the bytes allocated per key."""
+        tracemalloc.start()
+        try:
+            start, _ = tracemalloc.get_traced_memory()
+            for i in range(self.NUM_KEYS):
+                storage[f"tenant:{i % 100}:user:{i:08d}"] = b"session-%d" % i
+            end, _ = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return (end - start) / self.NUM_KEYS
+
+    def test_bytes_per_key(self):
+        payload = len(f"tenant:00:user:{0:08d}") + len(b"session-00000")
+        dict_usage = self._bytes_per_key({})
+        compact_usage = self._bytes_per_key(CompactStorage())
+        print(f"payload: ~{payload} bytes/key, dict: {dict_usage:.0f} bytes/key, compact: {compact_usage:.0f} bytes/key")
+        self.assertLess(compact_usage, 0.6 * dict_usage)
+        print("Compact storage memory - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import threading
+import time
+import unittest
+from server.data_store.concurrency.locking import LockType
+from server.data_store.data_store import DataStore
+from server.data_store.transactions.transaction import TransactionAbortedError
+
+
+class TestTransactionManager(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = DataStore()
+        self.transaction_manager = self.data_store.transaction_manager
+
+    def test_transaction_records_held_locks(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("key1", "value1", transaction_id)
+        self.data_store.delete("key2", transaction_id)
+
+        transaction = self.transaction_manager.transactions[transaction_id]
+        self.assertEqual(set(transaction.held_locks), {"key1", "key2"})
+        print("Held locks recorded - Test passed")
+
+    def test_commit_and_rollback_prune_free_locks(self):
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("key1", "value1", transaction_id)
+        self.data_store.commit_transaction(transaction_id)
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+
+        transaction_id = self.data_store.start_transaction()
+        self.data_store.put("key2", "value2", transaction_id)
+        self.data_store.rollback_transaction(transaction_id)
+        self.assertEqual(len(self.transaction_manager.lock_table), 0)
+        print("Free locks pruned - Test passed")
+
+    def test_release_keeps_locks_shared_with_other_transactions(self):
+        first = self.data_store.start_transaction()
+        second = self.data_store.start_transaction()
+        self.transaction_manager.acquire_lock("shared", LockType.READ, first)
+        self.transaction_manager.acquire_lock("shared", LockType.READ, second)
+
+        self.data_store.commit_transaction(first)
+
+        self.assertEqual(self.transaction_manager.lock_table.get("shared").holders, {second})
+        self.data_store.commit_transaction(second)
+        self.assertIsNone(self.transaction_manager.lock_table.get("shared"))
+        print("Shared lock kept until last holder releases - Test passed")
+
+    def test_key_owners_follow_uncommitted_changes(self):
+        writer = self.data_store.start_transaction()
+        self.data_store.put("key1", "value1", writer)
+        self.data_store.delete("key2", writer)
+        self.assertEqual(self.transaction_manager.get_transaction_id_for_key("key1"), writer)
+        self.assertEqual(self.transaction_manager.get_transaction_id_for_key("key2"), writer)
+        self.data_store.commit_transaction(writer)
+        self.assertIsNone(self.transaction_manager.get_transaction_id_for_key("key1"))
+
+        writer = self.data_store.start_transaction()
+        self.data_store.put("key1", "value2", writer)
+        self.data_store.rollback_transaction(writer)
+        self.assertEqual(self.transaction_manager.key_owners, {})
+        print("Key owners index - Test passed")
+
+    def test_finished_transactions_are_removed(self):
+        committed = self.data_store.start_transaction()
+        rolled_back = self.data_store.start_transaction()
+        self.data_store.put("key1", "value1", committed)
+        self.assertEqual(self.transaction_manager.active_count(), 2)
+        self.data_store.commit_transaction(committed)
+        self.data_store.rollback_transaction(rolled_back)
+
+        self.assertEqual(self.transaction_manager.active_count(), 0)
+        self.assertEqual(self.transaction_manager.active_snapshots, {})
+        self.assertFalse(self.data_store.has_transaction(committed))
+        with self.assertRaises(TransactionAbortedError):
+            self.data_store.put("key1", "value2", committed)
+        print("Finished transactions removed - Test passed")
+
+
+class TestIdleTransactions(unittest.TestCase):
+
+    def test_idle_transactions_are_reaped(self):
+        data_store = DataStore(idle_timeout=0.2)
+        self.addCleanup(data_store.close)
+        idle = data_store.start_transaction()
+        busy = data_store.start_transaction()
+        data_store.put("key1", "value1", idle)
+        deadline = time.time() + 5
+        while data_store.has_transaction(idle) and time.time() < deadline:
+            data_store.get("key2", busy)
+            time.sleep(0.02)
+
+        self.assertFalse(data_store.has_transaction(idle))
+        self.assertTrue(data_store.has_transaction(busy))
+        self.assertEqual(data_store.transaction_stats(), {'active_transactions': 1, 'reaped_transactions': 1})
+        data_store.put("key1", "value2", busy)  # The reaped transaction's lock is free
+        print("Idle transactions reaped - Test passed")
+
+    def test_transaction_reaped_while_waiting_gives_up_its_lock(self):
+        data_store = DataStore(lock_timeout=5)
+        holder = data_store.start_transaction()
+        waiter = data_store.start_transaction()
+        data_store.put("key1", "value1", holder)
+        errors = []
+
+        def wait_for_lock():
+            try:
+                data_store.put("key1", "value2", waiter)
+            except TransactionAbortedError as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=wait_for_lock)
+        thread.start()
+        time.sleep(0.1)
+        data_store.rollback_transaction(waiter)
+        data_store.commit_transaction(holder)
+        thread.join(timeout=5)
+
+        self.assertEqual(len(errors), 1)
+        self.assertIsNone(data_store.transaction_manager.lock_table.get("key1"))
+        print("Reaped waiter gives up its lock - Test passed")
+
+
+if __name__ == '__main__':
+    unittest.main()
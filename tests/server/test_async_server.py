@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from server.core.async_server import AsyncServer
+from server.data_store.workers.process_data_store import ProcessDataStore
+from client.client import Client
+
+
+class TestAsyncServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = AsyncServer(port=9002)
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+        self.client = Client(port=9002)
+        self.client.connect()
+
+    def test_commands(self):
+        """Tests that the asyncio server processes commands like the threaded server."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+
+        response = self.client.send_command(f"PUT key1 value1 {transaction_id}")
+        self.assertEqual(response['status'], 'Ok')
+        response = self.client.send_command(f"GET key1 {transaction_id}")
+        self.assertEqual(response['result'], 'value1')
+        response = self.client.send_command(f"COMMIT {transaction_id}")
+        self.assertEqual(response['status'], 'Ok')
+        response = self.client.send_command("GET key1")
+        self.assertEqual(response['result'], 'value1')
+
+    def test_pipelined_commands(self):
+        """Tests that pipelined commands get their responses back in order."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        commands = [f"PUT key{i} {'v' * 5000}{i} {transaction_id}" for i in range(50)]
+        commands += [f"GET key{i} {transaction_id}" for i in range(50)]
+
+        responses = self.client.send_many(commands)
+        self.assertEqual([response['result'] for response in responses[50:]], [f"{'v' * 5000}{i}" for i in range(50)])
+
+    def test_disconnect_rolls_back_open_transactions(self):
+        """Tests that the asyncio server rolls back the transactions of a closed connection."""
+        other = Client(port=9002)
+        other.connect()
+        transaction_id = other.send_command("BEGIN")['transaction_id']
+        other.send_command(f"PUT key1 abandoned {transaction_id}")
+        other.disconnect()
+
+        deadline = time.time() + 5
+        while self.server.data_store.has_transaction(transaction_id) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.server.data_store.has_transaction(transaction_id))
+        self.assertIsNone(self.server.data_store.transaction_manager.lock_table.get("key1"))
+
+    def tearDown(self):
+        self.client.disconnect()
+        self.server.stop()
+        self.server_thread.join()
+
+
+class TestAsyncServerWithWorkers(unittest.TestCase):
+
+    def setUp(self):
+        self.data_store = ProcessDataStore(num_workers=2)
+        self.server = AsyncServer(port=9014, data_store=self.data_store)
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+        self.client = Client(port=9014)
+        self.client.connect()
+
+    def test_worker_round_trips_run_off_the_event_loop(self):
+        self.assertEqual(self.server.non_blocking_actions, {"BEGIN"})
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.client.send_many([f"PUT key{i} value{i} {transaction_id}" for i in range(20)])
+        self.assertEqual(self.client.send_command(f"COMMIT {transaction_id}")['status'], 'Ok')
+
+        slow_get = self.data_store.get
+
+        def get(key, transaction_id):
+            time.sleep(0.5)
+            return slow_get(key, transaction_id)
+
+        other = Client(port=9014)
+        other.connect()
+        with mock.patch.object(self.data_store, 'get', get):
+            reader = threading.Thread(target=other.send_command, args=("GET key1",))
+            reader.start()
+            time.sleep(0.1)
+            start = time.perf_counter()
+            transaction_id = self.client.send_command("BEGIN")['transaction_id']
+            response = self.client.send_command(f"MGET key1 key19 {transaction_id}")
+            self.assertLess(time.perf_counter() - start, 0.3)
+            self.assertEqual(response['result'], ["value1", "value19"])
+            reader.join()
+        other.disconnect()
+        print("Worker round trips off the event loop - Test passed")
+
+    def test_disconnect_rolls_back_open_transactions(self):
+        other = Client(port=9014)
+        other.connect()
+        transaction_id = other.send_command("BEGIN")['transaction_id']
+        other.send_command(f"PUT key1 abandoned {transaction_id}")
+        other.disconnect()
+
+        deadline = time.time() + 5
+        while self.data_store.has_transaction(transaction_id) and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(self.data_store.has_transaction(transaction_id))
+        self.assertIsNone(self.client.send_command("GET key1")['result'])
+        print("Worker rollback on disconnect - Test passed")
+
+    def tearDown(self):
+        self.client.disconnect()
+        self.server.stop()
+        self.server_thread.join()
+        self.data_store.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import threading
+import time
+import unittest
+from server.core.server import Server
+from client.client import Client
+
+
+class TestBatchBenchmark(unittest.TestCase):
+    """Compares keys/sec of batch commands against one round trip per key."""
+    NUM_KEYS = 500
+
+    def setUp(self):
+        self.server = Server(port=9006)
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+    def tearDown(self):
+        self.server.stop()
+        self.server_thread.join()
+
+    def _measure(self, protocol: str):
+        client = Client(port=9006, protocol=protocol)
+        client.connect()
+        try:
+            transaction_id = client.send_command("BEGIN")['transaction_id']
+            keys = [f"{protocol}{i}" for i in range(self.NUM_KEYS)]
+
+            start = time.perf_counter()
+            for key in keys:
+                client.request("PUT", key, "value", transaction_id)
+            for key in keys:
+                client.request("GET", key, transaction_id=transaction_id)
+            single_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            client.mput({key: "value" for key in keys}, transaction_id)
+            result = client.mget(keys, transaction_id)['result']
+            batch_seconds = time.perf_counter() - start
+            self.assertEqual(len(result), self.NUM_KEYS)
+        finally:
+            client.disconnect()
+        return 2 * self.NUM_KEYS / single_seconds, 2 * self.NUM_KEYS / batch_seconds
+
+    def test_batch_is_faster_than_single_commands(self):
+        for protocol in ('text', 'binary'):
+            single_rate, batch_rate = self._measure(protocol)
+            print(f"{protocol:>6}: single {single_rate:,.0f} keys/s, batch {batch_rate:,.0f} keys/s")
+            self.assertGreater(batch_rate, single_rate)
+        print("Batch vs single commands - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
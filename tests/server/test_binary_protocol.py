@@ -0,0 +1,229 @@
+import threading
+import time
+import unittest
+from server.core.async_server import AsyncServer
+from server.core.binary_protocol import (REQUEST_HEADER, RESPONSE_HEADER, BinaryFrameBuffer, Opcode, decode_response,
+                                         encode_request, encode_response)
+from server.core.server import Server
+from server.data_store.data_store import DataStore
+from client.client import Client
+
+
+class TestBinaryFrames(unittest.TestCase):
+
+    def test_frames_split_across_reads(self):
+        payload = encode_request(Opcode.PUT, 7, b'key', b'a value\nwith\x00bytes')
+        payload += encode_request(Opcode.GET, 7, b'key')
+        frames = BinaryFrameBuffer(REQUEST_HEADER, 2)
+
+        self.assertEqual(frames.feed(payload[:5]), [])
+        self.assertEqual(frames.feed(payload[5:20]), [])
+        self.assertEqual(frames.feed(payload[20:]), [(Opcode.PUT, 7, b'key', b'a value\nwith\x00bytes'),
+                                                     (Opcode.GET, 7, b'key', b'')])
+        print("Binary frames split across reads - Test passed")
+
+    def test_oversized_frame_is_rejected(self):
+        frames = BinaryFrameBuffer(REQUEST_HEADER, 2, max_frame_length=1024)
+        with self.assertRaises(ValueError):
+            frames.feed(REQUEST_HEADER.pack(Opcode.PUT, 1, 3, 4096))
+        print("Oversized binary frame - Test passed")
+
+    def test_response_round_trip(self):
+        frames = BinaryFrameBuffer(RESPONSE_HEADER, 1)
+        cases = [
+            (Opcode.GET, {'status': 'Ok', 'result': b'\xff\xfe'}),
+            (Opcode.GET, {'status': 'Ok', 'result': None}),
+            (Opcode.GET, {'status': 'Ok', 'result': b''}),
+            (Opcode.BEGIN, {'status': 'Ok', 'transaction_id': 42}),
+            (Opcode.TTL, {'status': 'Ok', 'result': -2}),
+            (Opcode.CAS, {'status': 'Ok', 'result': 7}),
+            (Opcode.CAS, {'status': 'Ok', 'result': None}),
+            (Opcode.GETV, {'status': 'Ok', 'result': [b'\x00value', 7]}),
+            (Opcode.GETV, {'status': 'Ok', 'result': [None, 0]}),
+            (Opcode.EXPIRE, {'status': 'Ok', 'result': 1}),
+            (Opcode.PUT, {'status': 'Error', 'mesg': 'Invalid transaction ID 3'}),
+        ]
+        for opcode, response in cases:
+            with self.subTest(response=response):
+                (frame,) = frames.feed(encode_response(response))
+                self.assertEqual(decode_response(opcode, *frame), response)
+        print("Binary response round trip - Test passed")
+
+
+class TestBinaryServer(unittest.TestCase):
+    server_class = Server
+    port = 9003
+
+    def setUp(self):
+        self.server = self.server_class(port=self.port, data_store=DataStore(ordered_index=True))
+        self.server_thread = threading.Thread(target=self.server.start)
+        self.server_thread.start()
+        self.server.started.wait(timeout=5)
+
+        self.client = Client(port=self.port, protocol='binary')
+        self.client.connect()
+
+    def test_raw_bytes_values(self):
+        """Tests that values with spaces, newlines and non-UTF-8 bytes are stored and returned unchanged."""
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        value = b'hello world\n\x00\xff'
+        self.assertEqual(self.client.request("PUT", "key1", value, transaction_id)['status'], 'Ok')
+        self.assertEqual(self.client.request("GET", "key1", transaction_id=transaction_id)['result'], value)
+        self.assertIsNone(self.client.request("GET", "missing", transaction_id=transaction_id)['result'])
+        self.client.request("COMMIT", transaction_id=transaction_id)
+
+        self.assertEqual(self.server.data_store.get("key1", self.server.data_store.start_transaction()), value)
+        print("Binary values - Test passed")
+
+    def test_text_and_binary_clients_share_the_store(self):
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.client.send_command(f"PUT key1 value1 {transaction_id}")
+        self.assertEqual(self.client.send_command(f"COMMIT {transaction_id}")['status'], 'Ok')
+
+        text_client = Client(port=self.port)
+        text_client.connect()
+        try:
+            transaction_id = text_client.send_command("BEGIN")['transaction_id']
+            self.assertEqual(text_client.send_command(f"GET key1 {transaction_id}")['result'], 'value1')
+        finally:
+            text_client.disconnect()
+        print("Text and binary clients - Test passed")
+
+    def test_pipelined_requests_and_errors(self):
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        responses = self.client.send_many([f"PUT key{i} value{i} {transaction_id}" for i in range(100)]
+                                          + ["PUT missing-value", f"GET key7 {transaction_id}", "GET key7 999"])
+        self.assertTrue(all(response['status'] == 'Ok' for response in responses[:100]))
+        self.assertEqual(responses[100]['status'], 'Error')
+        self.assertEqual(responses[101]['result'], b'value7')
+        self.assertEqual(responses[102], {'status': 'Error', 'mesg': 'Invalid transaction ID 999'})
+        print("Binary pipelining - Test passed")
+
+    def test_batch_commands(self):
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        self.assertEqual(self.client.mput({"a": b"1 2", "b": b"\xff"}, transaction_id)['status'], 'Ok')
+        self.assertEqual(self.client.mdelete(["b"], transaction_id)['status'], 'Ok')
+        self.assertEqual(self.client.mget(["a", "b", "c"], transaction_id)['result'], [b"1 2", None, None])
+        print("Binary batch commands - Test passed")
+
+    def test_expiry_commands(self):
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        self.client.request("PUT", "session", b"abc", transaction_id)
+        self.assertEqual(self.client.request("EXPIRE", "session", 30, transaction_id)['result'], 1)
+        self.assertEqual(self.client.request("TTL", "session", transaction_id=transaction_id)['result'], 30)
+        self.assertEqual(self.client.request("EXPIRE", "missing", 30, transaction_id)['result'], 0)
+
+        responses = self.client.send_many([f"PUT token abc EX 30 {transaction_id}", f"TTL token {transaction_id}",
+                                           "PUT short xyz EX 1", f"PUT bad xyz EX 0 {transaction_id}"])
+        self.assertEqual([response['status'] for response in responses], ['Ok', 'Ok', 'Ok', 'Error'])
+        self.assertEqual(responses[1]['result'], 30)
+        self.assertEqual(self.client.request("PUTEX", "other", [30, b"\x00"], transaction_id)['status'], 'Ok')
+        self.assertEqual(self.client.request("TTL", "other", transaction_id=transaction_id)['result'], 30)
+        time.sleep(1.2)
+        self.assertIsNone(self.client.request("GET", "short")['result'])
+        print("Binary expiry commands - Test passed")
+
+    def test_scan_commands(self):
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        self.client.mput({f"user:{i}": f"v{i}".encode() for i in range(5)}, transaction_id)
+        self.client.request("COMMIT", transaction_id=transaction_id)
+
+        data = self.client.request("SCAN", "user:", ["0", 3])['data']
+        self.assertEqual([key for key, _ in data['items']], ["user:0", "user:1", "user:2"])
+        data = self.client.request("SCAN", "user:", [data['cursor'], 3])['data']
+        self.assertEqual(data, {'cursor': '0', 'items': [["user:3", "v3"], ["user:4", "v4"]]})
+        data = self.client.send_command("RANGE user:1 user:3 5")['data']
+        self.assertEqual(data, {'next': None, 'items': [["user:1", "v1"], ["user:2", "v2"]]})
+        print("Binary scan commands - Test passed")
+
+    def test_autocommit_commands(self):
+        self.assertEqual(self.client.request("PUT", "key1", b"\x00value")['status'], 'Ok')
+        self.assertEqual(self.client.request("GET", "key1")['result'], b"\x00value")
+        self.assertEqual(self.client.request("DEL", "key1")['status'], 'Ok')
+        self.assertIsNone(self.client.request("GET", "key1")['result'])
+        self.assertEqual(self.client.request("PUT", "key1", b"value")['status'], 'Ok')
+        self.assertEqual(self.client.request("EXPIRE", "key1", 30)['result'], 1)
+        self.assertEqual(self.client.request("TTL", "key1")['result'], 30)
+        self.assertEqual(self.client.send_command("EXPIRE key1 0")['result'], 1)
+        self.assertEqual(self.client.request("TTL", "key1")['result'], -2)
+        self.assertEqual(self.client.request("MGET", ["key1"])['status'], 'Error')
+        print("Binary autocommit - Test passed")
+
+    def test_counter_commands(self):
+        self.assertEqual(self.client.incr("hits")['result'], 1)
+        self.assertEqual(self.client.incr("hits", 10)['result'], 11)
+        self.assertEqual(self.client.incr("hits", -4)['result'], 7)
+        self.assertEqual(self.client.append("log", b"\x00a")['result'], 2)
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        responses = self.client.send_many([f"INCRBY hits 3 {transaction_id}", f"DECRBY hits 1 {transaction_id}",
+                                           f"APPEND log bc {transaction_id}"])
+        self.assertEqual([response['result'] for response in responses], [10, 9, 4])
+        self.client.request("COMMIT", transaction_id=transaction_id)
+        self.assertEqual(self.client.request("GET", "log")['result'], b"\x00abc")
+        print("Binary counter commands - Test passed")
+
+    def test_optimistic_commands(self):
+        version = self.client.cas("counter", 0, b"\x00one")['result']
+        self.assertEqual(self.client.get_version("counter")['result'], [b"\x00one", version])
+        self.assertIsNone(self.client.cas("counter", 0, b"two")['result'])
+        self.assertEqual(self.client.get_version("missing")['result'], [None, 0])
+        responses = self.client.send_many([f"CAS counter {version} two", "GETV counter"])
+        self.assertEqual(responses[1]['result'], [b"two", responses[0]['result']])
+
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        self.assertEqual(self.client.watch(["counter"], transaction_id)['status'], 'Ok')
+        self.client.request("PUT", "counter", b"three", transaction_id)
+        self.client.request("PUT", "counter", b"four")
+        self.assertEqual(self.client.request("COMMIT", transaction_id=transaction_id)['status'], 'Error')
+        print("Binary optimistic commands - Test passed")
+
+    def test_showall_is_streamed(self):
+        self.server.SHOWALL_PAGE_SIZE = 2
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        self.client.mput({f"key{i}": f"value{i}".encode() for i in range(5)}, transaction_id)
+        self.client.request("COMMIT", transaction_id=transaction_id)
+
+        self.assertEqual([len(page) for page in self.client.show_all_pages()], [2, 2, 1])
+        transaction_id = self.client.request("BEGIN")['transaction_id']
+        responses = self.client.send_many(["SHOWALL", f"GET key4 {transaction_id}"])
+        self.assertEqual(sorted(responses[0]['data']), [f"key{i}" for i in range(5)])
+        self.assertEqual(responses[1]['result'], b'value4')
+        print("Binary SHOWALL streaming - Test passed")
+
+    def tearDown(self):
+        self.client.disconnect()
+        self.server.stop()
+        self.server_thread.join()
+
+
+class TestBinaryAsyncServer(TestBinaryServer):
+    server_class = AsyncServer
+    port = 9004
+
+
+class TestProtocolCost(unittest.TestCase):
+
+    def test_binary_is_cheaper_than_text(self):
+        """Compares the server-side cost of small PUT/GET requests in both protocols."""
+        server = Server(port=9005)
+        transaction_id = server.data_store.start_transaction()
+        count = 5000
+        lines = [f"PUT key{i} value{i} {transaction_id}".encode() for i in range(count)]
+        lines += [f"GET key{i} {transaction_id}".encode() for i in range(count)]
+        frames = [(Opcode.PUT, transaction_id, f"key{i}".encode(), f"value{i}".encode()) for i in range(count)]
+        frames += [(Opcode.GET, transaction_id, f"key{i}".encode(), b'') for i in range(count)]
+
+        start = time.perf_counter()
+        b''.join(server.process_lines(lines))
+        text_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        b''.join(server.process_binary(frames))
+        binary_seconds = time.perf_counter() - start
+
+        print(f"  text: {2 * count / text_seconds:,.0f} req/s, binary: {2 * count / binary_seconds:,.0f} req/s")
+        self.assertLess(binary_seconds, text_seconds)
+        print("Protocol cost - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
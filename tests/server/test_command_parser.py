@@ -16,10 +16,28 @@ class TestCommandParser(unittest.TestCase):
             {"command": "PUT key1 value1", "expected_action": "PUT", "expected_params": {'key': 'key1', 'value': 'value1'}, "expected_transaction_id": None},
             {"command": "GET key1", "expected_action": "GET", "expected_params": {'key': 'key1'}, "expected_transaction_id": None},
             {"command": "DEL key1", "expected_action": "DEL", "expected_params": {'key': 'key1'}, "expected_transaction_id": None},
+            {"command": "PUT key1 5", "expected_action": "PUT", "expected_params": {'key': 'key1', 'value': '5'}, "expected_transaction_id": None},
+            {"command": "PUT key1 5 2", "expected_action": "PUT", "expected_params": {'key': 'key1', 'value': '5'}, "expected_transaction_id": 2},
             {"command": "COMMIT 1", "expected_action": "COMMIT", "expected_params": {}, "expected_transaction_id": 1},
             {"command": "ROLLBACK 1", "expected_action": "ROLLBACK", "expected_params": {}, "expected_transaction_id": 1},
             {"command": "SHOWALL", "expected_action": "SHOWALL", "expected_params": {}, "expected_transaction_id": None},
             {"command": "COMMITALL", "expected_action": "COMMITALL", "expected_params": {}, "expected_transaction_id": None},
+            {"command": "SNAPSHOT", "expected_action": "SNAPSHOT", "expected_params": {}, "expected_transaction_id": None},
+            {"command": "STATS", "expected_action": "STATS", "expected_params": {}, "expected_transaction_id": None},
+            {"command": "SCAN tenant:1: 0 10", "expected_action": "SCAN", "expected_params": {'prefix': 'tenant:1:', 'cursor': '0', 'count': 10}, "expected_transaction_id": None},
+            {"command": "RANGE a m 5", "expected_action": "RANGE", "expected_params": {'start': 'a', 'end': 'm', 'limit': 5}, "expected_transaction_id": None},
+            {"command": "MGET key1 key2 3", "expected_action": "MGET", "expected_params": {'keys': ['key1', 'key2']}, "expected_transaction_id": 3},
+            {"command": "MDEL key1 3", "expected_action": "MDEL", "expected_params": {'keys': ['key1']}, "expected_transaction_id": 3},
+            {"command": "MPUT key1 value1 key2 2 3", "expected_action": "MPUT", "expected_params": {'pairs': [('key1', 'value1'), ('key2', '2')]}, "expected_transaction_id": 3},
+            {"command": "MPUT key1 value1 key2 2", "expected_action": "MPUT", "expected_params": {'pairs': [('key1', 'value1'), ('key2', '2')]}, "expected_transaction_id": None},
+            {"command": "INCR hits", "expected_action": "INCR", "expected_params": {'key': 'hits'}, "expected_transaction_id": None},
+            {"command": "INCR hits 2", "expected_action": "INCR", "expected_params": {'key': 'hits'}, "expected_transaction_id": 2},
+            {"command": "INCRBY hits 5", "expected_action": "INCRBY", "expected_params": {'key': 'hits', 'amount': 5}, "expected_transaction_id": None},
+            {"command": "DECRBY hits -5 2", "expected_action": "DECRBY", "expected_params": {'key': 'hits', 'amount': -5}, "expected_transaction_id": 2},
+            {"command": "APPEND log 5", "expected_action": "APPEND", "expected_params": {'key': 'log', 'value': '5'}, "expected_transaction_id": None},
+            {"command": "CAS counter 3 4", "expected_action": "CAS", "expected_params": {'key': 'counter', 'version': 3, 'value': '4'}, "expected_transaction_id": None},
+            {"command": "GETV counter", "expected_action": "GETV", "expected_params": {'key': 'counter'}, "expected_transaction_id": None},
+            {"command": "WATCH key1 key2 3", "expected_action": "WATCH", "expected_params": {'keys': ['key1', 'key2']}, "expected_transaction_id": 3},
         ]
 
         for test_case in test_cases:
@@ -45,6 +63,17 @@ class TestCommandParser(unittest.TestCase):
             "INVALID_COMMAND",
             "PUT key1",
             "GET",
+            "MGET",
+            "MPUT key1",
+            "MPUT key1 value1 key2",
+            "SCAN tenant:1: 0",
+            "RANGE a m 0",
+            "CAS counter 3",
+            "CAS counter x 4",
+            "WATCH key1",
+            "INCRBY hits",
+            "INCRBY hits many",
+            "APPEND log",
         ]
 
         for cmd in invalid_test_cases:
@@ -0,0 +1,45 @@
+import socket
+import unittest
+from server.core.framing import LineReader
+
+
+class TestLineReader(unittest.TestCase):
+
+    def setUp(self):
+        self.server_side, self.client_side = socket.socketpair()
+        self.reader = LineReader(self.server_side, max_line_length=1024)
+
+    def tearDown(self):
+        self.server_side.close()
+        self.client_side.close()
+
+    def test_coalesced_lines_are_split(self):
+        self.client_side.sendall(b"BEGIN\nPUT a 1 1\nGET a 1\n")
+        self.assertEqual(self.reader.read_lines(), [b"BEGIN", b"PUT a 1 1", b"GET a 1"])
+        print("Coalesced lines - Test passed")
+
+    def test_line_split_across_reads(self):
+        self.client_side.sendall(b"PUT a ")
+        self.client_side.sendall(b"1 1\nGET")
+        self.assertEqual(self.reader.read_line(), b"PUT a 1 1")
+        self.client_side.sendall(b" a 1\n")
+        self.assertEqual(self.reader.read_line(), b"GET a 1")
+        print("Line split across reads - Test passed")
+
+    def test_end_of_stream(self):
+        self.client_side.sendall(b"BEGIN\nCOMMIT 1")
+        self.client_side.close()
+        self.assertEqual(self.reader.read_line(), b"BEGIN")
+        self.assertEqual(self.reader.read_line(), b"COMMIT 1")
+        self.assertIsNone(self.reader.read_line())
+        print("End of stream - Test passed")
+
+    def test_oversized_line_is_rejected(self):
+        self.client_side.sendall(b"x" * 4096)
+        with self.assertRaises(ValueError):
+            self.reader.read_line()
+        print("Oversized line - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,25 @@
 import unittest
 from server.core.server import Server
 from client.client import Client
+from server.data_store.data_store import DataStore
+from server.data_store.workers.process_data_store import ProcessDataStore
 import threading
+import time
 
 
 class TestServer(unittest.TestCase):
+    port = 9000  # Different port for testing
+
+    def create_server(self):
+        return Server(port=self.port, data_store=DataStore(ordered_index=True))
 
     def setUp(self):
-        self.server = Server(port=9000)  # Different port for testing
+        self.server = self.create_server()
         self.server_thread = threading.Thread(target=self.server.start)
         self.server_thread.start()
+        self.server.started.wait(timeout=5)
 
-        self.client = Client(port=9000)
+        self.client = Client(port=self.port)
         self.client.connect()
 
     def test_commands(self):
@@ -35,6 +43,11 @@ class TestServer(unittest.TestCase):
         response = self.client.send_command(f"ROLLBACK {transaction_id1}")
         self.assertEqual(response['status'], 'Ok')
 
+        # A finished transaction cannot be used again
+        response = self.client.send_command(f"GET key1 {transaction_id1}")
+        self.assertEqual(response['status'], 'Error')
+        transaction_id1 = self.client.send_command("BEGIN")['transaction_id']
+
         # Test DEL command
         response = self.client.send_command(f"DEL key1 {transaction_id1}")
         self.assertEqual(response['status'], 'Ok')
@@ -52,11 +65,208 @@ class TestServer(unittest.TestCase):
         self.assertEqual(response['status'], 'Ok')
         self.assertIsNotNone(response['data'])  # Assuming the server returns the data
 
+    def test_large_value(self):
+        """Tests that values larger than one socket read are not truncated."""
+        value = "v" * 100000
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.client.send_command(f"PUT big {value} {transaction_id}")
+
+        response = self.client.send_command(f"GET big {transaction_id}")
+        self.assertEqual(response['result'], value)
+
+    def test_pipelined_commands(self):
+        """Tests that many commands sent in one write get their responses back in order."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        commands = [f"PUT key{i} value{i} {transaction_id}" for i in range(200)]
+        commands += [f"GET key{i} {transaction_id}" for i in range(200)]
+
+        responses = self.client.send_many(commands)
+        self.assertEqual(len(responses), 400)
+        self.assertTrue(all(response['status'] == 'Ok' for response in responses[:200]))
+        self.assertEqual([response['result'] for response in responses[200:]], [f"value{i}" for i in range(200)])
+
+    def test_batch_commands(self):
+        """Tests MPUT, MGET and MDEL over the text protocol."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        response = self.client.send_command(f"MPUT key1 value1 key2 value2 key3 value3 {transaction_id}")
+        self.assertEqual(response['status'], 'Ok')
+        self.assertEqual(self.client.mdelete(["key2"], transaction_id)['status'], 'Ok')
+
+        response = self.client.mget(["key1", "key2", "key3"], transaction_id)
+        self.assertEqual(response['result'], ['value1', None, 'value3'])
+
+    def test_expiry_commands(self):
+        """Tests PUT ... EX, EXPIRE and TTL over the text protocol."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"PUT session abc EX 100 {transaction_id}")['status'], 'Ok')
+        self.assertEqual(self.client.send_command(f"PUT counter 1 {transaction_id}")['status'], 'Ok')
+        self.client.send_command(f"COMMIT {transaction_id}")
+
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"TTL session {transaction_id}")['result'], 100)
+        self.assertEqual(self.client.send_command(f"TTL counter {transaction_id}")['result'], -1)
+        self.assertEqual(self.client.send_command(f"TTL missing {transaction_id}")['result'], -2)
+        self.assertEqual(self.client.send_command(f"EXPIRE counter 50 {transaction_id}")['result'], 1)
+        self.assertEqual(self.client.send_command(f"EXPIRE missing 50 {transaction_id}")['result'], 0)
+        self.assertEqual(self.client.send_command(f"TTL counter {transaction_id}")['result'], 50)
+
+    def test_autocommit_commands(self):
+        """Tests GET, PUT, DEL, EXPIRE and TTL without a transaction ID."""
+        self.assertEqual(self.client.send_command("PUT counter 5")['status'], 'Ok')
+        self.assertEqual(self.client.send_command("GET counter")['result'], '5')
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"GET counter {transaction_id}")['result'], '5')
+        self.assertEqual(self.client.send_command("EXPIRE counter 30")['result'], 1)
+        self.assertEqual(self.client.send_command("TTL counter")['result'], 30)
+        self.assertEqual(self.client.send_command("EXPIRE missing 30")['result'], 0)
+        self.assertEqual(self.client.send_command("DEL counter")['status'], 'Ok')
+        self.assertIsNone(self.client.send_command("GET counter")['result'])
+        self.assertEqual(self.client.send_command("STATS")['data']['active_transactions'], 1)
+
+    def test_counter_commands(self):
+        """Tests INCR, INCRBY, DECRBY and APPEND, on their own and in a transaction."""
+        self.assertEqual(self.client.send_command("INCR hits")['result'], 1)
+        self.assertEqual(self.client.send_command("INCRBY hits 10")['result'], 11)
+        self.assertEqual(self.client.send_command("DECRBY hits 4")['result'], 7)
+        self.assertEqual(self.client.send_command("GET hits")['result'], '7')
+        self.assertEqual(self.client.send_command("APPEND log abc")['result'], 3)
+        self.assertEqual(self.client.send_command("INCR log")['status'], 'Error')
+
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"INCRBY hits 3 {transaction_id}")['result'], 10)
+        self.assertEqual(self.client.send_command(f"APPEND log def {transaction_id}")['result'], 6)
+        self.client.send_command(f"COMMIT {transaction_id}")
+        self.assertEqual(self.client.send_command("GET log")['result'], 'abcdef')
+
+    def test_optimistic_commands(self):
+        """Tests GETV and CAS, and a WATCH transaction aborted by a concurrent change."""
+        version = self.client.send_command("CAS counter 0 1")['result']
+        self.assertEqual(self.client.send_command("GETV counter")['result'], ['1', version])
+        self.assertIsNone(self.client.send_command("CAS counter 0 2")['result'])
+        self.assertGreater(self.client.send_command(f"CAS counter {version} 2")['result'], version)
+
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"WATCH counter {transaction_id}")['status'], 'Ok')
+        self.client.send_command(f"PUT counter 3 {transaction_id}")
+        self.client.send_command("PUT counter 10")
+        self.assertEqual(self.client.send_command(f"COMMIT {transaction_id}")['status'], 'Error')
+        self.assertEqual(self.client.send_command("GET counter")['result'], '10')
+
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.client.send_command(f"WATCH counter {transaction_id}")
+        self.client.send_command(f"PUT counter 11 {transaction_id}")
+        self.assertEqual(self.client.send_command(f"COMMIT {transaction_id}")['status'], 'Ok')
+        self.assertEqual(self.client.send_command("GET counter")['result'], '11')
+
+    def test_scan_commands(self):
+        """Tests paging through a prefix with SCAN and through a key range with RANGE."""
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        pairs = ' '.join(f"tenant:{tenant}:user:{user} v{tenant}{user}" for tenant in range(2) for user in range(5))
+        self.client.send_command(f"MPUT {pairs} {transaction_id}")
+        self.client.send_command(f"COMMIT {transaction_id}")
+
+        cursor, keys = "0", []
+        while True:
+            data = self.client.send_command(f"SCAN tenant:1: {cursor} 2")['data']
+            keys.extend(key for key, _ in data['items'])
+            cursor = data['cursor']
+            if cursor == "0":
+                break
+        self.assertEqual(keys, [f"tenant:1:user:{user}" for user in range(5)])
+
+        data = self.client.send_command("RANGE tenant:0:user:3 tenant:1:user:1 2")['data']
+        self.assertEqual(data, {'next': 'tenant:1:user:0',
+                                'items': [['tenant:0:user:3', 'v03'], ['tenant:0:user:4', 'v04']]})
+        response = self.client.send_command("SCAN tenant:1: zz 2")
+        self.assertEqual(response['status'], 'Error')
+
+    def test_showall_is_streamed(self):
+        """Tests that SHOWALL arrives in pages that the client reassembles, in order with other responses."""
+        self.server.SHOWALL_PAGE_SIZE = 3
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        pairs = ' '.join(f"key{i} value{i}" for i in range(10))
+        self.client.send_command(f"MPUT {pairs} {transaction_id}")
+        self.client.send_command(f"COMMIT {transaction_id}")
+
+        pages = list(self.client.show_all_pages())
+        self.assertTrue(all(len(page) <= 3 for page in pages))
+        self.assertGreaterEqual(len(pages), 4)
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        responses = self.client.send_many(["STATS", "SHOWALL", f"GET key1 {transaction_id}"])
+        data = responses[1]['data']
+        self.assertEqual(data, {key: entry for page in pages for key, entry in page.items()})
+        self.assertEqual(data['key9'], {'value': 'value9', 'transaction_id': None})
+        self.assertNotIn('more', responses[1])
+        self.assertEqual(responses[2]['result'], 'value1')
+
+    def test_stats_command(self):
+        """Tests that STATS reports the memory estimate and eviction counters."""
+        before = self.client.send_command("STATS")['data']['used_memory']
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.client.send_command(f"PUT key1 value1 {transaction_id}")
+        self.client.send_command(f"COMMIT {transaction_id}")
+        stats = self.client.send_command("STATS")['data']
+        self.assertGreater(stats['used_memory'], before)
+        self.assertEqual((stats['evicted_keys'], stats['rejected_writes']), (0, 0))
+        self.assertEqual(stats['active_transactions'], 0)
+
+    def test_disconnect_rolls_back_open_transactions(self):
+        """Tests that a client leaving mid-transaction does not keep its locks."""
+        other = Client(port=self.port)
+        other.connect()
+        transaction_id = other.send_command("BEGIN")['transaction_id']
+        other.send_command(f"PUT key1 abandoned {transaction_id}")
+        other.disconnect()
+
+        deadline = time.time() + 5
+        while self.client.send_command("STATS")['data']['active_transactions'] and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.client.send_command("STATS")['data']['active_transactions'], 0)
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"PUT key1 value1 {transaction_id}")['status'], 'Ok')
+        self.client.send_command(f"COMMIT {transaction_id}")
+        transaction_id = self.client.send_command("BEGIN")['transaction_id']
+        self.assertEqual(self.client.send_command(f"GET key1 {transaction_id}")['result'], 'value1')
+
     def tearDown(self):
         self.client.disconnect()
         self.server.stop()
         self.server_thread.join()
 
 
+class TestServerWithWorkers(TestServer):
+    """Runs the server tests against shards owned by worker processes."""
+    port = 9007
+
+    def create_server(self):
+        return Server(port=self.port, data_store=ProcessDataStore(num_workers=2, ordered_index=True))
+
+    def tearDown(self):
+        super().tearDown()
+        self.server.data_store.close()
+
+
+class TestProcessCommand(unittest.TestCase):
+
+    def setUp(self):
+        self.server = Server(port=9001)
+        self.server.data_store.transaction_manager.lock_timeout = 0.1
+
+    def test_lock_conflict_returns_error(self):
+        """Tests that a lock conflict is reported to the client instead of killing the handler."""
+        holder = self.server.process_command("BEGIN")['transaction_id']
+        waiter = self.server.process_command("BEGIN")['transaction_id']
+        self.server.process_command(f"PUT key1 value1 {holder}")
+
+        response = self.server.process_command(f"PUT key1 value2 {waiter}")
+        self.assertEqual(response['status'], 'Error')
+
+        self.server.process_command(f"ROLLBACK {waiter}")
+        self.server.process_command(f"COMMIT {holder}")
+        waiter = self.server.process_command("BEGIN")['transaction_id']
+        response = self.server.process_command(f"PUT key1 value2 {waiter}")
+        self.assertEqual(response['status'], 'Ok')
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+from server.core.async_server import AsyncServer
+from server.core.server import Server
+
+
+class TestServerBenchmark(unittest.TestCase):
+    CLIENT_COUNTS = (10, 100, 1000)
+
+    async def _run_clients(self, port, num_clients):
+        """Connects num_clients clients at once, then has each run one transaction. Returns the threads in use
+        while all clients are connected and the time the transactions took."""
+        connections = await asyncio.gather(*(asyncio.open_connection('localhost', port) for _ in range(num_clients)))
+        await asyncio.sleep(0.2)
+        threads_in_use = threading.active_count()
+
+        async def client(reader, writer, client_id):
+            async def send(command):
+                writer.write(f"{command}\n".encode('utf-8'))
+                await writer.drain()
+                return json.loads(await reader.readline())
+
+            transaction_id = (await send("BEGIN"))['transaction_id']
+            responses = [
+                await send(f"PUT key{client_id} value{client_id} {transaction_id}"),
+                await send(f"GET key{client_id} {transaction_id}"),
+                await send(f"COMMIT {transaction_id}"),
+            ]
+            writer.close()
+            return responses
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(client(reader, writer, n) for n, (reader, writer) in enumerate(connections)))
+        elapsed = time.perf_counter() - start
+        for responses in results:
+            self.assertTrue(all(response['status'] == 'Ok' for response in responses))
+        return threads_in_use, elapsed
+
+    def _benchmark(self, server_class, port, num_clients):
+        """Runs one server mode against num_clients concurrent clients and returns (requests/sec, threads in use)."""
+        server = server_class(port=port, backlog=1024)
+        server_thread = threading.Thread(target=server.start)
+        server_thread.start()
+        server.started.wait(timeout=5)
+        try:
+            threads_in_use, elapsed = asyncio.run(self._run_clients(port, num_clients))
+        finally:
+            server.stop()
+            server_thread.join()
+        return num_clients * 4 / elapsed, threads_in_use
+
+    def test_threaded_vs_asyncio(self):
+        """Benchmark: threaded and asyncio servers at 10, 100 and 1000 concurrent clients."""
+        results = {}
+        port = 9100
+        for num_clients in self.CLIENT_COUNTS:
+            for server_class in (Server, AsyncServer):
+                port += 1
+                results[server_class, num_clients] = self._benchmark(server_class, port, num_clients)
+                requests_per_second, threads = results[server_class, num_clients]
+                print(f"{server_class.__name__:>11} {num_clients:>5} clients: "
+                      f"{requests_per_second:,.0f} req/s, {threads} threads")
+
+        self.assertLess(results[AsyncServer, 1000][1], results[Server, 1000][1])
+        print("Threaded vs asyncio server - Test passed")
+
+
+if __name__ == "__main__":
+    unittest.main()